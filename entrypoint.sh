@@ -1,7 +1,7 @@
 #!/bin/bash
 
-# Start FastAPI in the background
-uvicorn src.api.main:app --host 0.0.0.0 --port 8000 &
+# Start FastAPI in the background (pre-fork launcher: model loaded once, shared by workers)
+python -m src.api.serve --host 0.0.0.0 --port 8000 --workers "${API_WORKERS:-1}" &
 
 # Start Streamlit in the foreground
 streamlit run src/frontend/app.py --server.port 7860 --server.address 0.0.0.0
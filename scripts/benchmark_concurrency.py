@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for /v1/predict under different execution models.
+
+Starts one uvicorn server per INFERENCE_EXECUTOR mode, fires requests from
+a fixed number of concurrent clients and reports client-side latency
+percentiles and throughput. With `inline` every request's scoring/SHAP/Redis
+work runs on the event loop, so slow requests delay all others and p99
+grows with concurrency; `thread` and `process` move that work off the loop.
+
+Usage:
+    python scripts/benchmark_concurrency.py
+    python scripts/benchmark_concurrency.py --modes inline thread --concurrency 200 \\
+        --requests 4000 --explain
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+import numpy as np
+
+from scripts.benchmark_tree_evaluator import synthetic_rows
+
+
+def start_server(mode: str, port: int, args) -> subprocess.Popen:
+    """Launch uvicorn with the given executor mode and wait for /health."""
+    env = dict(
+        os.environ,
+        INFERENCE_EXECUTOR=mode,
+        INFERENCE_CPU_WORKERS=str(args.cpu_workers),
+        ENABLE_EXPLAINABILITY=str(args.explain).lower(),
+        MICRO_BATCHING=str(not args.no_micro_batching).lower(),
+    )
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "src.api.main:app",
+            "--port",
+            str(port),
+            "--no-access-log",
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+
+    proc.kill()
+    raise RuntimeError(f"Server for mode '{mode}' did not become ready")
+
+
+async def run_load(url: str, payloads: list, concurrency: int) -> tuple:
+    """Send payloads from `concurrency` clients; return (latencies_s, errors, wall_s)."""
+    latencies = []
+    errors = 0
+    queue = iter(payloads)
+
+    async with httpx.AsyncClient(
+        timeout=30, limits=httpx.Limits(max_connections=concurrency)
+    ) as client:
+
+        async def client_loop():
+            nonlocal errors
+            for payload in queue:
+                start = time.perf_counter()
+                try:
+                    response = await client.post(url, json=payload)
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                latencies.append(time.perf_counter() - start)
+                errors += not ok
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+        wall = time.perf_counter() - start
+
+    return np.asarray(latencies), errors, wall
+
+
+def request_payloads(n: int) -> list:
+    """Synthetic /v1/predict bodies (features resolved by the server)."""
+    payloads = []
+    for i, row in enumerate(synthetic_rows(n, seed=1)):
+        payloads.append(
+            {
+                "user_id": f"bench_{i % 500}",
+                **{
+                    key: row[key]
+                    for key in (
+                        "trans_date_trans_time",
+                        "amt",
+                        "lat",
+                        "long",
+                        "merch_lat",
+                        "merch_long",
+                        "job",
+                        "category",
+                        "gender",
+                        "dob",
+                    )
+                },
+            }
+        )
+    return payloads
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /v1/predict under concurrency")
+    parser.add_argument("--modes", nargs="+", default=["inline", "thread"])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--cpu-workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--explain", action="store_true", help="Enable SHAP in responses")
+    parser.add_argument("--no-micro-batching", action="store_true")
+    args = parser.parse_args()
+
+    payloads = request_payloads(args.requests)
+    url = f"http://127.0.0.1:{args.port}/v1/predict"
+
+    print(
+        f"{args.requests} requests, {args.concurrency} concurrent clients, "
+        f"explain={args.explain}, micro_batching={not args.no_micro_batching}"
+    )
+    print(f"{'mode':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'errors':>7}")
+
+    for mode in args.modes:
+        proc = start_server(mode, args.port, args)
+        try:
+            asyncio.run(run_load(url, payloads[: args.concurrency], args.concurrency))  # warm-up
+            latencies, errors, wall = asyncio.run(run_load(url, payloads, args.concurrency))
+        finally:
+            proc.terminate()
+            proc.wait()
+
+        p50, p95, p99 = np.percentile(latencies * 1000, [50, 95, 99])
+        print(
+            f"{mode:>8} {p50:9.1f} {p95:9.1f} {p99:9.1f} {len(latencies) / wall:9.0f} {errors:7d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+FraudFeatureExtractor.transform: vectorized implementation vs the original.
+
+Builds frames of raw transactions in the dataset's formats (string
+timestamps and dates of birth, M/F gender, float64 coordinates) and, per
+size, times the current transform against the original pandas
+implementation (kept below as legacy_transform), reports the peak memory
+each allocates (tracemalloc, separate run) and checks that both outputs are
+identical.
+
+The 10M-row frame needs several GB of RAM (mostly the raw strings); pass
+--rows to skip it, or --no-legacy to time only the current implementation.
+
+Usage:
+    python scripts/benchmark_feature_extractor.py
+    python scripts/benchmark_feature_extractor.py --rows 10000,1000000 --repeat 3
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from src.models.pipeline import FraudFeatureExtractor
+
+
+def legacy_transform(X: pd.DataFrame) -> pd.DataFrame:
+    """FraudFeatureExtractor.transform before vectorization (reference)."""
+    X = X.copy()
+
+    if "trans_date_trans_time" in X.columns:
+        if X["trans_date_trans_time"].dtype == "object":
+            X["trans_date_trans_time"] = pd.to_datetime(X["trans_date_trans_time"])
+        dt = X["trans_date_trans_time"].dt
+        X["hour_sin"] = np.sin(2 * np.pi * dt.hour / 24)
+        X["hour_cos"] = np.cos(2 * np.pi * dt.hour / 24)
+        X["day_sin"] = np.sin(2 * np.pi * dt.dayofweek / 7)
+        X["day_cos"] = np.cos(2 * np.pi * dt.dayofweek / 7)
+        if "dob" in X.columns:
+            if X["dob"].dtype == "object":
+                X["dob"] = pd.to_datetime(X["dob"])
+            X["age"] = dt.year - X["dob"].dt.year
+
+    if all(c in X.columns for c in ["lat", "long", "merch_lat", "merch_long"]):
+        lat1, lon1, lat2, lon2 = map(
+            np.radians, [X["lat"], X["long"], X["merch_lat"], X["merch_long"]]
+        )
+        dlon = lon2 - lon1
+        dlat = lat2 - lat1
+        a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+        X["distance_km"] = 2 * np.arcsin(np.sqrt(a)) * 6371
+
+    if "amt" in X.columns:
+        X["amt_log"] = np.log1p(X["amt"])
+
+    if "gender" in X.columns:
+        X["gender"] = X["gender"].map({"M": 1, "F": 0}).astype(int)
+
+    return X
+
+
+def raw_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    """n raw transactions over 18 months, ~1000 cardholders' dates of birth."""
+    rng = np.random.default_rng(seed)
+    timestamps = np.datetime64("2019-01-01") + rng.integers(0, 540 * 86400, n).astype(
+        "timedelta64[s]"
+    )
+    dobs = np.datetime64("1930-01-01") + rng.integers(0, 27000, 1000).astype("timedelta64[D]")
+    return pd.DataFrame(
+        {
+            "trans_date_trans_time": np.char.replace(
+                np.datetime_as_string(timestamps), "T", " "
+            ).astype(object),
+            "dob": np.datetime_as_string(rng.choice(dobs, n)).astype(object),
+            "gender": rng.choice(np.array(["M", "F"], dtype=object), n),
+            "lat": rng.uniform(20, 50, n),
+            "long": rng.uniform(-125, -70, n),
+            "merch_lat": rng.uniform(20, 50, n),
+            "merch_long": rng.uniform(-125, -70, n),
+            "amt": np.round(rng.lognormal(4, 1.2, n), 2),
+            "category": rng.choice(np.array(["grocery_pos", "gas_transport"], dtype=object), n),
+        }
+    )
+
+
+def measure(transform, frame: pd.DataFrame, repeat: int):
+    """(best seconds over repeat runs, peak MB allocated in one traced run, output)."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        out = transform(frame)
+        best = min(best, time.perf_counter() - started)
+        del out
+
+    tracemalloc.start()
+    out = transform(frame)
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return best, peak, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FraudFeatureExtractor.transform")
+    parser.add_argument("--rows", default="10000,1000000,10000000", help="Comma-separated sizes")
+    parser.add_argument("--repeat", type=int, default=1, help="Timed runs per size (best kept)")
+    parser.add_argument("--no-legacy", action="store_true", help="Skip the original transform")
+    args = parser.parse_args()
+
+    extractor = FraudFeatureExtractor()
+    print(f"{'rows':>11} {'impl':>7} {'seconds':>9} {'rows/s':>12} {'peak MB':>9} {'speedup':>8}")
+    for n in (int(size) for size in args.rows.split(",")):
+        frame = raw_frame(n)
+        seconds, peak, out = measure(extractor.transform, frame, args.repeat)
+        print(f"{n:>11,} {'current':>7} {seconds:9.3f} {n / seconds:12,.0f} {peak:9.0f}")
+        if args.no_legacy:
+            continue
+
+        legacy_seconds, legacy_peak, expected = measure(legacy_transform, frame, args.repeat)
+        pd.testing.assert_frame_equal(out, expected, check_exact=True)
+        print(
+            f"{n:>11,} {'legacy':>7} {legacy_seconds:9.3f} {n / legacy_seconds:12,.0f} "
+            f"{legacy_peak:9.0f} {legacy_seconds / seconds:7.1f}x"
+        )
+        del out, expected
+
+
+if __name__ == "__main__":
+    main()
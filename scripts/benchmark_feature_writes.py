@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Feature-store write throughput: client-side EMA vs server-side Lua script.
+
+Compares, against a running Redis:
+- get+multi: the previous add_transaction (GET the EMA, compute it in
+  Python, then a MULTI/EXEC pipeline) - two round trips per write
+- lua: RedisFeatureStore.add_transaction (one EVALSHA) - one round trip
+
+Each mode is driven by N threads writing to a shared set of users, and
+reports writes/sec plus how many EMA updates were lost to interleaving
+(the client-side read-modify-write lets concurrent writers of the same
+user overwrite each other's update).
+
+Usage:
+    python scripts/benchmark_feature_writes.py
+    python scripts/benchmark_feature_writes.py --writes 20000 --threads 16 --users 100
+"""
+
+import argparse
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.features.store import RedisFeatureStore
+
+
+def add_transaction_get_multi(
+    store: RedisFeatureStore, user_id: str, amount: float, timestamp: int
+) -> None:
+    """The two-round-trip write this benchmark compares against."""
+    tx_key = store._get_tx_history_key(user_id)
+    avg_key = store._get_avg_spend_key(user_id)
+
+    current = store.client.get(avg_key)
+    new_ema = amount
+    if current is not None:
+        new_ema = store.ema_alpha * amount + (1 - store.ema_alpha) * float(current)
+
+    pipe = store.client.pipeline()
+    pipe.zadd(tx_key, {f"{timestamp}:{amount}": timestamp})
+    pipe.zremrangebyscore(tx_key, "-inf", timestamp - 86400)
+    pipe.expire(tx_key, store.key_ttl)
+    pipe.set(avg_key, new_ema)
+    pipe.expire(avg_key, store.key_ttl)
+    pipe.execute()
+
+
+def run(store: RedisFeatureStore, write, prefix: str, writes: int, threads: int, users: int):
+    """Drive `writes` writes of amount 100 after a 0 seed; return (writes/sec, lost updates)."""
+    user_ids = [f"{prefix}_{i}" for i in range(users)]
+    for user_id in user_ids:
+        store.delete_user_data(user_id)
+        store.add_transaction(user_id, 0.0, timestamp=1000000)
+
+    def worker(i):
+        write(user_ids[i % users], 100.0, 1000001 + i)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, range(writes)))
+    wall = time.perf_counter() - start
+
+    # With equal amounts the EMA after k updates is 100 * (1 - (1 - alpha)^k),
+    # so the stored value tells how many updates actually took effect
+    expected_updates = writes // users
+    lost = 0
+    for user_id in user_ids:
+        features = store.get_features(user_id, current_timestamp=1000001 + writes)
+        remaining = 1 - features["avg_spend_24h"] / 100.0
+        applied = expected_updates
+        if remaining > 0:
+            applied = round(math.log(remaining) / math.log(1 - store.ema_alpha))
+        lost += max(0, expected_updates - applied)
+
+    for user_id in user_ids:
+        store.delete_user_data(user_id)
+
+    return writes / wall, lost
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark feature-store writes")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument("--db", type=int, default=15)
+    parser.add_argument("--writes", type=int, default=10000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--users", type=int, default=50)
+    args = parser.parse_args()
+
+    store = RedisFeatureStore(
+        host=args.host, port=args.port, db=args.db, max_connections=args.threads
+    )
+    args.writes -= args.writes % args.users  # Same number of writes per user
+
+    modes = {
+        "get+multi": lambda u, a, t: add_transaction_get_multi(store, u, a, t),
+        "lua": store.add_transaction,
+    }
+
+    print(f"{args.writes} writes, {args.threads} threads, {args.users} users")
+    print(f"{'mode':>10} {'writes/s':>10} {'lost EMA updates':>17}")
+    for name, write in modes.items():
+        rate, lost = run(store, write, f"bench_{name}", args.writes, args.threads, args.users)
+        print(f"{name:>10} {rate:10.0f} {lost:17d}")
+
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Per-user key layouts: Redis memory and key count, "keys" vs "hash".
+
+Writes the same transactions for N users in each key layout (into a
+dedicated, flushed database) and reports keys and bytes per user, and the
+memory projected for --target-users (10M by default). Memory is the
+used_memory growth reported by INFO memory; servers without it (fakeredis)
+get MEMORY USAGE over a sample of users, or failing that the stored
+payload sizes (no per-key overhead, so the layouts look closer than they
+are).
+
+Run with --users 10000000 to measure 10M users directly instead of
+projecting (needs a server with room for the larger layout).
+
+Usage:
+    python scripts/benchmark_key_layout.py
+    python scripts/benchmark_key_layout.py --users 1000000 --tx-per-user 20
+"""
+
+import argparse
+import time
+
+import numpy as np
+import redis
+
+from src.features.store import KEY_LAYOUTS, RedisFeatureStore, user_keys
+
+
+def used_memory(client: redis.Redis):
+    """INFO memory used_memory in bytes, or None if unsupported."""
+    try:
+        return int(client.info("memory")["used_memory"])
+    except (redis.exceptions.ResponseError, KeyError):
+        # Some servers (fakeredis) close the connection after an error reply
+        client.connection_pool.disconnect()
+        return None
+
+
+def sampled_bytes(client: redis.Redis, keys) -> int:
+    """Bytes of some keys: MEMORY USAGE, or their payload size if unsupported."""
+    total = 0
+    for key in keys:
+        try:
+            total += client.memory_usage(key) or 0
+            continue
+        except redis.exceptions.ResponseError:
+            client.connection_pool.disconnect()
+
+        kind = client.type(key)
+        if kind == "zset":
+            total += sum(len(m) + 8 for m in client.zrange(key, 0, -1))
+        elif kind == "hash":
+            total += sum(len(f) + len(v) for f, v in client.hgetall(key).items())
+        else:
+            total += len(client.get(key) or "")
+        total += len(key)
+    return total
+
+
+def write_users(store: RedisFeatureStore, users: int, tx_per_user: int, batch: int) -> float:
+    """Record tx_per_user transactions (spread over 24h) for each user; seconds taken."""
+    offsets = np.linspace(0, 86399, tx_per_user).astype(int)
+    amounts = np.round(np.random.default_rng(0).uniform(1, 500, tx_per_user), 2)
+    started = time.perf_counter()
+    events = []
+    for u in range(users):
+        events += [
+            (f"bench_{u}", float(amount), 1000000 + int(offset))
+            for offset, amount in zip(offsets, amounts)
+        ]
+        if len(events) >= batch:
+            store.add_transactions(events)
+            events = []
+    store.add_transactions(events)
+    return time.perf_counter() - started
+
+
+def measure(store: RedisFeatureStore, args) -> dict:
+    """Keys and bytes per user after writing args.users users in store's layout."""
+    client = store.client
+    client.flushdb()
+    before = used_memory(client)
+    seconds = write_users(store, args.users, args.tx_per_user, args.batch)
+    after = used_memory(client)
+    keys = client.dbsize()
+
+    if before is not None and after is not None:
+        per_user, source = (after - before) / args.users, "INFO used_memory"
+    else:
+        sample = [f"bench_{u}" for u in range(min(args.sample, args.users))]
+        sample_keys = [key for u in sample for key in user_keys(u) if client.exists(key)]
+        per_user, source = sampled_bytes(client, sample_keys) / len(sample), "sampled keys"
+
+    client.flushdb()
+    return {
+        "keys_per_user": keys / args.users,
+        "bytes_per_user": per_user,
+        "source": source,
+        "write_seconds": seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-user key layouts")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument("--db", type=int, default=15, help="Flushed before and after each run")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--tx-per-user", type=int, default=5, help="Transactions in the 24h window")
+    parser.add_argument("--window-mode", choices=["zset", "buckets"], default="zset")
+    parser.add_argument("--target-users", type=int, default=10_000_000)
+    parser.add_argument("--batch", type=int, default=5000, help="Events per pipeline")
+    parser.add_argument("--sample", type=int, default=1000, help="Users sampled without INFO")
+    args = parser.parse_args()
+
+    results = {}
+    for layout in KEY_LAYOUTS:
+        store = RedisFeatureStore(
+            host=args.host,
+            port=args.port,
+            db=args.db,
+            window_mode=args.window_mode,
+            key_layout=layout,
+        )
+        results[layout] = measure(store, args)
+        store.close()
+
+    print(
+        f"\n{args.users:,} users x {args.tx_per_user} transactions ({args.window_mode} window), "
+        f"projected to {args.target_users:,} users"
+    )
+    print(f"{'layout':>8} {'keys/user':>10} {'bytes/user':>11} {'projected':>11} {'write s':>8}")
+    for layout, r in results.items():
+        projected_gb = r["bytes_per_user"] * args.target_users / 1e9
+        print(
+            f"{layout:>8} {r['keys_per_user']:10.2f} {r['bytes_per_user']:11,.0f} "
+            f"{projected_gb:9.2f}GB {r['write_seconds']:8.1f}"
+        )
+
+    keys, hashed = results["keys"]["bytes_per_user"], results["hash"]["bytes_per_user"]
+    if keys > 0:
+        print(
+            f"hash layout: {1 - hashed / keys:.1%} less memory, "
+            f"{(keys - hashed) * args.target_users / 1e9:.2f} GB saved at "
+            f"{args.target_users:,} users ({results['hash']['source']})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Feature read throughput with 0 to N read replicas.
+
+Seeds --users users on the primary, then for k = 0..N replicas (the first
+k) client threads send batches of feature reads (get_features_many) for a
+fixed duration, optionally while --writers threads keep writing to the
+primary; reports users read per second and the share served by replicas.
+
+--spawn N starts a local primary and N replicas (redis-server --replicaof,
+ports from --base-port) for the run and stops them afterwards; otherwise
+pass the URLs of an existing primary and its replicas. Databases of one
+server, the default, only exercise the routing: they share its thread (and
+only the primary's own database is ever fresh).
+
+Usage:
+    python scripts/benchmark_replica_reads.py --spawn 2
+    python scripts/benchmark_replica_reads.py --primary redis://db-a:6379/0 \\
+        --replicas redis://db-b:6379/0,redis://db-c:6379/0 --writers 2
+"""
+
+import argparse
+import random
+import shutil
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import redis
+
+from src.features.sharded_store import parse_redis_url
+from src.features.store import RedisFeatureStore
+
+
+def run_for(seconds: float, threads: int, work) -> int:
+    """Call work() from `threads` threads for `seconds`; total items it reported."""
+    deadline = time.perf_counter() + seconds
+
+    def loop() -> int:
+        done = 0
+        while time.perf_counter() < deadline:
+            done += work()
+        return done
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return sum(pool.map(lambda _: loop(), range(threads)))
+
+
+def spawn_servers(replicas: int, base_port: int):
+    """Start a primary on base_port and replicas of it on the next ports; (processes, URLs)."""
+    if shutil.which("redis-server") is None:
+        raise SystemExit("--spawn needs redis-server on PATH")
+
+    processes, urls = [], []
+    for i in range(replicas + 1):
+        port = base_port + i
+        command = ["redis-server", "--port", str(port), "--save", "", "--appendonly", "no"]
+        if i:
+            command += ["--replicaof", "127.0.0.1", str(base_port)]
+        processes.append(subprocess.Popen(command, stdout=subprocess.DEVNULL))
+        urls.append(f"redis://127.0.0.1:{port}/0")
+
+    # Wait until every replica has completed its initial sync
+    deadline = time.monotonic() + 10
+    for url in urls[1:]:
+        client = redis.Redis(**parse_redis_url(url))
+        while True:
+            try:
+                if client.info("replication").get("master_link_status") == "up":
+                    break
+            except redis.exceptions.ConnectionError:
+                pass
+            if time.monotonic() > deadline:
+                stop_servers(processes)
+                raise SystemExit(f"replica {url} did not sync")
+            time.sleep(0.1)
+    return processes, urls
+
+
+def stop_servers(processes) -> None:
+    """Terminate spawned redis-server processes."""
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.wait()
+
+
+def seed(store: RedisFeatureStore, user_ids, per_user: int, now: int) -> None:
+    """Write per_user transactions over the last 24h for every user."""
+    events = []
+    for user_id in user_ids:
+        events += [
+            (user_id, round(random.uniform(1, 500), 2), now - random.randrange(86400))
+            for _ in range(per_user)
+        ]
+        if len(events) >= 5000:
+            store.add_transactions(events)
+            events = []
+    store.add_transactions(events)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark feature reads with read replicas")
+    parser.add_argument("--primary", default="redis://localhost:6379/15")
+    parser.add_argument("--replicas", default="", help="Comma-separated redis:// URLs")
+    parser.add_argument("--spawn", type=int, default=0, help="Start a primary and N replicas")
+    parser.add_argument("--base-port", type=int, default=7400)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--tx-per-user", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=0, help="Threads writing meanwhile")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--max-staleness-ms", type=float, default=1000.0)
+    parser.add_argument("--hedge-ms", type=float, default=0.0, help="0: no hedging")
+    args = parser.parse_args()
+
+    processes = []
+    if args.spawn:
+        processes, urls = spawn_servers(args.spawn, args.base_port)
+        primary, replica_urls = urls[0], urls[1:]
+    else:
+        primary = args.primary
+        replica_urls = [url.strip() for url in args.replicas.split(",") if url.strip()]
+
+    try:
+        user_ids = [f"replica_bench_{i}" for i in range(args.users)]
+        now = 2000000000
+        connections = 4 * (args.threads + args.writers)
+        writer_store = RedisFeatureStore(**parse_redis_url(primary), max_connections=connections)
+        seed(writer_store, user_ids, args.tx_per_user, now)
+
+        print(
+            f"{args.threads} reader threads, {args.writers} writer threads, batches of "
+            f"{args.batch}, {args.seconds}s per run"
+        )
+        print(f"{'replicas':>8} {'reads/s':>12} {'from replicas':>14} {'fallbacks':>10}")
+        for k in range(len(replica_urls) + 1):
+            store = RedisFeatureStore(
+                **parse_redis_url(primary),
+                max_connections=connections,
+                replicas=[parse_redis_url(url) for url in replica_urls[:k]],
+                replica_max_staleness_ms=args.max_staleness_ms,
+                replica_hedge_ms=args.hedge_ms,
+            )
+            router = store.replica_router
+            if router is not None:
+                # Let the first heartbeats replicate
+                deadline = time.monotonic() + 5
+                while time.monotonic() < deadline and all(
+                    router.staleness_ms(i) > router.max_staleness_ms
+                    for i in range(len(router.names))
+                ):
+                    time.sleep(0.05)
+
+            def read() -> int:
+                batch = random.sample(user_ids, args.batch)
+                store.get_features_many(batch, [now] * len(batch))
+                return 1
+
+            def write() -> int:
+                events = [
+                    (random.choice(user_ids), round(random.uniform(1, 500), 2), now)
+                    for _ in range(args.batch)
+                ]
+                writer_store.add_transactions(events)
+                return 0
+
+            with ThreadPoolExecutor(max_workers=1) as background:
+                if args.writers:
+                    background.submit(run_for, args.seconds, args.writers, write)
+                batches = run_for(args.seconds, args.threads, read)
+
+            reads = batches * args.batch / args.seconds
+            share, fallbacks = 0.0, 0
+            if router is not None:
+                stats = router.stats()
+                served = sum(replica["reads"] for replica in stats["replicas"].values())
+                share, fallbacks = served / max(batches, 1), stats["primary_reads"]
+            print(f"{k:>8} {reads:12,.0f} {share:14.1%} {fallbacks:10,}")
+            store.close()
+
+        keys = list(writer_store.client.scan_iter(match="user:replica_bench_*", count=1000))
+        for i in range(0, len(keys), 1000):
+            writer_store.client.delete(*keys[i : i + 1000])
+        writer_store.close()
+    finally:
+        stop_servers(processes)
+
+
+if __name__ == "__main__":
+    main()
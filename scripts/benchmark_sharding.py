@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Sharded feature-store throughput from 1 to N shards.
+
+For k = 1..N shards (the first k URLs), client threads send batches of
+events (add_transactions) and then batches of feature reads
+(get_features_many) for a fixed duration each; reports events/sec and
+users/sec. Each batch is split by shard and the per-shard pipelines run in
+parallel, so throughput scales with k when the URLs are separate
+redis-server processes (or hosts). Databases of one server, the default,
+only exercise the routing: they share the server's single thread.
+
+Usage:
+    python scripts/benchmark_sharding.py \\
+        --shards redis://localhost:6379/0,redis://localhost:6380/0,\\
+redis://localhost:6381/0,redis://localhost:6382/0
+    python scripts/benchmark_sharding.py --threads 8 --batch 500 --seconds 5
+"""
+
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.features.sharded_store import ShardedFeatureStore
+
+DEFAULT_SHARDS = ",".join(f"redis://localhost:6379/{db}" for db in (12, 13, 14, 15))
+
+
+def run_for(seconds: float, threads: int, work) -> int:
+    """Call work() from `threads` threads for `seconds`; total items it reported."""
+    deadline = time.perf_counter() + seconds
+
+    def loop() -> int:
+        done = 0
+        while time.perf_counter() < deadline:
+            done += work()
+        return done
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return sum(pool.map(lambda _: loop(), range(threads)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark feature-store sharding")
+    parser.add_argument("--shards", default=DEFAULT_SHARDS, help="Comma-separated redis:// URLs")
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    urls = [url.strip() for url in args.shards.split(",") if url.strip()]
+    user_ids = [f"shard_bench_{i}" for i in range(args.users)]
+    now = 2000000000
+
+    print(f"{args.threads} threads, batches of {args.batch}, {args.seconds}s per mode")
+    print(f"{'shards':>6} {'writes/s':>12} {'reads/s':>12}")
+    for k in range(1, len(urls) + 1):
+        store = ShardedFeatureStore.from_urls(urls[:k], max_connections=4 * args.threads)
+
+        def write() -> int:
+            events = [
+                (random.choice(user_ids), round(random.uniform(1, 500), 2), now)
+                for _ in range(args.batch)
+            ]
+            store.add_transactions(events)
+            return len(events)
+
+        def read() -> int:
+            batch = random.sample(user_ids, args.batch)
+            store.get_features_many(batch, [now] * len(batch))
+            return len(batch)
+
+        writes = run_for(args.seconds, args.threads, write) / args.seconds
+        reads = run_for(args.seconds, args.threads, read) / args.seconds
+        print(f"{k:>6} {writes:12,.0f} {reads:12,.0f}")
+
+        for shard in store.shards.values():
+            keys = list(shard.client.scan_iter(match="user:shard_bench_*", count=1000))
+            for i in range(0, len(keys), 1000):
+                shard.client.delete(*keys[i : i + 1000])
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark the flattened tree evaluator against XGBoost.
+
+Checks that FlatTreeEnsemble reproduces XGBClassifier.predict_proba exactly,
+then times both at several batch sizes on synthetic transactions passed
+through the compiled preprocessing path.
+
+Usage:
+    python scripts/benchmark_tree_evaluator.py
+    python scripts/benchmark_tree_evaluator.py --batch-sizes 1 32 256 1024 --repeats 200
+"""
+
+import argparse
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.features.constants import category_names, job_names
+from src.models.compiled import CompiledFraudPipeline
+from src.models.forest import FlatTreeEnsemble
+
+
+def synthetic_rows(n: int, seed: int = 0) -> list:
+    """Random raw transactions in the API's model-input format."""
+    rng = np.random.default_rng(seed)
+    times = pd.Timestamp("2019-01-01") + pd.to_timedelta(
+        rng.integers(0, 2 * 365 * 86400, n), unit="s"
+    )
+    return [
+        {
+            "trans_date_trans_time": times[i].strftime("%Y-%m-%d %H:%M:%S"),
+            "amt": float(rng.lognormal(4, 1.2)),
+            "lat": float(rng.uniform(25, 48)),
+            "long": float(rng.uniform(-124, -67)),
+            "merch_lat": float(rng.uniform(25, 48)),
+            "merch_long": float(rng.uniform(-124, -67)),
+            "job": str(rng.choice(job_names)),
+            "category": str(rng.choice(category_names)),
+            "gender": str(rng.choice(["M", "F"])),
+            "dob": f"{rng.integers(1930, 2004)}-{rng.integers(1, 13):02d}-15",
+            "trans_count_24h": int(rng.integers(0, 30)),
+            "amt_to_avg_ratio_24h": float(rng.lognormal(0, 0.7)),
+            "amt_relative_to_all_time": float(rng.lognormal(0, 0.7)),
+        }
+        for i in range(n)
+    ]
+
+
+def time_call(fn, repeats: int) -> float:
+    """Median wall time of fn() in milliseconds."""
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark flattened tree evaluator")
+    parser.add_argument("--model-path", default="models/fraud_model.pkl")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 1024])
+    parser.add_argument("--repeats", type=int, default=100)
+    parser.add_argument("--parity-rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    pipeline = joblib.load(args.model_path)
+    model = pipeline.named_steps["model"]
+
+    start = time.perf_counter()
+    forest = FlatTreeEnsemble.from_xgboost(model)
+    export_ms = (time.perf_counter() - start) * 1000
+    print(
+        f"Exported {forest.n_trees} trees, {len(forest.feature):,} nodes, "
+        f"max depth {forest.max_depth} in {export_ms:.0f}ms"
+    )
+
+    compiled = CompiledFraudPipeline(pipeline, flat_tree_max_rows=0)
+    X = compiled.transform(synthetic_rows(max(args.parity_rows, max(args.batch_sizes))))
+
+    # Parity check
+    expected = model.predict_proba(X)
+    actual = forest.predict_proba(X)
+    mismatches = int((actual != expected).any(axis=1).sum())
+    max_diff = float(np.abs(actual - expected).max())
+    status = "OK" if mismatches == 0 else "MISMATCH"
+    print(
+        f"Parity on {len(X):,} rows: {status} ({mismatches} rows differ, max |diff| {max_diff:g})"
+    )
+
+    print(f"\n{'batch':>6} {'xgboost ms':>11} {'flat ms':>9} {'speedup':>8}")
+    for batch_size in args.batch_sizes:
+        batch = np.ascontiguousarray(X[:batch_size])
+        repeats = max(5, args.repeats * 32 // max(batch_size, 32))
+        xgb_ms = time_call(lambda: model.predict_proba(batch), repeats)
+        flat_ms = time_call(lambda: forest.predict_proba(batch), repeats)
+        print(f"{batch_size:>6} {xgb_ms:>11.3f} {flat_ms:>9.3f} {xgb_ms / flat_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Velocity window storage: memory per user and count accuracy, ZSET vs buckets.
+
+Against a running Redis, reports:
+- Memory: bytes per user for the 24h window key after N transactions in a
+  day, in window_mode="zset" (one member per transaction) and "buckets"
+  (one hash field per bucket). Uses MEMORY USAGE; servers without it
+  (fakeredis) get an estimate from the stored payload sizes instead.
+- Accuracy: trans_count_24h of the buckets mode against the exact ZSET
+  count, at random query times over a multi-day random transaction stream.
+  Buckets count the 86400 / bucket_seconds buckets ending with the query
+  time's, so transactions in the oldest partial bucket are missed.
+
+Usage:
+    python scripts/benchmark_velocity_memory.py
+    python scripts/benchmark_velocity_memory.py --bucket-seconds 300 900 3600
+"""
+
+import argparse
+
+import numpy as np
+import redis
+
+from src.features.store import RedisFeatureStore
+
+
+def memory_usage_supported(client: redis.Redis) -> bool:
+    """Whether the server implements MEMORY USAGE."""
+    try:
+        client.memory_usage("benchmark:probe")
+        return True
+    except redis.exceptions.ResponseError:
+        # Some servers (fakeredis) close the connection after an error reply
+        client.connection_pool.disconnect()
+        return False
+
+
+def key_bytes(client: redis.Redis, key: str, measured: bool) -> int:
+    """Bytes for one key: MEMORY USAGE, or its payload size if unsupported."""
+    if measured:
+        return client.memory_usage(key) or 0
+
+    if client.type(key) == "zset":
+        members = client.zrange(key, 0, -1)
+        return sum(len(m) + 8 for m in members)  # Member + double score
+    return sum(len(f) + len(v) for f, v in client.hgetall(key).items())
+
+
+def memory_report(stores: dict, sizes: list) -> None:
+    """Print window-key bytes per user after n transactions spread over 24h."""
+    print("\nMemory per user (24h window key)")
+    print(f"{'tx/day':>8} " + " ".join(f"{name:>14}" for name in stores))
+
+    measured = memory_usage_supported(stores["zset"].client)
+    for n in sizes:
+        row = []
+        timestamps = np.linspace(1000000, 1000000 + 86399, n).astype(int)
+        for name, store in stores.items():
+            user_id = f"mem_{name}_{n}"
+            store.delete_user_data(user_id)
+            store.add_transactions([(user_id, 42.5, int(ts)) for ts in timestamps])
+            row.append(key_bytes(store.client, store._get_window_key(user_id), measured))
+            store.delete_user_data(user_id)
+        print(f"{n:>8} " + " ".join(f"{b:>14,}" for b in row))
+
+    if not measured:
+        print("(MEMORY USAGE unsupported: payload bytes, excluding Redis overhead)")
+
+
+def accuracy_report(stores: dict, users: int, days: int, queries: int, seed: int) -> None:
+    """Print count errors of each bucketed store against the ZSET store."""
+    rng = np.random.default_rng(seed)
+    start = 1000000
+    end = start + days * 86400
+
+    events = []
+    for u in range(users):
+        # Rate varies per user: 1 to 200 transactions per day
+        n = int(rng.integers(1, 200)) * days
+        events += [(int(ts), u) for ts in rng.integers(start, end, n)]
+    events.sort()
+
+    # Separate users per store (bucketed stores share the tx_buckets key name)
+    for name, store in stores.items():
+        for u in range(users):
+            store.delete_user_data(f"acc_{name}_{u}")
+
+    # Replay in time order: both modes only keep the current window, so each
+    # query sees the events up to its timestamp (like serving does)
+    query_times = np.sort(rng.integers(start + 86400, end, queries))
+    queried = rng.integers(users, size=queries)
+    counts = {name: np.zeros(queries) for name in stores}
+    written = 0
+    for i, (at, u) in enumerate(zip(query_times.tolist(), queried)):
+        upto = written
+        while upto < len(events) and events[upto][0] <= at:
+            upto += 1
+        for name, store in stores.items():
+            store.add_transactions(
+                [(f"acc_{name}_{v}", 10.0, ts) for ts, v in events[written:upto]]
+            )
+            counts[name][i] = store.get_features(f"acc_{name}_{u}", at)["trans_count_24h"]
+        written = upto
+
+    exact = counts["zset"]
+
+    print(f"\nCount accuracy vs ZSET ({written} transactions, {queries} queries)")
+    print(f"{'mode':>14} {'mean abs err':>13} {'mean rel err':>13} {'max err':>8} {'exact':>7}")
+    for name in stores:
+        if name == "zset":
+            continue
+        error = np.abs(counts[name] - exact)
+        relative = error[exact > 0] / exact[exact > 0]
+        print(
+            f"{name:>14} {error.mean():13.3f} {relative.mean():13.2%} "
+            f"{int(error.max()):8d} {np.mean(error == 0):7.1%}"
+        )
+
+    for name, store in stores.items():
+        for u in range(users):
+            store.delete_user_data(f"acc_{name}_{u}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark velocity window storage modes")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument("--db", type=int, default=15)
+    parser.add_argument("--bucket-seconds", type=int, nargs="+", default=[900, 3600])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    connection = {"host": args.host, "port": args.port, "db": args.db}
+    stores = {"zset": RedisFeatureStore(**connection)}
+    for seconds in args.bucket_seconds:
+        stores[f"buckets/{seconds}s"] = RedisFeatureStore(
+            **connection, window_mode="buckets", bucket_seconds=seconds
+        )
+
+    memory_report(stores, args.sizes)
+    accuracy_report(stores, args.users, args.days, args.queries, args.seed)
+
+    for store in stores.values():
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
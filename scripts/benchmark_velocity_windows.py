@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Multi-window velocity latency: one server-side scan vs one read per window.
+
+Against a running Redis, with users holding a week of transactions,
+measures per-call latency of:
+- get_features: the existing single-window read (24h window script + GET + HMGET)
+- get_velocity: every configured window in one EVALSHA of the velocity script
+- per-window: one ZRANGEBYSCORE round trip per window, summed client-side
+  (what get_velocity replaces)
+
+Windows come from configs/redis_config.yaml (velocity_windows).
+
+Usage:
+    python scripts/benchmark_velocity_windows.py
+    python scripts/benchmark_velocity_windows.py --tx-per-day 500 --calls 5000
+"""
+
+import argparse
+import math
+import random
+import time
+
+import numpy as np
+
+from src.features.store import RedisFeatureStore
+from src.features.windows import load_velocity_windows
+
+
+def per_window_velocity(store: RedisFeatureStore, user_id: str, now: int) -> dict:
+    """One ZRANGEBYSCORE round trip per window, counted and summed in Python."""
+    key = store._get_tx_history_key(user_id)
+    features = {}
+    for name, seconds in store.velocity_windows.items():
+        members = store.client.zrangebyscore(key, now - seconds, now)
+        features[f"trans_count_{name}"] = float(len(members))
+        features[f"amt_sum_{name}"] = sum(float(m.split(":")[1]) for m in members)
+    return features
+
+
+def measure(call, user_ids, now, calls):
+    """Latency percentiles (ms) of `calls` calls on random users."""
+    latencies = []
+    for _ in range(calls):
+        user_id = random.choice(user_ids)
+        start = time.perf_counter()
+        call(user_id, now)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.percentile(latencies, [50, 95, 99])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark multi-window velocity reads")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument("--db", type=int, default=15)
+    parser.add_argument("--config", default="configs/redis_config.yaml")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--tx-per-day", type=int, default=50)
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    store = RedisFeatureStore(
+        host=args.host,
+        port=args.port,
+        db=args.db,
+        velocity_windows=load_velocity_windows(args.config),
+    )
+
+    now = 2000000000
+    user_ids = [f"velocity_bench_{i}" for i in range(args.users)]
+    n = args.tx_per_day * store.window_retention // 86400
+    for user_id in user_ids:
+        store.delete_user_data(user_id)
+        offsets = sorted(random.randrange(store.window_retention) for _ in range(n))
+        store.add_transactions(
+            [(user_id, round(random.uniform(1, 500), 2), now - offset) for offset in offsets]
+        )
+
+    # Same answer before timing anything (sums up to float rounding)
+    sample = user_ids[0]
+    expected = per_window_velocity(store, sample, now)
+    for feature, value in store.get_velocity(sample, now).items():
+        assert math.isclose(value, expected[feature], rel_tol=1e-9), feature
+
+    modes = {
+        "get_features (24h only)": lambda u, t: store.get_features(u, t),
+        f"get_velocity ({len(store.velocity_windows)} windows)": store.get_velocity,
+        "per-window round trips": lambda u, t: per_window_velocity(store, u, t),
+    }
+
+    print(
+        f"{args.users} users x {n} transactions, windows {list(store.velocity_windows)}, "
+        f"{args.calls} calls"
+    )
+    print(f"{'mode':>28} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, call in modes.items():
+        p50, p95, p99 = measure(call, user_ids, now, args.calls)
+        print(f"{name:>28} {p50:8.3f} {p95:8.3f} {p99:8.3f}")
+
+    for user_id in user_ids:
+        store.delete_user_data(user_id)
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
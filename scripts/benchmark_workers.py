@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Memory and throughput of the pre-fork server as workers are added.
+
+For each worker count, starts `python -m src.api.serve --workers N`, drives
+/v1/predict with concurrent clients and then reads each worker's memory from
+/proc (Linux only):
+- RSS: resident pages, counting pages shared with the parent in full
+- PSS: proportional set size, shared pages divided among their sharers;
+       the sum over workers is the real memory cost of the pool
+- Private: pages only this worker touches (dirty copy-on-write copies etc.)
+
+Usage:
+    python scripts/benchmark_workers.py
+    python scripts/benchmark_workers.py --workers 1 2 4 8 --requests 4000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+import numpy as np
+
+from scripts.benchmark_concurrency import request_payloads, run_load
+
+
+def memory_kb(pid: int) -> dict:
+    """RSS, PSS and private memory of a process in kB (from smaps_rollup)."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                values[parts[0][:-1]] = int(parts[1])
+    return {
+        "rss": values.get("Rss", 0),
+        "pss": values.get("Pss", 0),
+        "private": values.get("Private_Clean", 0) + values.get("Private_Dirty", 0),
+    }
+
+
+def child_pids(pid: int) -> list:
+    """Direct children of a process."""
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(p) for p in f.read().split()]
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    """Launch the pre-fork server and wait until every worker is up."""
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "src.api.serve", "--workers", str(workers), "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    deadline = time.time() + 90
+    while time.time() < deadline:
+        try:
+            ready = httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200
+            if ready and len(child_pids(proc.pid)) == workers:
+                time.sleep(1.0)  # Let the remaining workers finish their startup hooks
+                return proc
+        except (httpx.HTTPError, FileNotFoundError):
+            pass
+        time.sleep(0.25)
+
+    proc.kill()
+    raise RuntimeError(f"Server with {workers} workers did not become ready")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pre-fork workers")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--port", type=int, default=8775)
+    args = parser.parse_args()
+
+    payloads = request_payloads(args.requests)
+    url = f"http://127.0.0.1:{args.port}/v1/predict"
+
+    print(f"{os.cpu_count()} CPUs, {args.requests} requests, {args.concurrency} concurrent clients")
+    print(
+        f"{'workers':>7} {'req/s':>8} {'p99 ms':>9} {'RSS/worker MB':>14} "
+        f"{'PSS/worker MB':>14} {'private/worker MB':>18} {'total PSS MB':>13}"
+    )
+
+    for workers in args.workers:
+        proc = start_server(workers, args.port)
+        try:
+            asyncio.run(run_load(url, payloads[: args.concurrency], args.concurrency))  # warm-up
+            latencies, errors, wall = asyncio.run(run_load(url, payloads, args.concurrency))
+            memory = [memory_kb(pid) for pid in child_pids(proc.pid)]
+            parent = memory_kb(proc.pid)
+        finally:
+            proc.terminate()
+            proc.wait()
+
+        rss = np.mean([m["rss"] for m in memory]) / 1024
+        pss = np.mean([m["pss"] for m in memory]) / 1024
+        private = np.mean([m["private"] for m in memory]) / 1024
+        total_pss = (sum(m["pss"] for m in memory) + parent["pss"]) / 1024
+        p99 = np.percentile(latencies * 1000, 99)
+        print(
+            f"{workers:>7} {len(latencies) / wall:8.0f} {p99:9.1f} {rss:14.1f} "
+            f"{pss:14.1f} {private:18.1f} {total_pss:13.1f}"
+            + (f"  ({errors} errors)" if errors else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
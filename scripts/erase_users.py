@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Erase the feature data of a batch of users (GDPR right to be forgotten).
+
+Reads user IDs from a file (one per line), deletes every registered
+per-user key with pipelined UNLINK at a bounded rate, and appends one
+audit line per user (user_id, deleted_keys, erased_at) to --audit.
+
+Usage:
+    python scripts/erase_users.py --input erasure_requests.txt
+    python scripts/erase_users.py --input ids.txt --rate 20000 --batch 1000 \\
+        --shards redis://a:6379/0,redis://b:6379/0
+"""
+
+import argparse
+
+from src.features.erasure import bulk_erase
+from src.features.sharded_store import ShardedFeatureStore
+from src.features.store import RedisFeatureStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk erasure of users' feature data")
+    parser.add_argument("--input", required=True, help="File of user IDs, one per line")
+    parser.add_argument("--audit", default="logs/erasure_audit.jsonl")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument("--db", type=int, default=0)
+    parser.add_argument("--password", default=None)
+    parser.add_argument("--shards", default="", help="Comma-separated redis:// URLs")
+    parser.add_argument("--batch", type=int, default=500, help="Users per pipeline")
+    parser.add_argument("--rate", type=float, default=5000.0, help="Max users per second")
+    args = parser.parse_args()
+
+    urls = [url.strip() for url in args.shards.split(",") if url.strip()]
+    if urls:
+        store = ShardedFeatureStore.from_urls(urls, password=args.password)
+    else:
+        store = RedisFeatureStore(
+            host=args.host, port=args.port, db=args.db, password=args.password
+        )
+
+    stats = bulk_erase(
+        store,
+        args.input,
+        batch_size=args.batch,
+        max_users_per_second=args.rate,
+        audit_path=args.audit,
+    )
+    print(
+        f"{stats['users']:,} users ({stats['users_with_data']:,} with data): "
+        f"{stats['deleted_keys']:,} keys unlinked in {stats['seconds']:.1f}s; audit: {args.audit}"
+    )
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Migrate feature data from the "keys" to the "hash" key layout.
+
+Switch the API to FEATURE_KEY_LAYOUT=hash first, then run this: each user's
+window is renamed to its hash-tagged key and the EMA, rolling sum and
+all-time profile move into the user's state hash (see
+src/features/layout_migration.py). Safe to rerun; --dry-run only counts.
+
+Usage:
+    python scripts/migrate_key_layout.py --dry-run
+    python scripts/migrate_key_layout.py --rate 20000
+    python scripts/migrate_key_layout.py --shards redis://a:6379/0,redis://b:6379/0
+"""
+
+import argparse
+
+from src.features.layout_migration import migrate_key_layout
+from src.features.sharded_store import ShardedFeatureStore
+from src.features.store import RedisFeatureStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate feature keys to the hash layout")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument("--db", type=int, default=0)
+    parser.add_argument("--password", default=None)
+    parser.add_argument("--shards", default="", help="Comma-separated redis:// URLs")
+    parser.add_argument("--scan-count", type=int, default=1000)
+    parser.add_argument("--rate", type=float, default=None, help="Max users per second")
+    parser.add_argument("--dry-run", action="store_true", help="Only count users and keys")
+    args = parser.parse_args()
+
+    urls = [url.strip() for url in args.shards.split(",") if url.strip()]
+    if urls:
+        store = ShardedFeatureStore.from_urls(urls, password=args.password)
+    else:
+        store = RedisFeatureStore(
+            host=args.host, port=args.port, db=args.db, password=args.password
+        )
+
+    def report(stats):
+        print(f"\r{stats['users']:,} users, {stats['removed_keys']:,} keys", end="", flush=True)
+
+    stats = migrate_key_layout(
+        store,
+        scan_count=args.scan_count,
+        max_users_per_second=args.rate,
+        dry_run=args.dry_run,
+        report=report,
+    )
+    print()
+    if args.dry_run:
+        print(f"Would migrate {stats['users']:,} users ({stats['removed_keys']:,} old keys)")
+    else:
+        print(
+            f"Migrated {stats['users']:,} users in {stats['seconds']:.1f}s: "
+            f"{stats['removed_keys']:,} old keys removed, {stats['merged']:,} merged into "
+            "windows already written in the new layout"
+        )
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Rebalance a sharded feature store after adding a Redis node.
+
+Pass the new, complete shard list (the REDIS_SHARDS value the API will
+use). Every shard's user keys are walked with SCAN; the keys of users the
+consistent-hash ring now assigns to another shard (with one node added:
+only the users the new node takes over) are moved there with DUMP /
+RESTORE, TTL included, and deleted from the old shard.
+
+Suggested order:
+1. Start the new node
+2. Switch the API to the new REDIS_SHARDS list
+3. Run this script (users being moved read as new until it finishes)
+
+Usage:
+    python scripts/rebalance_shards.py --shards redis://a:6379/0,redis://b:6379/0,redis://c:6379/0
+    python scripts/rebalance_shards.py --shards ... --dry-run
+"""
+
+import argparse
+import time
+
+from src.features.sharded_store import ShardedFeatureStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move feature-store keys to their shard")
+    parser.add_argument("--shards", required=True, help="Comma-separated redis:// URLs")
+    parser.add_argument("--password", default=None, help="Password for URLs without one")
+    parser.add_argument("--scan-count", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true", help="Only count keys to move")
+    args = parser.parse_args()
+
+    urls = [url.strip() for url in args.shards.split(",") if url.strip()]
+    store = ShardedFeatureStore.from_urls(urls, password=args.password)
+
+    start = time.perf_counter()
+    stats = store.rebalance(scan_count=args.scan_count, dry_run=args.dry_run)
+    elapsed = time.perf_counter() - start
+
+    verb = "would move" if args.dry_run else "moved"
+    print(
+        f"{len(urls)} shards: scanned {stats['scanned_keys']:,} keys, {verb} "
+        f"{stats['moved_keys']:,}, kept {stats['conflicts']:,} already on their shard "
+        f"({elapsed:.1f}s)"
+    )
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Adaptive Micro-Batching.
+
+Coalesces concurrent single-transaction requests into one internal batch so
+that the pipeline runs once for many callers instead of once per request.
+
+Adaptation strategy:
+- Window: if the observed arrival rate is too low to expect another request
+  within `max_wait_ms`, batches are dispatched immediately (no added latency
+  at low traffic). Otherwise the collector waits just long enough to fill the
+  current batch limit, capped at `max_wait_ms`.
+- Batch limit: AIMD-style. Doubles (up to `max_batch_size`) when a batch fills
+  completely, halves (down to `min_batch_size`) when batches run mostly empty.
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# Batch-size histogram bucket upper bounds
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+# Type of the scoring callable: rows -> (probabilities, {row_index: error}).
+# May be a coroutine function (e.g. InferenceExecutor.score) to score off the loop.
+ScoreResult = Tuple[np.ndarray, Dict[int, str]]
+ScoreFn = Callable[[List[Dict[str, Any]]], Union[ScoreResult, Awaitable[ScoreResult]]]
+
+
+class MicroBatcher:
+    """
+    Asyncio micro-batcher for single-row inference.
+
+    Example:
+        >>> batcher = MicroBatcher(lambda rows: predict_proba_batch(pipeline, rows))
+        >>> await batcher.start()
+        >>> prob = await batcher.submit(row)
+        >>> print(batcher.stats()["batch_size_avg"])
+    """
+
+    def __init__(
+        self,
+        score_fn: ScoreFn,
+        max_wait_ms: float = 2.0,
+        max_batch_size: int = 64,
+        min_batch_size: int = 4,
+        rate_smoothing: float = 0.1,
+        wait_samples: int = 1024,
+    ) -> None:
+        """
+        Initialize the micro-batcher.
+
+        Args:
+            score_fn: Scores a list of rows, returning (probabilities, errors).
+                      Coroutine functions are awaited, leaving the loop free
+                      while a batch is scored.
+            max_wait_ms: Upper bound on the time the first request of a batch
+                         waits for companions
+            max_batch_size: Upper bound on the adaptive batch limit
+            min_batch_size: Lower bound on the adaptive batch limit
+            rate_smoothing: EWMA smoothing factor for inter-arrival times
+            wait_samples: Number of recent queue waits kept for percentiles
+        """
+        if min_batch_size < 1 or max_batch_size < min_batch_size:
+            raise ValueError("Require 1 <= min_batch_size <= max_batch_size")
+
+        self.score_fn = score_fn
+        self._blocking: bool = not inspect.iscoroutinefunction(score_fn)
+        self.max_wait: float = max_wait_ms / 1000.0
+        self.max_batch_size: int = max_batch_size
+        self.min_batch_size: int = min_batch_size
+        self.rate_smoothing: float = rate_smoothing
+
+        # Adaptive state
+        self.batch_limit: int = min_batch_size
+        self.window: float = 0.0
+        self._interarrival: Optional[float] = None
+        self._last_arrival: Optional[float] = None
+        self._last_dispatch_end: float = 0.0
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._inflight: List[Tuple[Dict[str, Any], asyncio.Future, float]] = []
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self._batches: int = 0
+        self._items: int = 0
+        self._errors: int = 0
+        self._size_histogram: Dict[str, int] = {str(b): 0 for b in BATCH_SIZE_BUCKETS}
+        self._size_histogram["+Inf"] = 0
+        self._waits: Deque[float] = deque(maxlen=wait_samples)
+        self._wait_sum: float = 0.0
+
+    async def start(self) -> None:
+        """Start the background collector task (call from the running event loop)."""
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the collector and fail any requests still queued."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        pending = [future for _, future, _ in self._inflight]
+        while not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            pending.append(future)
+        self._inflight = []
+
+        for future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Micro-batcher stopped"))
+
+    async def submit(self, row: Dict[str, Any]) -> float:
+        """
+        Queue one row and wait for its fraud probability.
+
+        Args:
+            row: Raw model input row (see scoring.build_model_row)
+
+        Returns:
+            Fraud probability for this row
+
+        Raises:
+            RuntimeError: If the batcher is not running or scoring failed for this row
+        """
+        if self._task is None:
+            raise RuntimeError("Micro-batcher not started")
+
+        now = time.perf_counter()
+        self._observe_arrival(now)
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((row, future, now))
+        return await future
+
+    def _observe_arrival(self, now: float) -> None:
+        """Update the inter-arrival EWMA and derive the collection window."""
+        if self._last_arrival is not None:
+            # Arrivals cannot be observed while synchronous scoring blocks the loop,
+            # so a gap spanning a dispatch is measured from when the loop became free
+            gap = now - max(self._last_arrival, self._last_dispatch_end)
+            if self._interarrival is None:
+                self._interarrival = gap
+            else:
+                self._interarrival += self.rate_smoothing * (gap - self._interarrival)
+        self._last_arrival = now
+
+        if self._interarrival is None or self._interarrival >= self.max_wait:
+            # Low traffic: another request is not expected within the window
+            self.window = 0.0
+        else:
+            self.window = min(self.max_wait, (self.batch_limit - 1) * self._interarrival)
+
+    def _adapt(self, batch_size: int) -> None:
+        """Grow the batch limit when batches fill, shrink it when they run empty."""
+        if batch_size >= self.batch_limit:
+            self.batch_limit = min(self.batch_limit * 2, self.max_batch_size)
+        elif batch_size * 4 <= self.batch_limit:
+            self.batch_limit = max(self.batch_limit // 2, self.min_batch_size)
+
+    async def _collect(self) -> List[Tuple[Dict[str, Any], asyncio.Future, float]]:
+        """Wait for the first request, then gather companions until full or timed out."""
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.window
+
+        while len(batch) < self.batch_limit:
+            # Drain requests that are already queued without waiting
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self) -> None:
+        """Collector loop: collect a batch, score it once, resolve each caller."""
+        while True:
+            batch = await self._collect()
+            await self._dispatch(batch)
+            self._adapt(len(batch))
+
+    async def _dispatch(self, batch: List[Tuple[Dict[str, Any], asyncio.Future, float]]) -> None:
+        """Score a batch and deliver each caller its own result."""
+        self._inflight = batch
+        dispatched_at = time.perf_counter()
+        for _, _, enqueued_at in batch:
+            wait = dispatched_at - enqueued_at
+            self._waits.append(wait)
+            self._wait_sum += wait
+        self._record_size(len(batch))
+
+        try:
+            result = self.score_fn([row for row, _, _ in batch])
+            if not self._blocking:
+                result = await result
+            probs, errors = result
+        except Exception as e:
+            logger.error(f"Micro-batch scoring failed: {e}", exc_info=True)
+            self._errors += len(batch)
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError(f"Prediction failed: {e}"))
+            self._inflight = []
+            return
+        finally:
+            if self._blocking:
+                self._last_dispatch_end = time.perf_counter()
+
+        self._inflight = []
+        for i, (_, future, _) in enumerate(batch):
+            if future.done():  # Caller went away (e.g. request cancelled)
+                continue
+            if i in errors:
+                self._errors += 1
+                future.set_exception(RuntimeError(errors[i]))
+            else:
+                future.set_result(float(probs[i]))
+
+    def _record_size(self, size: int) -> None:
+        """Update batch counters and the batch-size histogram."""
+        self._batches += 1
+        self._items += size
+        for bound in BATCH_SIZE_BUCKETS:
+            if size <= bound:
+                self._size_histogram[str(bound)] += 1
+                return
+        self._size_histogram["+Inf"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return batching metrics.
+
+        Returns:
+            Dictionary with batch counts, batch-size histogram, queue wait
+            percentiles (ms) and the current adaptive window/limit
+        """
+        waits_ms = np.asarray(self._waits, dtype=np.float64) * 1000
+        return {
+            "batches": self._batches,
+            "items": self._items,
+            "errors": self._errors,
+            "batch_size_avg": round(self._items / self._batches, 2) if self._batches else 0.0,
+            "batch_size_histogram": dict(self._size_histogram),
+            "queue_wait_ms_avg": round(self._wait_sum * 1000 / self._items, 3)
+            if self._items
+            else 0.0,
+            "queue_wait_ms_p50": round(float(np.percentile(waits_ms, 50)), 3)
+            if waits_ms.size
+            else 0.0,
+            "queue_wait_ms_p99": round(float(np.percentile(waits_ms, 99)), 3)
+            if waits_ms.size
+            else 0.0,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "current_window_ms": round(self.window * 1000, 3),
+            "current_batch_limit": self.batch_limit,
+        }
+
+
+__all__ = ["MicroBatcher", "BATCH_SIZE_BUCKETS"]
@@ -26,13 +26,57 @@ class Settings(BaseSettings):
     redis_port: int = 6379
     redis_db: int = 0
     redis_password: Optional[str] = None
+    feature_store_backend: str = "redis"  # redis | memory (see features/backend.py)
+    async_feature_store: bool = True  # redis.asyncio client (see features/async_store.py)
+    redis_max_connections: int = 200
+    redis_shards: str = ""  # Comma-separated redis:// URLs (see features/sharded_store.py)
+    redis_replicas: str = ""  # Read replicas, comma-separated redis:// URLs (features/replicas.py)
+    redis_replica_max_staleness_ms: float = 1000.0  # Else reads fall back to the primary
+    redis_replica_hedge_ms: float = 0.0  # Hedge slow replica reads to a second one (0 = off)
+    feature_window_mode: str = "zset"  # zset | buckets (bounded memory per user)
+    feature_bucket_seconds: int = 900  # Bucket width in buckets mode (96 per 24h)
+    feature_key_layout: str = "keys"  # keys | hash (one state hash per user, see store.py)
+    redis_config_path: str = "configs/redis_config.yaml"  # velocity_windows
 
     # Feature flags
     shadow_mode: bool = False
     enable_explainability: bool = False
+    compiled_inference: bool = True  # DataFrame-free scoring path (see models/compiled.py)
 
     # Performance
     max_latency_ms: float = 50.0
+    max_batch_size: int = 1000
+
+    # Micro-batching of concurrent /v1/predict calls
+    micro_batching: bool = True
+    micro_batch_max_wait_ms: float = 2.0
+    micro_batch_max_size: int = 64
+
+    # Execution model for CPU-bound stages and sync Redis calls (see api/executor.py)
+    inference_executor: str = "thread"  # inline | thread | process
+    inference_cpu_workers: int = 4
+    inference_io_workers: int = 32
+
+    # Write-behind persistence of scored transactions (see api/persistence.py)
+    write_behind: bool = True
+    write_behind_queue_size: int = 10000
+    write_behind_batch_size: int = 256
+    write_behind_flush_ms: float = 50.0
+    write_behind_full_policy: str = "block"  # block | drop | sync
+    hydrate_and_record: bool = True  # /v1/predict reads and records in one round trip
+
+    # In-process near cache for hot users' features (see features/near_cache.py)
+    near_cache: bool = False
+    near_cache_max_entries: int = 10000
+    near_cache_ttl_ms: float = 1000.0  # Staleness bound per entry
+    near_cache_tracking: bool = True  # Redis CLIENT TRACKING invalidation when supported
+
+    # Background feature-store health sampling for /health* (see api/health.py)
+    health_check_interval_s: float = 5.0  # 0 = check Redis on every /health call
+
+    # Pre-fork serving (see api/serve.py)
+    api_workers: int = 1
+    model_threads: int = 0  # XGBoost threads per process; 0 = all cores / api_workers
 
     # API metadata
     api_version: str = "1.0.0"
@@ -0,0 +1,270 @@
+"""
+Inference Executor.
+
+Keeps blocking work off the asyncio event loop so that one slow request does
+not stall every other connection served by the same uvicorn worker.
+
+Execution modes (INFERENCE_EXECUTOR):
+- inline:  run everything on the event loop (previous behaviour; lowest
+           overhead at very low concurrency)
+- thread:  CPU-bound stages (model scoring, SHAP) run in a bounded thread
+           pool. XGBoost, numpy and the SHAP tree kernel release the GIL for
+           most of their work, so this overlaps well with request handling.
+- process: CPU-bound stages run in a bounded process pool. Forked workers
+           reuse the model, scorer and explainer already loaded by the
+           parent (shared copy-on-write); otherwise each loads its own copy
+           at start-up. Each gets its share of the XGBoost threads; only raw
+           rows and results cross the process boundary.
+
+Blocking feature-store calls (synchronous Redis client) always go through a
+separate I/O thread pool in the thread and process modes, so a slow Redis
+round trip never competes with scoring for a CPU worker.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+
+from src.api.scoring import predict_proba_batch, shap_contributions_rows
+
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_MODES = ("inline", "thread", "process")
+
+# Per-process state of process-pool workers (populated by _init_worker)
+_worker: Dict[str, Any] = {}
+
+# Model objects of the process starting a process pool (set by start()).
+# Forked workers inherit them and share their pages copy-on-write; workers
+# started another way (spawn, forkserver) find this empty and load model_path.
+_parent: Dict[str, Any] = {}
+
+
+def _init_worker(model_path: str, compiled: bool, explain: bool, model_threads: int) -> None:
+    """Set up the scorer (and explainer) once per worker process, reusing inherited ones."""
+    from src.explainability import FraudExplainer
+    from src.models.compiled import CompiledFraudPipeline
+    from src.models.pipeline import limit_model_threads
+
+    pipeline = _parent.get("pipeline")
+    scorer, explainer = _parent.get("scorer"), _parent.get("explainer")
+    if pipeline is None:
+        pipeline = joblib.load(model_path)
+        scorer, explainer = None, None
+
+    # Workers score in parallel: split the cores instead of each using all of them
+    limit_model_threads(pipeline, model_threads)
+    if scorer is None:
+        scorer = pipeline
+        if compiled:
+            try:
+                scorer = CompiledFraudPipeline(pipeline)
+            except Exception as e:
+                logger.warning(f"Worker pipeline compilation failed: {e}. Using sklearn pipeline.")
+    if explain and explainer is None:
+        explainer = FraudExplainer(model_path, pipeline=pipeline)
+
+    _worker["scorer"] = scorer
+    _worker["explainer"] = explainer if explain else None
+
+
+def _worker_score(rows: List[Dict[str, Any]]) -> Tuple[np.ndarray, Dict[int, str]]:
+    """Score rows with the worker-local model (process mode)."""
+    return predict_proba_batch(_worker["scorer"], rows)
+
+
+def _worker_explain(rows: List[Dict[str, Any]]) -> List[Dict[str, float]]:
+    """Top SHAP contributions with the worker-local explainer (process mode)."""
+    if _worker.get("explainer") is None:
+        raise RuntimeError("Explainer not loaded in worker process")
+    return shap_contributions_rows(_worker["explainer"], rows)
+
+
+class InferenceExecutor:
+    """
+    Runs scoring, SHAP and blocking I/O according to the configured mode.
+
+    Example:
+        >>> executor = InferenceExecutor("thread", scorer=scorer, explainer=explainer)
+        >>> executor.start()
+        >>> stored = await executor.run_io(store.get_features, "u12345", 1234567890)
+        >>> probs, errors = await executor.score([row])
+        >>> executor.shutdown()
+    """
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        scorer: Any = None,
+        explainer: Any = None,
+        cpu_workers: int = 4,
+        io_workers: int = 32,
+        model_path: Optional[str] = None,
+        compiled: bool = True,
+        model_threads: Optional[int] = None,
+        pipeline: Any = None,
+    ) -> None:
+        """
+        Initialize the executor (pools are created by start()).
+
+        Args:
+            mode: One of "inline", "thread" or "process"
+            scorer: CompiledFraudPipeline or sklearn Pipeline (inline/thread modes)
+            explainer: FraudExplainer or None (inline/thread modes)
+            cpu_workers: Size of the CPU pool (threads or processes)
+            io_workers: Size of the thread pool for blocking feature-store calls
+            model_path: Pipeline artifact loaded by each worker (process mode)
+            compiled: Compile the pipeline in each worker (process mode)
+            model_threads: XGBoost threads per worker (process mode); None splits
+                           the machine's cores evenly across cpu_workers
+            pipeline: Loaded sklearn Pipeline behind scorer and explainer; forked
+                      process workers reuse the three instead of loading model_path
+        """
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown executor mode '{mode}'. Use one of {EXECUTOR_MODES}")
+        if cpu_workers < 1 or io_workers < 1:
+            raise ValueError("cpu_workers and io_workers must be >= 1")
+        if mode == "process" and model_path is None:
+            raise ValueError("Process mode requires model_path")
+
+        self.mode: str = mode
+        self.scorer = scorer
+        self.explainer = explainer
+        self.cpu_workers: int = cpu_workers
+        self.io_workers: int = io_workers
+        self.model_path: Optional[str] = model_path
+        self.compiled: bool = compiled
+        self.pipeline = pipeline
+        self.model_threads: int = model_threads or max(1, (os.cpu_count() or 1) // cpu_workers)
+
+        self._cpu_pool: Optional[Executor] = None
+        self._io_pool: Optional[ThreadPoolExecutor] = None
+
+        # Metrics
+        self._cpu_tasks: int = 0
+        self._io_tasks: int = 0
+        self._cpu_inflight: int = 0
+        self._io_inflight: int = 0
+
+    def start(self) -> None:
+        """Create the worker pools (no-op in inline mode)."""
+        if self.mode == "inline" or self._cpu_pool is not None:
+            return
+
+        if self.mode == "thread":
+            self._cpu_pool = ThreadPoolExecutor(
+                max_workers=self.cpu_workers, thread_name_prefix="inference-cpu"
+            )
+        else:
+            if self.pipeline is not None:
+                _parent.update(pipeline=self.pipeline, scorer=self.scorer, explainer=self.explainer)
+            self._cpu_pool = ProcessPoolExecutor(
+                max_workers=self.cpu_workers,
+                initializer=_init_worker,
+                initargs=(
+                    self.model_path,
+                    self.compiled,
+                    self.explainer is not None,
+                    self.model_threads,
+                ),
+            )
+
+        self._io_pool = ThreadPoolExecutor(
+            max_workers=self.io_workers, thread_name_prefix="inference-io"
+        )
+
+    def shutdown(self) -> None:
+        """Wait for running tasks and release the pools."""
+        if self._cpu_pool is not None:
+            self._cpu_pool.shutdown(wait=True, cancel_futures=True)
+            self._cpu_pool = None
+        if self._io_pool is not None:
+            self._io_pool.shutdown(wait=True, cancel_futures=True)
+            self._io_pool = None
+
+    async def _run_cpu(self, fn: Callable, local_fn: Callable, *args: Any) -> Any:
+        """Run fn in the CPU pool; local_fn (worker-side equivalent) in process mode."""
+        self._cpu_tasks += 1
+        if self._cpu_pool is None:
+            return fn(*args)
+
+        target = local_fn if self.mode == "process" else fn
+        self._cpu_inflight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._cpu_pool, target, *args)
+        finally:
+            self._cpu_inflight -= 1
+
+    async def run_io(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a blocking I/O call (e.g. a synchronous Redis command) off the loop.
+
+        Args:
+            fn: Blocking callable
+            *args, **kwargs: Passed to fn
+
+        Returns:
+            Whatever fn returns
+        """
+        self._io_tasks += 1
+        if self._io_pool is None:
+            return fn(*args, **kwargs)
+
+        self._io_inflight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._io_pool, functools.partial(fn, *args, **kwargs))
+        finally:
+            self._io_inflight -= 1
+
+    async def score(self, rows: List[Dict[str, Any]]) -> Tuple[np.ndarray, Dict[int, str]]:
+        """
+        Score rows (see scoring.predict_proba_batch) in the CPU pool.
+
+        Returns:
+            Tuple of (probabilities, errors)
+        """
+        return await self._run_cpu(
+            functools.partial(predict_proba_batch, self.scorer), _worker_score, rows
+        )
+
+    async def explain(self, rows: List[Dict[str, Any]]) -> List[Dict[str, float]]:
+        """
+        Top SHAP contributions per row (see scoring.shap_contributions_rows) in the CPU pool.
+
+        Raises:
+            RuntimeError: If no explainer is configured
+        """
+        if self.explainer is None:
+            raise RuntimeError("Explainer not configured")
+        return await self._run_cpu(
+            functools.partial(shap_contributions_rows, self.explainer), _worker_explain, rows
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return executor metrics.
+
+        Returns:
+            Dictionary with mode, pool sizes, task counts and in-flight tasks
+        """
+        return {
+            "mode": self.mode,
+            "cpu_workers": self.cpu_workers if self.mode != "inline" else 0,
+            "io_workers": self.io_workers if self.mode != "inline" else 0,
+            "cpu_tasks": self._cpu_tasks,
+            "io_tasks": self._io_tasks,
+            "cpu_inflight": self._cpu_inflight,
+            "io_inflight": self._io_inflight,
+        }
+
+
+__all__ = ["InferenceExecutor", "EXECUTOR_MODES"]
@@ -0,0 +1,160 @@
+"""
+Background Health Monitor.
+
+Takes feature-store health checks (PING + INFO) off the request path. A
+background task calls the store's health_check every `interval_s` and keeps
+the latest result, so /health, /health/ready and /metrics serve a cached
+snapshot however often load balancers probe them, and Redis sees one health
+check per interval per process.
+
+Each snapshot holds the store's health_check (status, ping, server stats,
+connection-pool usage), when it was taken, and ping percentiles over the
+recent samples. A snapshot older than `max_age_s` (the check hangs or the
+task died) counts as unhealthy.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# Returns the store's health_check dictionary (e.g. call_store(feature_store.health_check))
+ProbeFn = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+class HealthMonitor:
+    """
+    Periodically samples feature-store health in the background.
+
+    Example:
+        >>> monitor = HealthMonitor(lambda: call_store(store.health_check), interval_s=5.0)
+        >>> await monitor.start()  # first sample taken before returning
+        >>> monitor.is_healthy()
+        True
+        >>> await monitor.stop()
+    """
+
+    def __init__(
+        self,
+        probe: ProbeFn,
+        interval_s: float = 5.0,
+        max_age_s: Optional[float] = None,
+        window: int = 60,
+    ) -> None:
+        """
+        Initialize the monitor.
+
+        Args:
+            probe: Coroutine function returning a health_check dictionary
+            interval_s: Seconds between samples
+            max_age_s: Age after which the snapshot is stale (default: 3 intervals)
+            window: Samples kept for the ping percentiles
+        """
+        if interval_s <= 0:
+            raise ValueError("interval_s must be > 0")
+
+        self.probe = probe
+        self.interval_s: float = interval_s
+        self.max_age_s: float = max_age_s if max_age_s is not None else 3 * interval_s
+
+        self._task: Optional[asyncio.Task] = None
+        self._health: Optional[Dict[str, Any]] = None
+        self.checked_at: Optional[float] = None
+        self._pings: deque = deque(maxlen=window)
+
+        # Metrics
+        self._samples: int = 0
+        self._failures: int = 0
+        self._consecutive_failures: int = 0
+
+    async def start(self) -> None:
+        """Take a first sample, then start sampling in the background."""
+        if self._task is not None:
+            return
+        await self.sample()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_s)
+            await self.sample()
+
+    async def sample(self) -> Dict[str, Any]:
+        """Run one health check now and store it as the current snapshot."""
+        try:
+            health = await asyncio.wait_for(self.probe(), timeout=self.max_age_s)
+        except asyncio.TimeoutError:
+            health = {"status": "unhealthy", "error": f"health check timed out ({self.max_age_s}s)"}
+        except Exception as e:
+            health = {"status": "unhealthy", "error": str(e)}
+
+        self._samples += 1
+        if health.get("status") == "healthy":
+            self._consecutive_failures = 0
+            if "ping_ms" in health:
+                self._pings.append(health["ping_ms"])
+        else:
+            self._failures += 1
+            self._consecutive_failures += 1
+            if self._consecutive_failures == 1:
+                logger.warning(f"Feature store unhealthy: {health.get('error', health)}")
+
+        self._health = health
+        self.checked_at = time.time()
+        return health
+
+    def age_s(self) -> Optional[float]:
+        """Seconds since the last sample (None before the first)."""
+        return time.time() - self.checked_at if self.checked_at is not None else None
+
+    def is_healthy(self) -> bool:
+        """True if the last sample was healthy and is not stale."""
+        age = self.age_s()
+        return (
+            self._health is not None
+            and self._health.get("status") == "healthy"
+            and age is not None
+            and age <= self.max_age_s
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Latest health as served by /metrics.
+
+        Returns:
+            healthy, checked_at (Unix time), age_s, the store's health_check
+            under "store", ping p50/p99 over the recent samples and sample /
+            failure counters
+        """
+        pings = list(self._pings)
+        return {
+            "healthy": self.is_healthy(),
+            "checked_at": self.checked_at,
+            "age_s": self.age_s(),
+            "store": self._health,
+            "ping_p50_ms": float(np.percentile(pings, 50)) if pings else None,
+            "ping_p99_ms": float(np.percentile(pings, 99)) if pings else None,
+            "samples": self._samples,
+            "failures": self._failures,
+            "consecutive_failures": self._consecutive_failures,
+        }
+
+
+__all__ = ["HealthMonitor"]
@@ -5,22 +5,55 @@ Production-grade inference API with sub-50ms latency target.
 Integrates with Redis Feature Store for real-time feature injection.
 """
 
+import inspect
 import json
 import logging
 import time
 from pathlib import Path
-import pandas as pd
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 import joblib
+import numpy as np
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
 
+from src.api.batching import MicroBatcher
 from src.api.config import settings
+from src.api.executor import InferenceExecutor
+from src.api.health import HealthMonitor
 from src.api.logger import log_shadow_prediction
-from src.api.schemas import PredictionRequest, PredictionResponse, HealthResponse
+from src.api.persistence import WriteBehindQueue
+from src.api.schemas import (
+    BatchPredictionItem,
+    BatchPredictionRequest,
+    BatchPredictionResponse,
+    HealthResponse,
+    PredictionRequest,
+    PredictionResponse,
+)
+from src.api.scoring import (
+    build_model_row,
+    features_used,
+    has_overrides,
+    needs_feature_lookup,
+    parse_timestamp,
+    predict_proba_batch,
+    resolve_features,
+    shap_contributions_rows,
+)
+from src.api.serve import threads_per_worker
+from src.features.async_store import AsyncRedisFeatureStore
+from src.features.backend import FEATURE_STORE_BACKENDS, FeatureStoreBackend
+from src.features.memory_store import InMemoryFeatureStore
+from src.features.near_cache import NearCache
+from src.features.sharded_store import ShardedFeatureStore, parse_redis_url
 from src.features.store import RedisFeatureStore
+from src.features.windows import load_velocity_windows
 from src.explainability import FraudExplainer
+from src.models.compiled import CompiledFraudPipeline
+from src.models.pipeline import limit_model_threads
 
 
 # Initialize FastAPI app
@@ -41,23 +74,30 @@ app.add_middleware(
 
 # Global resources (loaded on startup)
 pipeline = None
+scorer = None  # CompiledFraudPipeline when available, else the sklearn pipeline
 threshold = None
-feature_store: Optional[RedisFeatureStore] = None
+feature_store: Optional[FeatureStoreBackend] = None
 explainer: Optional[FraudExplainer] = None
+batcher: Optional[MicroBatcher] = None
+executor: Optional[InferenceExecutor] = None
+writer: Optional[WriteBehindQueue] = None
+health_monitor: Optional[HealthMonitor] = None
+near_cache: Optional[NearCache] = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-@app.on_event("startup")
-async def load_resources():
+def load_model_resources() -> None:
     """
-    Load model and initialize Redis on startup.
+    Load the pipeline, compiled scorer, threshold and SHAP explainer.
 
-    This runs once when the API starts, avoiding per-request overhead.
+    Called by the startup hook, or ahead of time by the pre-fork launcher
+    (src/api/serve.py) so that forked workers share these objects
+    copy-on-write instead of each loading its own copy.
     """
-    global pipeline, threshold, feature_store, explainer
+    global pipeline, scorer, threshold, explainer
 
     logger.info("Loading model and resources...")
 
@@ -69,6 +109,20 @@ async def load_resources():
     pipeline = joblib.load(model_path)
     logger.info(f"✓ Loaded model from {model_path}")
 
+    if settings.model_threads <= 0:
+        settings.model_threads = threads_per_worker(settings.api_workers)
+    limit_model_threads(pipeline, settings.model_threads)
+    logger.info(f"✓ XGBoost threads per process: {settings.model_threads}")
+
+    # Compile DataFrame-free inference path (falls back to the sklearn pipeline)
+    scorer = pipeline
+    if settings.compiled_inference:
+        try:
+            scorer = CompiledFraudPipeline(pipeline)
+            logger.info("✓ Compiled DataFrame-free inference path")
+        except Exception as e:
+            logger.warning(f"Pipeline compilation failed: {e}. Using sklearn pipeline.")
+
     # Load optimal threshold
     threshold_path = Path(settings.threshold_path)
     if not threshold_path.exists():
@@ -80,26 +134,200 @@ async def load_resources():
 
     logger.info(f"✓ Loaded threshold: {threshold:.4f}")
 
-    # Initialize Redis Feature Store
+    # Initialize SHAP Explainer (reuses the loaded pipeline)
     try:
-        feature_store = RedisFeatureStore(
+        explainer = FraudExplainer(str(model_path), pipeline=pipeline)
+        logger.info("✓ Initialized SHAP Explainer")
+    except Exception as e:
+        logger.warning(f"SHAP initialization failed: {e}. Explainability disabled.")
+        explainer = None
+
+
+@app.on_event("startup")
+async def load_resources():
+    """
+    Load model and initialize Redis on startup.
+
+    This runs once per API process, avoiding per-request overhead. Model
+    resources already preloaded by the pre-fork launcher are reused; Redis
+    clients, pools and background tasks are always created per process.
+    """
+    global feature_store, batcher, executor, writer, near_cache, health_monitor
+
+    if pipeline is None:
+        load_model_resources()
+
+    shard_urls = [url.strip() for url in settings.redis_shards.split(",") if url.strip()]
+    replica_urls = [url.strip() for url in settings.redis_replicas.split(",") if url.strip()]
+
+    # Optional in-process cache for hot users' features (in front of Redis).
+    # Entries hold aggregated state (window count and sum, EMA, profile); the
+    # timestamps each one is valid for come from its neighbours in the window
+    # ZSET, so it needs the ZSET mode, and a single node for invalidation
+    # tracking. Only plain get_features reads use it: with the default
+    # HYDRATE_AND_RECORD=true, scored requests read and record in one script
+    # call and bypass the cache
+    if (
+        settings.near_cache
+        and settings.feature_store_backend == "redis"
+        and settings.feature_window_mode == "zset"
+        and not shard_urls
+    ):
+        near_cache = NearCache(
+            max_entries=settings.near_cache_max_entries,
+            ttl_seconds=settings.near_cache_ttl_ms / 1000,
+        )
+
+    # Initialize the feature store: Redis (asyncio client unless disabled) or in-process
+    try:
+        if settings.feature_store_backend not in FEATURE_STORE_BACKENDS:
+            raise ValueError(
+                f"feature_store_backend must be one of {FEATURE_STORE_BACKENDS}, "
+                f"got {settings.feature_store_backend!r}"
+            )
+
+        velocity_windows = load_velocity_windows(settings.redis_config_path)
+        if settings.feature_window_mode == "buckets":
+            # The bucket ring only covers 24h
+            dropped = [name for name, seconds in velocity_windows.items() if seconds > 86400]
+            if dropped:
+                logger.warning(f"Velocity windows {dropped} exceed 24h; ignored in buckets mode")
+                velocity_windows = {
+                    name: seconds for name, seconds in velocity_windows.items() if seconds <= 86400
+                } or None
+
+        # Read replicas of the single Redis node (reads only, see features/replicas.py)
+        replicas = {
+            "replicas": [parse_redis_url(url) for url in replica_urls],
+            "replica_max_staleness_ms": settings.redis_replica_max_staleness_ms,
+            "replica_hedge_ms": settings.redis_replica_hedge_ms,
+        }
+        if replica_urls and shard_urls:
+            logger.warning("REDIS_REPLICAS is not supported with REDIS_SHARDS; ignored")
+
+        if settings.feature_store_backend == "memory":
+            feature_store = InMemoryFeatureStore(velocity_windows=velocity_windows)
+            logger.info("✓ In-memory feature store (single process, not shared)")
+        elif shard_urls:
+            feature_store = ShardedFeatureStore.from_urls(
+                shard_urls,
+                password=settings.redis_password,
+                max_connections=settings.redis_max_connections,
+                window_mode=settings.feature_window_mode,
+                bucket_seconds=settings.feature_bucket_seconds,
+                velocity_windows=velocity_windows,
+                key_layout=settings.feature_key_layout,
+            )
+            logger.info(f"✓ Sharded Redis Feature Store ({len(shard_urls)} shards, sync client)")
+        elif settings.async_feature_store:
+            feature_store = AsyncRedisFeatureStore(
+                host=settings.redis_host,
+                port=settings.redis_port,
+                db=settings.redis_db,
+                password=settings.redis_password,
+                max_connections=settings.redis_max_connections,
+                near_cache=near_cache,
+                window_mode=settings.feature_window_mode,
+                bucket_seconds=settings.feature_bucket_seconds,
+                velocity_windows=velocity_windows,
+                key_layout=settings.feature_key_layout,
+                **replicas,
+            )
+            await feature_store.connect()
+        else:
+            feature_store = RedisFeatureStore(
+                host=settings.redis_host,
+                port=settings.redis_port,
+                db=settings.redis_db,
+                password=settings.redis_password,
+                near_cache=near_cache,
+                window_mode=settings.feature_window_mode,
+                bucket_seconds=settings.feature_bucket_seconds,
+                velocity_windows=velocity_windows,
+                key_layout=settings.feature_key_layout,
+                **replicas,
+            )
+        if settings.feature_store_backend == "redis" and not shard_urls:
+            client = "async" if settings.async_feature_store else "sync"
+            read_replicas = f", {len(replica_urls)} read replicas" if replica_urls else ""
+            logger.info(f"✓ Connected to Redis Feature Store ({client} client{read_replicas})")
+    except Exception as e:
+        logger.warning(f"Feature store initialization failed: {e}. Feature store disabled.")
+        feature_store = None
+
+    if feature_store and near_cache:
+        tracking = settings.near_cache_tracking and near_cache.start_tracking(
             host=settings.redis_host,
             port=settings.redis_port,
             db=settings.redis_db,
             password=settings.redis_password,
         )
-        logger.info("✓ Connected to Redis Feature Store")
-    except Exception as e:
-        logger.warning(f"Redis connection failed: {e}. Feature store disabled.")
-        feature_store = None
+        logger.info(
+            f"✓ Near cache enabled (max_entries={settings.near_cache_max_entries}, "
+            f"ttl={settings.near_cache_ttl_ms}ms, tracking={tracking})"
+        )
 
-    # Initialize SHAP Explainer
-    try:
-        explainer = FraudExplainer(str(model_path))
-        logger.info("✓ Initialized SHAP Explainer")
-    except Exception as e:
-        logger.warning(f"SHAP initialization failed: {e}. Explainability disabled.")
-        explainer = None
+    # Executor for CPU-bound stages and blocking Redis calls. Process mode
+    # splits this process's thread budget across its workers (invalid worker
+    # counts are left to the executor's validation)
+    worker_threads = None
+    if settings.inference_executor == "process" and settings.inference_cpu_workers > 0:
+        worker_threads = max(1, settings.model_threads // settings.inference_cpu_workers)
+    executor = InferenceExecutor(
+        settings.inference_executor,
+        scorer=scorer,
+        explainer=explainer if settings.enable_explainability else None,
+        cpu_workers=settings.inference_cpu_workers,
+        io_workers=settings.inference_io_workers,
+        model_path=settings.model_path,
+        compiled=settings.compiled_inference,
+        model_threads=worker_threads,
+        pipeline=pipeline,
+    )
+    executor.start()
+    logger.info(
+        f"✓ Inference executor: {settings.inference_executor} "
+        f"(cpu_workers={settings.inference_cpu_workers}, "
+        f"io_workers={settings.inference_io_workers})"
+    )
+
+    # Start write-behind queue for feature-store updates
+    if feature_store and settings.write_behind:
+        writer = WriteBehindQueue(
+            persist_events,
+            max_queue_size=settings.write_behind_queue_size,
+            max_batch_size=settings.write_behind_batch_size,
+            flush_interval_ms=settings.write_behind_flush_ms,
+            full_policy=settings.write_behind_full_policy,
+        )
+        await writer.start()
+        logger.info(
+            f"✓ Write-behind persistence enabled (flush={settings.write_behind_flush_ms}ms, "
+            f"batch={settings.write_behind_batch_size}, "
+            f"policy={settings.write_behind_full_policy})"
+        )
+
+    # Sample feature-store health in the background; /health* serve the cached result
+    if feature_store and settings.health_check_interval_s > 0:
+        health_monitor = HealthMonitor(
+            lambda: call_store(feature_store.health_check),
+            interval_s=settings.health_check_interval_s,
+        )
+        await health_monitor.start()
+        logger.info(f"✓ Health monitor started (every {settings.health_check_interval_s}s)")
+
+    # Start micro-batcher for concurrent /v1/predict calls
+    if settings.micro_batching:
+        batcher = MicroBatcher(
+            executor.score,
+            max_wait_ms=settings.micro_batch_max_wait_ms,
+            max_batch_size=settings.micro_batch_max_size,
+        )
+        await batcher.start()
+        logger.info(
+            f"✓ Micro-batching enabled (max_wait={settings.micro_batch_max_wait_ms}ms, "
+            f"max_batch={settings.micro_batch_max_size})"
+        )
 
     logger.info("=" * 60)
     logger.info("API Ready!")
@@ -111,35 +339,154 @@ async def load_resources():
 @app.on_event("shutdown")
 async def shutdown_resources():
     """Clean up resources on shutdown."""
-    global feature_store
+    global feature_store, batcher, executor, writer, near_cache, health_monitor
+
+    if health_monitor:
+        await health_monitor.stop()
+        health_monitor = None
+
+    if batcher:
+        await batcher.stop()
+        batcher = None
+        logger.info("✓ Stopped micro-batcher")
+
+    if writer:
+        await writer.stop()
+        logger.info(f"✓ Drained write-behind queue ({writer.stats()['written']} events written)")
+        writer = None
+
+    if executor:
+        executor.shutdown()
+        executor = None
+        logger.info("✓ Stopped inference executor")
+
+    if near_cache:
+        near_cache.stop()
+        near_cache = None
 
     if feature_store:
-        feature_store.close()
+        await call_store(feature_store.close)
         logger.info("✓ Closed Redis connection")
 
 
+async def call_store(fn, *args, **kwargs):
+    """
+    Call a feature-store method without blocking the event loop.
+
+    Coroutine methods (AsyncRedisFeatureStore) are awaited directly; blocking
+    ones (RedisFeatureStore) run in the executor's I/O pool; in-process ones
+    (InMemoryFeatureStore) are called inline.
+    """
+    if inspect.iscoroutinefunction(fn):
+        return await fn(*args, **kwargs)
+    if executor is not None and getattr(getattr(fn, "__self__", None), "blocking_io", True):
+        return await executor.run_io(fn, *args, **kwargs)
+    return fn(*args, **kwargs)
+
+
+async def persist_events(events: List[Tuple[str, float, int]]) -> None:
+    """Write a batch of (user_id, amount, timestamp) events to the feature store."""
+    await call_store(feature_store.add_transactions, events)
+
+
+async def record_transaction(user_id: str, amount: float, timestamp: int) -> None:
+    """Persist a scored transaction (write-behind when enabled, else inline)."""
+    if writer is not None:
+        await writer.submit((user_id, amount, timestamp))
+    else:
+        await call_store(
+            feature_store.add_transaction, user_id=user_id, amount=amount, timestamp=timestamp
+        )
+
+
+async def record_transactions(events: List[Tuple[str, float, int]]) -> None:
+    """Persist a batch's transactions: queued one by one when write-behind, else one call."""
+    if writer is not None:
+        for event in events:
+            await writer.submit(event)
+    else:
+        await persist_events(events)
+
+
+async def score_rows(rows: List[Dict]) -> Tuple[np.ndarray, Dict[int, str]]:
+    """Score rows in the executor's CPU pool (inline if no executor is running)."""
+    if executor is not None:
+        return await executor.score(rows)
+    return predict_proba_batch(scorer or pipeline, rows)
+
+
+async def explain_rows(rows: List[Dict]) -> List[Dict[str, float]]:
+    """Top SHAP contributions per row in the executor's CPU pool."""
+    if executor is not None and executor.explainer is not None:
+        return await executor.explain(rows)
+    return shap_contributions_rows(explainer, rows)
+
+
+def model_ready() -> bool:
+    """True once the model and threshold are loaded."""
+    return pipeline is not None and threshold is not None
+
+
+async def feature_store_healthy() -> bool:
+    """Feature-store health: the monitor's cached snapshot, else a live check."""
+    if not feature_store:
+        return False
+    if health_monitor is not None:
+        return health_monitor.is_healthy()
+    try:
+        health = await call_store(feature_store.health_check)
+        return health["status"] == "healthy"
+    except Exception:
+        return False
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """
     Health check endpoint for monitoring.
 
-    Returns service status and resource availability.
+    Returns service status and resource availability. Redis status comes
+    from the background health monitor's last sample (no Redis call per
+    request while the monitor runs).
     """
-    redis_connected = False
-    if feature_store:
-        try:
-            health = feature_store.health_check()
-            redis_connected = health["status"] == "healthy"
-        except Exception:
-            redis_connected = False
-
-    status = "healthy" if (pipeline is not None and threshold is not None) else "unhealthy"
+    status = "healthy" if model_ready() else "unhealthy"
 
     return HealthResponse(
         status=status,
         model_loaded=pipeline is not None,
-        redis_connected=redis_connected,
+        redis_connected=await feature_store_healthy(),
         version=settings.api_version,
+        redis_checked_at=health_monitor.checked_at if health_monitor else None,
+    )
+
+
+@app.get("/health/live")
+async def liveness():
+    """
+    Liveness probe: the process and its event loop respond.
+
+    Never touches the model or Redis, so a dependency outage does not get
+    the process restarted.
+    """
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """
+    Readiness probe: 200 when the model is loaded and the feature store
+    (if configured) was healthy at its last sample, else 503 so the load
+    balancer routes traffic to other instances.
+    """
+    if not feature_store:
+        store_status = "disabled"
+    else:
+        store_status = "healthy" if await feature_store_healthy() else "unhealthy"
+    ready = model_ready() and store_status != "unhealthy"
+
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "model_loaded": model_ready(), "feature_store": store_status},
     )
 
 
@@ -150,7 +497,9 @@ async def predict(request: PredictionRequest):
 
     Workflow:
     1. Parse & validate request
-    2. Query Redis for real-time features (trans_count_24h, avg_spend_24h)
+    2. Query Redis for real-time features (trans_count_24h, avg_spend_24h);
+       with hydrate_and_record, the same round trip also records the
+       transaction
     3. Combine features + run inference
     4. Apply decision threshold
     5. Shadow mode override (if enabled)
@@ -172,75 +521,58 @@ async def predict(request: PredictionRequest):
         raise HTTPException(status_code=503, detail="Service unavailable: Model not loaded")
 
     try:
-        # Step 1: Convert request to dict
-        request_data = request.dict()
-
-        # Step 2: Query Redis/Use Overrides
+        # Step 1: Query Redis/Use Overrides
         # Priority: Override > Redis > Default
-        trans_count_24h = request.trans_count_24h
-        avg_spend_24h = request.avg_spend_24h
-        amt_to_avg_ratio_24h = request.amt_to_avg_ratio_24h
-        user_avg_amt_all_time = request.user_avg_amt_all_time
-
-        # If any real-time feature is missing from overrides, try Redis
-        if (
-            trans_count_24h is None or avg_spend_24h is None or user_avg_amt_all_time is None
-        ) and feature_store:
+        # Transactions are persisted only without overrides and outside shadow mode,
+        # so that velocity features accumulate from real traffic only
+        persist = feature_store is not None and not settings.shadow_mode
+        persist = persist and not has_overrides(request)
+        stored = None
+        timestamp = None
+        if feature_store and needs_feature_lookup(request):
             try:
                 # Uses transaction timestamp for time-based lookup
-                trans_time = pd.to_datetime(request.trans_date_trans_time)
-                timestamp = int(trans_time.timestamp())
-
-                features = feature_store.get_features(request.user_id, timestamp)
-
-                if trans_count_24h is None:
-                    trans_count_24h = features.get("trans_count_24h", 0)
-
-                if avg_spend_24h is None:
-                    avg_spend_24h = features.get("avg_spend_24h", request.amt)
-
-                # Note: Redis Feature Store doesn't currently track all-time average
-                # This would need to be added to the Feature Store implementation
-                # For now, we'll use avg_spend_24h as a proxy if not overridden
-                if user_avg_amt_all_time is None:
-                    user_avg_amt_all_time = features.get("user_avg_amt_all_time", avg_spend_24h)
-
+                timestamp = parse_timestamp(request.trans_date_trans_time)
+                if persist and settings.hydrate_and_record:
+                    # Features as of before this transaction + record it, one round trip.
+                    # Not retried on failure: the script may already have been applied
+                    persist = False
+                    stored = await call_store(
+                        feature_store.get_features_and_record,
+                        request.user_id,
+                        request.amt,
+                        timestamp,
+                    )
+                else:
+                    stored = await call_store(
+                        feature_store.get_features, request.user_id, timestamp
+                    )
             except Exception as e:
                 logger.warning(
                     f"Redis feature lookup failed: {e}. Using defaults for missing values."
                 )
 
-        # Fill remaining defaults
-        if trans_count_24h is None:
-            trans_count_24h = 0
-        if avg_spend_24h is None:
-            avg_spend_24h = request.amt
-        if user_avg_amt_all_time is None:
-            user_avg_amt_all_time = avg_spend_24h  # Use 24h avg as proxy
+        resolved = resolve_features(request, stored)
 
-        # Calculate derived ratio if not overridden
-        if amt_to_avg_ratio_24h is None:
-            amt_to_avg_ratio_24h = request.amt / avg_spend_24h if avg_spend_24h > 0 else 1.0
+        # Step 2: Inject into request data
+        request_data = build_model_row(request, resolved)
 
-        # Inject into request data
-        request_data["trans_count_24h"] = trans_count_24h
-        request_data["avg_spend_24h"] = avg_spend_24h
-        request_data["amt_to_avg_ratio_24h"] = amt_to_avg_ratio_24h
-        request_data["amt_relative_to_all_time"] = 1.0  # Default if not computed
+        # Step 3: Inference (coalesced with concurrent requests when micro-batching)
+        if batcher is not None:
+            prob = await batcher.submit(request_data)
+        else:
+            probs, row_errors = await score_rows([request_data])
+            if row_errors:
+                raise RuntimeError(row_errors[0])
+            prob = float(probs[0])
 
-        # Step 3: Convert to DataFrame for pipeline
-        df = pd.DataFrame([request_data])
-
-        # Step 4: Inference
-        prob = pipeline.predict_proba(df)[:, 1][0]
-
-        # Step 5: Apply threshold
+        # Step 4: Apply threshold
         real_decision = "BLOCK" if prob >= threshold else "APPROVE"
 
         # Calculate latency
         latency_ms = (time.time() - start_time) * 1000
 
-        # Step 6: Shadow mode override
+        # Step 5: Shadow mode override
         final_decision = real_decision
         if settings.shadow_mode:
             log_shadow_prediction(
@@ -258,44 +590,21 @@ async def predict(request: PredictionRequest):
                 f"Latency exceeded target: {latency_ms:.2f}ms > {settings.max_latency_ms}ms"
             )
 
-        # Capture features used for response
-        features_used = {
-            "trans_count_24h": trans_count_24h,
-            "avg_spend_24h": avg_spend_24h,
-            "amt_to_avg_ratio_24h": amt_to_avg_ratio_24h,
-            "user_avg_amt_all_time": user_avg_amt_all_time,  # Now uses real/override value
-        }
-
         # Calculate SHAP values if explainer is available
         shap_contributions = {}
         if explainer is not None and settings.enable_explainability:
             try:
-                explanation = explainer.explain_prediction(df, threshold=threshold)
-                # Get top 5 features by absolute impact
-                shap_contributions = {
-                    item["feature"]: item["impact"] for item in explanation["top_features"]
-                }
+                # Top 5 features by absolute impact
+                shap_contributions = (await explain_rows([request_data]))[0]
             except Exception as e:
                 logger.warning(f"SHAP computation failed: {e}")
 
-        # Persist transaction to Redis (if no overrides were used and not in shadow mode)
-        # This ensures velocity features accumulate for future predictions
-        if feature_store and not settings.shadow_mode:
-            # Only persist if user didn't override features (to avoid polluting real data)
-            no_overrides = (
-                request.trans_count_24h is None
-                and request.avg_spend_24h is None
-                and request.user_avg_amt_all_time is None
-            )
-            if no_overrides:
-                try:
-                    trans_time = pd.to_datetime(request.trans_date_trans_time)
-                    timestamp = int(trans_time.timestamp())
-                    feature_store.add_transaction(
-                        user_id=request.user_id, amount=request.amt, timestamp=timestamp
-                    )
-                except Exception as e:
-                    logger.warning(f"Failed to persist transaction to Redis: {e}")
+        # Persist transaction to Redis unless already recorded with the lookup
+        if persist and timestamp is not None:
+            try:
+                await record_transaction(request.user_id, request.amt, timestamp)
+            except Exception as e:
+                logger.warning(f"Failed to persist transaction to Redis: {e}")
 
         return PredictionResponse(
             decision=final_decision,
@@ -303,7 +612,7 @@ async def predict(request: PredictionRequest):
             risk_score=float(prob * 100),
             latency_ms=latency_ms,
             shadow_mode=settings.shadow_mode,
-            features=features_used,
+            features=features_used(resolved),
             shap_values=shap_contributions,
         )
 
@@ -312,6 +621,174 @@ async def predict(request: PredictionRequest):
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
 
+@app.post("/v1/predict/batch", response_model=BatchPredictionResponse)
+async def predict_batch(request: BatchPredictionRequest):
+    """
+    Batch fraud detection endpoint.
+
+    Scores many transactions with one feature-store round trip and one
+    vectorized pipeline call (FraudFeatureExtractor, ColumnTransformer and
+    XGBoost each run once over the batch).
+
+    Workflow:
+    1. Validate each transaction individually
+    2. Fetch real-time features for all rows in one pipelined call
+    3. Run inference once over the whole batch
+    4. Apply threshold / shadow mode per row
+    5. Persist eligible transactions to the feature store in one call
+
+    A bad row (validation, timestamp or inference error) fails only that
+    row; the rest of the batch is still scored. Features are read as of
+    before the batch, so transactions of the same user within one batch do
+    not see each other.
+
+    Args:
+        request: Batch of transactions
+
+    Returns:
+        One result (prediction or error) per transaction
+
+    Raises:
+        HTTPException: If model not loaded or batch exceeds max_batch_size
+    """
+    start_time = time.time()
+
+    if pipeline is None or threshold is None:
+        raise HTTPException(status_code=503, detail="Service unavailable: Model not loaded")
+
+    n_items = len(request.transactions)
+    if n_items > settings.max_batch_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {n_items} > max_batch_size ({settings.max_batch_size})",
+        )
+
+    errors: Dict[int, str] = {}
+    valid: List[int] = []
+    requests: Dict[int, PredictionRequest] = {}
+    timestamps: Dict[int, int] = {}
+
+    # Step 1: Validate rows and parse timestamps
+    for i, item in enumerate(request.transactions):
+        try:
+            txn = PredictionRequest.model_validate(item)
+            timestamps[i] = parse_timestamp(txn.trans_date_trans_time)
+        except ValidationError as e:
+            errors[i] = f"Validation failed: {e.errors(include_url=False)}"
+            continue
+        except Exception as e:
+            errors[i] = f"Invalid timestamp: {e}"
+            continue
+        requests[i] = txn
+        valid.append(i)
+
+    # Step 2: Fetch real-time features for all rows needing a lookup
+    stored: Dict[int, Dict[str, float]] = {}
+    lookup = [i for i in valid if needs_feature_lookup(requests[i])]
+    if lookup and feature_store:
+        try:
+            fetched = await call_store(
+                feature_store.get_features_many,
+                [requests[i].user_id for i in lookup],
+                [timestamps[i] for i in lookup],
+            )
+            stored = dict(zip(lookup, fetched))
+        except Exception as e:
+            logger.warning(f"Redis batch feature lookup failed: {e}. Using defaults.")
+
+    resolved = {i: resolve_features(requests[i], stored.get(i)) for i in valid}
+    rows = [build_model_row(requests[i], resolved[i]) for i in valid]
+
+    # Step 3: Vectorized inference (per-row fallback isolates failures)
+    probs, row_errors = await score_rows(rows)
+    for pos, message in row_errors.items():
+        errors[valid[pos]] = f"Prediction failed: {message}"
+
+    scored = [pos for pos in range(len(valid)) if pos not in row_errors]
+    latency_ms = (time.time() - start_time) * 1000
+
+    # Step 4: SHAP contributions for scored rows (one explainer call)
+    shap_rows: Dict[int, Dict[str, float]] = {}
+    if scored and explainer is not None and settings.enable_explainability:
+        try:
+            contributions = await explain_rows([rows[pos] for pos in scored])
+            shap_rows = dict(zip(scored, contributions))
+        except Exception as e:
+            logger.warning(f"SHAP computation failed: {e}")
+
+    # Step 5: Decisions, shadow logging and persistence
+    results: Dict[int, BatchPredictionItem] = {}
+    events: List[Tuple[str, float, int]] = []
+    for pos in scored:
+        i = valid[pos]
+        prob = probs[pos]
+        real_decision = "BLOCK" if prob >= threshold else "APPROVE"
+
+        final_decision = real_decision
+        if settings.shadow_mode:
+            log_shadow_prediction(
+                request_data=rows[pos],
+                probability=prob,
+                real_decision=real_decision,
+                latency_ms=latency_ms,
+            )
+            final_decision = "APPROVE"
+
+        if feature_store and not settings.shadow_mode and not has_overrides(requests[i]):
+            events.append((requests[i].user_id, requests[i].amt, timestamps[i]))
+
+        results[i] = BatchPredictionItem(
+            index=i,
+            prediction=PredictionResponse(
+                decision=final_decision,
+                probability=float(prob),
+                risk_score=float(prob * 100),
+                latency_ms=latency_ms,
+                shadow_mode=settings.shadow_mode,
+                features=features_used(resolved[i]),
+                shap_values=shap_rows.get(pos, {}),
+            ),
+        )
+
+    if events:
+        try:
+            await record_transactions(events)
+        except Exception as e:
+            logger.warning(f"Failed to persist {len(events)} transactions to Redis: {e}")
+
+    for i, message in errors.items():
+        results[i] = BatchPredictionItem(index=i, error=message)
+
+    if errors:
+        logger.warning(f"Batch prediction: {len(errors)}/{n_items} rows failed")
+
+    return BatchPredictionResponse(
+        results=[results[i] for i in range(n_items)],
+        succeeded=n_items - len(errors),
+        failed=len(errors),
+        latency_ms=(time.time() - start_time) * 1000,
+    )
+
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Runtime performance metrics.
+
+    Returns JSON counters for internal components (e.g. micro-batching
+    batch sizes and queue wait times, executor pool usage, write-behind
+    queue depth and dropped events, near-cache hit rate and evictions,
+    the last feature-store health sample with connection-pool usage).
+    """
+    return {
+        "micro_batching": batcher.stats() if batcher is not None else None,
+        "executor": executor.stats() if executor is not None else None,
+        "write_behind": writer.stats() if writer is not None else None,
+        "near_cache": near_cache.stats() if near_cache is not None else None,
+        "health": health_monitor.snapshot() if health_monitor is not None else None,
+    }
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information."""
@@ -321,7 +798,11 @@ async def root():
         "status": "running",
         "endpoints": {
             "predict": "/v1/predict (POST)",
+            "predict_batch": "/v1/predict/batch (POST)",
             "health": "/health (GET)",
+            "liveness": "/health/live (GET)",
+            "readiness": "/health/ready (GET)",
+            "metrics": "/metrics (GET)",
             "docs": "/docs (GET)",
         },
     }
@@ -0,0 +1,236 @@
+"""
+Write-Behind Persistence.
+
+Takes feature-store writes (add_transaction) off the response path. Scored
+transactions are queued and a background task flushes them in pipelined
+batches covering many users, on size (`max_batch_size`) or time
+(`flush_interval_ms`), whichever comes first.
+
+Queue-full policy:
+- block: the request waits for room in the queue (back-pressure)
+- drop:  the event is discarded and counted in `dropped`
+- sync:  the event is written inline by the request, bypassing the queue
+
+Trade-off: until a batch is flushed (at most `flush_interval_ms` plus one
+write), a user's next request does not yet see the previous transaction in
+its velocity features.
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+
+logger = logging.getLogger(__name__)
+
+FULL_POLICIES = ("block", "drop", "sync")
+
+# (user_id, amount, timestamp) — arguments of add_transaction
+TransactionEvent = Tuple[str, float, int]
+
+# Writes a batch of events (e.g. feature_store.add_transactions); may be a coroutine function
+WriteFn = Callable[[List[TransactionEvent]], Union[Any, Awaitable[Any]]]
+
+
+class WriteBehindQueue:
+    """
+    Bounded asyncio write-behind queue for feature-store updates.
+
+    Example:
+        >>> writer = WriteBehindQueue(store.add_transactions, flush_interval_ms=50)
+        >>> await writer.start()
+        >>> await writer.submit(("u12345", 150.0, 1234567890))
+        >>> await writer.stop()  # drains queued events
+    """
+
+    def __init__(
+        self,
+        write_fn: WriteFn,
+        max_queue_size: int = 10000,
+        max_batch_size: int = 256,
+        flush_interval_ms: float = 50.0,
+        full_policy: str = "block",
+    ) -> None:
+        """
+        Initialize the writer.
+
+        Args:
+            write_fn: Persists a list of events in one pipelined call
+            max_queue_size: Maximum number of queued events
+            max_batch_size: Flush as soon as this many events are collected
+            flush_interval_ms: Flush at most this long after the first
+                               event of a batch was dequeued
+            full_policy: What submit() does when the queue is full
+                         ("block", "drop" or "sync")
+        """
+        if full_policy not in FULL_POLICIES:
+            raise ValueError(f"Unknown full_policy '{full_policy}'. Use one of {FULL_POLICIES}")
+        if max_queue_size < 1 or max_batch_size < 1:
+            raise ValueError("max_queue_size and max_batch_size must be >= 1")
+
+        self.write_fn = write_fn
+        self._is_async: bool = inspect.iscoroutinefunction(write_fn)
+        self.max_queue_size: int = max_queue_size
+        self.max_batch_size: int = max_batch_size
+        self.flush_interval: float = flush_interval_ms / 1000.0
+        self.full_policy: str = full_policy
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing: bool = False
+
+        # Metrics
+        self._enqueued: int = 0
+        self._written: int = 0
+        self._dropped: int = 0
+        self._failed: int = 0
+        self._sync_writes: int = 0
+        self._batches: int = 0
+        self._batched: int = 0
+        self._flush_seconds: float = 0.0
+
+    async def start(self) -> None:
+        """Start the background flush task (call from the running event loop)."""
+        if self._task is not None:
+            return
+        self._closing = False
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Stop accepting events and drain what is queued.
+
+        Args:
+            timeout: Maximum seconds to wait for the drain; events still
+                     queued afterwards are counted as dropped
+        """
+        if self._task is None:
+            return
+
+        self._closing = True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Write-behind drain timed out; {self._queue.qsize()} events dropped")
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        while not self._queue.empty():
+            self._queue.get_nowait()
+            self._dropped += 1
+
+    async def submit(self, event: TransactionEvent) -> None:
+        """
+        Queue one transaction for persistence.
+
+        Falls back to an inline write when the writer is not running (or is
+        shutting down), so events are never silently lost.
+
+        Args:
+            event: (user_id, amount, timestamp)
+        """
+        if self._task is None or self._closing:
+            await self._write_inline(event)
+            return
+
+        try:
+            self._queue.put_nowait(event)
+            self._enqueued += 1
+            return
+        except asyncio.QueueFull:
+            pass
+
+        if self.full_policy == "drop":
+            self._dropped += 1
+        elif self.full_policy == "sync":
+            await self._write_inline(event)
+        else:
+            await self._queue.put(event)
+            self._enqueued += 1
+
+    async def _write(self, events: List[TransactionEvent]) -> None:
+        """Call write_fn, awaiting it if it is a coroutine function."""
+        result = self.write_fn(events)
+        if self._is_async:
+            await result
+
+    async def _write_inline(self, event: TransactionEvent) -> None:
+        """Write one event on the caller's path (errors propagate to the caller)."""
+        self._sync_writes += 1
+        await self._write([event])
+        self._written += 1
+
+    async def _collect(self) -> List[TransactionEvent]:
+        """Wait for the first event, then gather more until full or the interval elapses."""
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.flush_interval
+
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 or self._closing:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self) -> None:
+        """Flush loop: collect a batch, write it in one call, mark it done."""
+        while True:
+            batch = await self._collect()
+            start = time.perf_counter()
+            try:
+                await self._write(batch)
+                self._written += len(batch)
+            except Exception as e:
+                logger.warning(f"Write-behind flush of {len(batch)} events failed: {e}")
+                self._failed += len(batch)
+            finally:
+                self._batches += 1
+                self._batched += len(batch)
+                self._flush_seconds += time.perf_counter() - start
+                for _ in batch:
+                    self._queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return writer metrics.
+
+        Returns:
+            Dictionary with queue depth, event counters (enqueued, written,
+            dropped, failed, sync_writes) and flush statistics
+        """
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_capacity": self.max_queue_size,
+            "full_policy": self.full_policy,
+            "enqueued": self._enqueued,
+            "written": self._written,
+            "dropped": self._dropped,
+            "failed": self._failed,
+            "sync_writes": self._sync_writes,
+            "batches": self._batches,
+            "batch_size_avg": round(self._batched / self._batches, 2) if self._batches else 0.0,
+            "flush_ms_avg": round(self._flush_seconds * 1000 / self._batches, 3)
+            if self._batches
+            else 0.0,
+        }
+
+
+__all__ = ["WriteBehindQueue", "TransactionEvent", "FULL_POLICIES"]
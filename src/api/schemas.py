@@ -4,7 +4,7 @@ API Request/Response Schemas.
 Pydantic models for API contract validation.
 """
 
-from typing import Literal, Optional, Dict, Any
+from typing import Literal, Optional, Dict, Any, List
 from pydantic import BaseModel, Field
 
 
@@ -82,6 +82,47 @@ class PredictionResponse(BaseModel):
         }
 
 
+class BatchPredictionRequest(BaseModel):
+    """
+    Request schema for the batch prediction endpoint.
+
+    Each item follows the PredictionRequest schema. Items are validated
+    individually so that one malformed transaction fails only its own row.
+    """
+
+    transactions: List[Dict[str, Any]] = Field(
+        ..., min_length=1, description="Transactions to score (PredictionRequest objects)"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "transactions": [
+                    PredictionRequest.model_config["json_schema_extra"]["example"],
+                ]
+            }
+        }
+
+
+class BatchPredictionItem(BaseModel):
+    """Outcome for one transaction of a batch (prediction or error)."""
+
+    index: int = Field(..., description="Position of the transaction in the request")
+    prediction: Optional[PredictionResponse] = Field(
+        default=None, description="Prediction (None if this row failed)"
+    )
+    error: Optional[str] = Field(default=None, description="Error message for a failed row")
+
+
+class BatchPredictionResponse(BaseModel):
+    """Response schema for the batch prediction endpoint."""
+
+    results: List[BatchPredictionItem] = Field(..., description="One entry per transaction")
+    succeeded: int = Field(..., description="Number of rows scored successfully")
+    failed: int = Field(..., description="Number of rows that failed")
+    latency_ms: float = Field(..., description="Total batch latency in milliseconds")
+
+
 class HealthResponse(BaseModel):
     """Health check response."""
 
@@ -89,6 +130,14 @@ class HealthResponse(BaseModel):
     model_loaded: bool
     redis_connected: bool
     version: str
+    redis_checked_at: Optional[float] = None  # Unix time of the cached Redis check
 
 
-__all__ = ["PredictionRequest", "PredictionResponse", "HealthResponse"]
+__all__ = [
+    "PredictionRequest",
+    "PredictionResponse",
+    "BatchPredictionRequest",
+    "BatchPredictionItem",
+    "BatchPredictionResponse",
+    "HealthResponse",
+]
@@ -0,0 +1,243 @@
+"""
+Scoring Helpers.
+
+Shared feature resolution and vectorized inference used by the single and
+batch prediction endpoints. Keeping this logic in one place guarantees that
+a transaction scored through `/v1/predict/batch` sees exactly the same model
+inputs as it would through `/v1/predict`.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.api.schemas import PredictionRequest
+from src.models.compiled import CompiledFraudPipeline
+
+
+# Real-time features that callers may override in the request body
+OVERRIDE_FIELDS = ("trans_count_24h", "avg_spend_24h", "user_avg_amt_all_time")
+
+
+def parse_timestamp(trans_date_trans_time: str) -> int:
+    """
+    Convert a transaction timestamp string to Unix seconds.
+
+    Args:
+        trans_date_trans_time: Timestamp in 'YYYY-MM-DD HH:MM:SS' format
+
+    Returns:
+        Unix timestamp (seconds)
+    """
+    return int(pd.to_datetime(trans_date_trans_time).timestamp())
+
+
+def needs_feature_lookup(request: PredictionRequest) -> bool:
+    """Return True if any real-time feature must come from the feature store."""
+    return any(getattr(request, field) is None for field in OVERRIDE_FIELDS)
+
+
+def has_overrides(request: PredictionRequest) -> bool:
+    """
+    Return True if the caller supplied any real-time feature override.
+
+    Overridden requests are never persisted to the feature store, to avoid
+    polluting real user history with analysis traffic.
+    """
+    return any(getattr(request, field) is not None for field in OVERRIDE_FIELDS)
+
+
+def resolve_features(
+    request: PredictionRequest, stored: Optional[Dict[str, float]] = None
+) -> Dict[str, float]:
+    """
+    Resolve real-time features for a request.
+
+    Priority: Override > Feature Store > Default.
+
+    Args:
+        request: Validated prediction request
+        stored: Features returned by the feature store (None if unavailable)
+
+    Returns:
+        Dictionary with trans_count_24h, avg_spend_24h, amt_to_avg_ratio_24h,
+        user_avg_amt_all_time and amt_relative_to_all_time
+    """
+    trans_count_24h = request.trans_count_24h
+    avg_spend_24h = request.avg_spend_24h
+    amt_to_avg_ratio_24h = request.amt_to_avg_ratio_24h
+    user_avg_amt_all_time = request.user_avg_amt_all_time
+
+    if stored is not None:
+        if trans_count_24h is None:
+            trans_count_24h = stored.get("trans_count_24h", 0)
+
+        # Exact 24h mean (training's avg_amt_24h) unless the caller supplied
+        # the average; like training's fillna, an empty window gives 1.0
+        if amt_to_avg_ratio_24h is None and avg_spend_24h is None and "avg_amt_24h" in stored:
+            avg_amt_24h = stored["avg_amt_24h"]
+            amt_to_avg_ratio_24h = (
+                request.amt / avg_amt_24h
+                if stored.get("trans_count_24h") and avg_amt_24h > 0
+                else 1.0
+            )
+
+        if avg_spend_24h is None:
+            avg_spend_24h = stored.get("avg_spend_24h", request.amt)
+
+        # All-time profile (running count/sum in the store). Like training's
+        # expanding mean, a user's first transaction is compared to itself
+        if user_avg_amt_all_time is None:
+            if stored.get("trans_count_all_time"):
+                user_avg_amt_all_time = stored["user_avg_amt_all_time"]
+            elif "trans_count_all_time" in stored:
+                user_avg_amt_all_time = request.amt
+
+    # Fill remaining defaults
+    if trans_count_24h is None:
+        trans_count_24h = 0
+    if avg_spend_24h is None:
+        avg_spend_24h = request.amt
+    if user_avg_amt_all_time is None:
+        user_avg_amt_all_time = avg_spend_24h  # Use 24h avg as proxy
+
+    # Calculate derived ratios if not overridden
+    if amt_to_avg_ratio_24h is None:
+        amt_to_avg_ratio_24h = request.amt / avg_spend_24h if avg_spend_24h > 0 else 1.0
+    amt_relative_to_all_time = (
+        request.amt / user_avg_amt_all_time if user_avg_amt_all_time > 0 else 1.0
+    )
+
+    return {
+        "trans_count_24h": trans_count_24h,
+        "avg_spend_24h": avg_spend_24h,
+        "amt_to_avg_ratio_24h": amt_to_avg_ratio_24h,
+        "user_avg_amt_all_time": user_avg_amt_all_time,
+        "amt_relative_to_all_time": amt_relative_to_all_time,
+    }
+
+
+def build_model_row(request: PredictionRequest, resolved: Dict[str, float]) -> Dict[str, Any]:
+    """
+    Build the raw input row expected by the training pipeline.
+
+    Args:
+        request: Validated prediction request
+        resolved: Output of resolve_features()
+
+    Returns:
+        Flat dictionary of raw columns plus injected real-time features
+    """
+    row = request.model_dump()
+    row["trans_count_24h"] = resolved["trans_count_24h"]
+    row["avg_spend_24h"] = resolved["avg_spend_24h"]
+    row["amt_to_avg_ratio_24h"] = resolved["amt_to_avg_ratio_24h"]
+    row["amt_relative_to_all_time"] = resolved["amt_relative_to_all_time"]
+    return row
+
+
+def features_used(resolved: Dict[str, float]) -> Dict[str, float]:
+    """Select the features echoed back to the caller in the response."""
+    return {
+        "trans_count_24h": resolved["trans_count_24h"],
+        "avg_spend_24h": resolved["avg_spend_24h"],
+        "amt_to_avg_ratio_24h": resolved["amt_to_avg_ratio_24h"],
+        "user_avg_amt_all_time": resolved["user_avg_amt_all_time"],
+    }
+
+
+def predict_proba_rows(model, rows: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Fraud probabilities for raw rows.
+
+    Args:
+        model: CompiledFraudPipeline (DataFrame-free) or fitted sklearn Pipeline
+        rows: Raw input rows (see build_model_row)
+
+    Returns:
+        Array of fraud probabilities aligned with rows
+    """
+    if isinstance(model, CompiledFraudPipeline):
+        return model.predict_proba(rows)[:, 1]
+    return model.predict_proba(pd.DataFrame(rows))[:, 1]
+
+
+def predict_proba_batch(model, rows: List[Dict[str, Any]]) -> Tuple[np.ndarray, Dict[int, str]]:
+    """
+    Score many rows with a single vectorized predict_proba call.
+
+    Feature extraction, the ColumnTransformer and XGBoost each run once over
+    the whole batch. If the vectorized call fails (e.g. one row carries an
+    unparseable date or unknown gender), rows are re-scored individually so
+    that only the offending rows fail.
+
+    Args:
+        model: CompiledFraudPipeline or fitted sklearn Pipeline
+        rows: Raw input rows (see build_model_row)
+
+    Returns:
+        Tuple of (probabilities, errors) where probabilities has NaN for
+        failed rows and errors maps row position to an error message
+    """
+    if not rows:
+        return np.empty(0, dtype=np.float64), {}
+
+    try:
+        probs = predict_proba_rows(model, rows)
+        return np.asarray(probs, dtype=np.float64), {}
+    except Exception:
+        pass
+
+    # Slow path: isolate failing rows
+    probs = np.full(len(rows), np.nan, dtype=np.float64)
+    errors: Dict[int, str] = {}
+    for i, row in enumerate(rows):
+        try:
+            probs[i] = predict_proba_rows(model, [row])[0]
+        except Exception as e:
+            errors[i] = str(e)
+
+    return probs, errors
+
+
+def top_shap_contributions(
+    feature_names: List[str], shap_row: np.ndarray, top_k: int = 5
+) -> Dict[str, float]:
+    """
+    Select the top-k features by absolute SHAP impact for one row.
+
+    Matches the ordering used by FraudExplainer.explain_prediction().
+    """
+    order = np.argsort(-np.abs(shap_row), kind="stable")[:top_k]
+    return {feature_names[i]: float(shap_row[i]) for i in order}
+
+
+def shap_contributions_rows(explainer, rows: List[Dict[str, Any]]) -> List[Dict[str, float]]:
+    """
+    Top SHAP contributions for many raw rows with one explainer call.
+
+    Args:
+        explainer: FraudExplainer
+        rows: Raw input rows (see build_model_row)
+
+    Returns:
+        One {feature: impact} dictionary per row (see top_shap_contributions)
+    """
+    shap_values, _ = explainer.calculate_shap_values(pd.DataFrame(rows))
+    return [top_shap_contributions(explainer.feature_names, row) for row in shap_values]
+
+
+__all__ = [
+    "OVERRIDE_FIELDS",
+    "parse_timestamp",
+    "needs_feature_lookup",
+    "has_overrides",
+    "resolve_features",
+    "build_model_row",
+    "features_used",
+    "predict_proba_rows",
+    "predict_proba_batch",
+    "top_shap_contributions",
+    "shap_contributions_rows",
+]
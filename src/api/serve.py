@@ -0,0 +1,172 @@
+"""
+Pre-Fork Serving Launcher.
+
+Loads the model, threshold and SHAP explainer once in a parent process,
+binds the listening socket, then forks N uvicorn workers. The workers
+inherit the loaded objects and share their memory pages copy-on-write, so
+adding a worker costs little more than its interpreter and request state
+instead of another full copy of the pipeline.
+
+Per-process resources (Redis clients, thread pools, the micro-batcher and
+write-behind tasks) are still created in each worker by the app's startup
+hook, after the fork.
+
+Usage:
+    python -m src.api.serve --workers 4 --host 0.0.0.0 --port 8000
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, Optional
+
+import uvicorn
+
+from src.api.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+def threads_per_worker(workers: int) -> int:
+    """Split the machine's cores evenly across workers (at least one thread each)."""
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """Create the listening socket shared by all workers."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class PreforkServer:
+    """
+    Parent process supervising forked uvicorn workers.
+
+    Example:
+        >>> PreforkServer(workers=4, host="0.0.0.0", port=8000).run()
+    """
+
+    def __init__(self, workers: int, host: str, port: int, log_level: str = "info") -> None:
+        """
+        Initialize the launcher.
+
+        Args:
+            workers: Number of worker processes to fork
+            host: Bind address
+            port: Bind port
+            log_level: uvicorn log level
+        """
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+
+        self.workers: int = workers
+        self.host: str = host
+        self.port: int = port
+        self.log_level: str = log_level
+
+        self._sock: Optional[socket.socket] = None
+        self._children: Dict[int, int] = {}  # pid -> worker slot
+        self._stopping: bool = False
+
+    def preload(self) -> None:
+        """Load shared model resources in the parent, before any fork."""
+        import src.api.main as api_main
+
+        if settings.model_threads <= 0:
+            settings.model_threads = threads_per_worker(self.workers)
+
+        api_main.load_model_resources()
+
+        # Move everything allocated so far out of the GC's tracked generations:
+        # collections in the workers would otherwise touch (and copy) these pages
+        gc.collect()
+        gc.freeze()
+
+    def _spawn(self, slot: int) -> None:
+        """Fork one worker serving on the shared socket."""
+        pid = os.fork()
+        if pid:
+            self._children[pid] = slot
+            return
+
+        # Child: default signal handling (uvicorn installs its own), then serve
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        exit_code = 0
+        try:
+            import src.api.main as api_main
+
+            config = uvicorn.Config(api_main.app, log_level=self.log_level, access_log=False)
+            uvicorn.Server(config).run(sockets=[self._sock])
+        except BaseException:
+            logger.exception(f"Worker {slot} crashed")
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def _stop(self, signum, frame) -> None:
+        """Forward termination to the workers."""
+        self._stopping = True
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> None:
+        """Preload, fork the workers and supervise them until terminated."""
+        self.preload()
+        self._sock = bind_socket(self.host, self.port)
+
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        for slot in range(self.workers):
+            self._spawn(slot)
+        logger.info(
+            f"✓ Serving on {self.host}:{self.port} with {self.workers} workers "
+            f"(pids {sorted(self._children)}, {settings.model_threads} XGBoost threads each)"
+        )
+
+        while self._children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+
+            slot = self._children.pop(pid, None)
+            if slot is not None and not self._stopping:
+                logger.warning(f"Worker {slot} (pid {pid}) exited with status {status}; restarting")
+                time.sleep(0.5)  # Avoid a tight crash loop
+                self._spawn(slot)
+
+        self._sock.close()
+        logger.info("✓ All workers stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-fork PayShield API server")
+    parser.add_argument("--workers", type=int, default=settings.api_workers)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    PreforkServer(args.workers, args.host, args.port, log_level=args.log_level).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,7 +13,7 @@ Based on research notebook SHAP implementation:
 import base64
 import io
 from pathlib import Path
-from typing import Dict, Tuple, Union
+from typing import Dict, Optional, Tuple, Union
 
 import joblib
 import matplotlib
@@ -45,12 +45,14 @@ class FraudExplainer:
         >>> summary_b64 = explainer.generate_summary(X_test_sample)
     """
 
-    def __init__(self, pipeline_path: str):
+    def __init__(self, pipeline_path: str, pipeline: Optional[Pipeline] = None):
         """
         Initialize SHAP explainer with trained pipeline.
 
         Args:
             pipeline_path: Path to saved pipeline (.pkl file)
+            pipeline: Already loaded pipeline from pipeline_path. Pass it to
+                      share one copy with the scorer instead of loading again.
 
         Raises:
             FileNotFoundError: If pipeline file doesn't exist
@@ -60,8 +62,8 @@ class FraudExplainer:
         if not pipeline_path.exists():
             raise FileNotFoundError(f"Pipeline not found: {pipeline_path}")
 
-        # Load trained pipeline
-        self.pipeline: Pipeline = joblib.load(pipeline_path)
+        # Load trained pipeline (unless the caller already has it)
+        self.pipeline: Pipeline = pipeline if pipeline is not None else joblib.load(pipeline_path)
 
         # Extract components
         if "model" not in self.pipeline.named_steps:
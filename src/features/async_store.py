@@ -0,0 +1,563 @@
+"""
+Async Redis Feature Store
+
+asyncio counterpart of RedisFeatureStore built on redis.asyncio, so that
+FastAPI handlers can await feature hydration without occupying a thread.
+
+Same key layout, features and semantics as the synchronous store (see
+store.py); only the transport differs:
+- Own redis.asyncio connection pool (connections are bound to the event loop
+  that created them, so create and use the store from one loop)
+- Commands are awaited, leaving the loop free to serve other requests while
+  Redis responds
+- Replica heartbeats run as a task on that loop (started by connect())
+
+Author: PayShield-ML Team
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import redis
+import redis.asyncio as aioredis
+
+from src.features.near_cache import NearCache
+from src.features.store import FeatureStoreBase, ScriptCall, user_keys
+
+
+class AsyncRedisFeatureStore(FeatureStoreBase):
+    """
+    asyncio Redis-backed feature store for real-time fraud detection.
+
+    Example:
+        >>> store = AsyncRedisFeatureStore(host="localhost", port=6379)
+        >>> await store.connect()
+        >>>
+        >>> await store.add_transaction("u12345", 150.00, timestamp=1234567890)
+        >>> features = await store.get_features("u12345", 1234567890)
+        >>> print(features)
+        {'trans_count_24h': 1.0, 'avg_spend_24h': 150.0}
+        >>>
+        >>> await store.close()
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6379,
+        db: int = 0,
+        password: Optional[str] = None,
+        max_connections: int = 200,
+        decode_responses: bool = True,
+        ema_alpha: Optional[float] = None,
+        near_cache: Optional[NearCache] = None,
+        window_mode: str = "zset",
+        bucket_seconds: int = 900,
+        velocity_windows: Optional[Dict[str, int]] = None,
+        key_layout: str = "keys",
+        replicas: Optional[Sequence[Mapping[str, Any]]] = None,
+        replica_max_staleness_ms: float = 1000.0,
+        replica_hedge_ms: Optional[float] = None,
+    ) -> None:
+        """
+        Initialize the async connection pool (no I/O until connect()).
+
+        Args:
+            host: Redis server hostname
+            port: Redis server port
+            db: Redis database number (0-15)
+            password: Redis password (if authentication enabled)
+            max_connections: Maximum connections in pool. Awaiting callers
+                             hold a connection only for the duration of a
+                             command, so this can be sized to the expected
+                             number of in-flight requests.
+            decode_responses: If True, decode bytes to strings
+            ema_alpha: Exponential moving average smoothing factor.
+                      Default is 2/(24+1) ≈ 0.08 for 24-hour window.
+            near_cache: Optional in-process cache for hot users' features
+            window_mode: "zset" (exact) or "buckets" (bounded memory per user)
+            bucket_seconds: Bucket width in "buckets" mode (default 15 minutes)
+            velocity_windows: Window name -> seconds for get_velocity
+            key_layout: "keys" or "hash" (see store.KEY_LAYOUTS)
+            replicas: Read replicas (host, port, db, password each; see
+                      RedisFeatureStore)
+            replica_max_staleness_ms: Staleness beyond which reads fall back
+                                      to the primary
+            replica_hedge_ms: Hedge a read to a second replica after this
+                              long (None or 0: no hedging)
+        """
+        super().__init__(
+            ema_alpha=ema_alpha,
+            near_cache=near_cache,
+            window_mode=window_mode,
+            bucket_seconds=bucket_seconds,
+            velocity_windows=velocity_windows,
+            key_layout=key_layout,
+        )
+
+        self.host: str = host
+        self.port: int = port
+
+        # Blocking pool: wait for a free connection instead of failing at the limit
+        self.pool: aioredis.BlockingConnectionPool = aioredis.BlockingConnectionPool(
+            host=host,
+            port=port,
+            db=db,
+            password=password,
+            max_connections=max_connections,
+            timeout=1,  # 1s wait for a free connection
+            decode_responses=decode_responses,
+            socket_connect_timeout=2,  # 2s connection timeout
+            socket_timeout=1,  # 1s operation timeout
+        )
+
+        self.client: aioredis.Redis = aioredis.Redis(connection_pool=self.pool)
+
+        replica_settings = self._init_replicas(
+            replicas, password, replica_max_staleness_ms, replica_hedge_ms
+        )
+        self.replica_pools: List[aioredis.BlockingConnectionPool] = [
+            aioredis.BlockingConnectionPool(
+                **replica,
+                max_connections=max_connections,
+                timeout=1,
+                decode_responses=decode_responses,
+                socket_connect_timeout=2,
+                socket_timeout=1,
+            )
+            for replica in replica_settings
+        ]
+        self.replica_clients: List[aioredis.Redis] = [
+            aioredis.Redis(connection_pool=pool) for pool in self.replica_pools
+        ]
+        self._heartbeat_task: Optional[asyncio.Task] = None
+
+    async def connect(self) -> None:
+        """
+        Verify the connection and load the Lua scripts; with replicas, also
+        start the heartbeat task.
+
+        Raises:
+            ConnectionError: If Redis is not reachable
+        """
+        try:
+            await self.client.ping()
+        except redis.exceptions.ConnectionError as e:
+            raise ConnectionError(
+                f"Failed to connect to Redis at {self.host}:{self.port}. "
+                f"Ensure Redis is running. Error: {e}"
+            ) from e
+
+        await self._load_scripts()
+
+        if self.replica_router is not None and self._heartbeat_task is None:
+            for client in self.replica_clients:
+                try:
+                    await self._load_scripts(client=client)
+                except redis.exceptions.RedisError:
+                    pass  # Unreachable for now: stale until heartbeats arrive
+            await self._send_heartbeat()
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+
+    async def add_transaction(
+        self, user_id: str, amount: float, timestamp: Optional[int] = None
+    ) -> None:
+        """
+        Record a new transaction and update features atomically.
+
+        See RedisFeatureStore.add_transaction.
+
+        Args:
+            user_id: User identifier
+            amount: Transaction amount in USD
+            timestamp: Unix timestamp. If None, uses current time.
+
+        Raises:
+            redis.exceptions.RedisError: If Redis operation fails
+        """
+        if timestamp is None:
+            timestamp = int(time.time())
+
+        await self._run_scripts([self._transaction_call(user_id, amount, timestamp)])
+        self._invalidate_near_cache([user_id])
+
+    async def add_transactions(self, events: Sequence[Tuple[str, float, int]]) -> None:
+        """
+        Record many transactions (possibly of many users) in one round trip.
+
+        See RedisFeatureStore.add_transactions.
+
+        Args:
+            events: (user_id, amount, timestamp) tuples, applied in order
+        """
+        if not events:
+            return
+
+        await self._run_scripts(
+            [
+                self._transaction_call(user_id, amount, timestamp)
+                for user_id, amount, timestamp in events
+            ]
+        )
+        self._invalidate_near_cache(user_id for user_id, _, _ in events)
+
+    async def get_features_and_record(
+        self, user_id: str, amount: float, timestamp: Optional[int] = None
+    ) -> Dict[str, float]:
+        """
+        Return the user's features as of just before a transaction, then record it.
+
+        See RedisFeatureStore.get_features_and_record.
+
+        Args:
+            user_id: User identifier
+            amount: Transaction amount in USD
+            timestamp: Unix timestamp. If None, uses current time.
+
+        Returns:
+            Feature dictionary as returned by get_features (excluding this
+            transaction)
+        """
+        if timestamp is None:
+            timestamp = int(time.time())
+
+        call = self._transaction_call(user_id, amount, timestamp, script="hydrate_and_record")
+        count, avg_spend, profile_count, profile_sum, window_sum = (
+            await self._run_scripts([call])
+        )[0]
+        self._invalidate_near_cache([user_id])
+        return self._decode_features(
+            (count, float(window_sum)), avg_spend, [profile_count, profile_sum]
+        )
+
+    async def _run_scripts(self, calls: Sequence[ScriptCall]) -> List[Any]:
+        """
+        Run script calls in one pipeline, loading scripts missing on the server.
+
+        See RedisFeatureStore._run_scripts.
+        """
+        results: List[Any] = [None] * len(calls)
+        pending = list(range(len(calls)))
+
+        while True:
+            pipe = self.client.pipeline(transaction=False)
+            self._queue_script_calls(pipe, calls, pending)
+            retry = self._collect_script_replies(
+                pending, await pipe.execute(raise_on_error=False), results
+            )
+            if not retry:
+                return results
+
+            await self._load_scripts({calls[i][0] for i in retry})
+            pending = retry
+
+    async def _execute_reads(
+        self, queue, transaction: bool = False, client: Optional[aioredis.Redis] = None
+    ) -> List[Any]:
+        """
+        Execute the commands queued by `queue` in one pipeline.
+
+        See RedisFeatureStore._execute_reads.
+        """
+        client = client or self.client
+        while True:
+            pipe = client.pipeline(transaction=transaction)
+            queue(pipe)
+            replies = await pipe.execute(raise_on_error=False)
+            if not self._lost_scripts(replies):
+                return replies
+
+            await self._load_scripts(client=client)
+
+    async def _routed_reads(self, queue, transaction: bool = False) -> List[Any]:
+        """
+        _execute_reads on a fresh replica, hedged or falling back to the
+        primary (see RedisFeatureStore._routed_reads).
+        """
+        router = self.replica_router
+        order = router.choose() if router is not None else []
+        if not order:
+            return await self._execute_reads(queue, transaction)
+
+        def read(replica: int) -> Awaitable[List[Any]]:
+            return self._execute_reads(queue, transaction, self.replica_clients[replica])
+
+        try:
+            if router.hedge_after_ms is None or len(order) < 2:
+                replies = await read(order[0])
+                router.record_read(order[0])
+                return replies
+            return await self._hedged_reads(read, order[:2])
+        except redis.exceptions.RedisError:
+            router.record_read(None)
+            return await self._execute_reads(queue, transaction)
+
+    async def _hedged_reads(
+        self, read: Callable[[int], Awaitable[List[Any]]], order: List[int]
+    ) -> List[Any]:
+        """Read from order[0], and also order[1] if order[0] is slow; the loser is cancelled."""
+        router = self.replica_router
+        tasks = {asyncio.ensure_future(read(order[0])): order[0]}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=router.hedge_after_ms / 1000)
+            if not done:
+                tasks[asyncio.ensure_future(read(order[1]))] = order[1]
+
+            pending = set(tasks)
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        replica = tasks[task]
+                        router.record_read(
+                            replica, hedged=len(tasks) > 1, hedge_won=replica == order[1]
+                        )
+                        return task.result()
+                if not pending:
+                    raise task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _load_scripts(
+        self, names: Optional[Sequence[str]] = None, client: Optional[aioredis.Redis] = None
+    ) -> None:
+        """Load scripts into the server's script cache (all by default)."""
+        client = client or self.client
+        for name in names or self.SCRIPTS:
+            await client.script_load(self.SCRIPTS[name])
+
+    async def _send_heartbeat(self) -> None:
+        """See RedisFeatureStore._send_heartbeat."""
+        router = self.replica_router
+        seq = router.next_heartbeat()
+        try:
+            await self.client.set(router.heartbeat_key, seq, px=router.heartbeat_ttl_ms)
+        except redis.exceptions.RedisError:
+            return
+        for i, client in enumerate(self.replica_clients):
+            try:
+                router.observe(i, await client.get(router.heartbeat_key))
+            except redis.exceptions.RedisError:
+                pass  # Unreachable: its staleness keeps growing
+
+    async def _heartbeat_loop(self) -> None:
+        """Send heartbeats every heartbeat_interval_ms until close()."""
+        while True:
+            await asyncio.sleep(self.replica_router.heartbeat_interval_ms / 1000)
+            await self._send_heartbeat()
+
+    async def get_features(
+        self, user_id: str, current_timestamp: Optional[int] = None
+    ) -> Dict[str, float]:
+        """
+        Retrieve real-time features for a user.
+
+        See RedisFeatureStore.get_features.
+
+        Args:
+            user_id: User identifier
+            current_timestamp: Current Unix timestamp. If None, uses system time.
+
+        Returns:
+            Dictionary with trans_count_24h, avg_spend_24h, avg_amt_24h,
+            trans_count_all_time and user_avg_amt_all_time
+        """
+        if current_timestamp is None:
+            current_timestamp = int(time.time())
+
+        if self.near_cache is not None:
+            state = self.near_cache.get(user_id, current_timestamp)
+            if state is None:
+                ticket = self.near_cache.reserve(user_id)
+                replies = await self._execute_reads(
+                    lambda pipe: self._queue_state_read(pipe, user_id, current_timestamp),
+                    transaction=True,
+                )
+                state = self._cache_state(user_id, replies, current_timestamp, ticket)
+            return self._features_from_state(state)
+
+        results = await self._routed_reads(
+            lambda pipe: self._queue_feature_reads(pipe, [user_id], [current_timestamp]),
+            transaction=True,
+        )
+
+        return self._decode_features(*self._window_replies(results, [current_timestamp]))
+
+    async def get_features_many(
+        self, user_ids: List[str], timestamps: Optional[List[int]] = None
+    ) -> List[Dict[str, float]]:
+        """
+        Retrieve real-time features for many users in one round trip.
+
+        See RedisFeatureStore.get_features_many.
+
+        Args:
+            user_ids: User identifiers
+            timestamps: Reference Unix timestamp per user. If None, uses system time.
+
+        Returns:
+            List of feature dictionaries aligned with user_ids
+        """
+        return self._decode_features_list(await self._read_features(user_ids, timestamps))
+
+    async def get_features_arrays(
+        self, user_ids: List[str], timestamps: Optional[List[int]] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Retrieve real-time features for many users as columns.
+
+        See RedisFeatureStore.get_features_arrays.
+
+        Args:
+            user_ids: User identifiers
+            timestamps: Reference Unix timestamp per user. If None, uses system time.
+
+        Returns:
+            One array per get_features key: {"trans_count_24h": array, ...}
+        """
+        return self._decode_feature_arrays(await self._read_features(user_ids, timestamps))
+
+    async def _read_features(
+        self, user_ids: List[str], timestamps: Optional[List[int]]
+    ) -> List[Any]:
+        """Interleaved window / GET / HMGET replies for many users, one pipeline per chunk."""
+        replies: List[Any] = []
+        for chunk_users, chunk_timestamps in self._read_chunks(user_ids, timestamps):
+            chunk = await self._routed_reads(
+                lambda pipe: self._queue_feature_reads(pipe, chunk_users, chunk_timestamps)
+            )
+            replies.extend(self._window_replies(chunk, chunk_timestamps))
+        return replies
+
+    async def get_velocity(
+        self, user_id: str, current_timestamp: Optional[int] = None
+    ) -> Dict[str, float]:
+        """
+        Transaction count and amount sum over every velocity window.
+
+        See RedisFeatureStore.get_velocity.
+
+        Args:
+            user_id: User identifier
+            current_timestamp: Reference Unix timestamp. If None, uses system time.
+
+        Returns:
+            trans_count_<name> and amt_sum_<name> per configured window
+        """
+        if current_timestamp is None:
+            current_timestamp = int(time.time())
+
+        replies = await self._routed_reads(
+            lambda pipe: self._queue_velocity_read(pipe, user_id, current_timestamp)
+        )
+        return self._velocity_features(replies[0], current_timestamp)
+
+    async def get_transaction_history(
+        self, user_id: str, lookback_hours: int = 24, current_timestamp: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Retrieve raw transaction history for a user, newest first.
+
+        See RedisFeatureStore.get_transaction_history.
+        """
+        self._require_history()
+
+        if current_timestamp is None:
+            current_timestamp = int(time.time())
+
+        window_start = current_timestamp - (lookback_hours * 3600)
+
+        tx_key = self._get_tx_history_key(user_id)
+        raw_results = (
+            await self._routed_reads(
+                lambda pipe: pipe.zrangebyscore(
+                    tx_key, window_start, current_timestamp, withscores=True
+                )
+            )
+        )[0]
+
+        return self._decode_history(raw_results)
+
+    async def delete_user_data(self, user_id: str) -> int:
+        """
+        Delete all feature data for a user (GDPR): every registered key,
+        with UNLINK (see RedisFeatureStore.delete_user_data).
+
+        Returns:
+            Number of keys deleted
+        """
+        deleted = await self.client.unlink(*user_keys(user_id))
+        self._invalidate_near_cache([user_id])
+        return deleted
+
+    async def delete_users_data(self, user_ids: Sequence[str]) -> List[int]:
+        """
+        Delete all feature data for many users in one round trip.
+
+        Returns:
+            Keys deleted per user (see RedisFeatureStore.delete_users_data)
+        """
+        if not user_ids:
+            return []
+
+        pipe = self.client.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.unlink(*user_keys(user_id))
+        deleted = await pipe.execute()
+        self._invalidate_near_cache(user_ids)
+        return deleted
+
+    async def health_check(self) -> Dict[str, Any]:
+        """
+        Check Redis connection health and get statistics.
+
+        Returns:
+            Dictionary with health metrics (see RedisFeatureStore.health_check)
+        """
+        try:
+            start = time.time()
+            await self.client.ping()
+            ping_ms = (time.time() - start) * 1000
+
+            info = await self.client.info("stats")
+
+            return {
+                "status": "healthy",
+                "ping_ms": round(ping_ms, 2),
+                "connected_clients": info.get("connected_clients", -1),
+                "total_commands_processed": info.get("total_commands_processed", -1),
+                **self._pool_stats(),
+                **self._replica_stats(),
+            }
+        except Exception as e:
+            return {
+                "status": "unhealthy",
+                "error": str(e),
+                **self._pool_stats(),
+                **self._replica_stats(),
+            }
+
+    async def close(self) -> None:
+        """
+        Close the client and its connection pool.
+
+        Call this when shutting down the application.
+        """
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat_task = None
+        for client, pool in zip(self.replica_clients, self.replica_pools):
+            await client.aclose()
+            await pool.disconnect()
+        await self.client.aclose()
+        await self.pool.disconnect()
+
+
+__all__ = ["AsyncRedisFeatureStore"]
@@ -0,0 +1,82 @@
+"""
+Feature Store Backend Interface.
+
+The operations the API, jobs and tests rely on, implemented by:
+- RedisFeatureStore: shared state across workers and hosts (store.py)
+- AsyncRedisFeatureStore: same, with coroutine methods (async_store.py)
+- InMemoryFeatureStore: single-process, no network hop (memory_store.py)
+- ShardedFeatureStore: users spread over several Redis nodes (sharded_store.py)
+
+All backends share the key semantics of FeatureStoreBase: a 24h sliding
+window of transactions (kept for the longest velocity window), an EMA of
+spend, an all-time profile, and TTLs refreshed on every write.
+
+Author: PayShield-ML Team
+"""
+
+from typing import Any, Dict, List, Optional, Protocol, Sequence, Tuple, runtime_checkable
+
+import numpy as np
+
+
+FEATURE_STORE_BACKENDS = ("redis", "memory")
+
+
+@runtime_checkable
+class FeatureStoreBackend(Protocol):
+    """
+    Structural interface of a feature store.
+
+    Methods are shown synchronous; AsyncRedisFeatureStore implements them as
+    coroutine functions, so callers that accept any backend await coroutine
+    methods and call the others directly (see call_store in src/api/main.py).
+
+    blocking_io tells such callers whether a synchronous method waits on
+    the network (run it off the event loop) or only touches local memory
+    (call it inline).
+    """
+
+    blocking_io: bool
+    ema_alpha: float
+    key_ttl: int
+
+    def add_transaction(
+        self, user_id: str, amount: float, timestamp: Optional[int] = None
+    ) -> None: ...
+
+    def add_transactions(self, events: Sequence[Tuple[str, float, int]]) -> None: ...
+
+    def get_features_and_record(
+        self, user_id: str, amount: float, timestamp: Optional[int] = None
+    ) -> Dict[str, float]: ...
+
+    def get_features(
+        self, user_id: str, current_timestamp: Optional[int] = None
+    ) -> Dict[str, float]: ...
+
+    def get_features_many(
+        self, user_ids: List[str], timestamps: Optional[List[int]] = None
+    ) -> List[Dict[str, float]]: ...
+
+    def get_features_arrays(
+        self, user_ids: List[str], timestamps: Optional[List[int]] = None
+    ) -> Dict[str, np.ndarray]: ...
+
+    def get_velocity(
+        self, user_id: str, current_timestamp: Optional[int] = None
+    ) -> Dict[str, float]: ...
+
+    def get_transaction_history(
+        self, user_id: str, lookback_hours: int = 24, current_timestamp: Optional[int] = None
+    ) -> List[Tuple[int, float]]: ...
+
+    def delete_user_data(self, user_id: str) -> int: ...
+
+    def delete_users_data(self, user_ids: Sequence[str]) -> List[int]: ...
+
+    def health_check(self) -> Dict[str, Any]: ...
+
+    def close(self) -> None: ...
+
+
+__all__ = ["FEATURE_STORE_BACKENDS", "FeatureStoreBackend"]
@@ -0,0 +1,292 @@
+"""
+Feature Store Export
+
+Streams a snapshot of every user's features out of Redis into partitioned
+Parquet files, for offline / online feature parity checks and capacity
+analysis, without KEYS or long blocking commands:
+
+- Keyspace walk: SCAN over user:* in batches of scan_count keys; each user
+  is taken from its all-time profile key (or its avg_spend key when it has
+  no profile), or its state hash in the "hash" key layout
+- Reads: one pipeline per batch with exactly the reads get_features makes
+  (window, EMA, profile) plus the window's length, decoded by the store's
+  own helpers, so exported values are what the API would serve at as_of
+- Output: <output_dir>/snapshot=<as_of>/part-NNNNN.parquet, a file every
+  rows_per_file users, so memory stays bounded however many users exist
+- Latency budget: a background probe times get_features on the same
+  server while the export runs; when its p99 rises more than
+  latency_budget_ms above the p99 measured before the export, batches
+  shrink and the exporter pauses between them
+
+SCAN returns every key present for the whole walk at least once, and may
+return one twice while Redis resizes its hash table: deduplicate on
+user_id downstream. Sharded stores are exported shard by shard.
+
+Author: PayShield-ML Team
+"""
+
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.features.store import AVG_SPEND, PROFILE, STATE, RedisFeatureStore, key_user_id
+
+
+PROBE_USER = "__export_probe__"
+
+
+class LatencyGuard:
+    """
+    Background latency probe with a p99 budget.
+
+    Calls `probe` every `interval` seconds from a daemon thread and keeps
+    the last `window` latencies. `over_budget()` compares their p99 with
+    the baseline p99 measured by `start()` before any load is added.
+
+    Example:
+        >>> guard = LatencyGuard(lambda: store.get_features("__probe__"), budget_ms=1.0)
+        >>> guard.start()
+        >>> guard.over_budget()
+        False
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[], Any],
+        budget_ms: float = 1.0,
+        interval: float = 0.01,
+        window: int = 200,
+        baseline_samples: int = 50,
+    ) -> None:
+        self.probe = probe
+        self.budget_ms = budget_ms
+        self.interval = interval
+        self.baseline_samples = baseline_samples
+        self.baseline_p99_ms = 0.0
+        self._samples: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _measure(self) -> float:
+        """One probe call's latency in ms."""
+        start = time.perf_counter()
+        self.probe()
+        return (time.perf_counter() - start) * 1000
+
+    def start(self) -> None:
+        """Measure the baseline, then start probing in the background."""
+        baseline = []
+        for _ in range(self.baseline_samples):
+            baseline.append(self._measure())
+            time.sleep(self.interval)
+        self.baseline_p99_ms = float(np.percentile(baseline, 99))
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="export-probe", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            latency = self._measure()
+            with self._lock:
+                self._samples.append(latency)
+
+    def p99_ms(self) -> float:
+        """p99 of the recent probe latencies (the baseline before any sample)."""
+        with self._lock:
+            samples = list(self._samples)
+        return float(np.percentile(samples, 99)) if samples else self.baseline_p99_ms
+
+    def over_budget(self) -> bool:
+        """True if the recent p99 exceeds the baseline p99 by more than budget_ms."""
+        return self.p99_ms() - self.baseline_p99_ms > self.budget_ms
+
+    def stop(self) -> None:
+        """Stop the probe thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+class _PartitionWriter:
+    """Buffers rows and writes a Parquet part file every rows_per_file rows."""
+
+    def __init__(self, directory: Path, rows_per_file: int) -> None:
+        self.directory = directory
+        self.rows_per_file = rows_per_file
+        self.files: List[Path] = []
+        self._columns: Dict[str, List[np.ndarray]] = {}
+        self._rows = 0
+
+    def append(self, columns: Dict[str, np.ndarray]) -> None:
+        for name, values in columns.items():
+            self._columns.setdefault(name, []).append(values)
+        self._rows += len(next(iter(columns.values())))
+        if self._rows >= self.rows_per_file:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._rows:
+            return
+        table = pa.table({name: np.concatenate(parts) for name, parts in self._columns.items()})
+        path = self.directory / f"part-{len(self.files):05d}.parquet"
+        pq.write_table(table, path)
+        self.files.append(path)
+        self._columns, self._rows = {}, 0
+
+
+def _scan_users(store: RedisFeatureStore, count: int) -> Iterator[Tuple[List[str], List[str]]]:
+    """
+    SCAN user keys in batches; yield the user IDs found per batch.
+
+    Yields (profile_ids, avg_spend_ids): users seen through their profile
+    key (state hash in the "hash" key layout), and users seen through their
+    avg_spend key (kept only if they turn out to have no profile).
+    """
+    profile_suffix = f":{STATE}" if store.key_layout == "hash" else f":{PROFILE}"
+    cursor = 0
+    while True:
+        cursor, keys = store.client.scan(cursor, match="user:*", count=count)
+        profile_ids, avg_spend_ids = [], []
+        for key in keys:
+            if key.endswith(profile_suffix):
+                profile_ids.append(key_user_id(key))
+            elif key.endswith(f":{AVG_SPEND}") and store.key_layout == "keys":
+                avg_spend_ids.append(key_user_id(key))
+        if profile_ids or avg_spend_ids:
+            yield profile_ids, avg_spend_ids
+        if cursor == 0:
+            return
+
+
+def _read_batch(store: RedisFeatureStore, user_ids: List[str], as_of: int) -> Dict[str, np.ndarray]:
+    """Feature columns (as get_features_arrays) plus window_len for a batch of users."""
+    timestamps = [as_of] * len(user_ids)
+
+    def queue(pipe) -> None:
+        store._queue_feature_reads(pipe, user_ids, timestamps)
+        for user_id in user_ids:
+            if store.window_mode == "buckets":
+                pipe.hlen(store._get_tx_buckets_key(user_id))
+            else:
+                pipe.zcard(store._get_tx_history_key(user_id))
+
+    replies = store._execute_reads(queue)
+    n = len(user_ids) * store._reads_per_user
+    columns = store._decode_feature_arrays(store._window_replies(replies[:n], timestamps))
+    columns["window_len"] = np.array(replies[n:], dtype=np.int64)
+    return columns
+
+
+def export_to_parquet(
+    store: Union[RedisFeatureStore, Any],
+    output_dir: Union[str, Path],
+    as_of: Optional[int] = None,
+    scan_count: int = 1000,
+    rows_per_file: int = 100_000,
+    latency_budget_ms: Optional[float] = 1.0,
+    max_pause: float = 1.0,
+) -> Dict[str, Any]:
+    """
+    Export every user's features to partitioned Parquet files.
+
+    Args:
+        store: RedisFeatureStore, or ShardedFeatureStore (exported shard by shard)
+        output_dir: Root directory; files go to <output_dir>/snapshot=<as_of>/
+        as_of: Unix timestamp the windows are evaluated at (default: now)
+        scan_count: SCAN COUNT hint, and the largest read batch
+        rows_per_file: Users per Parquet file (bounds the buffered rows)
+        latency_budget_ms: Allowed p99 rise of get_features on the server
+                           (None: no probing, full speed)
+        max_pause: Longest pause between batches when over budget, in seconds
+
+    Returns:
+        path, users, files, seconds, baseline_p99_ms, probe_p99_ms (worst
+        shard) and throttled (batches followed by a pause)
+
+    Columns: user_id, trans_count_24h, avg_spend_24h, avg_amt_24h,
+    trans_count_all_time, user_avg_amt_all_time, window_len (ZSET members
+    or bucket fields held).
+
+    Example:
+        >>> export_to_parquet(store, "data/exports", latency_budget_ms=0.5)
+        {'path': 'data/exports/snapshot=1700000000', 'users': 1000000, 'files': 10, ...}
+    """
+    as_of = int(as_of if as_of is not None else time.time())
+    directory = Path(output_dir) / f"snapshot={as_of}"
+    directory.mkdir(parents=True, exist_ok=True)
+    writer = _PartitionWriter(directory, rows_per_file)
+
+    shards = list(store.shards.values()) if hasattr(store, "shards") else [store]
+    stats: Dict[str, Any] = {
+        "path": str(directory),
+        "users": 0,
+        "baseline_p99_ms": 0.0,
+        "probe_p99_ms": 0.0,
+        "throttled": 0,
+    }
+    started = time.perf_counter()
+
+    for shard in shards:
+        guard = None
+        if latency_budget_ms is not None:
+            guard = LatencyGuard(
+                lambda shard=shard: shard.get_features(PROBE_USER, as_of),
+                budget_ms=latency_budget_ms,
+            )
+            guard.start()
+
+        batch_size, pause = scan_count, 0.0
+        try:
+            for profile_ids, avg_spend_ids in _scan_users(shard, scan_count):
+                found = profile_ids + avg_spend_ids
+                i = 0
+                while i < len(found):
+                    user_ids = found[i : i + batch_size]
+                    columns = _read_batch(shard, user_ids, as_of)
+
+                    # Users reached through avg_spend are exported from their
+                    # profile key, unless they have none
+                    keep = np.ones(len(user_ids), dtype=bool)
+                    first_avg = max(len(profile_ids) - i, 0)
+                    keep[first_avg:] = columns["trans_count_all_time"][first_avg:] == 0
+                    columns = {name: values[keep] for name, values in columns.items()}
+                    columns = {
+                        "user_id": np.array(user_ids, dtype=object)[keep],
+                        **columns,
+                    }
+                    writer.append(columns)
+                    stats["users"] += int(keep.sum())
+                    i += len(user_ids)
+
+                    if guard is not None:
+                        if guard.over_budget():
+                            batch_size = max(batch_size // 2, 10)
+                            pause = min(max(pause * 2, 0.005), max_pause)
+                        else:
+                            batch_size = min(batch_size * 2, scan_count)
+                            pause = pause / 2 if pause > 0.001 else 0.0
+                        if pause:
+                            stats["throttled"] += 1
+                            time.sleep(pause)
+        finally:
+            if guard is not None:
+                guard.stop()
+                stats["baseline_p99_ms"] = max(stats["baseline_p99_ms"], guard.baseline_p99_ms)
+                stats["probe_p99_ms"] = max(stats["probe_p99_ms"], guard.p99_ms())
+
+    writer.flush()
+    stats["files"] = len(writer.files)
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+__all__ = ["LatencyGuard", "export_to_parquet"]
@@ -0,0 +1,202 @@
+"""
+Key Layout Migration
+
+Moves feature data written with key_layout="keys" (user:<id>:tx_history,
+:tx_buckets, :avg_spend, :profile, :rolling_sum) to key_layout="hash"
+(user:{<id>}:tx_history / :tx_buckets plus the user:{<id>}:state hash), on
+a live server:
+
+- Keyspace walk: SCAN over user:* in batches of scan_count keys; every
+  user with old-layout keys in a batch is migrated (when more of its keys
+  turn up in a later batch, there is nothing left to move)
+- Per user: one atomic script (MIGRATE_USER_SCRIPT). The window is RENAMEd
+  (members and TTL kept), the EMA and rolling sum become state fields, the
+  all-time profile is added to the state's count and sum, and the old keys
+  are unlinked
+- Live traffic: switch the API to the "hash" layout first, then migrate.
+  Users who transacted since the switch already have a new window: the old
+  members are merged into it (ZSET union; buckets missing from the new hash
+  are copied), the newer EMA is kept and the profile counts are added
+- Rate limit: batches are paced to at most max_users_per_second
+
+Every old key and its new counterpart are read in one script, so run this
+against standalone nodes (one store, or each shard of a sharded store),
+before moving the data to Redis Cluster.
+
+Author: PayShield-ML Team
+"""
+
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from src.features.store import (
+    AVG_SPEND,
+    PROFILE,
+    ROLLING_SUM,
+    STATE,
+    TX_BUCKETS,
+    TX_HISTORY,
+    RedisFeatureStore,
+    key_user_id,
+    user_key,
+)
+
+
+# KEYS: old tx_history, tx_buckets, avg_spend, profile, rolling_sum; new
+#       tx_history, tx_buckets, state
+# ARGV: profile_ttl (seconds; used if neither layout's profile has a TTL)
+# Returns {old keys removed, 1 if merged into an existing new window else 0}
+MIGRATE_USER_SCRIPT = """
+local old_keys = redis.call('EXISTS', KEYS[1], KEYS[2], KEYS[3], KEYS[4], KEYS[5])
+if old_keys == 0 then
+    return {0, 0}
+end
+local state = KEYS[8]
+local new_window = redis.call('EXISTS', KEYS[6], KEYS[7]) > 0
+local merged = 0
+
+for i = 1, 2 do
+    local old, new = KEYS[i], KEYS[i + 5]
+    if redis.call('EXISTS', old) == 1 then
+        if redis.call('EXISTS', new) == 0 then
+            redis.call('RENAME', old, new)
+        elseif redis.call('TYPE', new).ok == 'zset' then
+            local pttl = redis.call('PTTL', new)
+            redis.call('ZUNIONSTORE', new, 2, new, old, 'AGGREGATE', 'MAX')
+            if pttl > 0 then
+                redis.call('PEXPIRE', new, pttl)
+            end
+            merged = 1
+        else
+            local fields = redis.call('HGETALL', old)
+            for j = 1, #fields, 2 do
+                redis.call('HSETNX', new, fields[j], fields[j + 1])
+            end
+            merged = 1
+        end
+    end
+end
+
+if new_window then
+    -- The new EMA is the more recent; the rolling sum is rebuilt from the
+    -- merged window on the next write
+    if merged == 1 then
+        redis.call('HDEL', state, 'rsum', 'rcur')
+    end
+else
+    local ema = redis.call('GET', KEYS[3])
+    if ema then
+        redis.call('HSET', state, 'ema', ema)
+    else
+        redis.call('HDEL', state, 'ema')
+    end
+    local rolling = redis.call('HMGET', KEYS[5], 'sum', 'cursor')
+    if rolling[2] then
+        redis.call('HSET', state, 'rsum', rolling[1], 'rcur', rolling[2])
+    else
+        redis.call('HDEL', state, 'rsum', 'rcur')
+    end
+end
+
+local profile = redis.call('HMGET', KEYS[4], 'count', 'sum')
+if profile[1] then
+    redis.call('HINCRBY', state, 'count', profile[1])
+    redis.call('HINCRBYFLOAT', state, 'sum', profile[2])
+end
+
+if redis.call('EXISTS', state) == 1 then
+    local ttl = math.max(redis.call('PTTL', state), redis.call('PTTL', KEYS[4]))
+    if ttl <= 0 then
+        ttl = tonumber(ARGV[1]) * 1000
+    end
+    redis.call('PEXPIRE', state, ttl)
+end
+
+redis.call('UNLINK', KEYS[1], KEYS[2], KEYS[3], KEYS[4], KEYS[5])
+return {old_keys, merged}
+"""
+
+_OLD_SUFFIXES = (TX_HISTORY, TX_BUCKETS, AVG_SPEND, PROFILE, ROLLING_SUM)
+
+
+def _migration_keys(user_id: str) -> List[str]:
+    """KEYS of MIGRATE_USER_SCRIPT for a user."""
+    return [user_key(user_id, suffix) for suffix in _OLD_SUFFIXES] + [
+        user_key(user_id, suffix, "hash") for suffix in (TX_HISTORY, TX_BUCKETS, STATE)
+    ]
+
+
+def _scan_old_keys(store: RedisFeatureStore, count: int) -> Iterator[List[str]]:
+    """SCAN user keys in batches; yield the old-layout keys found per batch."""
+    cursor = 0
+    while True:
+        cursor, keys = store.client.scan(cursor, match="user:*", count=count)
+        # Hash-tagged keys are already in the new layout
+        old_keys = [key for key in keys if not key.startswith("user:{")]
+        if old_keys:
+            yield old_keys
+        if cursor == 0:
+            return
+
+
+def migrate_key_layout(
+    store: Union[RedisFeatureStore, Any],
+    scan_count: int = 1000,
+    max_users_per_second: Optional[float] = None,
+    dry_run: bool = False,
+    report: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Migrate every user from the "keys" to the "hash" key layout.
+
+    Args:
+        store: RedisFeatureStore, or ShardedFeatureStore (migrated shard by
+               shard); its own key_layout does not matter
+        scan_count: SCAN COUNT hint (users per pipeline is at most this)
+        max_users_per_second: Rate limit (None: unlimited)
+        dry_run: Only count the users and keys that would be migrated
+        report: Called with the running stats after every batch
+
+    Returns:
+        users (migrated, or to migrate with dry_run), removed_keys (old
+        keys), merged (users that already had a new-layout window) and
+        seconds
+
+    Example:
+        >>> migrate_key_layout(store, max_users_per_second=20000)
+        {'users': 1000000, 'removed_keys': 4000000, 'merged': 312, 'seconds': 61.4}
+    """
+    shards = list(store.shards.values()) if hasattr(store, "shards") else [store]
+    stats: Dict[str, Any] = {"users": 0, "removed_keys": 0, "merged": 0}
+    started = time.perf_counter()
+
+    for shard in shards:
+        script = shard.client.register_script(MIGRATE_USER_SCRIPT)
+        for old_keys in _scan_old_keys(shard, scan_count):
+            if dry_run:
+                # Every user with data has a profile key (the longest TTL)
+                stats["users"] += sum(1 for key in old_keys if key.endswith(f":{PROFILE}"))
+                stats["removed_keys"] += len(old_keys)
+            else:
+                user_ids = sorted({key_user_id(key) for key in old_keys})
+                pipe = shard.client.pipeline(transaction=False)
+                for user_id in user_ids:
+                    script(keys=_migration_keys(user_id), args=[shard.profile_ttl], client=pipe)
+                for removed, merged in pipe.execute():
+                    stats["users"] += 1 if removed else 0
+                    stats["removed_keys"] += removed
+                    stats["merged"] += merged
+                shard._invalidate_near_cache(user_ids)
+
+            if report is not None:
+                report(dict(stats))
+            if max_users_per_second:
+                ahead = stats["users"] / max_users_per_second - (time.perf_counter() - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+__all__ = ["MIGRATE_USER_SCRIPT", "migrate_key_layout"]
@@ -0,0 +1,367 @@
+"""
+In-Memory Feature Store
+
+Single-process backend with the same API and semantics as RedisFeatureStore,
+for single-node deployments and for running the test suite without Redis.
+Every operation is a few array operations under a lock: no network hop,
+no serialization.
+
+State per user is compact: the 24h window is two sorted NumPy arrays
+(int64 timestamps, float64 amounts) plus the EMA as one float, instead of
+ZSET members or a dict of Python floats per transaction; the all-time
+profile is a count and a sum.
+
+Matches the Redis backend on:
+- Window: each write inserts the transaction and trims everything at or
+  before its timestamp - window_retention (24h, or the longest velocity
+  window); reads count and sum [t - 24h, t] inclusive
+- EMA: same formula and float arithmetic (the Lua script keeps 17
+  significant digits, which round-trips a double exactly)
+- TTL: a user's window and EMA expire key_ttl seconds after their last
+  write, the all-time profile profile_ttl seconds after it
+- Duplicate (timestamp, amount) pairs are stored once, like ZSET members
+
+State is lost when the process exits and is not shared between workers.
+
+Author: PayShield-ML Team
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.features.store import FeatureStoreBase
+
+
+class _UserState:
+    """One user's window (sorted by timestamp), EMA, all-time profile and expiries."""
+
+    __slots__ = (
+        "timestamps",
+        "amounts",
+        "avg_spend",
+        "expires_at",
+        "profile_count",
+        "profile_sum",
+        "profile_expires_at",
+    )
+
+    def __init__(self) -> None:
+        self.clear_window()
+        self.clear_profile()
+
+    def clear_window(self) -> None:
+        """Drop the window and EMA (as when their Redis keys expire)."""
+        self.timestamps: np.ndarray = np.empty(0, dtype=np.int64)
+        self.amounts: np.ndarray = np.empty(0, dtype=np.float64)
+        self.avg_spend: Optional[float] = None
+        self.expires_at: float = 0.0
+
+    def clear_profile(self) -> None:
+        """Drop the all-time profile."""
+        self.profile_count: int = 0
+        self.profile_sum: float = 0.0
+        self.profile_expires_at: float = 0.0
+
+    def profile(self) -> Optional[Tuple[int, float]]:
+        """(count, sum) like the Redis HMGET reply, or None if no profile."""
+        return (self.profile_count, self.profile_sum) if self.profile_count else None
+
+    def bounds(self, window_start: int, window_end: int) -> Tuple[int, int]:
+        """Index range of transactions with window_start <= timestamp <= window_end."""
+        lo = int(np.searchsorted(self.timestamps, window_start, side="left"))
+        hi = int(np.searchsorted(self.timestamps, window_end, side="right"))
+        return lo, hi
+
+
+class InMemoryFeatureStore(FeatureStoreBase):
+    """
+    Process-local feature store with RedisFeatureStore semantics.
+
+    Example:
+        >>> store = InMemoryFeatureStore()
+        >>> store.add_transaction("u12345", 150.00, timestamp=1234567890)
+        >>> store.get_features("u12345", 1234567890)
+        {'trans_count_24h': 1.0, 'avg_spend_24h': 150.0}
+    """
+
+    blocking_io = False
+
+    def __init__(
+        self, ema_alpha: Optional[float] = None, velocity_windows: Optional[Dict[str, int]] = None
+    ) -> None:
+        """
+        Initialize an empty store.
+
+        Args:
+            ema_alpha: Exponential moving average smoothing factor.
+                      Default is 2/(24+1) ≈ 0.08 for 24-hour window.
+            velocity_windows: Window name -> seconds for get_velocity
+        """
+        super().__init__(ema_alpha=ema_alpha, velocity_windows=velocity_windows)
+
+        self._users: Dict[str, _UserState] = {}
+        self._lock = threading.Lock()
+
+    def _live_state(self, user_id: str) -> Optional[_UserState]:
+        """The user's state, or None if absent or expired (caller holds the lock)."""
+        state = self._users.get(user_id)
+        if state is None:
+            return None
+
+        now = time.time()
+        if state.avg_spend is not None and state.expires_at <= now:
+            state.clear_window()
+        if state.profile_count and state.profile_expires_at <= now:
+            state.clear_profile()
+        if state.avg_spend is None and not state.profile_count:
+            del self._users[user_id]
+            return None
+        return state
+
+    @staticmethod
+    def _window(state: _UserState, current_timestamp: int) -> Tuple[int, float]:
+        """(transactions, amount sum) in [current_timestamp - 24h, current_timestamp]."""
+        lo, hi = state.bounds(current_timestamp - 86400, current_timestamp)
+        return hi - lo, float(state.amounts[lo:hi].sum())
+
+    def _record(
+        self, user_id: str, amount: float, timestamp: int
+    ) -> Tuple[Tuple[int, float], Optional[float], Optional[Tuple[int, float]]]:
+        """
+        Apply one transaction (caller holds the lock).
+
+        Returns:
+            ((count, amount sum) of the 24h window, EMA, profile) as of just
+            before it
+        """
+        state = self._live_state(user_id)
+        if state is None:
+            state = self._users[user_id] = _UserState()
+
+        window, previous_ema, previous_profile = (
+            self._window(state, timestamp),
+            state.avg_spend,
+            state.profile(),
+        )
+
+        # Insert (unless this exact member exists), then trim up to timestamp - retention
+        same = state.bounds(timestamp, timestamp)
+        if not np.any(state.amounts[same[0] : same[1]] == amount):
+            state.timestamps = np.insert(state.timestamps, same[1], timestamp)
+            state.amounts = np.insert(state.amounts, same[1], amount)
+        keep = int(
+            np.searchsorted(state.timestamps, timestamp - self.window_retention, side="right")
+        )
+        if keep:
+            state.timestamps = state.timestamps[keep:]
+            state.amounts = state.amounts[keep:]
+
+        if previous_ema is None:
+            state.avg_spend = float(amount)
+        else:
+            state.avg_spend = self.ema_alpha * amount + (1 - self.ema_alpha) * previous_ema
+        state.profile_count += 1
+        state.profile_sum += amount
+        now = time.time()
+        state.expires_at = now + self.key_ttl
+        state.profile_expires_at = now + self.profile_ttl
+
+        return window, previous_ema, previous_profile
+
+    def _read(
+        self, user_id: str, current_timestamp: int
+    ) -> Tuple[Tuple[int, float], Optional[float], Optional[Tuple[int, float]]]:
+        """(window stats, EMA, profile) equivalents for one user (caller holds the lock)."""
+        state = self._live_state(user_id)
+        if state is None:
+            return (0, 0.0), None, None
+        return self._window(state, current_timestamp), state.avg_spend, state.profile()
+
+    def add_transaction(self, user_id: str, amount: float, timestamp: Optional[int] = None) -> None:
+        """
+        Record a new transaction and update features.
+
+        See RedisFeatureStore.add_transaction.
+
+        Args:
+            user_id: User identifier
+            amount: Transaction amount in USD
+            timestamp: Unix timestamp. If None, uses current time.
+        """
+        if timestamp is None:
+            timestamp = int(time.time())
+
+        with self._lock:
+            self._record(user_id, amount, timestamp)
+
+    def add_transactions(self, events: Sequence[Tuple[str, float, int]]) -> None:
+        """
+        Record many transactions, in order.
+
+        Args:
+            events: (user_id, amount, timestamp) tuples
+        """
+        with self._lock:
+            for user_id, amount, timestamp in events:
+                self._record(user_id, amount, timestamp)
+
+    def get_features_and_record(
+        self, user_id: str, amount: float, timestamp: Optional[int] = None
+    ) -> Dict[str, float]:
+        """
+        Return the user's features as of just before a transaction, then record it.
+
+        See RedisFeatureStore.get_features_and_record.
+
+        Args:
+            user_id: User identifier
+            amount: Transaction amount in USD
+            timestamp: Unix timestamp. If None, uses current time.
+
+        Returns:
+            Feature dictionary as returned by get_features (excluding this
+            transaction)
+        """
+        if timestamp is None:
+            timestamp = int(time.time())
+
+        with self._lock:
+            return self._decode_features(*self._record(user_id, amount, timestamp))
+
+    def get_features(
+        self, user_id: str, current_timestamp: Optional[int] = None
+    ) -> Dict[str, float]:
+        """
+        Retrieve real-time features for a user.
+
+        See RedisFeatureStore.get_features.
+
+        Args:
+            user_id: User identifier
+            current_timestamp: Current Unix timestamp. If None, uses system time.
+
+        Returns:
+            Dictionary with trans_count_24h, avg_spend_24h, avg_amt_24h,
+            trans_count_all_time and user_avg_amt_all_time
+        """
+        if current_timestamp is None:
+            current_timestamp = int(time.time())
+
+        with self._lock:
+            return self._decode_features(*self._read(user_id, current_timestamp))
+
+    def get_features_many(
+        self, user_ids: List[str], timestamps: Optional[List[int]] = None
+    ) -> List[Dict[str, float]]:
+        """
+        Retrieve real-time features for many users.
+
+        See RedisFeatureStore.get_features_many.
+        """
+        return self._decode_features_list(self._read_features(user_ids, timestamps))
+
+    def get_features_arrays(
+        self, user_ids: List[str], timestamps: Optional[List[int]] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Retrieve real-time features for many users as columns.
+
+        See RedisFeatureStore.get_features_arrays.
+        """
+        return self._decode_feature_arrays(self._read_features(user_ids, timestamps))
+
+    def _read_features(self, user_ids: List[str], timestamps: Optional[List[int]]) -> List[Any]:
+        """Interleaved (window, EMA, profile) values, the layout of the Redis pipeline replies."""
+        replies: List[Any] = []
+        with self._lock:
+            for chunk_users, chunk_timestamps in self._read_chunks(user_ids, timestamps):
+                for user_id, current_timestamp in zip(chunk_users, chunk_timestamps):
+                    replies.extend(self._read(user_id, current_timestamp))
+        return replies
+
+    def get_velocity(
+        self, user_id: str, current_timestamp: Optional[int] = None
+    ) -> Dict[str, float]:
+        """
+        Transaction count and amount sum over every velocity window.
+
+        See RedisFeatureStore.get_velocity.
+        """
+        if current_timestamp is None:
+            current_timestamp = int(time.time())
+
+        reply: List[Any] = []
+        with self._lock:
+            state = self._live_state(user_id)
+            for seconds in self.velocity_windows.values():
+                if state is None:
+                    reply += [0, 0.0]
+                    continue
+                lo, hi = state.bounds(current_timestamp - seconds, current_timestamp)
+                reply += [hi - lo, float(state.amounts[lo:hi].sum())]
+        return self._decode_velocity(reply)
+
+    def get_transaction_history(
+        self, user_id: str, lookback_hours: int = 24, current_timestamp: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Retrieve raw transaction history for a user, newest first.
+
+        See RedisFeatureStore.get_transaction_history.
+        """
+        if current_timestamp is None:
+            current_timestamp = int(time.time())
+
+        with self._lock:
+            state = self._live_state(user_id)
+            if state is None:
+                return []
+            lo, hi = state.bounds(current_timestamp - lookback_hours * 3600, current_timestamp)
+            window = list(zip(state.timestamps[lo:hi].tolist(), state.amounts[lo:hi].tolist()))
+
+        window.sort(reverse=True, key=lambda x: x[0])
+        return window
+
+    def delete_user_data(self, user_id: str) -> int:
+        """
+        Delete all feature data for a user (GDPR).
+
+        Returns:
+            Number of keys the Redis backend would have deleted (0 to 4)
+        """
+        with self._lock:
+            state = self._live_state(user_id)
+            self._users.pop(user_id, None)
+        if state is None:
+            return 0
+        return (3 if state.avg_spend is not None else 0) + (1 if state.profile_count else 0)
+
+    def delete_users_data(self, user_ids: Sequence[str]) -> List[int]:
+        """
+        Delete all feature data for many users.
+
+        Returns:
+            Keys the Redis backend would have deleted, per user
+        """
+        return [self.delete_user_data(user_id) for user_id in user_ids]
+
+    def health_check(self) -> Dict[str, Any]:
+        """
+        Report store health.
+
+        Returns:
+            Dictionary with status, ping (always 0: no network), backend
+            name and number of users held
+        """
+        with self._lock:
+            users = len(self._users)
+        return {"status": "healthy", "ping_ms": 0.0, "backend": "memory", "users": users}
+
+    def close(self) -> None:
+        """Nothing to release (kept for interface compatibility)."""
+
+
+__all__ = ["InMemoryFeatureStore"]
@@ -0,0 +1,359 @@
+"""
+Near Cache for Hot-User Features.
+
+In-process LRU cache placed in front of the feature store's get_features.
+A handful of power users and merchants get most of the reads; serving them
+from local memory saves a Redis round trip per request.
+
+Entries hold a user's aggregated state as read by get_features (24h window
+count and amount sum, raw EMA and all-time profile), so their size does not
+grow with the window. Each entry also holds the range of request
+timestamps over which the window keeps the same transactions (bounded by
+the newest one in it, the latest one before it + 24h, the oldest one in it
++ 24h and the first one after it); a request outside that range is a miss
+and re-reads the user.
+
+Only get_features reads through the cache: the API's lookups in shadow
+mode, with overrides, or with hydrate_and_record off. A lookup that also
+records the transaction (get_features_and_record) must reach Redis anyway,
+and batch reads (get_features_many) go to Redis or its replicas directly.
+
+Freshness:
+- Writes made through the owning store invalidate the user's entry
+- With Redis client-side caching (CLIENT TRACKING in BCAST mode, redirected
+  to a listener connection), writes by any other worker invalidate it too
+- Every entry also expires after `ttl_seconds`: the staleness bound when
+  tracking is unavailable (older servers, managed Redis, fakeredis) or
+  while its connection is being re-established
+
+Author: PayShield-ML Team
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis
+
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "__redis__:invalidate"
+
+
+class CachedUserState:
+    """A user's cached 24h window aggregate, raw EMA and profile, and the timestamps it holds for."""
+
+    __slots__ = ("window", "avg_spend", "profile", "valid_from", "valid_until", "expires_at")
+
+    def __init__(
+        self,
+        window: Tuple[int, float],
+        avg_spend: Optional[str],
+        expires_at: float,
+        profile: Optional[List[Any]] = None,
+        valid_from: float = float("-inf"),
+        valid_until: float = float("inf"),
+    ) -> None:
+        self.window: Tuple[int, float] = window  # (transactions, amount sum)
+        self.avg_spend: Optional[str] = avg_spend
+        self.profile: Optional[List[Any]] = profile  # Raw [count, sum]
+        self.valid_from: float = valid_from
+        self.valid_until: float = valid_until
+        self.expires_at: float = expires_at
+
+    def covers(self, timestamp: int) -> bool:
+        """Whether the window at timestamp is the cached one (same transactions)."""
+        return self.valid_from <= timestamp <= self.valid_until
+
+
+class NearCache:
+    """
+    Bounded, thread-safe LRU cache of per-user feature state.
+
+    Example:
+        >>> cache = NearCache(max_entries=10000, ttl_seconds=1.0)
+        >>> cache.start_tracking(host="localhost", port=6379)
+        >>> store = RedisFeatureStore(near_cache=cache)
+        >>> store.get_features("u12345", 1700000000)  # Redis, then cached
+        >>> store.get_features("u12345", 1700000060)  # Served locally
+        >>> cache.stats()["hit_rate"]
+        0.5
+    """
+
+    def __init__(
+        self, max_entries: int = 10000, ttl_seconds: float = 1.0, key_prefix: str = "user:"
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum cached users; the least recently used is evicted
+            ttl_seconds: Maximum age of an entry (staleness bound)
+            key_prefix: Prefix of the feature-store keys (tracked for invalidation)
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+
+        self.max_entries: int = max_entries
+        self.ttl_seconds: float = ttl_seconds
+        self.key_prefix: str = key_prefix
+
+        self._entries: "OrderedDict[str, CachedUserState]" = OrderedDict()
+        # Outstanding fetches: user_id -> ticket. Invalidation drops the ticket,
+        # so a fetch that raced with a write is not cached.
+        self._pending: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+        # Client-side caching listener
+        self._tracking_thread: Optional[threading.Thread] = None
+        self._tracking_stop = threading.Event()
+        self._tracking_ready = threading.Event()
+        self.tracking: bool = False
+
+        # Counters
+        self._hits = 0
+        self._misses = 0
+        self._out_of_window = 0
+        self._expirations = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get(self, user_id: str, timestamp: Optional[int] = None) -> Optional[CachedUserState]:
+        """
+        Return the user's fresh entry (marking it recently used), or None.
+
+        With a timestamp, an entry whose window differs at that timestamp
+        (see CachedUserState.covers) is a miss too; the next put replaces it.
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                del self._entries[user_id]
+                self._expirations += 1
+                entry = None
+            elif entry is not None and timestamp is not None and not entry.covers(timestamp):
+                self._out_of_window += 1
+                entry = None
+
+            if entry is None:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(user_id)
+            self._hits += 1
+            return entry
+
+    def reserve(self, user_id: str) -> object:
+        """Register a fetch about to be made; pass the ticket to put()."""
+        ticket = object()
+        with self._lock:
+            self._pending[user_id] = ticket
+        return ticket
+
+    def put(
+        self,
+        user_id: str,
+        window: Tuple[int, float],
+        avg_spend: Optional[str],
+        ticket: object,
+        profile: Optional[List[Any]] = None,
+        valid_from: float = float("-inf"),
+        valid_until: float = float("inf"),
+    ) -> CachedUserState:
+        """
+        Cache the state fetched for a user.
+
+        The entry is only stored if the user was not invalidated since
+        reserve(); it is returned either way, for the caller to use.
+        valid_from and valid_until bound the request timestamps it is
+        served for (inclusive).
+        """
+        entry = CachedUserState(
+            window,
+            avg_spend,
+            time.monotonic() + self.ttl_seconds,
+            profile,
+            valid_from=valid_from,
+            valid_until=valid_until,
+        )
+        with self._lock:
+            if self._pending.get(user_id) is not ticket:
+                return entry
+            del self._pending[user_id]
+
+            self._entries[user_id] = entry
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return entry
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop a user's entry and any fetch in flight for it."""
+        with self._lock:
+            self._pending.pop(user_id, None)
+            if self._entries.pop(user_id, None) is not None:
+                self._invalidations += 1
+
+    def clear(self) -> None:
+        """Drop every entry (e.g. after missing invalidation messages)."""
+        with self._lock:
+            self._invalidations += len(self._entries)
+            self._entries.clear()
+            self._pending.clear()
+
+    def invalidate_keys(self, keys: Optional[List[Any]]) -> None:
+        """
+        Apply a Redis invalidation message.
+
+        Args:
+            keys: Invalidated keys ("user:{id}:tx_history", ...); None means
+                  the whole keyspace was flushed
+        """
+        if keys is None:
+            self.clear()
+            return
+
+        for key in keys:
+            if isinstance(key, bytes):
+                key = key.decode()
+            if key.startswith(self.key_prefix):
+                # user:{user_id}:{suffix} (user ids may themselves contain ':'),
+                # hash-tagged in the "hash" key layout (see store.key_user_id)
+                user_id = key[len(self.key_prefix) :].rsplit(":", 1)[0]
+                if user_id.startswith("{") and user_id.endswith("}"):
+                    user_id = user_id[1:-1]
+                self.invalidate(user_id)
+
+    def start_tracking(
+        self,
+        host: str = "localhost",
+        port: int = 6379,
+        db: int = 0,
+        password: Optional[str] = None,
+        timeout: float = 2.0,
+    ) -> bool:
+        """
+        Subscribe to Redis invalidation messages for the feature keys.
+
+        Opens a dedicated connection that enables broadcast tracking of
+        `key_prefix` keys with itself as the redirect target, then listens
+        on __redis__:invalidate in a daemon thread. If the connection drops,
+        the cache is cleared and tracking is re-established.
+
+        Args:
+            host: Redis server hostname
+            port: Redis server port
+            db: Redis database number
+            password: Redis password
+            timeout: Seconds to wait for the initial handshake
+
+        Returns:
+            True if the server accepted tracking; False if unsupported, in
+            which case entries are only bounded by ttl_seconds
+        """
+        connection_kwargs = {
+            "host": host,
+            "port": port,
+            "db": db,
+            "password": password,
+            "decode_responses": True,
+            "socket_connect_timeout": 2,
+        }
+        self._tracking_stop.clear()
+        self._tracking_ready.clear()
+        self._tracking_thread = threading.Thread(
+            target=self._tracking_loop,
+            args=(connection_kwargs,),
+            name="near-cache-invalidation",
+            daemon=True,
+        )
+        self._tracking_thread.start()
+        self._tracking_ready.wait(timeout)
+
+        if not self.tracking:
+            logger.warning(
+                "Redis client-side tracking unavailable; near cache entries are "
+                f"bounded by their {self.ttl_seconds}s TTL only"
+            )
+        return self.tracking
+
+    def _enable_tracking(self, connection: redis.Connection) -> None:
+        """Handshake on a fresh connection: BCAST tracking redirected to itself."""
+        connection.send_command("CLIENT", "ID")
+        client_id = connection.read_response()
+        connection.send_command(
+            "CLIENT", "TRACKING", "ON", "REDIRECT", client_id, "BCAST", "PREFIX", self.key_prefix
+        )
+        connection.read_response()
+        connection.send_command("SUBSCRIBE", INVALIDATION_CHANNEL)
+        connection.read_response()
+
+    def _tracking_loop(self, connection_kwargs: Dict[str, Any]) -> None:
+        """Listener thread: apply invalidations, reconnect on failure."""
+        while not self._tracking_stop.is_set():
+            connection = redis.Connection(**connection_kwargs)
+            try:
+                connection.connect()
+                self._enable_tracking(connection)
+            except redis.exceptions.ResponseError as e:
+                logger.info(f"CLIENT TRACKING not supported: {e}")
+                connection.disconnect()
+                self._tracking_ready.set()
+                return
+            except (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError, OSError):
+                connection.disconnect()
+                self._tracking_ready.set()
+                self._tracking_stop.wait(1.0)
+                continue
+
+            # Anything cached before tracking started may already be stale
+            self.clear()
+            self.tracking = True
+            self._tracking_ready.set()
+
+            try:
+                while not self._tracking_stop.is_set():
+                    if not connection.can_read(timeout=0.5):
+                        continue
+                    message = connection.read_response()
+                    if message and message[0] == "message" and message[1] == INVALIDATION_CHANNEL:
+                        self.invalidate_keys(message[2])
+            except (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError, OSError):
+                logger.warning("Near cache invalidation connection lost; reconnecting")
+            finally:
+                self.tracking = False
+                connection.disconnect()
+                # Invalidations may have been missed while disconnected
+                self.clear()
+
+    def stop(self) -> None:
+        """Stop listening for invalidations."""
+        self._tracking_stop.set()
+        if self._tracking_thread is not None:
+            self._tracking_thread.join(timeout=2.0)
+            self._tracking_thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for sizing the cache."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "tracking": self.tracking,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "out_of_window": self._out_of_window,
+                "expirations": self._expirations,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
+
+
+__all__ = ["CachedUserState", "NearCache"]
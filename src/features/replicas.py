@@ -0,0 +1,185 @@
+"""
+Read Replica Routing
+
+Sends feature reads to Redis replicas while every write stays on the
+primary, so read traffic (batch scoring, read-only /v1/predict calls)
+scales with the number of replicas instead of queueing behind writes.
+
+- Staleness: the store writes a heartbeat (a sequence number under a key
+  private to the store) to the primary every heartbeat_interval_ms and
+  reads it back from each replica. A replica holding heartbeat n has every
+  write made before n was sent, so its staleness is bounded by the time
+  since n was sent (replication lag plus up to two heartbeat intervals).
+  Times come from this process's monotonic clock, so clock skew between
+  hosts does not matter.
+- Routing: reads go round-robin to the replicas within max_staleness_ms;
+  when none is (lag, broken link, heartbeat not replicated yet) they go to
+  the primary
+- Hedging: with hedge_after_ms, a read the first replica has not answered
+  within the budget is also sent to a second one, and the first reply wins
+  (tail latency for at most one extra read)
+
+Reads that must see the caller's own latest write (hydrate-and-record, the
+near cache) always use the primary.
+
+Author: PayShield-ML Team
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+
+class ReplicaRouter:
+    """
+    Replica selection by measured staleness (no I/O; the stores send the
+    heartbeats and report what the replicas hold).
+
+    Example:
+        >>> router = ReplicaRouter(["replica-a:6379/0", "replica-b:6379/0"])
+        >>> seq = router.next_heartbeat()  # SET router.heartbeat_key seq on the primary
+        >>> router.observe(0, seq)  # GET router.heartbeat_key on replica 0
+        >>> router.choose()
+        [0]
+    """
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        max_staleness_ms: float = 1000.0,
+        heartbeat_interval_ms: Optional[float] = None,
+        hedge_after_ms: Optional[float] = None,
+    ) -> None:
+        """
+        Initialize the router.
+
+        Args:
+            names: Replica names (for stats), in the order replicas are observed
+            max_staleness_ms: Replicas whose staleness bound exceeds this are
+                              skipped (reads fall back to the primary)
+            heartbeat_interval_ms: Heartbeat period (default: a quarter of
+                                   max_staleness_ms; must be smaller)
+            hedge_after_ms: Send a read to a second replica if the first has
+                            not answered after this long (None: no hedging)
+        """
+        if not names:
+            raise ValueError("at least one replica is required")
+        if max_staleness_ms <= 0:
+            raise ValueError("max_staleness_ms must be > 0")
+        if heartbeat_interval_ms is None:
+            heartbeat_interval_ms = max_staleness_ms / 4
+        if not 0 < heartbeat_interval_ms < max_staleness_ms:
+            raise ValueError("heartbeat_interval_ms must be > 0 and < max_staleness_ms")
+        if hedge_after_ms is not None and hedge_after_ms <= 0:
+            raise ValueError("hedge_after_ms must be > 0")
+
+        self.names: List[str] = list(names)
+        self.max_staleness_ms: float = max_staleness_ms
+        self.heartbeat_interval_ms: float = heartbeat_interval_ms
+        self.hedge_after_ms: Optional[float] = hedge_after_ms
+
+        # Private to this store, so other processes' heartbeats don't count
+        self.heartbeat_key: str = f"feature_store:heartbeat:{uuid.uuid4().hex}"
+        # Expires if the store stops (a few missed intervals)
+        self.heartbeat_ttl_ms: int = int(max(10 * heartbeat_interval_ms, 10000))
+
+        self._lock = threading.Lock()
+        self._seq = 0
+        # seq -> monotonic send time, for the heartbeats a replica may still hold
+        self._sent: "OrderedDict[int, float]" = OrderedDict()
+        self._seen: List[int] = [0] * len(self.names)
+        self._next = 0
+
+        # Metrics
+        self._replica_reads: List[int] = [0] * len(self.names)
+        self._primary_reads = 0
+        self._hedged = 0
+        self._hedge_wins = 0
+        self._errors = 0
+
+    def next_heartbeat(self) -> int:
+        """Sequence number of a heartbeat about to be written to the primary."""
+        with self._lock:
+            self._seq += 1
+            self._sent[self._seq] = time.monotonic()
+            # Heartbeats older than the staleness limit can't make a replica usable
+            horizon = time.monotonic() - 2 * self.max_staleness_ms / 1000
+            while len(self._sent) > 1 and next(iter(self._sent.values())) < horizon:
+                self._sent.popitem(last=False)
+            return self._seq
+
+    def observe(self, replica: int, value: Any) -> None:
+        """Record the heartbeat a replica returned (None if it has none yet)."""
+        if value is None:
+            return
+        with self._lock:
+            self._seen[replica] = max(self._seen[replica], int(value))
+
+    def staleness_ms(self, replica: int) -> float:
+        """Upper bound of the replica's staleness now (inf if unknown)."""
+        with self._lock:
+            sent = self._sent.get(self._seen[replica])
+        if sent is None:
+            return float("inf")
+        return (time.monotonic() - sent) * 1000
+
+    def choose(self) -> List[int]:
+        """
+        Fresh replicas to read from, in round-robin order (empty: use the
+        primary). The first is the target; the second, if any, the hedge.
+        """
+        limit = self.max_staleness_ms
+        fresh = [i for i in range(len(self.names)) if self.staleness_ms(i) <= limit]
+        if not fresh:
+            with self._lock:
+                self._primary_reads += 1
+            return []
+
+        with self._lock:
+            start = self._next % len(fresh)
+            self._next += 1
+        return fresh[start:] + fresh[:start]
+
+    def record_read(
+        self, replica: Optional[int], hedged: bool = False, hedge_won: bool = False
+    ) -> None:
+        """
+        Count a completed read.
+
+        Args:
+            replica: Replica that answered (None: replicas failed, the
+                     primary answered)
+            hedged: A second replica was asked
+            hedge_won: The second replica answered first
+        """
+        with self._lock:
+            if replica is None:
+                self._primary_reads += 1
+                self._errors += 1
+            else:
+                self._replica_reads[replica] += 1
+            self._hedged += int(hedged)
+            self._hedge_wins += int(hedge_won)
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-replica staleness and read counts, primary fallbacks and hedging."""
+        return {
+            "replicas": {
+                name: {
+                    "staleness_ms": round(self.staleness_ms(i), 2),
+                    "fresh": self.staleness_ms(i) <= self.max_staleness_ms,
+                    "reads": self._replica_reads[i],
+                }
+                for i, name in enumerate(self.names)
+            },
+            "primary_reads": self._primary_reads,
+            "replica_errors": self._errors,
+            "hedged_reads": self._hedged,
+            "hedge_wins": self._hedge_wins,
+            "max_staleness_ms": self.max_staleness_ms,
+        }
+
+
+__all__ = ["ReplicaRouter"]
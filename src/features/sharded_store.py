@@ -0,0 +1,490 @@
+"""
+Sharded Feature Store
+
+Spreads users across several Redis nodes, each holding the full key layout
+of RedisFeatureStore for its users. A user is routed by consistent hashing
+of the user ID (HashRing), so all of a user's keys live on one node and the
+Lua scripts stay single-node. Adding a node moves only the users the new
+node takes over (about 1/N of them); rebalance() moves their keys.
+
+Single-user calls go to the user's shard. Batch calls (add_transactions,
+get_features_many, get_features_arrays) are split by shard and the
+per-shard batches run in parallel, one pipeline each.
+
+Example:
+    >>> store = ShardedFeatureStore.from_urls(
+    ...     ["redis://redis-a:6379/0", "redis://redis-b:6379/0"]
+    ... )
+    >>> store.add_transaction("u12345", 150.00, timestamp=1234567890)
+    >>> store.shard_for("u12345")
+    'redis-b:6379/0'
+
+Author: PayShield-ML Team
+"""
+
+import bisect
+import hashlib
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from src.features.store import RedisFeatureStore, key_user_id
+
+
+def _ring_hash(key: str) -> int:
+    """Stable 64-bit position on the ring (same in every process)."""
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """
+    Consistent hash ring of named nodes.
+
+    Each node owns `vnodes` points on the ring; a key belongs to the node of
+    the first point at or after the key's hash. Adding a node only takes
+    keys from existing nodes (never moves keys between them).
+
+    Example:
+        >>> ring = HashRing(["a", "b", "c"])
+        >>> ring.node_for("u12345")
+        'c'
+    """
+
+    def __init__(self, nodes: Sequence[str], vnodes: int = 160) -> None:
+        """
+        Build the ring.
+
+        Args:
+            nodes: Node names (order does not matter)
+            vnodes: Points per node; more points balance keys more evenly
+
+        Raises:
+            ValueError: If there are no nodes or a name is repeated
+        """
+        if not nodes:
+            raise ValueError("at least one node is required")
+        if len(set(nodes)) != len(nodes):
+            raise ValueError("node names must be unique")
+
+        points = sorted((_ring_hash(f"{node}#{i}"), node) for node in nodes for i in range(vnodes))
+        self.nodes: List[str] = list(nodes)
+        self._hashes: List[int] = [h for h, _ in points]
+        self._owners: List[str] = [node for _, node in points]
+
+    def node_for(self, key: str) -> str:
+        """Name of the node owning key."""
+        i = bisect.bisect_left(self._hashes, _ring_hash(key))
+        return self._owners[i % len(self._owners)]
+
+
+def parse_redis_url(url: str) -> Dict[str, Any]:
+    """
+    Connection settings from a redis:// URL.
+
+    Args:
+        url: redis://[:password@]host[:port][/db]
+
+    Returns:
+        host, port, db and password keyword arguments for RedisFeatureStore
+
+    Example:
+        >>> parse_redis_url("redis://:secret@redis-a:6380/2")
+        {'host': 'redis-a', 'port': 6380, 'db': 2, 'password': 'secret'}
+    """
+    parts = urlsplit(url)
+    if parts.scheme != "redis":
+        raise ValueError(f"expected a redis:// URL, got {url!r}")
+    return {
+        "host": parts.hostname or "localhost",
+        "port": parts.port or 6379,
+        "db": int(parts.path.lstrip("/") or 0),
+        "password": parts.password,
+    }
+
+
+class _SharedSetting:
+    """Store setting read from the first shard and assigned to every shard."""
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, obj: Optional["ShardedFeatureStore"], objtype: type = None) -> Any:
+        if obj is None:
+            return self
+        return getattr(next(iter(obj.shards.values())), self.name)
+
+    def __set__(self, obj: "ShardedFeatureStore", value: Any) -> None:
+        for store in obj.shards.values():
+            setattr(store, self.name, value)
+
+
+class ShardedFeatureStore:
+    """
+    RedisFeatureStore API over several Redis nodes.
+
+    Shards are named (host:port/db for from_urls); the names place the
+    nodes on the ring, so the user -> shard mapping only depends on the
+    set of shards, not on their order.
+
+    Configuration attributes (ema_alpha, velocity_windows, ...) are shared:
+    reading one returns the first shard's value, assigning one applies it
+    to every shard.
+    """
+
+    blocking_io = True
+
+    # RedisFeatureStore settings mirrored on every shard
+    ema_alpha = _SharedSetting()
+    key_ttl = _SharedSetting()
+    profile_ttl = _SharedSetting()
+    read_chunk_size = _SharedSetting()
+    velocity_windows = _SharedSetting()
+    window_retention = _SharedSetting()
+
+    def __init__(self, shards: Mapping[str, RedisFeatureStore], vnodes: int = 160) -> None:
+        """
+        Initialize over connected per-node stores.
+
+        Args:
+            shards: Shard name -> store for that node
+            vnodes: Ring points per shard (see HashRing)
+        """
+        self.shards: Dict[str, RedisFeatureStore] = dict(shards)
+        self.ring: HashRing = HashRing(list(self.shards), vnodes=vnodes)
+
+        # One worker per shard: per-shard batches run concurrently
+        self._pool = ThreadPoolExecutor(
+            max_workers=len(self.shards), thread_name_prefix="feature-shard"
+        )
+
+    @classmethod
+    def from_urls(
+        cls, urls: Sequence[str], vnodes: int = 160, **store_kwargs: Any
+    ) -> "ShardedFeatureStore":
+        """
+        Connect one RedisFeatureStore per redis:// URL.
+
+        Args:
+            urls: One URL per node (see parse_redis_url)
+            vnodes: Ring points per shard
+            **store_kwargs: Passed to every RedisFeatureStore (window_mode,
+                            velocity_windows, max_connections, ...); a password
+                            in the URL takes precedence
+
+        Returns:
+            Sharded store with shards named host:port/db
+        """
+        shards = {}
+        for url in urls:
+            connection = parse_redis_url(url)
+            kwargs = dict(store_kwargs, **{k: v for k, v in connection.items() if v is not None})
+            name = f"{connection['host']}:{connection['port']}/{connection['db']}"
+            shards[name] = RedisFeatureStore(**kwargs)
+        return cls(shards, vnodes=vnodes)
+
+    def shard_for(self, user_id: str) -> str:
+        """Name of the shard holding a user's keys."""
+        return self.ring.node_for(user_id)
+
+    def _store_for(self, user_id: str) -> RedisFeatureStore:
+        """The store of a user's shard."""
+        return self.shards[self.ring.node_for(user_id)]
+
+    def _group(self, user_ids: Sequence[str]) -> Dict[str, List[int]]:
+        """Indices of user_ids per shard name, in input order."""
+        groups: Dict[str, List[int]] = defaultdict(list)
+        for i, user_id in enumerate(user_ids):
+            groups[self.ring.node_for(user_id)].append(i)
+        return groups
+
+    def _run_per_shard(
+        self, groups: Dict[str, List[int]], call: Callable[[RedisFeatureStore, List[int]], Any]
+    ) -> List[Tuple[List[int], Any]]:
+        """Run call(store, indices) for every shard group, in parallel; (indices, result) pairs."""
+        if len(groups) == 1:
+            ((name, indices),) = groups.items()
+            return [(indices, call(self.shards[name], indices))]
+
+        futures = [
+            (indices, self._pool.submit(call, self.shards[name], indices))
+            for name, indices in groups.items()
+        ]
+        return [(indices, future.result()) for indices, future in futures]
+
+    def add_transaction(self, user_id: str, amount: float, timestamp: Optional[int] = None) -> None:
+        """
+        Record a new transaction on the user's shard.
+
+        See RedisFeatureStore.add_transaction.
+        """
+        self._store_for(user_id).add_transaction(user_id, amount, timestamp)
+
+    def add_transactions(self, events: Sequence[Tuple[str, float, int]]) -> None:
+        """
+        Record many transactions: one pipeline per shard, shards in parallel.
+
+        Each user's events keep their order (a user lives on one shard).
+
+        Args:
+            events: (user_id, amount, timestamp) tuples
+        """
+        if not events:
+            return
+
+        groups = self._group([user_id for user_id, _, _ in events])
+        self._run_per_shard(
+            groups, lambda store, indices: store.add_transactions([events[i] for i in indices])
+        )
+
+    def get_features_and_record(
+        self, user_id: str, amount: float, timestamp: Optional[int] = None
+    ) -> Dict[str, float]:
+        """
+        Return the user's features as of just before a transaction, then record it.
+
+        See RedisFeatureStore.get_features_and_record.
+        """
+        return self._store_for(user_id).get_features_and_record(user_id, amount, timestamp)
+
+    def get_features(
+        self, user_id: str, current_timestamp: Optional[int] = None
+    ) -> Dict[str, float]:
+        """
+        Retrieve real-time features for a user from their shard.
+
+        See RedisFeatureStore.get_features.
+        """
+        return self._store_for(user_id).get_features(user_id, current_timestamp)
+
+    def _split_reads(
+        self, user_ids: List[str], timestamps: Optional[List[int]]
+    ) -> Tuple[Dict[str, List[int]], List[int]]:
+        """Shard groups and per-user timestamps of a multi-user read."""
+        if timestamps is None:
+            timestamps = [int(time.time())] * len(user_ids)
+        if len(timestamps) != len(user_ids):
+            raise ValueError("user_ids and timestamps must have the same length")
+        return self._group(user_ids), timestamps
+
+    def get_features_many(
+        self, user_ids: List[str], timestamps: Optional[List[int]] = None
+    ) -> List[Dict[str, float]]:
+        """
+        Retrieve features for many users: one read per shard, shards in parallel.
+
+        See RedisFeatureStore.get_features_many.
+        """
+        groups, timestamps = self._split_reads(user_ids, timestamps)
+        features: List[Dict[str, float]] = [{} for _ in user_ids]
+        for indices, shard_features in self._run_per_shard(
+            groups,
+            lambda store, indices: store.get_features_many(
+                [user_ids[i] for i in indices], [timestamps[i] for i in indices]
+            ),
+        ):
+            for i, user_features in zip(indices, shard_features):
+                features[i] = user_features
+        return features
+
+    def get_features_arrays(
+        self, user_ids: List[str], timestamps: Optional[List[int]] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Retrieve features for many users as columns, shards in parallel.
+
+        See RedisFeatureStore.get_features_arrays.
+        """
+        groups, timestamps = self._split_reads(user_ids, timestamps)
+        if not groups:
+            return next(iter(self.shards.values())).get_features_arrays([], [])
+
+        columns: Dict[str, np.ndarray] = {}
+        for indices, shard_columns in self._run_per_shard(
+            groups,
+            lambda store, indices: store.get_features_arrays(
+                [user_ids[i] for i in indices], [timestamps[i] for i in indices]
+            ),
+        ):
+            for name, values in shard_columns.items():
+                if name not in columns:
+                    columns[name] = np.zeros(len(user_ids), dtype=np.float64)
+                columns[name][indices] = values
+        return columns
+
+    def get_velocity(
+        self, user_id: str, current_timestamp: Optional[int] = None
+    ) -> Dict[str, float]:
+        """
+        Transaction count and amount sum over every velocity window.
+
+        See RedisFeatureStore.get_velocity.
+        """
+        return self._store_for(user_id).get_velocity(user_id, current_timestamp)
+
+    def get_transaction_history(
+        self, user_id: str, lookback_hours: int = 24, current_timestamp: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Retrieve raw transaction history for a user, newest first.
+
+        See RedisFeatureStore.get_transaction_history.
+        """
+        return self._store_for(user_id).get_transaction_history(
+            user_id, lookback_hours, current_timestamp
+        )
+
+    def delete_user_data(self, user_id: str) -> int:
+        """
+        Delete all feature data for a user (GDPR) on their shard.
+
+        See RedisFeatureStore.delete_user_data.
+        """
+        return self._store_for(user_id).delete_user_data(user_id)
+
+    def delete_users_data(self, user_ids: Sequence[str]) -> List[int]:
+        """
+        Delete many users' data: one pipeline per shard, shards in parallel.
+
+        Returns:
+            Keys deleted per user, aligned with user_ids
+        """
+        deleted = [0] * len(user_ids)
+        for indices, counts in self._run_per_shard(
+            self._group(user_ids),
+            lambda store, indices: store.delete_users_data([user_ids[i] for i in indices]),
+        ):
+            for i, count in zip(indices, counts):
+                deleted[i] = count
+        return deleted
+
+    def rebalance(self, scan_count: int = 1000, dry_run: bool = False) -> Dict[str, int]:
+        """
+        Move users' keys to the shard the ring assigns them.
+
+        Run after adding a shard: with consistent hashing only the users the
+        new shard takes over are moved. Each shard's user keys are walked
+        with SCAN (no KEYS, no blocking) and moved with DUMP / RESTORE
+        (keeping the remaining TTL), then deleted from the old shard.
+
+        A key that already exists on its new shard (the user transacted
+        there since the shard list changed) is kept as is and the old copy
+        dropped, so run this right after switching writers to the new shard
+        list to keep that window short.
+
+        Args:
+            scan_count: SCAN COUNT hint, also the number of keys moved per
+                        pipeline
+            dry_run: Only count the keys that would move
+
+        Returns:
+            scanned_keys, moved_keys and conflicts (keys kept on their new
+            shard)
+
+        Example:
+            >>> store = ShardedFeatureStore.from_urls([url_a, url_b, url_c])  # c is new
+            >>> store.rebalance()
+            {'scanned_keys': 30000, 'moved_keys': 9950, 'conflicts': 0}
+        """
+        stats = {"scanned_keys": 0, "moved_keys": 0, "conflicts": 0}
+        for name, store in self.shards.items():
+            batch: List[Tuple[str, str]] = []
+            for key in store.client.scan_iter(match="user:*", count=scan_count):
+                stats["scanned_keys"] += 1
+                owner = self.ring.node_for(key_user_id(key))
+                if owner == name:
+                    continue
+                batch.append((key, owner))
+                if len(batch) >= scan_count:
+                    self._move_keys(store, batch, stats, dry_run)
+                    batch = []
+            if batch:
+                self._move_keys(store, batch, stats, dry_run)
+        return stats
+
+    def _move_keys(
+        self,
+        source: RedisFeatureStore,
+        keys: List[Tuple[str, str]],
+        stats: Dict[str, int],
+        dry_run: bool,
+    ) -> None:
+        """Copy (key, target shard) pairs from source to their shards, then delete them."""
+        if dry_run:
+            stats["moved_keys"] += len(keys)
+            return
+
+        pipe = source.client.pipeline(transaction=False)
+        for key, _ in keys:
+            pipe.dump(key)
+            pipe.pttl(key)
+        replies = pipe.execute()
+
+        # Per target shard: (key, payload, ttl) to restore unless the key exists there
+        moves: Dict[str, List[Tuple[str, bytes, int]]] = defaultdict(list)
+        for (key, owner), payload, ttl in zip(keys, replies[0::2], replies[1::2]):
+            if payload is not None:  # Else expired or deleted since SCAN
+                moves[owner].append((key, payload, ttl))
+
+        restored: List[str] = []
+        for owner, entries in moves.items():
+            client = self.shards[owner].client
+            pipe = client.pipeline(transaction=False)
+            for key, _, _ in entries:
+                pipe.exists(key)
+            present = pipe.execute()
+
+            pipe = client.pipeline(transaction=False)
+            for (key, payload, ttl), exists in zip(entries, present):
+                if exists:
+                    stats["conflicts"] += 1
+                else:
+                    # PTTL -1: no expiry (RESTORE ttl 0)
+                    pipe.restore(key, max(ttl, 0), payload)
+            for (key, _, _), reply in zip(
+                [entry for entry, exists in zip(entries, present) if not exists],
+                pipe.execute(raise_on_error=False),
+            ):
+                if isinstance(reply, Exception):
+                    # BUSYKEY: written on the new shard between EXISTS and RESTORE
+                    if "BUSYKEY" not in str(reply):
+                        raise reply
+                    stats["conflicts"] += 1
+                else:
+                    stats["moved_keys"] += 1
+            restored.extend(key for key, _, _ in entries)
+
+        if restored:
+            source.client.delete(*restored)
+
+    def health_check(self) -> Dict[str, Any]:
+        """
+        Report the health of every shard.
+
+        Returns:
+            status ("healthy" only if every shard is), the slowest shard's
+            ping, connection-pool usage summed over shards, backend name and
+            each shard's health_check
+        """
+        shards = {name: store.health_check() for name, store in self.shards.items()}
+        healthy = all(health["status"] == "healthy" for health in shards.values())
+        return {
+            "status": "healthy" if healthy else "unhealthy",
+            "ping_ms": max(health.get("ping_ms", 0.0) for health in shards.values()),
+            "pool_in_use": sum(health["pool_in_use"] for health in shards.values()),
+            "pool_max": sum(health["pool_max"] for health in shards.values()),
+            "backend": "sharded",
+            "shards": shards,
+        }
+
+    def close(self) -> None:
+        """Close every shard's connection pool and the batch worker threads."""
+        for store in self.shards.values():
+            store.close()
+        self._pool.shutdown(wait=False)
+
+
+__all__ = ["HashRing", "ShardedFeatureStore", "parse_redis_url"]
@@ -4,25 +4,905 @@ Redis Feature Store
 Real-time feature storage and computation for fraud detection.
 Implements stateful features that require historical context:
 - Sliding window transaction counts (O(log N))
+- Exact rolling 24h amount sum, maintained on insert and expiry (O(log N))
 - Exponential moving averages for spending (O(1))
+- All-time spending profile: running count and sum (O(1))
 
 Architecture:
-- Uses Redis Sorted Sets (ZSET) for time-based sliding windows
+- Uses Redis Sorted Sets (ZSET) for time-based sliding windows, or a Hash
+  of fixed time buckets (window_mode="buckets") to bound memory per user
 - Uses Redis Strings for EMA computation with atomic operations
+- key_layout="hash": all of a user's scalars in one hash-tagged state hash
+  next to the window (half the keys; see KEY_LAYOUTS)
 - Connection pooling for low-latency concurrent requests
+- Optional read replicas: reads routed by measured staleness, writes on
+  the primary (see replicas.py)
 
 Author: PayShield-ML Team
 """
 
+import hashlib
+import threading
 import time
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
 
+import numpy as np
 import redis
 from redis.client import Pipeline
 from redis.connection import ConnectionPool
+from redis.exceptions import NoScriptError
+
+from src.features.near_cache import CachedUserState, NearCache
+from src.features.replicas import ReplicaRouter
+from src.features.windows import DEFAULT_VELOCITY_WINDOWS, validate_velocity_windows
+
+
+# Server-side transaction recording: window insert + trim, EMA
+# read-modify-write, all-time profile and TTL refresh run atomically in one
+# round trip.
+# KEYS: window (tx_history ZSET or tx_buckets hash), avg_spend, profile,
+#       rolling_sum (key_layout="hash": window, then the state hash three times)
+# ARGV: timestamp, member, amount, ema_alpha, key_ttl, bucket_seconds, buckets,
+#       profile_ttl, window_retention
+#
+# Every script starts with the accessors of its key layout (ema_get / ema_set,
+# rolling_get / rolling_set), so the window and profile code is shared.
+
+# key_layout="keys": EMA in a string key, rolling sum in its own hash, both
+# expiring with the window (key_ttl)
+_KEYS_LAYOUT_LUA = """
+local function ema_get()
+    return redis.call('GET', KEYS[2])
+end
+local function ema_set(ema)
+    redis.call('SET', KEYS[2], ema, 'EX', ARGV[5])
+end
+local function rolling_get()
+    return redis.call('HMGET', KEYS[4], 'sum', 'cursor')
+end
+local function rolling_set(rolling_sum, cursor)
+    redis.call('HSET', KEYS[4], 'sum', rolling_sum, 'cursor', cursor)
+    redis.call('EXPIRE', KEYS[4], ARGV[5])
+end
+"""
+
+# key_layout="hash": EMA and rolling sum are fields of the state hash (which
+# lives for profile_ttl). They only count while the window key exists, so
+# they still lapse after key_ttl without a transaction, as in the keys layout.
+_HASH_LAYOUT_LUA = """
+local window_live = redis.call('EXISTS', KEYS[1]) == 1
+local function ema_get()
+    if window_live then
+        return redis.call('HGET', KEYS[2], 'ema')
+    end
+    return false
+end
+local function ema_set(ema)
+    redis.call('HSET', KEYS[2], 'ema', ema)
+end
+local function rolling_get()
+    if window_live then
+        return redis.call('HMGET', KEYS[4], 'rsum', 'rcur')
+    end
+    return {false, false}
+end
+local function rolling_set(rolling_sum, cursor)
+    redis.call('HSET', KEYS[4], 'rsum', rolling_sum, 'rcur', cursor)
+end
+"""
+
+_RECORD_PREAMBLE_LUA = """
+local timestamp = tonumber(ARGV[1])
+local amount = tonumber(ARGV[3])
+local alpha = tonumber(ARGV[4])
+"""
+
+# Sum of the amounts of the ZSET members with min <= score <= max
+# (ZRANGEBYSCORE bounds, "(" for exclusive)
+_AMOUNT_SUM_LUA = """
+local function amount_sum(min, max)
+    local total = 0
+    for _, member in ipairs(redis.call('ZRANGEBYSCORE', KEYS[1], min, max)) do
+        total = total + tonumber(string.sub(member, string.find(member, ':', 1, true) + 1))
+    end
+    return total
+end
+"""
+
+# ZSET window: one member per transaction, trimmed to the longest window
+# (24h, or the longest velocity window).
+# Rolling 24h sum (KEYS[4], fields sum and cursor): amounts of the members
+# with score > cursor, the 24h window start of the latest write. Each write
+# moves the cursor forward and subtracts the members it passes, so every
+# member is added and subtracted once. A missing hash (first write, expiry)
+# is rebuilt from the window.
+_ZSET_WINDOW_LUA = """
+local start = timestamp - 86400
+local rolling = rolling_get()
+local rolling_sum, cursor = tonumber(rolling[1]) or 0, tonumber(rolling[2])
+if not cursor then
+    rolling_sum, cursor = amount_sum('(' .. start, '+inf'), start
+elseif start > cursor then
+    rolling_sum, cursor = rolling_sum - amount_sum('(' .. cursor, start), start
+end
+if redis.call('ZADD', KEYS[1], timestamp, ARGV[2]) == 1 and timestamp > cursor then
+    rolling_sum = rolling_sum + amount
+end
+if redis.call('ZCOUNT', KEYS[1], '(' .. cursor, '+inf') == 0 then
+    -- Empty window: drop accumulated float error
+    rolling_sum = 0
+end
+rolling_set(string.format('%.17g', rolling_sum), cursor)
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', timestamp - tonumber(ARGV[9]))
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+"""
+
+# Bucketed window: a ring of `buckets` hash fields, field = bucket % buckets,
+# value "bucket:count:sum". A field still holding an older bucket is reset.
+_BUCKET_WINDOW_LUA = """
+local bucket = math.floor(timestamp / tonumber(ARGV[6]))
+local slot = bucket % tonumber(ARGV[7])
+local n, total = 1, amount
+local stored = redis.call('HGET', KEYS[1], slot)
+if stored then
+    local b, c, s = string.match(stored, '^(%-?%d+):(%d+):(.+)$')
+    b = tonumber(b)
+    if b == bucket then
+        n, total = tonumber(c) + 1, tonumber(s) + amount
+    elseif b > bucket then
+        -- Slot already holds a newer bucket: too old for any window
+        n = nil
+    end
+end
+if n then
+    redis.call('HSET', KEYS[1], slot, bucket .. ':' .. n .. ':' .. string.format('%.17g', total))
+end
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+"""
+
+_EMA_LUA = """
+local current = ema_get()
+local ema = amount
+if current then
+    ema = alpha * amount + (1 - alpha) * tonumber(current)
+end
+ema = string.format('%.17g', ema)
+ema_set(ema)
+"""
+
+# All-time spending profile: running count and sum (constant size per user)
+_PROFILE_LUA = """
+redis.call('HINCRBY', KEYS[3], 'count', 1)
+redis.call('HINCRBYFLOAT', KEYS[3], 'sum', ARGV[3])
+redis.call('EXPIRE', KEYS[3], ARGV[8])
+"""
+
+_RECORD_TRANSACTION_LUA = _RECORD_PREAMBLE_LUA + _ZSET_WINDOW_LUA + _EMA_LUA + _PROFILE_LUA
+_RECORD_TRANSACTION_BUCKETS_LUA = (
+    _RECORD_PREAMBLE_LUA + _BUCKET_WINDOW_LUA + _EMA_LUA + _PROFILE_LUA
+)
+
+# Profile as of before the transaction (read by the hydrate scripts)
+_PROFILE_READ_LUA = "local profile = redis.call('HMGET', KEYS[3], 'count', 'sum')\n"
+
+# Transactions and their amount sum in [ARGV[1] - 24h, ARGV[1]] (count and
+# window_sum): ZCOUNT, and the rolling sum corrected by the members between
+# its cursor and the window start, and those after ARGV[1] (O(log N + k) for
+# the k members the window moved past since the latest write)
+_WINDOW_STATS_LUA = """
+local now = tonumber(ARGV[1])
+local count = redis.call('ZCOUNT', KEYS[1], now - 86400, now)
+local window_sum = 0
+if count > 0 then
+    local rolling = rolling_get()
+    local cursor = tonumber(rolling[2])
+    if not cursor then
+        window_sum = amount_sum(now - 86400, now)
+    else
+        window_sum = tonumber(rolling[1])
+        if now - 86400 > cursor then
+            window_sum = window_sum - amount_sum('(' .. cursor, '(' .. (now - 86400))
+        else
+            window_sum = window_sum + amount_sum(now - 86400, cursor)
+        end
+        window_sum = window_sum - amount_sum('(' .. now, '+inf')
+    end
+end
+window_sum = string.format('%.17g', window_sum)
+"""
+
+# Same for the buckets ending with the timestamp's (see _bucket_window)
+_BUCKET_COUNT_LUA = """
+local count, window_sum = 0, 0
+local last = math.floor(tonumber(ARGV[1]) / tonumber(ARGV[6]))
+local fields = redis.call('HGETALL', KEYS[1])
+for i = 2, #fields, 2 do
+    local b, c, s = string.match(fields[i], '^(%-?%d+):(%d+):(.+)$')
+    b = tonumber(b)
+    if b <= last and b > last - tonumber(ARGV[7]) then
+        count = count + tonumber(c)
+        window_sum = window_sum + tonumber(s)
+    end
+end
+window_sum = string.format('%.17g', window_sum)
+"""
+
+# Reads the features as of just before the transaction (same as get_features
+# at its timestamp), then records it. Returns {trans_count_24h, avg_spend or
+# nil, profile count or nil, profile sum or nil, 24h amount sum}
+_HYDRATE_RETURN_LUA = "return {count, current, profile[1], profile[2], window_sum}\n"
+
+
+def _layout_scripts(layout_lua: str) -> Dict[str, str]:
+    """Record and read scripts over one key layout's accessors (see KEY_LAYOUTS)."""
+    zset = layout_lua + _AMOUNT_SUM_LUA
+    return {
+        # Returns the new EMA
+        "add_transaction": zset + _RECORD_TRANSACTION_LUA + "return ema\n",
+        "add_transaction_buckets": layout_lua + _RECORD_TRANSACTION_BUCKETS_LUA + "return ema\n",
+        "hydrate_and_record": (
+            zset
+            + _WINDOW_STATS_LUA
+            + _PROFILE_READ_LUA
+            + _RECORD_TRANSACTION_LUA
+            + _HYDRATE_RETURN_LUA
+        ),
+        "hydrate_and_record_buckets": (
+            layout_lua
+            + _BUCKET_COUNT_LUA
+            + _PROFILE_READ_LUA
+            + _RECORD_TRANSACTION_BUCKETS_LUA
+            + _HYDRATE_RETURN_LUA
+        ),
+        # Window count and rolling sum at ARGV[1] (ZSET mode feature reads).
+        # KEYS as the record scripts. Returns {count, sum}
+        "window_stats": zset + _WINDOW_STATS_LUA + "return {count, window_sum}\n",
+    }
+
+
+_KEYS_LAYOUT_SCRIPTS = _layout_scripts(_KEYS_LAYOUT_LUA)
+WINDOW_STATS_SCRIPT = _KEYS_LAYOUT_SCRIPTS["window_stats"]
+ADD_TRANSACTION_SCRIPT = _KEYS_LAYOUT_SCRIPTS["add_transaction"]
+ADD_TRANSACTION_BUCKETS_SCRIPT = _KEYS_LAYOUT_SCRIPTS["add_transaction_buckets"]
+HYDRATE_AND_RECORD_SCRIPT = _KEYS_LAYOUT_SCRIPTS["hydrate_and_record"]
+HYDRATE_AND_RECORD_BUCKETS_SCRIPT = _KEYS_LAYOUT_SCRIPTS["hydrate_and_record_buckets"]
+
+# key_layout="hash" variants (name + "_hash"), plus the single-call feature
+# read: window stats, EMA and profile from the window key and the state hash.
+# ARGV: timestamp, then as the record scripts (bucket_seconds, buckets).
+# Returns {trans_count_24h, avg_spend or nil, profile count or nil, profile
+# sum or nil, 24h amount sum}
+_READ_STATE_LUA = _PROFILE_READ_LUA + "local current = ema_get()\n" + _HYDRATE_RETURN_LUA
+_HASH_LAYOUT_SCRIPTS = {
+    **{f"{name}_hash": source for name, source in _layout_scripts(_HASH_LAYOUT_LUA).items()},
+    "read_state_hash": _HASH_LAYOUT_LUA + _AMOUNT_SUM_LUA + _WINDOW_STATS_LUA + _READ_STATE_LUA,
+    "read_state_buckets_hash": _HASH_LAYOUT_LUA + _BUCKET_COUNT_LUA + _READ_STATE_LUA,
+}
+
+# Multi-window velocity: one ZRANGEBYSCORE over the longest window, counted
+# and summed into every window [timestamp - seconds, timestamp].
+# KEYS: tx_history. ARGV: timestamp, window seconds...
+# Returns {count_1, sum_1, count_2, sum_2, ...} in ARGV order
+VELOCITY_SCRIPT = """
+local now = tonumber(ARGV[1])
+local n = #ARGV - 1
+local seconds, counts, sums = {}, {}, {}
+local longest = 0
+for i = 1, n do
+    seconds[i] = tonumber(ARGV[i + 1])
+    counts[i], sums[i] = 0, 0
+    longest = math.max(longest, seconds[i])
+end
+
+local members = redis.call('ZRANGEBYSCORE', KEYS[1], now - longest, now, 'WITHSCORES')
+for j = 1, #members, 2 do
+    local age = now - tonumber(members[j + 1])
+    local sep = string.find(members[j], ':', 1, true)
+    local amount = tonumber(string.sub(members[j], sep + 1))
+    for i = 1, n do
+        if age <= seconds[i] then
+            counts[i] = counts[i] + 1
+            sums[i] = sums[i] + amount
+        end
+    end
+end
+
+local reply = {}
+for i = 1, n do
+    reply[2 * i - 1] = counts[i]
+    reply[2 * i] = string.format('%.17g', sums[i])
+end
+return reply
+"""
+
+# Window storage: one ZSET member per transaction (exact), or fixed time
+# buckets (bounded memory, approximate window edge)
+WINDOW_MODES = ("zset", "buckets")
+
+# Per-user key layout:
+# - "keys": one key per structure (user:<id>:tx_history, :avg_spend, :profile,
+#   :rolling_sum), each with its own TTL
+# - "hash": the window key plus one state hash holding every scalar (fields
+#   ema, count, sum, rsum, rcur), both hash-tagged (user:{<id>}:tx_history,
+#   user:{<id>}:state) so they share a Redis Cluster slot. Half the keys and
+#   their per-key overhead; migrate with layout_migration.migrate_key_layout
+KEY_LAYOUTS = ("keys", "hash")
+
+# Script call: (script name, keys, args)
+ScriptCall = Tuple[str, List[str], List[Any]]
+
+# Registry of per-user key suffixes: every structure stored as
+# user:{user_id}:{suffix} registers its suffix, and erasure
+# (delete_user_data, erasure.bulk_erase) deletes whatever is registered.
+USER_KEY_SUFFIXES: List[str] = []
+
+
+def register_user_key(suffix: str) -> str:
+    """
+    Register a per-user key suffix (idempotent).
+
+    Args:
+        suffix: Last component of user:{user_id}:{suffix}
+
+    Returns:
+        The suffix, for use as a module constant
+
+    Example:
+        >>> DEVICES = register_user_key("devices")
+    """
+    if suffix not in USER_KEY_SUFFIXES:
+        USER_KEY_SUFFIXES.append(suffix)
+    return suffix
+
+
+def user_key(user_id: str, suffix: str, key_layout: str = "keys") -> str:
+    """Key of one of a user's structures (hash-tagged in the "hash" layout)."""
+    if key_layout == "hash":
+        return f"user:{{{user_id}}}:{suffix}"
+    return f"user:{user_id}:{suffix}"
+
+
+def user_keys(user_id: str) -> List[str]:
+    """Every registered key of a user, in both key layouts."""
+    return [
+        user_key(user_id, suffix, key_layout)
+        for key_layout in KEY_LAYOUTS
+        for suffix in USER_KEY_SUFFIXES
+    ]
+
+
+def key_user_id(key: str) -> str:
+    """
+    User ID of a per-user key in either layout.
+
+    Example:
+        >>> key_user_id("user:{u1:a}:state")
+        'u1:a'
+    """
+    # User IDs may themselves contain ':'
+    user_id = key[len("user:") : key.rindex(":")]
+    if user_id.startswith("{") and user_id.endswith("}"):
+        return user_id[1:-1]
+    return user_id
+
+
+TX_HISTORY = register_user_key("tx_history")
+TX_BUCKETS = register_user_key("tx_buckets")
+AVG_SPEND = register_user_key("avg_spend")
+PROFILE = register_user_key("profile")
+ROLLING_SUM = register_user_key("rolling_sum")
+STATE = register_user_key("state")
+
+
+class FeatureStoreBase:
+    """
+    Key layout, configuration and result decoding shared by the sync and
+    asyncio feature stores. Subclasses only differ in how commands are sent.
+
+    Multi-step updates are Lua scripts (SCRIPTS) invoked by SHA with EVALSHA;
+    a script missing from the server cache (restart, SCRIPT FLUSH) is loaded
+    and the affected calls are retried.
+    """
+
+    # Synchronous methods wait on the network (see backend.FeatureStoreBackend)
+    blocking_io: bool = True
+
+    # Decoded replies per user in multi-user reads: window (count and sum),
+    # EMA, profile (see _window_replies)
+    FEATURE_READS: int = 3
+
+    SCRIPTS: Dict[str, str] = {
+        "add_transaction": ADD_TRANSACTION_SCRIPT,
+        "hydrate_and_record": HYDRATE_AND_RECORD_SCRIPT,
+        "add_transaction_buckets": ADD_TRANSACTION_BUCKETS_SCRIPT,
+        "hydrate_and_record_buckets": HYDRATE_AND_RECORD_BUCKETS_SCRIPT,
+        "velocity": VELOCITY_SCRIPT,
+        "window_stats": WINDOW_STATS_SCRIPT,
+        **_HASH_LAYOUT_SCRIPTS,
+    }
+
+    def __init__(
+        self,
+        ema_alpha: Optional[float] = None,
+        near_cache: Optional[NearCache] = None,
+        window_mode: str = "zset",
+        bucket_seconds: int = 900,
+        velocity_windows: Optional[Dict[str, int]] = None,
+        key_layout: str = "keys",
+    ) -> None:
+        """
+        Initialize shared feature configuration.
+
+        Args:
+            ema_alpha: Exponential moving average smoothing factor.
+                      Default is 2/(24+1) ≈ 0.08 for 24-hour window.
+            near_cache: Optional in-process cache serving get_features for
+                        hot users (see near_cache.py)
+            window_mode: "zset" (exact 24h window, one member per transaction)
+                         or "buckets" (fixed time buckets, bounded memory)
+            bucket_seconds: Bucket width in "buckets" mode; must divide 24h.
+                            Default 900 (96 × 15-minute buckets)
+            velocity_windows: Window name -> seconds served by get_velocity
+                              (see windows.py). Default: 24h only
+            key_layout: "keys" (one key per structure) or "hash" (window key
+                        plus one hash-tagged state hash per user, see
+                        KEY_LAYOUTS)
+        """
+        if window_mode not in WINDOW_MODES:
+            raise ValueError(f"window_mode must be one of {WINDOW_MODES}, got {window_mode!r}")
+        if key_layout not in KEY_LAYOUTS:
+            raise ValueError(f"key_layout must be one of {KEY_LAYOUTS}, got {key_layout!r}")
+        if bucket_seconds <= 0 or 86400 % bucket_seconds:
+            raise ValueError("bucket_seconds must be a positive divisor of 86400")
+        if window_mode == "buckets" and near_cache is not None:
+            raise ValueError("near_cache requires window_mode='zset'")
+        velocity_windows = validate_velocity_windows(
+            velocity_windows if velocity_windows is not None else DEFAULT_VELOCITY_WINDOWS
+        )
+        if window_mode == "buckets" and max(velocity_windows.values()) > 86400:
+            raise ValueError("velocity windows longer than 24h require window_mode='zset'")
+
+        self.near_cache: Optional[NearCache] = near_cache
+
+        # Sliding window storage (see WINDOW_MODES)
+        self.window_mode: str = window_mode
+        self.bucket_seconds: int = bucket_seconds
+        self.window_buckets: int = 86400 // bucket_seconds
+
+        # Per-user key layout (see KEY_LAYOUTS); multi-user reads queue one
+        # read_state call per user in the "hash" layout
+        self.key_layout: str = key_layout
+        self._reads_per_user: int = 1 if key_layout == "hash" else self.FEATURE_READS
+
+        # Multi-window velocity; the ZSET keeps transactions for the longest
+        self.velocity_windows: Dict[str, int] = velocity_windows
+        self.window_retention: int = max(86400, *velocity_windows.values())
+
+        # EMA configuration: α = 2/(n+1) for n=24 hours
+        self.ema_alpha: float = ema_alpha if ema_alpha is not None else 2.0 / (24 + 1)
+
+        # TTL for keys (7 days = 604800 seconds)
+        # This prevents unbounded memory growth
+        self.key_ttl: int = 604800
+
+        # TTL of the all-time profile (365 days since the last transaction):
+        # returning users keep their long-term baseline after a quiet week
+        self.profile_ttl: int = 31536000
+
+        # Users per pipeline in multi-user reads (bounds request/reply buffer size)
+        self.read_chunk_size: int = 1000
+
+        # Read replica routing; set by the Redis stores when given replicas
+        self.replica_router: Optional[ReplicaRouter] = None
+
+        # SHA1 of each Lua script, as computed by SCRIPT LOAD
+        self._script_shas: Dict[str, str] = {
+            name: hashlib.sha1(source.encode()).hexdigest() for name, source in self.SCRIPTS.items()
+        }
+
+    def _get_tx_history_key(self, user_id: str) -> str:
+        """Generate Redis key for transaction history ZSET."""
+        return user_key(user_id, TX_HISTORY, self.key_layout)
+
+    def _get_avg_spend_key(self, user_id: str) -> str:
+        """Generate Redis key for average spend EMA (the state hash in the "hash" layout)."""
+        if self.key_layout == "hash":
+            return self._get_state_key(user_id)
+        return user_key(user_id, AVG_SPEND)
+
+    def _get_profile_key(self, user_id: str) -> str:
+        """Generate Redis key for the all-time spending profile hash."""
+        if self.key_layout == "hash":
+            return self._get_state_key(user_id)
+        return user_key(user_id, PROFILE)
+
+    def _get_tx_buckets_key(self, user_id: str) -> str:
+        """Generate Redis key for the bucketed window hash."""
+        return user_key(user_id, TX_BUCKETS, self.key_layout)
+
+    def _get_rolling_sum_key(self, user_id: str) -> str:
+        """Generate Redis key for the rolling 24h amount sum hash."""
+        if self.key_layout == "hash":
+            return self._get_state_key(user_id)
+        return user_key(user_id, ROLLING_SUM)
+
+    def _get_state_key(self, user_id: str) -> str:
+        """Generate Redis key for the per-user state hash ("hash" layout)."""
+        return user_key(user_id, STATE, "hash")
+
+    def _get_window_key(self, user_id: str) -> str:
+        """Key of the user's sliding window in the configured window_mode."""
+        if self.window_mode == "buckets":
+            return self._get_tx_buckets_key(user_id)
+        return self._get_tx_history_key(user_id)
+
+    def _script_name(self, script: str) -> str:
+        """Name of a record / read script for the configured window mode and key layout."""
+        if self.window_mode == "buckets":
+            script += "_buckets"
+        if self.key_layout == "hash":
+            script += "_hash"
+        return script
+
+    def _script_keys(self, user_id: str) -> List[str]:
+        """KEYS of the record and window scripts."""
+        return [
+            self._get_window_key(user_id),
+            self._get_avg_spend_key(user_id),
+            self._get_profile_key(user_id),
+            self._get_rolling_sum_key(user_id),
+        ]
+
+    def _transaction_call(
+        self, user_id: str, amount: float, timestamp: int, script: str = "add_transaction"
+    ) -> ScriptCall:
+        """Script call recording one transaction (add_transaction or hydrate_and_record)."""
+        return (
+            self._script_name(script),
+            self._script_keys(user_id),
+            # Member "timestamp:amount" allows duplicate amounts at distinct times
+            [
+                timestamp,
+                f"{timestamp}:{amount}",
+                repr(float(amount)),
+                repr(self.ema_alpha),
+                self.key_ttl,
+                self.bucket_seconds,
+                self.window_buckets,
+                self.profile_ttl,
+                self.window_retention,
+            ],
+        )
+
+    def _read_chunks(
+        self, user_ids: Sequence[str], timestamps: Optional[Sequence[int]]
+    ) -> List[Tuple[Sequence[str], Sequence[int]]]:
+        """Validate a multi-user read and split it into per-pipeline chunks."""
+        if timestamps is None:
+            timestamps = [int(time.time())] * len(user_ids)
+
+        if len(timestamps) != len(user_ids):
+            raise ValueError("user_ids and timestamps must have the same length")
+
+        size = self.read_chunk_size
+        return [
+            (user_ids[i : i + size], timestamps[i : i + size])
+            for i in range(0, len(user_ids), size)
+        ]
+
+    def _queue_window_read(self, pipe, user_id: str, current_timestamp: int) -> None:
+        """Queue the read of a user's window (window_stats script, or HGETALL of the buckets)."""
+        if self.window_mode == "buckets":
+            pipe.hgetall(self._get_tx_buckets_key(user_id))
+        else:
+            keys = self._script_keys(user_id)
+            sha = self._script_shas[self._script_name("window_stats")]
+            pipe.evalsha(sha, len(keys), *keys, current_timestamp)
+
+    def _window_stats(self, reply: Any, current_timestamp: int) -> Tuple[int, float]:
+        """(transactions, amount sum) in the window from the _queue_window_read reply."""
+        if self.window_mode == "buckets":
+            return self._bucket_window(reply, current_timestamp)
+        count, window_sum = reply
+        return int(count), float(window_sum)
+
+    def _bucket_window(self, buckets: Dict[str, str], current_timestamp: int) -> Tuple[int, float]:
+        """
+        Sum the counts and amounts of the window_buckets buckets ending with
+        the one containing current_timestamp.
+
+        The window therefore spans between 24h - bucket_seconds and 24h
+        back, and includes the whole current bucket.
+        """
+        last = current_timestamp // self.bucket_seconds
+        count, window_sum = 0, 0.0
+        for value in buckets.values():
+            bucket, n, total = value.split(":", 2)
+            if last - self.window_buckets < int(bucket) <= last:
+                count += int(n)
+                window_sum += float(total)
+        return count, window_sum
+
+    def _queue_feature_reads(
+        self, pipe, user_ids: Sequence[str], timestamps: Sequence[int]
+    ) -> None:
+        """Queue the _reads_per_user commands per user on a (sync or async) pipeline."""
+        if self.key_layout == "hash":
+            sha = self._script_shas[self._script_name("read_state")]
+            for user_id, current_timestamp in zip(user_ids, timestamps):
+                keys = self._script_keys(user_id)
+                # ARGV positions of the record scripts (bucket_seconds, buckets)
+                args = [current_timestamp, "", 0, 0, 0, self.bucket_seconds, self.window_buckets]
+                pipe.evalsha(sha, len(keys), *keys, *args)
+            return
+
+        for user_id, current_timestamp in zip(user_ids, timestamps):
+            self._queue_window_read(pipe, user_id, current_timestamp)
+            pipe.get(self._get_avg_spend_key(user_id))
+            pipe.hmget(self._get_profile_key(user_id), "count", "sum")
+
+    def _window_replies(self, replies: List[Any], timestamps: Sequence[int]) -> List[Any]:
+        """
+        Decode the _queue_feature_reads replies into FEATURE_READS interleaved
+        (window count and amount sum, EMA, profile) replies per user.
+        """
+        if self.key_layout == "hash":
+            decoded: List[Any] = []
+            for count, avg_spend, profile_count, profile_sum, window_sum in replies:
+                window = (int(count), float(window_sum))
+                decoded += [window, avg_spend, [profile_count, profile_sum]]
+            return decoded
+
+        for i, current_timestamp in enumerate(timestamps):
+            j = i * self.FEATURE_READS
+            replies[j] = self._window_stats(replies[j], current_timestamp)
+        return replies
+
+    def _velocity_call(self, user_id: str, current_timestamp: int) -> ScriptCall:
+        """Script call computing every velocity window in one scan (ZSET mode)."""
+        return (
+            "velocity",
+            [self._get_tx_history_key(user_id)],
+            [current_timestamp, *self.velocity_windows.values()],
+        )
+
+    def _queue_velocity_read(self, pipe, user_id: str, current_timestamp: int) -> None:
+        """Queue the velocity read (velocity script, or HGETALL of the buckets)."""
+        if self.window_mode == "buckets":
+            pipe.hgetall(self._get_tx_buckets_key(user_id))
+        else:
+            self._queue_script_calls(pipe, [self._velocity_call(user_id, current_timestamp)], [0])
+
+    def _velocity_features(self, reply: Any, current_timestamp: int) -> Dict[str, float]:
+        """Velocity features from the _queue_velocity_read reply."""
+        if self.window_mode == "buckets":
+            return self._bucket_velocity(reply, current_timestamp)
+        return self._decode_velocity(reply)
+
+    def _decode_velocity(self, reply: List[Any]) -> Dict[str, float]:
+        """Velocity features from the {count, sum, ...} reply of the velocity script."""
+        features = {}
+        for i, name in enumerate(self.velocity_windows):
+            features[f"trans_count_{name}"] = float(reply[2 * i])
+            features[f"amt_sum_{name}"] = float(reply[2 * i + 1])
+        return features
+
+    def _bucket_velocity(self, buckets: Dict[str, str], current_timestamp: int) -> Dict[str, float]:
+        """
+        Velocity features from the bucket hash: each window sums the
+        ceil(seconds / bucket_seconds) buckets ending with current_timestamp's.
+        """
+        last = current_timestamp // self.bucket_seconds
+        spans = [-(-seconds // self.bucket_seconds) for seconds in self.velocity_windows.values()]
+        reply = [0, 0.0] * len(spans)
+        for value in buckets.values():
+            bucket, n, total = value.split(":", 2)
+            age = last - int(bucket)
+            for i, span in enumerate(spans):
+                if 0 <= age < span:
+                    reply[2 * i] += int(n)
+                    reply[2 * i + 1] += float(total)
+        return self._decode_velocity(reply)
+
+    def _require_history(self) -> None:
+        """Raise if individual transactions are not stored (buckets mode)."""
+        if self.window_mode != "zset":
+            raise ValueError("transaction history is only stored with window_mode='zset'")
+
+    def _queue_script_calls(self, pipe, calls: Sequence[ScriptCall], pending: List[int]) -> None:
+        """Queue EVALSHA for the pending calls on a (sync or async) pipeline."""
+        for i in pending:
+            name, keys, args = calls[i]
+            pipe.evalsha(self._script_shas[name], len(keys), *keys, *args)
+
+    def _queue_state_read(self, pipe, user_id: str, current_timestamp: int) -> None:
+        """
+        Queue the near-cache read: the feature reads at current_timestamp,
+        then the window members bounding the timestamps they hold for (each
+        ZRANGEBYSCORE LIMIT 1, O(log N)).
+        """
+        self._queue_feature_reads(pipe, [user_id], [current_timestamp])
+        key = self._get_tx_history_key(user_id)
+        start = current_timestamp - 86400
+        # Newest in the window, and latest before it: requests before them see another window
+        pipe.zrevrangebyscore(key, current_timestamp, start, start=0, num=1, withscores=True)
+        pipe.zrevrangebyscore(key, f"({start}", "-inf", start=0, num=1, withscores=True)
+        # Oldest in the window (leaves it 24h later), and first after it
+        pipe.zrangebyscore(key, start, current_timestamp, start=0, num=1, withscores=True)
+        pipe.zrangebyscore(key, f"({current_timestamp}", "+inf", start=0, num=1, withscores=True)
+
+    def _cache_state(
+        self, user_id: str, replies: List[Any], current_timestamp: int, ticket: object
+    ) -> CachedUserState:
+        """Store the state read by _queue_state_read in the near cache."""
+        newest, previous, oldest, following = replies[self._reads_per_user :]
+        window, avg_spend, profile = self._window_replies(
+            replies[: self._reads_per_user], [current_timestamp]
+        )
+        valid_from, valid_until = float("-inf"), float("inf")
+        if newest:
+            valid_from = int(newest[0][1])
+        if previous:
+            valid_from = max(valid_from, int(previous[0][1]) + 86400 + 1)
+        if oldest:
+            valid_until = int(oldest[0][1]) + 86400
+        if following:
+            valid_until = min(valid_until, int(following[0][1]) - 1)
+        return self.near_cache.put(
+            user_id,
+            window,
+            avg_spend,
+            ticket,
+            profile=profile,
+            valid_from=valid_from,
+            valid_until=valid_until,
+        )
+
+    def _features_from_state(self, state: CachedUserState) -> Dict[str, float]:
+        """Features from a cached state (at a timestamp it covers)."""
+        return self._decode_features(state.window, state.avg_spend, state.profile)
+
+    def _pool_stats(self) -> Dict[str, int]:
+        """Connections in use / idle in the client's pool, and its limit (no I/O)."""
+        return {
+            "pool_in_use": len(self.pool._in_use_connections),
+            "pool_idle": len(self.pool._available_connections),
+            "pool_max": self.pool.max_connections,
+        }
+
+    def _init_replicas(
+        self,
+        replicas: Optional[Sequence[Mapping[str, Any]]],
+        password: Optional[str],
+        max_staleness_ms: float,
+        hedge_ms: Optional[float],
+    ) -> List[Dict[str, Any]]:
+        """
+        Connection settings of the read replicas (password defaults to the
+        primary's); creates replica_router if there are any.
+        """
+        settings = [
+            {**replica, "password": replica.get("password") or password}
+            for replica in replicas or ()
+        ]
+        if settings:
+            self.replica_router = ReplicaRouter(
+                [f"{r['host']}:{r.get('port', 6379)}/{r.get('db', 0)}" for r in settings],
+                max_staleness_ms=max_staleness_ms,
+                hedge_after_ms=hedge_ms or None,
+            )
+        return settings
+
+    def _replica_stats(self) -> Dict[str, Any]:
+        """Replica staleness and read routing for health_check (empty without replicas)."""
+        if self.replica_router is None:
+            return {}
+        return {"read_replicas": self.replica_router.stats()}
+
+    def _invalidate_near_cache(self, user_ids: Iterable[str]) -> None:
+        """Drop near-cache entries of users this store just wrote."""
+        if self.near_cache is not None:
+            for user_id in set(user_ids):
+                self.near_cache.invalidate(user_id)
+
+    @staticmethod
+    def _collect_script_replies(
+        pending: List[int], replies: List[Any], results: List[Any]
+    ) -> List[int]:
+        """Store successful replies; return the calls that hit NOSCRIPT."""
+        retry = []
+        for i, reply in zip(pending, replies):
+            if isinstance(reply, NoScriptError):
+                retry.append(i)
+            elif isinstance(reply, Exception):
+                raise reply
+            else:
+                results[i] = reply
+        return retry
+
+    @staticmethod
+    def _lost_scripts(replies: List[Any]) -> bool:
+        """Whether read replies hit NOSCRIPT (raises any other error reply)."""
+        lost = False
+        for reply in replies:
+            if isinstance(reply, NoScriptError):
+                lost = True
+            elif isinstance(reply, Exception):
+                raise reply
+        return lost
+
+    @staticmethod
+    def _decode_profile(profile: Optional[Sequence[Any]]) -> Tuple[float, float]:
+        """(transaction count, mean amount) from a raw HMGET count/sum reply."""
+        if not profile or profile[0] is None:
+            return 0.0, 0.0
+        count = float(profile[0])
+        return count, float(profile[1]) / count
+
+    @classmethod
+    def _decode_features(
+        cls,
+        window: Tuple[int, float],
+        avg_spend: Optional[str],
+        profile: Optional[Sequence[Any]] = None,
+    ) -> Dict[str, float]:
+        """Build the feature dictionary from window (count, sum) / GET / HMGET replies."""
+        count, window_sum = window
+        count_all_time, avg_all_time = cls._decode_profile(profile)
+        return {
+            "trans_count_24h": float(count),
+            "avg_spend_24h": float(avg_spend) if avg_spend is not None else 0.0,
+            "avg_amt_24h": window_sum / count if count else 0.0,
+            "trans_count_all_time": count_all_time,
+            "user_avg_amt_all_time": avg_all_time,
+        }
+
+    @classmethod
+    def _decode_features_list(cls, replies: List[Any]) -> List[Dict[str, float]]:
+        """Feature dictionaries from interleaved window / GET / HMGET replies."""
+        return [
+            cls._decode_features(*replies[i : i + cls.FEATURE_READS])
+            for i in range(0, len(replies), cls.FEATURE_READS)
+        ]
+
+    @classmethod
+    def _decode_feature_arrays(cls, replies: List[Any]) -> Dict[str, np.ndarray]:
+        """Feature columns (float64 arrays) from interleaved window / GET / HMGET replies."""
+        stride = cls.FEATURE_READS
+        windows = np.array(replies[0::stride], dtype=np.float64).reshape(-1, 2)
+        profiles = np.array(
+            [cls._decode_profile(profile) for profile in replies[2::stride]], dtype=np.float64
+        ).reshape(-1, 2)
+        counts = windows[:, 0]
+        return {
+            "trans_count_24h": counts,
+            "avg_spend_24h": np.array(
+                [float(avg) if avg is not None else 0.0 for avg in replies[1::stride]],
+                dtype=np.float64,
+            ),
+            "avg_amt_24h": np.divide(
+                windows[:, 1], counts, out=np.zeros_like(counts), where=counts > 0
+            ),
+            "trans_count_all_time": profiles[:, 0],
+            "user_avg_amt_all_time": profiles[:, 1],
+        }
+
+    @staticmethod
+    def _decode_history(raw_results: List[Tuple[str, float]]) -> List[Tuple[int, float]]:
+        """Parse ZSET members ("timestamp:amount"), newest first."""
+        transactions = []
+        for member, score in raw_results:
+            timestamp_str, amount_str = member.split(":")
+            transactions.append((int(timestamp_str), float(amount_str)))
 
+        # Sort by timestamp descending (newest first)
+        transactions.sort(reverse=True, key=lambda x: x[0])
+
+        return transactions
 
-class RedisFeatureStore:
+
+class RedisFeatureStore(FeatureStoreBase):
     """
     Redis-backed feature store for real-time fraud detection.
 
@@ -35,6 +915,10 @@ class RedisFeatureStore:
        - Data Structure: Redis Sorted Set (ZSET)
        - Complexity: O(log N) insert, O(log N + M) range query
        - Key Format: user:{user_id}:tx_history
+       - window_mode="buckets": Redis Hash of fixed time buckets instead
+         (user:{user_id}:tx_buckets, field = bucket slot,
+         value = "bucket:count:sum"); O(1) update, O(buckets) read, at
+         most 86400 / bucket_seconds fields per user
 
     2. **avg_spend_24h**: Exponential moving average of spending
        - Data Structure: Redis String (float)
@@ -43,10 +927,34 @@ class RedisFeatureStore:
        - Formula: EMA_new = α * amt_current + (1-α) * EMA_old
        - α = 2/(n+1) where n=24 (for 24-hour window)
 
+    3. **avg_amt_24h**: Exact mean amount over the 24h window (training's
+       rolling mean)
+       - Data Structure: Redis Hash (sum, cursor) next to the ZSET
+       - Complexity: each member is added on insert and subtracted once
+         when the window moves past it; reads correct the sum by the
+         members expired since the latest write (O(log N + expired))
+       - Key Format: user:{user_id}:rolling_sum
+       - window_mode="buckets": sum of the bucket amounts
+
+    4. **user_avg_amt_all_time** / **trans_count_all_time**: All-time profile
+       - Data Structure: Redis Hash (count, sum)
+       - Complexity: O(1) update and read, constant size per user
+       - Key Format: user:{user_id}:profile (TTL profile_ttl, 365 days)
+
+    key_layout="hash" keeps 2 and 3 (ema, rsum, rcur fields) and 4 (count,
+    sum) in one state hash next to the window, both with the user ID as hash
+    tag: user:{<user_id>}:tx_history and user:{<user_id>}:state (TTL
+    profile_ttl; the window fields lapse with the window key).
+
     Connection Management:
     - Uses connection pooling to avoid TCP overhead
     - Thread-safe for concurrent API requests
     - Automatic reconnection on failure
+    - With replicas: get_features (without near cache), get_features_many /
+      _arrays, get_velocity and get_transaction_history read from a replica
+      within replica_max_staleness_ms of the primary (heartbeat thread, see
+      replicas.py), else from the primary; writes and
+      get_features_and_record always use the primary
 
     Example:
         >>> store = RedisFeatureStore(host="localhost", port=6379)
@@ -73,6 +981,14 @@ class RedisFeatureStore:
         max_connections: int = 50,
         decode_responses: bool = True,
         ema_alpha: Optional[float] = None,
+        near_cache: Optional[NearCache] = None,
+        window_mode: str = "zset",
+        bucket_seconds: int = 900,
+        velocity_windows: Optional[Dict[str, int]] = None,
+        key_layout: str = "keys",
+        replicas: Optional[Sequence[Mapping[str, Any]]] = None,
+        replica_max_staleness_ms: float = 1000.0,
+        replica_hedge_ms: Optional[float] = None,
     ) -> None:
         """
         Initialize Redis Feature Store with connection pooling.
@@ -86,7 +1002,30 @@ class RedisFeatureStore:
             decode_responses: If True, decode bytes to strings
             ema_alpha: Exponential moving average smoothing factor.
                       Default is 2/(24+1) ≈ 0.08 for 24-hour window.
+            near_cache: Optional in-process cache for hot users' features
+            window_mode: "zset" (exact) or "buckets" (bounded memory per user)
+            bucket_seconds: Bucket width in "buckets" mode (default 15 minutes)
+            velocity_windows: Window name -> seconds for get_velocity
+                              (see windows.load_velocity_windows)
+            key_layout: "keys" (one key per structure) or "hash" (window key
+                        plus one state hash per user, see KEY_LAYOUTS)
+            replicas: Read replicas of this server: host, port, db and
+                      password per replica (see sharded_store.parse_redis_url)
+            replica_max_staleness_ms: Replicas further behind the primary are
+                                      skipped (reads fall back to the primary)
+            replica_hedge_ms: Also send a read to a second replica when the
+                              first has not answered after this long
+                              (None or 0: no hedging)
         """
+        super().__init__(
+            ema_alpha=ema_alpha,
+            near_cache=near_cache,
+            window_mode=window_mode,
+            bucket_seconds=bucket_seconds,
+            velocity_windows=velocity_windows,
+            key_layout=key_layout,
+        )
+
         # Create connection pool for thread-safe access
         self.pool: ConnectionPool = redis.ConnectionPool(
             host=host,
@@ -101,13 +1040,6 @@ class RedisFeatureStore:
 
         self.client: redis.Redis = redis.Redis(connection_pool=self.pool)
 
-        # EMA configuration: α = 2/(n+1) for n=24 hours
-        self.ema_alpha: float = ema_alpha if ema_alpha is not None else 2.0 / (24 + 1)
-
-        # TTL for keys (7 days = 604800 seconds)
-        # This prevents unbounded memory growth
-        self.key_ttl: int = 604800
-
         # Test connection
         try:
             self.client.ping()
@@ -116,24 +1048,57 @@ class RedisFeatureStore:
                 f"Failed to connect to Redis at {host}:{port}. Ensure Redis is running. Error: {e}"
             ) from e
 
-    def _get_tx_history_key(self, user_id: str) -> str:
-        """Generate Redis key for transaction history ZSET."""
-        return f"user:{user_id}:tx_history"
+        self._load_scripts()
 
-    def _get_avg_spend_key(self, user_id: str) -> str:
-        """Generate Redis key for average spend EMA."""
-        return f"user:{user_id}:avg_spend"
+        # Read replicas: own pools, staleness measured by a heartbeat thread
+        replica_settings = self._init_replicas(
+            replicas, password, replica_max_staleness_ms, replica_hedge_ms
+        )
+        self.replica_pools: List[ConnectionPool] = [
+            redis.ConnectionPool(
+                **replica,
+                max_connections=max_connections,
+                decode_responses=decode_responses,
+                socket_connect_timeout=2,
+                socket_timeout=1,
+            )
+            for replica in replica_settings
+        ]
+        self.replica_clients: List[redis.Redis] = [
+            redis.Redis(connection_pool=pool) for pool in self.replica_pools
+        ]
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+        self._heartbeat_stop = threading.Event()
+        self._heartbeat_thread: Optional[threading.Thread] = None
+        if self.replica_router is not None:
+            for client in self.replica_clients:
+                try:
+                    self._load_scripts(client=client)
+                except redis.exceptions.RedisError:
+                    pass  # Unreachable for now: stale until heartbeats arrive
+            if self.replica_router.hedge_after_ms is not None:
+                self._hedge_pool = ThreadPoolExecutor(
+                    max_workers=max_connections, thread_name_prefix="replica-read"
+                )
+            self._send_heartbeat()
+            self._heartbeat_thread = threading.Thread(
+                target=self._heartbeat_loop, name="replica-heartbeat", daemon=True
+            )
+            self._heartbeat_thread.start()
 
     def add_transaction(self, user_id: str, amount: float, timestamp: Optional[int] = None) -> None:
         """
         Record a new transaction and update features atomically.
 
-        This method performs three atomic operations:
+        One EVALSHA of ADD_TRANSACTION_SCRIPT performs, server-side:
         1. Add transaction to sliding window (ZSET)
-        2. Remove expired transactions (older than 24h)
-        3. Update exponential moving average
+        2. Update the rolling 24h sum (add it, subtract members now outside 24h)
+        3. Remove expired transactions (older than 24h)
+        4. Update exponential moving average (read-modify-write)
+        5. Refresh the keys' TTL
 
-        All operations are pipelined for performance (single round trip).
+        The EMA update cannot interleave with a concurrent writer for the
+        same user, and the whole update is a single round trip.
 
         Args:
             user_id: User identifier
@@ -149,41 +1114,195 @@ class RedisFeatureStore:
         if timestamp is None:
             timestamp = int(time.time())
 
-        # Calculate window boundaries
-        window_start = timestamp - 86400  # 24 hours = 86400 seconds
+        self._run_scripts([self._transaction_call(user_id, amount, timestamp)])
+        self._invalidate_near_cache([user_id])
 
-        tx_key = self._get_tx_history_key(user_id)
-        avg_key = self._get_avg_spend_key(user_id)
+    def add_transactions(self, events: Sequence[Tuple[str, float, int]]) -> None:
+        """
+        Record many transactions (possibly of many users) in one round trip.
 
-        # Use pipeline for atomic multi-operation
-        pipe: Pipeline = self.client.pipeline()
+        Used by the API's write-behind queue. Sends one add_transaction
+        script call per event, in order, in a single pipeline.
 
-        # 1. Add transaction to sorted set (score = timestamp)
-        # Using transaction hash as member to allow duplicate amounts
-        tx_member = f"{timestamp}:{amount}"
-        pipe.zadd(tx_key, {tx_member: timestamp})
+        Args:
+            events: (user_id, amount, timestamp) tuples, applied in order
 
-        # 2. Remove transactions older than 24 hours
-        pipe.zremrangebyscore(tx_key, "-inf", window_start)
+        Raises:
+            redis.exceptions.RedisError: If Redis operation fails
 
-        # 3. Set TTL to prevent unbounded growth (reset on each transaction)
-        pipe.expire(tx_key, self.key_ttl)
+        Example:
+            >>> store.add_transactions([("u1", 150.0, 1234567890), ("u2", 20.0, 1234567891)])
+        """
+        if not events:
+            return
+
+        self._run_scripts(
+            [
+                self._transaction_call(user_id, amount, timestamp)
+                for user_id, amount, timestamp in events
+            ]
+        )
+        self._invalidate_near_cache(user_id for user_id, _, _ in events)
 
-        # 4. Update exponential moving average
-        # Get current EMA (default to amount if first transaction)
-        current_ema = self.client.get(avg_key)
-        if current_ema is None:
-            new_ema = amount
-        else:
-            current_ema = float(current_ema)
-            # EMA formula: α * x_new + (1-α) * EMA_old
-            new_ema = self.ema_alpha * amount + (1 - self.ema_alpha) * current_ema
+    def get_features_and_record(
+        self, user_id: str, amount: float, timestamp: Optional[int] = None
+    ) -> Dict[str, float]:
+        """
+        Return the user's features as of just before a transaction, then record it.
+
+        Equivalent to get_features(user_id, timestamp) followed by
+        add_transaction(user_id, amount, timestamp), but both run in one
+        atomic script: one round trip per scored transaction, and no other
+        write for the user can land between the read and the update.
 
-        pipe.set(avg_key, new_ema)
-        pipe.expire(avg_key, self.key_ttl)
+        Args:
+            user_id: User identifier
+            amount: Transaction amount in USD
+            timestamp: Unix timestamp. If None, uses current time.
+
+        Returns:
+            Feature dictionary as returned by get_features (excluding this
+            transaction)
+
+        Raises:
+            redis.exceptions.RedisError: If Redis operation fails
+
+        Example:
+            >>> store.get_features_and_record("u12345", 150.00, 1234567890)
+            {'trans_count_24h': 4.0, 'avg_spend_24h': 118.2}
+        """
+        if timestamp is None:
+            timestamp = int(time.time())
+
+        call = self._transaction_call(user_id, amount, timestamp, script="hydrate_and_record")
+        count, avg_spend, profile_count, profile_sum, window_sum = self._run_scripts([call])[0]
+        self._invalidate_near_cache([user_id])
+        return self._decode_features(
+            (count, float(window_sum)), avg_spend, [profile_count, profile_sum]
+        )
 
-        # Execute all operations atomically
-        pipe.execute()
+    def _run_scripts(self, calls: Sequence[ScriptCall]) -> List[Any]:
+        """
+        Run script calls in one pipeline, loading scripts missing on the server.
+
+        Args:
+            calls: (script name, keys, args) tuples
+
+        Returns:
+            Script replies aligned with calls
+        """
+        results: List[Any] = [None] * len(calls)
+        pending = list(range(len(calls)))
+
+        while True:
+            pipe: Pipeline = self.client.pipeline(transaction=False)
+            self._queue_script_calls(pipe, calls, pending)
+            replies = pipe.execute(raise_on_error=False)
+            retry = self._collect_script_replies(pending, replies, results)
+            if not retry:
+                return results
+
+            self._load_scripts({calls[i][0] for i in retry})
+            pending = retry
+
+    def _execute_reads(
+        self,
+        queue: Callable[[Pipeline], None],
+        transaction: bool = False,
+        client: Optional[redis.Redis] = None,
+    ) -> List[Any]:
+        """
+        Execute the commands queued by `queue` in one pipeline (on the
+        primary, or the given replica client).
+
+        ZSET-mode feature reads call the window_stats script; if the server
+        lost it, scripts are loaded and the whole pipeline is repeated.
+        """
+        client = client or self.client
+        while True:
+            pipe: Pipeline = client.pipeline(transaction=transaction)
+            queue(pipe)
+            replies = pipe.execute(raise_on_error=False)
+            if not self._lost_scripts(replies):
+                return replies
+
+            self._load_scripts(client=client)
+
+    def _routed_reads(
+        self, queue: Callable[[Pipeline], None], transaction: bool = False
+    ) -> List[Any]:
+        """
+        _execute_reads on a fresh replica (hedged to a second one after
+        replica_hedge_ms), or on the primary if none is fresh or the
+        replicas fail.
+        """
+        router = self.replica_router
+        order = router.choose() if router is not None else []
+        if not order:
+            return self._execute_reads(queue, transaction)
+
+        def read(replica: int) -> List[Any]:
+            return self._execute_reads(queue, transaction, self.replica_clients[replica])
+
+        try:
+            if self._hedge_pool is None or len(order) < 2:
+                replies = read(order[0])
+                router.record_read(order[0])
+                return replies
+            return self._hedged_reads(read, order[:2])
+        except redis.exceptions.RedisError:
+            router.record_read(None)
+            return self._execute_reads(queue, transaction)
+
+    def _hedged_reads(self, read: Callable[[int], List[Any]], order: List[int]) -> List[Any]:
+        """Read from order[0], and also order[1] if order[0] is slow; first success wins."""
+        router = self.replica_router
+        futures = {self._hedge_pool.submit(read, order[0]): order[0]}
+        done, _ = wait(futures, timeout=router.hedge_after_ms / 1000)
+        if not done:
+            futures[self._hedge_pool.submit(read, order[1])] = order[1]
+
+        pending = set(futures)
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    replica = futures[future]
+                    router.record_read(
+                        replica, hedged=len(futures) > 1, hedge_won=replica == order[1]
+                    )
+                    return future.result()
+            if not pending:
+                # The slow read is left to finish in the background
+                raise future.exception()
+
+    def _load_scripts(
+        self, names: Optional[Sequence[str]] = None, client: Optional[redis.Redis] = None
+    ) -> None:
+        """Load scripts into the server's script cache (all by default)."""
+        client = client or self.client
+        for name in names or self.SCRIPTS:
+            client.script_load(self.SCRIPTS[name])
+
+    def _send_heartbeat(self) -> None:
+        """Write the next heartbeat to the primary and record what each replica holds."""
+        router = self.replica_router
+        seq = router.next_heartbeat()
+        try:
+            self.client.set(router.heartbeat_key, seq, px=router.heartbeat_ttl_ms)
+        except redis.exceptions.RedisError:
+            return
+        for i, client in enumerate(self.replica_clients):
+            try:
+                router.observe(i, client.get(router.heartbeat_key))
+            except redis.exceptions.RedisError:
+                pass  # Unreachable: its staleness keeps growing
+
+    def _heartbeat_loop(self) -> None:
+        """Send heartbeats every heartbeat_interval_ms until close()."""
+        interval = self.replica_router.heartbeat_interval_ms / 1000
+        while not self._heartbeat_stop.wait(interval):
+            self._send_heartbeat()
 
     def get_features(
         self, user_id: str, current_timestamp: Optional[int] = None
@@ -202,6 +1321,9 @@ class RedisFeatureStore:
             Dictionary containing:
             - trans_count_24h: Number of transactions in last 24 hours
             - avg_spend_24h: Exponential moving average of spending
+            - avg_amt_24h: Mean amount of the 24h window (0.0 if empty)
+            - trans_count_all_time: Number of transactions ever recorded
+            - user_avg_amt_all_time: Mean amount of those (0.0 if none)
 
         Example:
             >>> features = store.get_features("u12345")
@@ -211,29 +1333,112 @@ class RedisFeatureStore:
         if current_timestamp is None:
             current_timestamp = int(time.time())
 
-        window_start = current_timestamp - 86400
+        if self.near_cache is not None:
+            state = self.near_cache.get(user_id, current_timestamp)
+            if state is None:
+                ticket = self.near_cache.reserve(user_id)
+                replies = self._execute_reads(
+                    lambda pipe: self._queue_state_read(pipe, user_id, current_timestamp),
+                    transaction=True,
+                )
+                state = self._cache_state(user_id, replies, current_timestamp, ticket)
+            return self._features_from_state(state)
+
+        # One transactional pipeline: window count and sum (O(log N) script,
+        # buckets O(buckets)), average spend, all-time count and sum (O(1))
+        results = self._routed_reads(
+            lambda pipe: self._queue_feature_reads(pipe, [user_id], [current_timestamp]),
+            transaction=True,
+        )
+
+        return self._decode_features(*self._window_replies(results, [current_timestamp]))
 
-        tx_key = self._get_tx_history_key(user_id)
-        avg_key = self._get_avg_spend_key(user_id)
+    def get_features_many(
+        self, user_ids: List[str], timestamps: Optional[List[int]] = None
+    ) -> List[Dict[str, float]]:
+        """
+        Retrieve real-time features for many users in one round trip.
 
-        # Use pipeline for efficiency
-        pipe: Pipeline = self.client.pipeline()
+        Used by batch scoring. All window/GET/HMGET reads are queued on a
+        single non-transactional pipeline, so N users cost one network
+        round trip instead of N (one per read_chunk_size users).
 
-        # Count transactions in window (ZCOUNT is O(log N))
-        pipe.zcount(tx_key, window_start, current_timestamp)
+        Args:
+            user_ids: User identifiers
+            timestamps: Reference Unix timestamp per user. If None, uses system time.
 
-        # Get average spend
-        pipe.get(avg_key)
+        Returns:
+            List of feature dictionaries (same format as get_features),
+            aligned with user_ids
 
-        results = pipe.execute()
+        Example:
+            >>> store.get_features_many(["u1", "u2"], [1234567890, 1234567900])
+            [{'trans_count_24h': 5.0, 'avg_spend_24h': 120.5}, {...}]
+        """
+        return self._decode_features_list(self._read_features(user_ids, timestamps))
 
-        trans_count = float(results[0])
-        avg_spend = float(results[1]) if results[1] is not None else 0.0
+    def get_features_arrays(
+        self, user_ids: List[str], timestamps: Optional[List[int]] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Retrieve real-time features for many users as columns.
 
-        return {
-            "trans_count_24h": trans_count,
-            "avg_spend_24h": avg_spend,
-        }
+        Same reads as get_features_many, returned as one float64 array per
+        feature (aligned with user_ids) for vectorized scoring and replay
+        jobs, without building a dictionary per user.
+
+        Args:
+            user_ids: User identifiers
+            timestamps: Reference Unix timestamp per user. If None, uses system time.
+
+        Returns:
+            One array per get_features key: {"trans_count_24h": array, ...}
+
+        Example:
+            >>> store.get_features_arrays(["u1", "u2"], [1234567890, 1234567900])
+            {'trans_count_24h': array([5., 0.]), 'avg_spend_24h': array([120.5, 0.])}
+        """
+        return self._decode_feature_arrays(self._read_features(user_ids, timestamps))
+
+    def _read_features(self, user_ids: List[str], timestamps: Optional[List[int]]) -> List[Any]:
+        """Interleaved window / GET / HMGET replies for many users, one pipeline per chunk."""
+        replies: List[Any] = []
+        for chunk_users, chunk_timestamps in self._read_chunks(user_ids, timestamps):
+            chunk = self._routed_reads(
+                lambda pipe: self._queue_feature_reads(pipe, chunk_users, chunk_timestamps)
+            )
+            replies.extend(self._window_replies(chunk, chunk_timestamps))
+        return replies
+
+    def get_velocity(
+        self, user_id: str, current_timestamp: Optional[int] = None
+    ) -> Dict[str, float]:
+        """
+        Transaction count and amount sum over every velocity window.
+
+        One server-side call regardless of the number of windows: in ZSET
+        mode the velocity script scans the longest window once and counts
+        each transaction into every window containing it (O(log N + M));
+        in buckets mode one HGETALL of the bucket hash.
+
+        Args:
+            user_id: User identifier
+            current_timestamp: Reference Unix timestamp. If None, uses system time.
+
+        Returns:
+            trans_count_<name> and amt_sum_<name> per configured window
+
+        Example:
+            >>> store.get_velocity("u12345", 1234567890)
+            {'trans_count_1h': 1.0, 'amt_sum_1h': 150.0, ..., 'amt_sum_7d': 2210.5}
+        """
+        if current_timestamp is None:
+            current_timestamp = int(time.time())
+
+        replies = self._routed_reads(
+            lambda pipe: self._queue_velocity_read(pipe, user_id, current_timestamp)
+        )
+        return self._velocity_features(replies[0], current_timestamp)
 
     def get_transaction_history(
         self, user_id: str, lookback_hours: int = 24, current_timestamp: Optional[int] = None
@@ -252,11 +1457,16 @@ class RedisFeatureStore:
             List of tuples: [(timestamp, amount), ...]
             Sorted by timestamp (newest first)
 
+        Raises:
+            ValueError: In "buckets" window mode (transactions are not kept)
+
         Example:
             >>> history = store.get_transaction_history("u12345", lookback_hours=48)
             >>> for ts, amt in history:
             ...     print(f"{ts}: ${amt:.2f}")
         """
+        self._require_history()
+
         if current_timestamp is None:
             current_timestamp = int(time.time())
 
@@ -266,53 +1476,74 @@ class RedisFeatureStore:
 
         # Get all transactions in window with scores (timestamps)
         # ZRANGEBYSCORE with WITHSCORES
-        raw_results = self.client.zrangebyscore(
-            tx_key, window_start, current_timestamp, withscores=True
-        )
+        raw_results = self._routed_reads(
+            lambda pipe: pipe.zrangebyscore(
+                tx_key, window_start, current_timestamp, withscores=True
+            )
+        )[0]
 
         # Parse results: member format is "timestamp:amount"
-        transactions = []
-        for member, score in raw_results:
-            timestamp_str, amount_str = member.split(":")
-            transactions.append((int(timestamp_str), float(amount_str)))
-
-        # Sort by timestamp descending (newest first)
-        transactions.sort(reverse=True, key=lambda x: x[0])
-
-        return transactions
+        return self._decode_history(raw_results)
 
     def delete_user_data(self, user_id: str) -> int:
         """
         Delete all feature data for a user.
 
-        Used for GDPR compliance / right to be forgotten.
+        Used for GDPR compliance / right to be forgotten. Every registered
+        per-user key (USER_KEY_SUFFIXES) is removed with UNLINK: the keys
+        disappear at once and their memory is reclaimed by a background
+        thread, so large windows don't block the server. Batches of users:
+        see erasure.bulk_erase.
 
         Args:
             user_id: User identifier
 
         Returns:
-            Number of keys deleted (should be 2)
+            Number of keys deleted (0 if the user has no data)
 
         Example:
             >>> deleted = store.delete_user_data("u12345")
             >>> print(f"Deleted {deleted} keys")
         """
-        tx_key = self._get_tx_history_key(user_id)
-        avg_key = self._get_avg_spend_key(user_id)
+        deleted = self.client.unlink(*user_keys(user_id))
+        self._invalidate_near_cache([user_id])
+        return deleted
+
+    def delete_users_data(self, user_ids: Sequence[str]) -> List[int]:
+        """
+        Delete all feature data for many users in one round trip.
+
+        One UNLINK per user on a non-transactional pipeline (see
+        delete_user_data).
+
+        Args:
+            user_ids: User identifiers
+
+        Returns:
+            Keys deleted per user, aligned with user_ids
+        """
+        if not user_ids:
+            return []
 
-        return self.client.delete(tx_key, avg_key)
+        pipe = self.client.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.unlink(*user_keys(user_id))
+        deleted = pipe.execute()
+        self._invalidate_near_cache(user_ids)
+        return deleted
 
     def health_check(self) -> Dict[str, any]:
         """
         Check Redis connection health and get statistics.
 
         Returns:
-            Dictionary with health metrics
+            Dictionary with health metrics, including connection-pool usage
+            (pool_in_use, pool_idle, pool_max)
 
         Example:
             >>> health = store.health_check()
             >>> print(health)
-            {'status': 'healthy', 'ping_ms': 0.5, 'connected_clients': 10}
+            {'status': 'healthy', 'ping_ms': 0.5, 'connected_clients': 10, 'pool_in_use': 2, ...}
         """
         try:
             start = time.time()
@@ -327,11 +1558,15 @@ class RedisFeatureStore:
                 "ping_ms": round(ping_ms, 2),
                 "connected_clients": info.get("connected_clients", -1),
                 "total_commands_processed": info.get("total_commands_processed", -1),
+                **self._pool_stats(),
+                **self._replica_stats(),
             }
         except Exception as e:
             return {
                 "status": "unhealthy",
                 "error": str(e),
+                **self._pool_stats(),
+                **self._replica_stats(),
             }
 
     def close(self) -> None:
@@ -340,7 +1575,24 @@ class RedisFeatureStore:
 
         Call this when shutting down the application.
         """
+        self._heartbeat_stop.set()
+        if self._heartbeat_thread is not None:
+            self._heartbeat_thread.join()
+        if self._hedge_pool is not None:
+            self._hedge_pool.shutdown(wait=False)
+        for pool in self.replica_pools:
+            pool.disconnect()
         self.pool.disconnect()
 
 
-__all__ = ["RedisFeatureStore"]
+__all__ = [
+    "KEY_LAYOUTS",
+    "USER_KEY_SUFFIXES",
+    "WINDOW_MODES",
+    "FeatureStoreBase",
+    "RedisFeatureStore",
+    "key_user_id",
+    "register_user_key",
+    "user_key",
+    "user_keys",
+]
@@ -0,0 +1,89 @@
+"""
+Velocity Window Configuration
+
+Named look-back windows for which the feature store returns a transaction
+count and amount sum in one server-side call (get_velocity), declared in
+configs/redis_config.yaml:
+
+    velocity_windows:
+      1h: 1
+      6h: 6
+      24h: 24
+      7d: 168
+
+Window names become feature suffixes (trans_count_1h, amt_sum_1h, ...);
+values are hours.
+
+Author: PayShield-ML Team
+"""
+
+import re
+from pathlib import Path
+from typing import Any, Dict, Mapping
+
+import yaml
+
+
+# Window returned when none is configured: the 24h window of trans_count_24h
+DEFAULT_VELOCITY_WINDOWS: Dict[str, int] = {"24h": 86400}
+
+_WINDOW_NAME = re.compile(r"^[A-Za-z0-9_]+$")
+
+
+def validate_velocity_windows(windows: Mapping[str, Any]) -> Dict[str, int]:
+    """
+    Check window names and durations.
+
+    Args:
+        windows: Window name -> duration in seconds
+
+    Returns:
+        Window name -> duration in seconds (int)
+
+    Raises:
+        ValueError: On an empty mapping, a name that is not a valid feature
+                    suffix, or a non-positive duration
+    """
+    if not windows:
+        raise ValueError("at least one velocity window is required")
+
+    validated = {}
+    for name, seconds in windows.items():
+        name = str(name)
+        if not _WINDOW_NAME.match(name):
+            raise ValueError(f"invalid velocity window name {name!r}")
+        if int(seconds) <= 0 or int(seconds) != seconds:
+            raise ValueError(f"velocity window {name!r} must be a positive whole number of seconds")
+        validated[name] = int(seconds)
+    return validated
+
+
+def load_velocity_windows(config_path: str = "configs/redis_config.yaml") -> Dict[str, int]:
+    """
+    Read the velocity windows from the Redis config file.
+
+    Args:
+        config_path: YAML file with a `velocity_windows` mapping (name -> hours)
+
+    Returns:
+        Window name -> duration in seconds; DEFAULT_VELOCITY_WINDOWS if the
+        file or the key is missing
+
+    Example:
+        >>> load_velocity_windows()
+        {'1h': 3600, '6h': 21600, '24h': 86400, '7d': 604800}
+    """
+    path = Path(config_path)
+    if not path.exists():
+        return dict(DEFAULT_VELOCITY_WINDOWS)
+
+    with open(path, "r") as f:
+        config = yaml.safe_load(f) or {}
+
+    hours = config.get("velocity_windows")
+    if not hours:
+        return dict(DEFAULT_VELOCITY_WINDOWS)
+    return validate_velocity_windows({name: h * 3600 for name, h in hours.items()})
+
+
+__all__ = ["DEFAULT_VELOCITY_WINDOWS", "load_velocity_windows", "validate_velocity_windows"]
@@ -0,0 +1,285 @@
+"""
+Flattened Tree-Ensemble Evaluator.
+
+Pure-numpy scoring of a trained XGBoost binary classifier without building a
+DMatrix or calling into the booster.
+
+Export:
+    The booster's JSON dump is flattened into one set of node arrays shared by
+    all trees (feature index, threshold, left/right child, default direction,
+    leaf value). Leaves point to themselves so every tree can be walked for the
+    same fixed number of steps.
+
+Evaluation:
+    For scoring, each tree is padded to a complete binary tree of the ensemble's
+    maximum depth (heap order: children of node i are 2i+1 and 2i+2). A batch is
+    then evaluated level by level for all rows and all trees at once with a few
+    `take` calls per level.
+
+Numerics follow the XGBoost CPU predictor exactly: features are compared as
+float32 (`x < threshold` goes left, NaN follows the default direction), leaf
+values are accumulated tree by tree in float32 starting from the base margin,
+and the logistic link uses the C library's `expf` (the routine the XGBoost
+binary itself calls). Probabilities are therefore bit-identical to
+`XGBClassifier.predict_proba`. If libm cannot be loaded, exp is evaluated in
+float64 and rounded, which can differ from XGBoost by 1 ulp in rare cases.
+"""
+
+import ctypes
+import ctypes.util
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+
+# Padding to a complete tree costs O(2^depth) nodes per tree
+MAX_PADDED_DEPTH = 12
+
+SUPPORTED_OBJECTIVES = ("binary:logistic",)
+
+
+def _load_expf() -> Optional[Callable[[float], float]]:
+    """Return libm's single-precision exp, or None if unavailable."""
+    try:
+        libm = ctypes.CDLL(ctypes.util.find_library("m"))
+        expf = libm.expf
+    except (OSError, AttributeError, TypeError):
+        return None
+    expf.restype = ctypes.c_float
+    expf.argtypes = [ctypes.c_float]
+    return expf
+
+
+_EXPF = _load_expf()
+
+
+def _exp_neg(margin: np.ndarray) -> np.ndarray:
+    """float32 exp(-margin), rounded exactly as XGBoost's sigmoid does."""
+    if _EXPF is None:
+        return np.exp(-margin.astype(np.float64)).astype(np.float32)
+    return np.fromiter((_EXPF(-v) for v in margin.tolist()), dtype=np.float32, count=len(margin))
+
+
+class FlatTreeEnsemble:
+    """
+    Flat-array representation of a gradient-boosted tree ensemble.
+
+    Example:
+        >>> forest = FlatTreeEnsemble.from_xgboost(pipeline.named_steps["model"])
+        >>> forest.predict_proba(X)  # == model.predict_proba(X)
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        default_left: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        base_margin: float,
+        n_features: int,
+    ) -> None:
+        """
+        Initialize from node arrays (one entry per node across all trees).
+
+        Args:
+            feature: Split feature index (ignored for leaves)
+            threshold: Split threshold; rows with x < threshold go left
+            left: Global index of the left child (self for leaves)
+            right: Global index of the right child (self for leaves)
+            default_left: Direction taken when the feature value is NaN
+            value: Leaf value (0 for internal nodes)
+            roots: Global index of each tree's root node, in boosting order
+            base_margin: Initial margin added before the first tree
+            n_features: Number of input features expected by the model
+        """
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float32)
+        self.left = np.asarray(left, dtype=np.intp)
+        self.right = np.asarray(right, dtype=np.intp)
+        self.default_left = np.asarray(default_left, dtype=bool)
+        self.value = np.asarray(value, dtype=np.float32)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.base_margin = np.float32(base_margin)
+        self.n_features = int(n_features)
+        self.n_trees = len(self.roots)
+
+        self.is_leaf = (self.left == np.arange(len(self.left))) & (self.left == self.right)
+        self.max_depth = self._max_depth()
+        if self.max_depth > MAX_PADDED_DEPTH:
+            raise ValueError(
+                f"Tree depth {self.max_depth} exceeds flat layout limit {MAX_PADDED_DEPTH}"
+            )
+        self._build_heap()
+
+    @classmethod
+    def from_xgboost(cls, model: Any) -> "FlatTreeEnsemble":
+        """
+        Export a trained XGBClassifier (or Booster) into flat arrays.
+
+        Args:
+            model: Fitted xgboost.XGBClassifier or xgboost.Booster
+
+        Raises:
+            ValueError: If the model uses features the evaluator does not
+                        reproduce (non-logistic objective, dart, categorical
+                        splits, multi-output, non-NaN missing value)
+        """
+        booster = model.get_booster() if hasattr(model, "get_booster") else model
+
+        missing = getattr(model, "missing", np.nan)
+        if missing is not None and not np.isnan(missing):
+            raise ValueError("Only missing=NaN is supported")
+
+        learner = json.loads(booster.save_raw("json"))["learner"]
+        objective = learner["objective"]["name"]
+        if objective not in SUPPORTED_OBJECTIVES:
+            raise ValueError(f"Unsupported objective: {objective}")
+
+        params = learner["learner_model_param"]
+        if int(params.get("num_class", 0)) > 1 or int(params.get("num_target", 1)) > 1:
+            raise ValueError("Only single-output models are supported")
+
+        booster_params = learner["gradient_booster"]
+        if booster_params["name"] != "gbtree":
+            raise ValueError(f"Unsupported booster: {booster_params['name']}")
+        trees: List[Dict[str, Any]] = booster_params["model"]["trees"]
+
+        # Honour early stopping the same way XGBClassifier.predict_proba does
+        best_iteration = booster.attr("best_iteration")
+        if best_iteration is not None:
+            indptr = booster_params["model"]["iteration_indptr"]
+            trees = trees[: indptr[int(best_iteration) + 1]]
+
+        # XGBoost >= 3 stores base_score as a vector literal, e.g. "[5E-1]"
+        base_score = float(params["base_score"].strip("[]"))
+        base_margin = np.float32(-np.log(np.float32(1.0) / np.float32(base_score) - 1.0))
+
+        features, thresholds, lefts, rights, defaults, values, roots = [], [], [], [], [], [], []
+        offset = 0
+        for tree in trees:
+            if any(tree.get("split_type", [])):
+                raise ValueError("Categorical splits are not supported")
+
+            left = np.asarray(tree["left_children"], dtype=np.intp)
+            right = np.asarray(tree["right_children"], dtype=np.intp)
+            conditions = np.asarray(tree["split_conditions"], dtype=np.float32)
+            leaf = left == -1
+            local = np.arange(len(left))
+
+            # Leaf values are stored in split_conditions for leaf nodes
+            features.append(np.where(leaf, 0, tree["split_indices"]))
+            thresholds.append(np.where(leaf, np.float32(0), conditions))
+            lefts.append(np.where(leaf, local, left) + offset)
+            rights.append(np.where(leaf, local, right) + offset)
+            defaults.append(np.asarray(tree["default_left"], dtype=bool))
+            values.append(np.where(leaf, conditions, np.float32(0)))
+            roots.append(offset)
+            offset += len(left)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            default_left=np.concatenate(defaults),
+            value=np.concatenate(values),
+            roots=np.asarray(roots),
+            base_margin=base_margin,
+            n_features=int(params["num_feature"]),
+        )
+
+    def _max_depth(self) -> int:
+        """Depth of the deepest leaf (root-only trees have depth 0)."""
+        nodes = self.roots
+        depth = 0
+        while not self.is_leaf[nodes].all():
+            nodes = np.concatenate([self.left[nodes], self.right[nodes]])
+            depth += 1
+        return depth
+
+    def _build_heap(self) -> None:
+        """Pad every tree to a complete binary tree of depth max_depth."""
+        depth = self.max_depth
+        n_internal = 2**depth - 1
+        heap_feature = np.zeros((self.n_trees, n_internal), dtype=np.intp)
+        heap_threshold = np.zeros((self.n_trees, n_internal), dtype=np.float32)
+        heap_default = np.zeros((self.n_trees, n_internal), dtype=bool)
+
+        # Level by level: node ids of each heap slot (leaves repeat themselves)
+        level = self.roots[:, None]
+        for d in range(depth):
+            start = 2**d - 1
+            heap_feature[:, start : start + level.shape[1]] = self.feature[level]
+            heap_threshold[:, start : start + level.shape[1]] = self.threshold[level]
+            heap_default[:, start : start + level.shape[1]] = self.default_left[level]
+            children = np.empty((self.n_trees, 2 * level.shape[1]), dtype=np.intp)
+            children[:, 0::2] = self.left[level]
+            children[:, 1::2] = self.right[level]
+            level = children
+
+        # A leaf reached early is copied into every slot below it, so the
+        # padded splits never change the result
+        self._heap_feature = heap_feature.ravel()
+        self._heap_threshold = heap_threshold.ravel()
+        self._heap_default = heap_default.ravel()
+        self._heap_leaf = self.value[level].ravel()
+        self._internal_offsets = (np.arange(self.n_trees) * n_internal)[None, :]
+        self._leaf_offsets = (np.arange(self.n_trees) * 2**depth)[None, :]
+
+    def predict_margin(self, X: np.ndarray) -> np.ndarray:
+        """
+        Raw margin (log-odds) for each row.
+
+        Args:
+            X: Feature matrix of shape (n_rows, n_features)
+
+        Returns:
+            float32 array of shape (n_rows,)
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected input of shape (n, {self.n_features}), got {X.shape}")
+
+        n_rows = X.shape[0]
+        flat_x = X.ravel()
+        row_offsets = (np.arange(n_rows, dtype=np.intp) * self.n_features)[:, None]
+        has_missing = bool(np.isnan(flat_x).any())
+
+        position = np.zeros((n_rows, self.n_trees), dtype=np.intp)
+        for _ in range(self.max_depth):
+            node = self._internal_offsets + position
+            x = flat_x.take(row_offsets + self._heap_feature.take(node))
+            go_left = x < self._heap_threshold.take(node)
+            if has_missing:
+                go_left = np.where(np.isnan(x), self._heap_default.take(node), go_left)
+            position = 2 * position + 2 - go_left
+
+        leaves = self._heap_leaf.take(self._leaf_offsets + position - (2**self.max_depth - 1))
+
+        # Sequential float32 accumulation, base margin first (as in XGBoost)
+        margins = np.empty((n_rows, self.n_trees + 1), dtype=np.float32)
+        margins[:, 0] = self.base_margin
+        margins[:, 1:] = leaves
+        return np.cumsum(margins, axis=1, dtype=np.float32)[:, -1]
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        Class probabilities, same layout and dtype as XGBClassifier.predict_proba.
+
+        Args:
+            X: Feature matrix of shape (n_rows, n_features)
+
+        Returns:
+            float32 array of shape (n_rows, 2)
+        """
+        margin = self.predict_margin(X)
+        one = np.float32(1.0)
+        positive = one / (one + _exp_neg(margin))
+        return np.vstack((one - positive, positive)).T
+
+
+__all__ = ["FlatTreeEnsemble", "MAX_PADDED_DEPTH"]
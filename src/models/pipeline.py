@@ -12,7 +12,7 @@ Derived from notebook analysis:
 - Geo: Haversine distance
 """
 
-from typing import Dict
+from typing import Callable, Dict
 
 import numpy as np
 import pandas as pd
@@ -24,6 +24,56 @@ from sklearn.preprocessing import RobustScaler
 from xgboost import XGBClassifier
 
 
+# Raw dataset formats; other strings fall back to pandas' format inference
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+DOB_FORMAT = "%Y-%m-%d"
+
+# Cyclical encodings of every hour and weekday (sin/cos of 2π·value/period)
+HOUR_SIN = np.sin(2 * np.pi * np.arange(24) / 24)
+HOUR_COS = np.cos(2 * np.pi * np.arange(24) / 24)
+DAY_SIN = np.sin(2 * np.pi * np.arange(7) / 7)
+DAY_COS = np.cos(2 * np.pi * np.arange(7) / 7)
+
+GENDER_MAP = {"M": 1, "F": 0}
+
+EARTH_RADIUS_KM = 6371
+
+
+def _parse_dates(values: pd.Series, fmt: str, unique: bool = False):
+    """
+    Parse date strings with an explicit format (pandas' inference if any
+    value does not match it).
+
+    Args:
+        values: Column of date strings
+        fmt: Expected strptime format
+        unique: Parse each distinct value once (columns with few distinct
+                values, like dob)
+
+    Returns:
+        Datetimes aligned with values (Series, or DatetimeIndex if unique)
+    """
+    codes = None
+    if unique:
+        codes, values = pd.factorize(values)
+    try:
+        parsed = pd.to_datetime(values, format=fmt)
+    except (TypeError, ValueError):
+        parsed = pd.to_datetime(values)
+    if codes is None:
+        return parsed
+    # Missing values (code -1) become NaT
+    return parsed.take(codes, allow_fill=True, fill_value=pd.NaT)
+
+
+def _cyclical(values: pd.Series, table: np.ndarray, fn: Callable, period: int) -> np.ndarray:
+    """table[values], or fn(2π·values/period) for values with gaps (NaT timestamps)."""
+    values = values.to_numpy()
+    if values.dtype.kind in "iu":
+        return table[values]
+    return fn(2 * np.pi * values / period)
+
+
 class FraudFeatureExtractor(BaseEstimator, TransformerMixin):
     """
     Custom transformer to compute derived features for fraud detection.
@@ -34,6 +84,12 @@ class FraudFeatureExtractor(BaseEstimator, TransformerMixin):
     3. Log transformations (amount, time diff)
     4. Age calculation
     5. Ratio features (if not already computed)
+
+    transform() is vectorized for large frames (training, batch scoring):
+    dates are parsed with the dataset's formats (dob once per distinct
+    value), sin/cos come from 24 / 7 entry tables, the distance is computed
+    in four reused buffers, and the input columns are shared with the
+    output instead of copied.
     """
 
     def __init__(self):
@@ -50,31 +106,38 @@ class FraudFeatureExtractor(BaseEstimator, TransformerMixin):
             X: DataFrame with raw columns
 
         Returns:
-            DataFrame with additional feature columns
+            DataFrame with additional feature columns (X itself is not modified)
+
+        Raises:
+            ValueError: If gender has values other than "M" and "F"
         """
-        # Avoid modifying original dataframe
-        X = X.copy()
+        # New frame sharing X's columns: assignments below never reach X
+        X = X.copy(deep=False)
 
         # 1. Date/Time Features
         if "trans_date_trans_time" in X.columns:
             # Convert to datetime if string
             if X["trans_date_trans_time"].dtype == "object":
-                X["trans_date_trans_time"] = pd.to_datetime(X["trans_date_trans_time"])
+                X["trans_date_trans_time"] = _parse_dates(
+                    X["trans_date_trans_time"], TIMESTAMP_FORMAT
+                )
 
             dt = X["trans_date_trans_time"].dt
 
             # Cyclical encoding for hour (0-23)
-            X["hour_sin"] = np.sin(2 * np.pi * dt.hour / 24)
-            X["hour_cos"] = np.cos(2 * np.pi * dt.hour / 24)
+            hour = dt.hour
+            X["hour_sin"] = _cyclical(hour, HOUR_SIN, np.sin, 24)
+            X["hour_cos"] = _cyclical(hour, HOUR_COS, np.cos, 24)
 
             # Cyclical encoding for day of week (0-6)
-            X["day_sin"] = np.sin(2 * np.pi * dt.dayofweek / 7)
-            X["day_cos"] = np.cos(2 * np.pi * dt.dayofweek / 7)
+            day = dt.dayofweek
+            X["day_sin"] = _cyclical(day, DAY_SIN, np.sin, 7)
+            X["day_cos"] = _cyclical(day, DAY_COS, np.cos, 7)
 
             # Calculate Age from DOB
             if "dob" in X.columns:
                 if X["dob"].dtype == "object":
-                    X["dob"] = pd.to_datetime(X["dob"])
+                    X["dob"] = _parse_dates(X["dob"], DOB_FORMAT, unique=True)
                 # Approximation: (Dataset Year - DOB Year)
                 # Using transaction year
                 X["age"] = dt.year - X["dob"].dt.year
@@ -91,25 +154,59 @@ class FraudFeatureExtractor(BaseEstimator, TransformerMixin):
 
         # 4. Gender Mapping (M=1, F=0)
         if "gender" in X.columns:
-            X["gender"] = X["gender"].map({"M": 1, "F": 0}).astype(int)
+            codes, values = pd.factorize(X["gender"])
+            try:
+                lookup = np.array([GENDER_MAP[value] for value in values], dtype=np.int64)
+            except KeyError as e:
+                raise ValueError(f"Unknown gender value: {e}") from e
+            if (codes < 0).any():
+                raise ValueError("Missing gender value")
+            X["gender"] = lookup[codes]
 
         return X
 
-    def _haversine_distance(self, lat1, lon1, lat2, lon2):
+    def _haversine_distance(self, lat1, lon1, lat2, lon2) -> np.ndarray:
         """
         Calculate the great circle distance between two points
         on the earth (specified in decimal degrees).
-        """
-        # Convert decimal degrees to radians
-        lat1, lon1, lat2, lon2 = map(np.radians, [lat1, lon1, lat2, lon2])
 
-        # Haversine formula
-        dlon = lon2 - lon1
-        dlat = lat2 - lat1
-        a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
-        c = 2 * np.arcsin(np.sqrt(a))
-        r = 6371  # Radius of earth in kilometers
-        return c * r
+        Same operations, in the same order, as the textbook expression
+        2·r·arcsin(sqrt(sin²(Δlat/2) + cos(lat1)·cos(lat2)·sin²(Δlon/2))),
+        but in four buffers updated in place: float32 if all coordinates
+        are float32, else float64.
+        """
+        columns = [np.asarray(c) for c in (lat1, lat2, lon1, lon2)]
+        dtype = np.float32 if all(c.dtype == np.float32 for c in columns) else np.float64
+        lat1, lat2, lon1, lon2 = (c.astype(dtype, copy=False) for c in columns)
+
+        # sin²(Δlat/2)
+        a = np.radians(lat1)
+        b = np.radians(lat2)
+        dist = np.subtract(b, a)
+        dist /= 2
+        np.sin(dist, out=dist)
+        np.square(dist, out=dist)
+
+        # cos(lat1)·cos(lat2)
+        np.cos(a, out=a)
+        np.cos(b, out=b)
+        a *= b
+
+        # sin²(Δlon/2)
+        np.radians(lon1, out=b)
+        dlon = np.radians(lon2)
+        dlon -= b
+        dlon /= 2
+        np.sin(dlon, out=dlon)
+        np.square(dlon, out=dlon)
+
+        a *= dlon
+        dist += a
+        np.sqrt(dist, out=dist)
+        np.arcsin(dist, out=dist)
+        dist *= 2
+        dist *= EARTH_RADIUS_KM
+        return dist
 
 
 def create_fraud_pipeline(params: Dict[str, any]) -> Pipeline:
@@ -177,3 +274,23 @@ def create_fraud_pipeline(params: Dict[str, any]) -> Pipeline:
     )
 
     return pipeline
+
+
+def limit_model_threads(pipeline: Pipeline, n_threads: int) -> None:
+    """
+    Cap the number of threads XGBoost uses for inference.
+
+    The training config uses n_jobs=-1 (all cores). When several serving
+    processes share a machine, each would spawn one OpenMP thread per core
+    and oversubscribe the CPUs, so servers pin a per-process budget instead.
+
+    Args:
+        pipeline: Fitted Pipeline with a 'model' step
+        n_threads: Threads per process (>= 1)
+    """
+    if n_threads < 1:
+        raise ValueError("n_threads must be >= 1")
+
+    model = pipeline.named_steps["model"]
+    model.set_params(n_jobs=n_threads)
+    model.get_booster().set_param({"nthread": n_threads})
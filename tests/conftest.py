@@ -4,6 +4,8 @@ Pytest Configuration and Fixtures
 Provides shared fixtures for testing data ingestion and feature store.
 """
 
+import asyncio
+import inspect
 import os
 from typing import Generator
 
@@ -11,6 +13,8 @@ import pytest
 import redis
 from redis import Redis
 
+from src.features.async_store import AsyncRedisFeatureStore
+from src.features.memory_store import InMemoryFeatureStore
 from src.features.store import RedisFeatureStore
 
 
@@ -60,6 +64,58 @@ def feature_store(redis_client: Redis) -> RedisFeatureStore:
     # Cleanup is handled by redis_client fixture
 
 
+@pytest.fixture
+def memory_feature_store() -> InMemoryFeatureStore:
+    """
+    Provide an empty InMemoryFeatureStore (no Redis required).
+    """
+    return InMemoryFeatureStore()
+
+
+class SyncStoreAdapter:
+    """Runs an async store's coroutine methods on a private event loop."""
+
+    def __init__(self, store, loop: asyncio.AbstractEventLoop) -> None:
+        self._store = store
+        self._loop = loop
+
+    def __getattr__(self, name):
+        attr = getattr(self._store, name)
+        if inspect.iscoroutinefunction(attr):
+            return lambda *args, **kwargs: self._loop.run_until_complete(attr(*args, **kwargs))
+        return attr
+
+    def __setattr__(self, name, value):
+        if name.startswith("_"):
+            super().__setattr__(name, value)
+        else:
+            setattr(self._store, name, value)
+
+
+@pytest.fixture
+def async_feature_store(redis_client: Redis) -> Generator[SyncStoreAdapter, None, None]:
+    """
+    Provide an AsyncRedisFeatureStore behind a synchronous facade.
+
+    Lets the RedisFeatureStore test scenarios run unchanged against the
+    asyncio implementation. The test database is flushed first, since the
+    scenarios reuse the user ids of the synchronous suite.
+    """
+    redis_client.flushdb()
+    loop = asyncio.new_event_loop()
+    store = AsyncRedisFeatureStore(
+        host=os.getenv("REDIS_HOST", "localhost"),
+        port=int(os.getenv("REDIS_PORT", "6379")),
+        db=15,  # Test database
+    )
+    loop.run_until_complete(store.connect())
+
+    yield SyncStoreAdapter(store, loop)
+
+    loop.run_until_complete(store.close())
+    loop.close()
+
+
 @pytest.fixture
 def sample_transaction() -> dict:
     """Provide a valid sample transaction for testing."""
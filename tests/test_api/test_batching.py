@@ -0,0 +1,122 @@
+"""
+Tests for adaptive micro-batching of single predictions.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.api.batching import MicroBatcher
+
+
+def make_score_fn(calls):
+    """Scoring stub: probability = row["x"] / 100, fails rows with x < 0."""
+
+    def score_fn(rows):
+        calls.append(len(rows))
+        probs = np.array([row["x"] / 100 for row in rows], dtype=np.float64)
+        errors = {i: "negative x" for i, row in enumerate(rows) if row["x"] < 0}
+        return probs, errors
+
+    return score_fn
+
+
+class TestMicroBatcher:
+    """Test suite for MicroBatcher."""
+
+    def test_concurrent_requests_are_coalesced(self):
+        """Test that concurrent submissions share batches and get their own results."""
+        calls = []
+
+        async def scenario():
+            batcher = MicroBatcher(make_score_fn(calls), max_wait_ms=5.0, max_batch_size=32)
+            await batcher.start()
+            results = await asyncio.gather(*(batcher.submit({"x": i}) for i in range(20)))
+            await batcher.stop()
+            return results, batcher.stats()
+
+        results, stats = asyncio.run(scenario())
+
+        assert results == pytest.approx([i / 100 for i in range(20)])
+        assert sum(calls) == 20
+        assert len(calls) < 20  # At least some requests were coalesced
+        assert stats["items"] == 20
+        assert stats["batches"] == len(calls)
+
+    def test_low_traffic_dispatches_immediately(self):
+        """Test that isolated requests do not wait for a batch window."""
+        calls = []
+
+        async def scenario():
+            batcher = MicroBatcher(make_score_fn(calls), max_wait_ms=200.0)
+            await batcher.start()
+            results = []
+            for i in range(3):
+                results.append(await batcher.submit({"x": i}))
+                await asyncio.sleep(0.25)  # Slower than max_wait
+            await batcher.stop()
+            return results, batcher.stats()
+
+        results, stats = asyncio.run(scenario())
+
+        assert calls == [1, 1, 1]
+        assert stats["current_window_ms"] == 0.0
+        # Would be ~200ms if the batcher waited out the window
+        assert stats["queue_wait_ms_p99"] < 100.0
+
+    def test_row_error_only_fails_that_caller(self):
+        """Test that a per-row scoring error is raised only for its request."""
+        calls = []
+
+        async def scenario():
+            batcher = MicroBatcher(make_score_fn(calls), max_wait_ms=5.0)
+            await batcher.start()
+            results = await asyncio.gather(
+                batcher.submit({"x": 10}),
+                batcher.submit({"x": -1}),
+                batcher.submit({"x": 30}),
+                return_exceptions=True,
+            )
+            await batcher.stop()
+            return results
+
+        results = asyncio.run(scenario())
+
+        assert results[0] == pytest.approx(0.10)
+        assert isinstance(results[1], RuntimeError)
+        assert results[2] == pytest.approx(0.30)
+
+    def test_batch_limit_adapts_to_load(self):
+        """Test AIMD growth on full batches and shrinkage on sparse ones."""
+        batcher = MicroBatcher(make_score_fn([]), min_batch_size=4, max_batch_size=16)
+
+        for _ in range(5):
+            batcher._adapt(batcher.batch_limit)
+        assert batcher.batch_limit == 16
+
+        for _ in range(5):
+            batcher._adapt(1)
+        assert batcher.batch_limit == 4
+
+    def test_stats_structure(self):
+        """Test that metrics expose batch sizes and queue wait time."""
+        batcher = MicroBatcher(make_score_fn([]))
+        stats = batcher.stats()
+
+        for key in (
+            "batches",
+            "batch_size_avg",
+            "batch_size_histogram",
+            "queue_wait_ms_p50",
+            "queue_wait_ms_p99",
+            "current_window_ms",
+            "current_batch_limit",
+        ):
+            assert key in stats
+
+    def test_submit_requires_start(self):
+        """Test that submitting before start raises."""
+        batcher = MicroBatcher(make_score_fn([]))
+        with pytest.raises(RuntimeError):
+            asyncio.run(batcher.submit({"x": 1}))
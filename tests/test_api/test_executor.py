@@ -0,0 +1,240 @@
+"""
+Tests for the inference executor (off-loop scoring and blocking I/O).
+"""
+
+import asyncio
+import multiprocessing
+import threading
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.api import executor as executor_module
+from src.api.batching import MicroBatcher
+from src.api.executor import InferenceExecutor
+from src.api.scoring import predict_proba_batch
+from src.models.compiled import CompiledFraudPipeline
+from src.models.pipeline import create_fraud_pipeline
+
+
+@pytest.fixture(scope="module")
+def fitted_pipeline():
+    """Small trained pipeline on synthetic transactions."""
+    np.random.seed(42)
+    n_samples = 200
+    X_train = pd.DataFrame(
+        {
+            "trans_date_trans_time": pd.date_range("2019-01-01", periods=n_samples, freq="h"),
+            "amt": np.random.uniform(10, 500, n_samples),
+            "lat": np.random.uniform(30, 45, n_samples),
+            "long": np.random.uniform(-120, -70, n_samples),
+            "merch_lat": np.random.uniform(30, 45, n_samples),
+            "merch_long": np.random.uniform(-120, -70, n_samples),
+            "job": np.random.choice(["Engineer, biomedical", "Data scientist"], n_samples),
+            "category": np.random.choice(["grocery_pos", "gas_transport"], n_samples),
+            "gender": np.random.choice(["M", "F"], n_samples),
+            "dob": ["1990-01-01"] * n_samples,
+            "trans_count_24h": np.random.randint(0, 10, n_samples),
+            "amt_to_avg_ratio_24h": np.random.uniform(0.5, 2.0, n_samples),
+            "amt_relative_to_all_time": np.random.uniform(0.5, 2.0, n_samples),
+        }
+    )
+    y_train = np.random.randint(0, 2, n_samples)
+
+    pipeline = create_fraud_pipeline({"max_depth": 3, "n_estimators": 10})
+    pipeline.fit(X_train, y_train)
+    return pipeline
+
+
+@pytest.fixture
+def rows():
+    """Raw model input rows (one of them invalid)."""
+    base = {
+        "trans_date_trans_time": "2020-06-15 14:30:00",
+        "amt": 150.0,
+        "lat": 40.7128,
+        "long": -74.0060,
+        "merch_lat": 40.7200,
+        "merch_long": -74.0100,
+        "job": "Engineer, biomedical",
+        "category": "grocery_pos",
+        "gender": "M",
+        "dob": "1985-03-20",
+        "trans_count_24h": 3,
+        "amt_to_avg_ratio_24h": 1.2,
+        "amt_relative_to_all_time": 1.0,
+    }
+    return [base, dict(base, amt=900.0, gender="F"), dict(base, gender="X")]
+
+
+class TestInferenceExecutor:
+    """Test suite for InferenceExecutor."""
+
+    @pytest.mark.parametrize("mode", ["inline", "thread"])
+    def test_score_matches_inline(self, fitted_pipeline, rows, mode):
+        """Test that pooled scoring returns exactly the inline results."""
+        scorer = CompiledFraudPipeline(fitted_pipeline)
+        expected, expected_errors = predict_proba_batch(scorer, rows)
+
+        executor = InferenceExecutor(mode, scorer=scorer, cpu_workers=2)
+        executor.start()
+        try:
+            probs, errors = asyncio.run(executor.score(rows))
+        finally:
+            executor.shutdown()
+
+        np.testing.assert_array_equal(probs, expected)
+        assert errors.keys() == expected_errors.keys() == {2}
+        assert executor.stats()["cpu_tasks"] == 1
+
+    def test_process_mode_loads_model_per_worker(self, fitted_pipeline, rows, tmp_path):
+        """Test that process workers load the artifact and score identically."""
+        model_path = tmp_path / "model.pkl"
+        joblib.dump(fitted_pipeline, model_path)
+        expected, _ = predict_proba_batch(CompiledFraudPipeline(fitted_pipeline), rows)
+
+        executor = InferenceExecutor("process", cpu_workers=1, model_path=str(model_path))
+        executor.start()
+        try:
+            probs, errors = asyncio.run(executor.score(rows))
+        finally:
+            executor.shutdown()
+
+        np.testing.assert_array_equal(probs, expected)
+        assert set(errors) == {2}
+
+    def test_worker_init_shares_pipeline_and_budgets_threads(
+        self, fitted_pipeline, tmp_path, monkeypatch
+    ):
+        """Test that a worker loads the artifact once, for scorer and explainer, on its threads."""
+        model_path = tmp_path / "model.pkl"
+        joblib.dump(fitted_pipeline, model_path)
+        monkeypatch.setattr(executor_module, "_worker", {})
+        monkeypatch.setattr(executor_module, "_parent", {})
+        loads = []
+        load = executor_module.joblib.load
+        monkeypatch.setattr(
+            executor_module.joblib, "load", lambda path: loads.append(path) or load(path)
+        )
+
+        executor_module._init_worker(str(model_path), False, True, 2)
+
+        scorer = executor_module._worker["scorer"]
+        assert len(loads) == 1
+        assert executor_module._worker["explainer"].pipeline is scorer
+        assert scorer.named_steps["model"].get_params()["n_jobs"] == 2
+
+    def test_worker_init_reuses_inherited_model(self, fitted_pipeline, monkeypatch):
+        """Test that a worker uses the parent's model objects instead of loading the artifact."""
+        scorer = CompiledFraudPipeline(fitted_pipeline)
+        explainer = object()
+        monkeypatch.setattr(executor_module, "_worker", {})
+        monkeypatch.setattr(
+            executor_module,
+            "_parent",
+            {"pipeline": fitted_pipeline, "scorer": scorer, "explainer": explainer},
+        )
+        monkeypatch.setattr(executor_module.joblib, "load", self.fail_load)
+
+        executor_module._init_worker("missing.pkl", True, True, 1)
+
+        assert executor_module._worker["scorer"] is scorer
+        assert executor_module._worker["explainer"] is explainer
+
+    @pytest.mark.skipif(
+        multiprocessing.get_start_method() != "fork", reason="Workers only inherit when forked"
+    )
+    def test_process_mode_reuses_preloaded_model(
+        self, fitted_pipeline, rows, tmp_path, monkeypatch
+    ):
+        """Test that forked workers score with the parent's preloaded model, without joblib.load."""
+        scorer = CompiledFraudPipeline(fitted_pipeline)
+        expected, _ = predict_proba_batch(scorer, rows)
+        monkeypatch.setattr(executor_module, "_parent", {})
+        monkeypatch.setattr(executor_module.joblib, "load", self.fail_load)
+
+        executor = InferenceExecutor(
+            "process",
+            scorer=scorer,
+            cpu_workers=1,
+            model_path=str(tmp_path / "missing.pkl"),
+            pipeline=fitted_pipeline,
+        )
+        executor.start()
+        try:
+            probs, errors = asyncio.run(executor.score(rows))
+        finally:
+            executor.shutdown()
+
+        np.testing.assert_array_equal(probs, expected)
+        assert set(errors) == {2}
+
+    @staticmethod
+    def fail_load(path):
+        raise AssertionError("model loaded again")
+
+    def test_default_thread_budget(self, monkeypatch):
+        """Test that process workers split the cores unless model_threads is given."""
+        monkeypatch.setattr(executor_module.os, "cpu_count", lambda: 8)
+
+        assert InferenceExecutor("thread", cpu_workers=4).model_threads == 2
+        assert InferenceExecutor("thread", cpu_workers=16).model_threads == 1
+        assert InferenceExecutor("thread", cpu_workers=4, model_threads=3).model_threads == 3
+
+    def test_run_io_leaves_event_loop_free(self):
+        """Test that blocking calls run outside the event-loop thread."""
+        blocker = threading.Event()
+
+        async def scenario():
+            executor = InferenceExecutor("thread", io_workers=2)
+            executor.start()
+            loop_thread = threading.get_ident()
+            call = asyncio.ensure_future(
+                executor.run_io(lambda: (blocker.wait(5), threading.get_ident()))
+            )
+
+            # The loop keeps serving other work while the call is blocked
+            await asyncio.sleep(0.01)
+            assert not call.done()
+            assert executor.stats()["io_inflight"] == 1
+            blocker.set()
+
+            _, worker_thread = await call
+            executor.shutdown()
+            return loop_thread, worker_thread
+
+        loop_thread, worker_thread = asyncio.run(scenario())
+        assert worker_thread != loop_thread
+
+    def test_micro_batcher_awaits_async_score_fn(self, fitted_pipeline, rows):
+        """Test that the micro-batcher scores off the loop through the executor."""
+        scorer = CompiledFraudPipeline(fitted_pipeline)
+        expected, _ = predict_proba_batch(scorer, rows[:2])
+
+        async def scenario():
+            executor = InferenceExecutor("thread", scorer=scorer)
+            executor.start()
+            batcher = MicroBatcher(executor.score, max_wait_ms=5.0)
+            await batcher.start()
+            results = await asyncio.gather(
+                *(batcher.submit(row) for row in rows), return_exceptions=True
+            )
+            await batcher.stop()
+            executor.shutdown()
+            return results
+
+        results = asyncio.run(scenario())
+
+        assert results[:2] == pytest.approx(list(expected))
+        assert isinstance(results[2], RuntimeError)
+
+    def test_invalid_configuration(self):
+        """Test that unknown modes and missing process artifacts are rejected."""
+        with pytest.raises(ValueError):
+            InferenceExecutor("gpu")
+        with pytest.raises(ValueError):
+            InferenceExecutor("process")
+        with pytest.raises(ValueError):
+            InferenceExecutor("thread", cpu_workers=0)
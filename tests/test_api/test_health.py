@@ -0,0 +1,168 @@
+"""
+Tests for the background health monitor and the health endpoints.
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.health import HealthMonitor
+
+
+def make_probe(results):
+    """Async health_check stub returning the next result (repeating the last)."""
+    calls = []
+
+    async def probe():
+        calls.append(len(calls))
+        result = results[min(len(calls), len(results)) - 1]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    probe.calls = calls
+    return probe
+
+
+HEALTHY = {"status": "healthy", "ping_ms": 0.4, "pool_in_use": 1, "pool_max": 200}
+
+
+class TestHealthMonitor:
+    """Test suite for HealthMonitor."""
+
+    def test_samples_in_background(self):
+        """Test that the store is checked once per interval, not per read."""
+        probe = make_probe([HEALTHY])
+
+        async def scenario():
+            monitor = HealthMonitor(probe, interval_s=0.02)
+            await monitor.start()
+            for _ in range(100):
+                assert monitor.is_healthy()
+            await asyncio.sleep(0.07)
+            await monitor.stop()
+            return monitor.snapshot()
+
+        snapshot = asyncio.run(scenario())
+
+        assert 2 <= len(probe.calls) <= 6
+        assert snapshot["healthy"]
+        assert snapshot["store"]["pool_max"] == 200
+        assert snapshot["ping_p99_ms"] == pytest.approx(0.4)
+
+    def test_failures_are_reported(self):
+        """Test unhealthy replies and probe exceptions."""
+        probe = make_probe([HEALTHY, {"status": "unhealthy", "error": "down"}, OSError("reset")])
+
+        async def scenario():
+            monitor = HealthMonitor(probe, interval_s=1.0)
+            await monitor.sample()
+            assert monitor.is_healthy()
+            await monitor.sample()
+            await monitor.sample()
+            return monitor.snapshot()
+
+        snapshot = asyncio.run(scenario())
+
+        assert not snapshot["healthy"]
+        assert snapshot["store"]["error"] == "reset"
+        assert snapshot["failures"] == snapshot["consecutive_failures"] == 2
+
+    def test_stale_snapshot_is_unhealthy(self):
+        """Test that a sample older than max_age_s no longer counts as healthy."""
+
+        async def scenario():
+            monitor = HealthMonitor(make_probe([HEALTHY]), interval_s=1.0, max_age_s=0.01)
+            await monitor.sample()
+            await asyncio.sleep(0.02)
+            return monitor.is_healthy()
+
+        assert asyncio.run(scenario()) is False
+
+    def test_hung_probe_times_out(self):
+        """Test that a check that never returns is recorded as a failure."""
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        async def scenario():
+            monitor = HealthMonitor(hang, interval_s=1.0, max_age_s=0.01)
+            return await monitor.sample()
+
+        assert asyncio.run(scenario())["status"] == "unhealthy"
+
+
+class StaticMonitor:
+    """Stands in for a running HealthMonitor with a fixed result."""
+
+    def __init__(self, healthy):
+        self.healthy = healthy
+        self.checked_at = 1700000000.0
+
+    def is_healthy(self):
+        return self.healthy
+
+    def snapshot(self):
+        return {"healthy": self.healthy, "checked_at": self.checked_at}
+
+
+class FailingStore:
+    """Feature store whose health_check must not be called while a monitor runs."""
+
+    blocking_io = False
+
+    def health_check(self):
+        raise AssertionError("live Redis check on the request path")
+
+
+class TestHealthEndpoints:
+    """Tests for /health, /health/live and /health/ready."""
+
+    @pytest.fixture
+    def api(self, monkeypatch):
+        import src.api.main as api_main
+
+        monkeypatch.setattr(api_main, "pipeline", object())
+        monkeypatch.setattr(api_main, "threshold", 0.5)
+        monkeypatch.setattr(api_main, "feature_store", FailingStore())
+        monkeypatch.setattr(api_main, "health_monitor", StaticMonitor(True))
+        return api_main
+
+    def test_health_serves_cached_snapshot(self, api):
+        """Test that /health uses the monitor's result instead of calling Redis."""
+        data = TestClient(api.app).get("/health").json()
+
+        assert data["status"] == "healthy"
+        assert data["redis_connected"] is True
+        assert data["redis_checked_at"] == 1700000000.0
+
+    def test_liveness_ignores_dependencies(self, api, monkeypatch):
+        """Test that liveness stays up without model or Redis."""
+        monkeypatch.setattr(api, "pipeline", None)
+        monkeypatch.setattr(api, "health_monitor", StaticMonitor(False))
+
+        response = TestClient(api.app).get("/health/live")
+        assert response.status_code == 200
+        assert response.json() == {"status": "alive"}
+
+    def test_readiness(self, api, monkeypatch):
+        """Test readiness across model and feature-store states."""
+        client = TestClient(api.app)
+        assert client.get("/health/ready").status_code == 200
+
+        monkeypatch.setattr(api, "health_monitor", StaticMonitor(False))
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json()["feature_store"] == "unhealthy"
+
+        # Serving without a feature store (disabled) is still ready
+        monkeypatch.setattr(api, "feature_store", None)
+        assert client.get("/health/ready").json() == {
+            "ready": True,
+            "model_loaded": True,
+            "feature_store": "disabled",
+        }
+
+        monkeypatch.setattr(api, "pipeline", None)
+        assert client.get("/health/ready").status_code == 503
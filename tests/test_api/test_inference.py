@@ -2,9 +2,16 @@
 Integration tests for FastAPI inference service.
 """
 
+import numpy as np
+import pandas as pd
 import pytest
 from fastapi.testclient import TestClient
 
+from src.api.schemas import PredictionRequest
+from src.api.scoring import resolve_features
+from src.models.compiled import CompiledFraudPipeline
+from src.models.pipeline import create_fraud_pipeline
+
 
 # Note: These tests require a trained model to be present
 # Run training first: python src/models/train.py --data_path ...
@@ -100,6 +107,288 @@ class TestPredictEndpoint:
         assert response.status_code == 422  # Unprocessable Entity
 
 
+@pytest.fixture
+def loaded_api(monkeypatch):
+    """Inject a small trained pipeline into the API globals (no Redis, no SHAP)."""
+    import src.api.main as api_main
+
+    np.random.seed(42)
+    n_samples = 200
+    X_train = pd.DataFrame(
+        {
+            "trans_date_trans_time": pd.date_range("2019-01-01", periods=n_samples, freq="h"),
+            "amt": np.random.uniform(10, 500, n_samples),
+            "lat": np.random.uniform(30, 45, n_samples),
+            "long": np.random.uniform(-120, -70, n_samples),
+            "merch_lat": np.random.uniform(30, 45, n_samples),
+            "merch_long": np.random.uniform(-120, -70, n_samples),
+            "job": np.random.choice(["Engineer, biomedical", "Data scientist"], n_samples),
+            "category": np.random.choice(["grocery_pos", "gas_transport"], n_samples),
+            "gender": np.random.choice(["M", "F"], n_samples),
+            "dob": ["1990-01-01"] * n_samples,
+            "trans_count_24h": np.random.randint(0, 10, n_samples),
+            "amt_to_avg_ratio_24h": np.random.uniform(0.5, 2.0, n_samples),
+            "amt_relative_to_all_time": np.random.uniform(0.5, 2.0, n_samples),
+        }
+    )
+    y_train = np.random.randint(0, 2, n_samples)
+
+    pipeline = create_fraud_pipeline({"max_depth": 3, "n_estimators": 10})
+    pipeline.fit(X_train, y_train)
+
+    monkeypatch.setattr(api_main, "pipeline", pipeline)
+    monkeypatch.setattr(api_main, "scorer", CompiledFraudPipeline(pipeline))
+    monkeypatch.setattr(api_main, "threshold", 0.5)
+    monkeypatch.setattr(api_main, "feature_store", None)
+    monkeypatch.setattr(api_main, "explainer", None)
+
+    return TestClient(api_main.app)
+
+
+class TestBatchPredictEndpoint:
+    """Tests for the batch prediction endpoint."""
+
+    def test_batch_returns_one_result_per_item(self, loaded_api, sample_request_data):
+        """Test that every transaction gets a prediction in request order."""
+        items = [dict(sample_request_data, amt=amt) for amt in (10.0, 150.0, 900.0)]
+        response = loaded_api.post("/v1/predict/batch", json={"transactions": items})
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["succeeded"] == 3
+        assert data["failed"] == 0
+        assert [r["index"] for r in data["results"]] == [0, 1, 2]
+        for result in data["results"]:
+            assert result["error"] is None
+            assert result["prediction"]["decision"] in ["BLOCK", "APPROVE"]
+
+    def test_batch_matches_single_predictions(self, loaded_api, sample_request_data):
+        """Test that batch scoring yields the same probabilities as /v1/predict."""
+        items = [
+            dict(sample_request_data, amt=25.0, gender="F"),
+            dict(sample_request_data, amt=480.0, trans_count_24h=7),
+            dict(sample_request_data, trans_date_trans_time="2020-06-20 03:15:00"),
+        ]
+        batch = loaded_api.post("/v1/predict/batch", json={"transactions": items}).json()
+
+        for item, result in zip(items, batch["results"]):
+            single = loaded_api.post("/v1/predict", json=item).json()
+            assert result["prediction"]["probability"] == pytest.approx(
+                single["probability"], abs=1e-7
+            )
+            assert result["prediction"]["features"] == single["features"]
+
+    def test_bad_rows_fail_alone(self, loaded_api, sample_request_data):
+        """Test that invalid rows fail individually without failing the batch."""
+        items = [
+            sample_request_data,
+            dict(sample_request_data, amt=-5.0),  # Schema violation
+            dict(sample_request_data, trans_date_trans_time="not a date"),  # Bad timestamp
+            dict(sample_request_data, gender="X"),  # Fails inside the pipeline
+            sample_request_data,
+        ]
+        response = loaded_api.post("/v1/predict/batch", json={"transactions": items})
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["succeeded"] == 2
+        assert data["failed"] == 3
+        ok = [r["index"] for r in data["results"] if r["error"] is None]
+        assert ok == [0, 4]
+        assert data["results"][0]["prediction"]["probability"] == pytest.approx(
+            data["results"][4]["prediction"]["probability"]
+        )
+        assert "Validation failed" in data["results"][1]["error"]
+        assert "Invalid timestamp" in data["results"][2]["error"]
+        assert "Prediction failed" in data["results"][3]["error"]
+
+    def test_batch_requires_model(self, api_client, sample_request_data, monkeypatch):
+        """Test that the batch endpoint returns 503 without a model."""
+        import src.api.main as api_main
+
+        monkeypatch.setattr(api_main, "pipeline", None)
+        response = api_client.post(
+            "/v1/predict/batch", json={"transactions": [sample_request_data]}
+        )
+        assert response.status_code == 503
+
+    def test_batch_size_limit(self, loaded_api, sample_request_data, monkeypatch):
+        """Test that oversized batches are rejected."""
+        import src.api.main as api_main
+
+        monkeypatch.setattr(api_main.settings, "max_batch_size", 2)
+        response = loaded_api.post(
+            "/v1/predict/batch", json={"transactions": [sample_request_data] * 3}
+        )
+        assert response.status_code == 413
+
+
+class RecordingStore:
+    """Synchronous feature-store stub recording which operations were called."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_features(self, user_id, current_timestamp=None):
+        self.calls.append("get_features")
+        return {"trans_count_24h": 3.0, "avg_spend_24h": 120.0}
+
+    def get_features_and_record(self, user_id, amount, timestamp=None):
+        self.calls.append("get_features_and_record")
+        return {"trans_count_24h": 3.0, "avg_spend_24h": 120.0}
+
+    def add_transaction(self, user_id, amount, timestamp=None):
+        self.calls.append("add_transaction")
+
+    def get_features_many(self, user_ids, timestamps):
+        self.calls.append("get_features_many")
+        return [{"trans_count_24h": 3.0, "avg_spend_24h": 120.0} for _ in user_ids]
+
+    def add_transactions(self, events):
+        self.calls.append("add_transactions")
+        self.events = list(events)
+
+
+class TestFeatureStoreRoundTrips:
+    """Tests for how /v1/predict reads and records real-time features."""
+
+    @pytest.fixture
+    def store(self, monkeypatch):
+        import src.api.main as api_main
+
+        store = RecordingStore()
+        monkeypatch.setattr(api_main, "feature_store", store)
+        monkeypatch.setattr(api_main, "writer", None)
+        return store
+
+    def test_hydrate_and_record_in_one_call(self, loaded_api, store, sample_request_data):
+        """Test that a normal request reads and records with a single store call."""
+        response = loaded_api.post("/v1/predict", json=sample_request_data)
+
+        assert response.status_code == 200
+        assert store.calls == ["get_features_and_record"]
+        assert response.json()["features"]["trans_count_24h"] == 3.0
+
+    def test_shadow_mode_does_not_record(self, loaded_api, store, sample_request_data, monkeypatch):
+        """Test that shadow mode only reads features."""
+        import src.api.main as api_main
+
+        monkeypatch.setattr(api_main.settings, "shadow_mode", True)
+        loaded_api.post("/v1/predict", json=sample_request_data)
+
+        assert store.calls == ["get_features"]
+
+    def test_overrides_do_not_record(self, loaded_api, store, sample_request_data):
+        """Test that a partial override reads the remaining features without recording."""
+        loaded_api.post("/v1/predict", json=dict(sample_request_data, trans_count_24h=5))
+
+        assert store.calls == ["get_features"]
+
+    def test_separate_calls_when_disabled(
+        self, loaded_api, store, sample_request_data, monkeypatch
+    ):
+        """Test the read-then-write path when hydrate_and_record is off."""
+        import src.api.main as api_main
+
+        monkeypatch.setattr(api_main.settings, "hydrate_and_record", False)
+        loaded_api.post("/v1/predict", json=sample_request_data)
+
+        assert store.calls == ["get_features", "add_transaction"]
+
+    def test_batch_records_in_one_call(self, loaded_api, store, sample_request_data):
+        """Test that a batch's eligible transactions are written with one store call."""
+        items = [dict(sample_request_data, user_id=f"u{i}") for i in range(3)]
+        items.append(dict(sample_request_data, trans_count_24h=5))  # Override: not recorded
+        loaded_api.post("/v1/predict/batch", json={"transactions": items})
+
+        assert store.calls == ["get_features_many", "add_transactions"]
+        assert [user_id for user_id, _, _ in store.events] == ["u0", "u1", "u2"]
+
+    def test_batch_submits_to_write_behind(
+        self, loaded_api, store, sample_request_data, monkeypatch
+    ):
+        """Test that a batch queues each transaction when write-behind is on."""
+        import src.api.main as api_main
+
+        submitted = []
+
+        class Writer:
+            async def submit(self, event):
+                submitted.append(event)
+
+        monkeypatch.setattr(api_main, "writer", Writer())
+        items = [dict(sample_request_data, user_id=f"u{i}") for i in range(3)]
+        loaded_api.post("/v1/predict/batch", json={"transactions": items})
+
+        assert store.calls == ["get_features_many"]
+        assert [user_id for user_id, _, _ in submitted] == ["u0", "u1", "u2"]
+
+    def test_in_memory_backend_accumulates_features(
+        self, loaded_api, sample_request_data, monkeypatch
+    ):
+        """Test the full read/record cycle against the in-memory backend."""
+        import src.api.main as api_main
+        from src.features.memory_store import InMemoryFeatureStore
+
+        monkeypatch.setattr(api_main, "feature_store", InMemoryFeatureStore())
+        monkeypatch.setattr(api_main, "writer", None)
+
+        first = loaded_api.post("/v1/predict", json=sample_request_data).json()
+        second = loaded_api.post("/v1/predict", json=sample_request_data).json()
+
+        assert first["features"]["trans_count_24h"] == 0.0
+        assert second["features"]["trans_count_24h"] == 1.0
+
+
+class TestResolveFeatures:
+    """Tests for resolving real-time features from the store's reply."""
+
+    def test_all_time_profile_from_store(self, sample_request_data):
+        """Test that the stored all-time mean feeds amt_relative_to_all_time."""
+        request = PredictionRequest(**dict(sample_request_data, amt=300.0))
+        stored = {
+            "trans_count_24h": 2.0,
+            "avg_spend_24h": 150.0,
+            "trans_count_all_time": 40.0,
+            "user_avg_amt_all_time": 100.0,
+        }
+
+        resolved = resolve_features(request, stored)
+
+        assert resolved["user_avg_amt_all_time"] == 100.0
+        assert resolved["amt_relative_to_all_time"] == 3.0
+
+    def test_first_transaction_compares_to_itself(self, sample_request_data):
+        """Test the training fallback (expanding mean filled with amt) for new users."""
+        request = PredictionRequest(**dict(sample_request_data, amt=300.0))
+        stored = {
+            "trans_count_24h": 0.0,
+            "avg_spend_24h": 0.0,
+            "trans_count_all_time": 0.0,
+            "user_avg_amt_all_time": 0.0,
+        }
+
+        resolved = resolve_features(request, stored)
+
+        assert resolved["user_avg_amt_all_time"] == 300.0
+        assert resolved["amt_relative_to_all_time"] == 1.0
+
+    def test_ratio_uses_exact_24h_mean(self, sample_request_data):
+        """Test that amt_to_avg_ratio_24h uses the rolling mean, not the EMA."""
+        request = PredictionRequest(**dict(sample_request_data, amt=300.0))
+        stored = {"trans_count_24h": 3.0, "avg_spend_24h": 150.0, "avg_amt_24h": 100.0}
+
+        assert resolve_features(request, stored)["amt_to_avg_ratio_24h"] == 3.0
+
+        # Empty window: training fills the mean with amt
+        stored = {"trans_count_24h": 0.0, "avg_spend_24h": 150.0, "avg_amt_24h": 0.0}
+        assert resolve_features(request, stored)["amt_to_avg_ratio_24h"] == 1.0
+
+        # A caller-supplied average still drives the ratio
+        request = PredictionRequest(**dict(sample_request_data, amt=300.0, avg_spend_24h=200.0))
+        assert resolve_features(request, stored)["amt_to_avg_ratio_24h"] == 1.5
+
+
 class TestRootEndpoint:
     """Tests for root endpoint."""
 
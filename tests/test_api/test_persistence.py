@@ -0,0 +1,152 @@
+"""
+Tests for the write-behind persistence queue.
+"""
+
+import asyncio
+
+import pytest
+
+from src.api.persistence import WriteBehindQueue
+
+
+def make_write_fn(batches, delay=0.0, fail=False):
+    """Async write stub recording each flushed batch."""
+
+    async def write_fn(events):
+        if delay:
+            await asyncio.sleep(delay)
+        if fail:
+            raise ConnectionError("redis down")
+        batches.append(list(events))
+
+    return write_fn
+
+
+def event(i):
+    return (f"user_{i % 3}", float(i), 1000000 + i)
+
+
+class TestWriteBehindQueue:
+    """Test suite for WriteBehindQueue."""
+
+    def test_events_are_grouped_into_batches(self):
+        """Test that many submissions are flushed in few pipelined batches, in order."""
+        batches = []
+
+        async def scenario():
+            writer = WriteBehindQueue(make_write_fn(batches), max_batch_size=8)
+            await writer.start()
+            for i in range(20):
+                await writer.submit(event(i))
+            await writer.stop()
+            return writer.stats()
+
+        stats = asyncio.run(scenario())
+
+        assert [e for batch in batches for e in batch] == [event(i) for i in range(20)]
+        assert max(len(batch) for batch in batches) == 8
+        assert len(batches) == 3
+        assert stats["written"] == 20
+        assert stats["queue_depth"] == 0
+
+    def test_flush_on_interval(self):
+        """Test that a partial batch is flushed once the interval elapses."""
+        batches = []
+
+        async def scenario():
+            writer = WriteBehindQueue(
+                make_write_fn(batches), max_batch_size=100, flush_interval_ms=20
+            )
+            await writer.start()
+            await writer.submit(event(1))
+            await asyncio.sleep(0.1)
+            flushed = list(batches)
+            await writer.stop()
+            return flushed
+
+        assert asyncio.run(scenario()) == [[event(1)]]
+
+    def test_stop_drains_queue(self):
+        """Test that shutdown writes everything that was queued."""
+        batches = []
+
+        async def scenario():
+            writer = WriteBehindQueue(
+                make_write_fn(batches, delay=0.01), max_batch_size=4, flush_interval_ms=1000
+            )
+            await writer.start()
+            for i in range(10):
+                await writer.submit(event(i))
+            await writer.stop()
+            return writer.stats()
+
+        stats = asyncio.run(scenario())
+
+        assert sum(len(batch) for batch in batches) == 10
+        assert stats["dropped"] == 0
+
+    @pytest.mark.parametrize("policy", ["block", "drop", "sync"])
+    def test_full_queue_policies(self, policy):
+        """Test block / drop / sync behaviour when the queue is full."""
+        batches = []
+
+        async def scenario():
+            writer = WriteBehindQueue(
+                make_write_fn(batches, delay=0.05),
+                max_queue_size=1,
+                max_batch_size=1,
+                flush_interval_ms=0,
+                full_policy=policy,
+            )
+            await writer.start()
+            await writer.submit(event(0))
+            await asyncio.sleep(0)  # Flusher takes event 0 and starts writing
+            for i in range(1, 6):
+                await writer.submit(event(i))
+            await writer.stop()
+            return writer.stats()
+
+        stats = asyncio.run(scenario())
+
+        assert stats["written"] + stats["dropped"] == 6
+        if policy == "block":
+            assert stats["dropped"] == 0 and stats["sync_writes"] == 0
+        elif policy == "drop":
+            assert stats["dropped"] > 0 and stats["sync_writes"] == 0
+        else:
+            assert stats["dropped"] == 0 and stats["sync_writes"] > 0
+
+    def test_failed_flush_is_counted(self):
+        """Test that a failing write is counted and does not stop the writer."""
+
+        async def scenario():
+            writer = WriteBehindQueue(make_write_fn([], fail=True), flush_interval_ms=1)
+            await writer.start()
+            await writer.submit(event(1))
+            await writer.submit(event(2))
+            await writer.stop()
+            return writer.stats()
+
+        stats = asyncio.run(scenario())
+
+        assert stats["failed"] == 2
+        assert stats["written"] == 0
+
+    def test_sync_write_fn_and_inline_fallback(self):
+        """Test plain write functions and inline writes when not started."""
+        batches = []
+
+        async def scenario():
+            writer = WriteBehindQueue(batches.append)
+            await writer.submit(event(1))  # Not started: written inline
+            return writer.stats()
+
+        stats = asyncio.run(scenario())
+
+        assert batches == [[event(1)]]
+        assert stats["sync_writes"] == 1
+
+    def test_invalid_policy(self):
+        """Test that unknown queue-full policies are rejected."""
+        with pytest.raises(ValueError):
+            WriteBehindQueue(make_write_fn([]), full_policy="retry")
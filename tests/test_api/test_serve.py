@@ -0,0 +1,105 @@
+"""
+Tests for the pre-fork serving launcher.
+"""
+
+import asyncio
+import gc
+
+import pytest
+
+import src.api.main as api_main
+from src.api import serve
+from src.api.config import settings
+from src.api.serve import PreforkServer, threads_per_worker
+
+
+class TestThreadsPerWorker:
+    """Test suite for the per-worker thread budget."""
+
+    def test_splits_cores_evenly(self, monkeypatch):
+        """Test that cores are divided across workers, rounding down."""
+        monkeypatch.setattr(serve.os, "cpu_count", lambda: 8)
+
+        assert threads_per_worker(1) == 8
+        assert threads_per_worker(4) == 2
+        assert threads_per_worker(3) == 2
+
+    def test_at_least_one_thread(self, monkeypatch):
+        """Test the floor of one thread (more workers than cores, unknown count)."""
+        monkeypatch.setattr(serve.os, "cpu_count", lambda: 2)
+        assert threads_per_worker(4) == 1
+
+        monkeypatch.setattr(serve.os, "cpu_count", lambda: None)
+        assert threads_per_worker(2) == 1
+
+
+class TestPreforkServer:
+    """Test suite for PreforkServer (no fork)."""
+
+    def test_rejects_no_workers(self):
+        """Test that at least one worker is required."""
+        with pytest.raises(ValueError):
+            PreforkServer(workers=0, host="127.0.0.1", port=8000)
+
+    def test_preload(self, monkeypatch):
+        """Test that preload budgets threads, loads the model and freezes the GC."""
+        loads = []
+        monkeypatch.setattr(api_main, "load_model_resources", lambda: loads.append(1))
+        monkeypatch.setattr(serve.os, "cpu_count", lambda: 8)
+        monkeypatch.setattr(settings, "model_threads", 0)
+
+        try:
+            PreforkServer(workers=2, host="127.0.0.1", port=8000).preload()
+            assert gc.get_freeze_count() > 0
+        finally:
+            gc.unfreeze()
+
+        assert loads == [1]
+        assert settings.model_threads == 4
+
+    def test_preload_keeps_configured_threads(self, monkeypatch):
+        """Test that an explicit model_threads is not overridden."""
+        monkeypatch.setattr(api_main, "load_model_resources", lambda: None)
+        monkeypatch.setattr(settings, "model_threads", 3)
+
+        try:
+            PreforkServer(workers=2, host="127.0.0.1", port=8000).preload()
+        finally:
+            gc.unfreeze()
+
+        assert settings.model_threads == 3
+
+
+class TestPreloadedResources:
+    """Test suite for the app start-up hook after a preload."""
+
+    def test_startup_reuses_preloaded_model(self, monkeypatch):
+        """Test that load_resources skips the model load when the pipeline is set."""
+        preloaded = object()
+
+        def fail_load():
+            raise AssertionError("model loaded again")
+
+        monkeypatch.setattr(api_main, "pipeline", preloaded)
+        monkeypatch.setattr(api_main, "load_model_resources", fail_load)
+        monkeypatch.setattr(settings, "feature_store_backend", "memory")
+        monkeypatch.setattr(settings, "inference_executor", "inline")
+
+        async def startup_and_shutdown():
+            await api_main.load_resources()
+            await api_main.shutdown_resources()
+
+        asyncio.run(startup_and_shutdown())
+
+        assert api_main.pipeline is preloaded
+
+    def test_invalid_cpu_workers_fail_validation(self, monkeypatch):
+        """Test that INFERENCE_CPU_WORKERS=0 is rejected by the executor, not a division."""
+        monkeypatch.setattr(api_main, "pipeline", object())
+        monkeypatch.setattr(api_main, "feature_store", None)  # Restored after the failed start
+        monkeypatch.setattr(settings, "feature_store_backend", "memory")
+        monkeypatch.setattr(settings, "inference_executor", "inline")
+        monkeypatch.setattr(settings, "inference_cpu_workers", 0)
+
+        with pytest.raises(ValueError, match="cpu_workers"):
+            asyncio.run(api_main.load_resources())
@@ -99,6 +99,19 @@ class TestFraudExplainer:
         assert explainer.explainer is not None
         assert len(explainer.feature_names) > 0
 
+    def test_initialization_reuses_loaded_pipeline(self, trained_pipeline, monkeypatch):
+        """Test that a pipeline passed in is used instead of loading the file again."""
+        pipeline = joblib.load(trained_pipeline)
+
+        def fail_load(path):
+            raise AssertionError("pipeline loaded twice")
+
+        monkeypatch.setattr("src.explainability.joblib.load", fail_load)
+        explainer = FraudExplainer(trained_pipeline, pipeline=pipeline)
+
+        assert explainer.pipeline is pipeline
+        assert explainer.model is pipeline.named_steps["model"]
+
     def test_initialization_invalid_path(self):
         """Test that explainer raises error for invalid path."""
         with pytest.raises(FileNotFoundError):
@@ -0,0 +1,132 @@
+"""
+Tests for the historical feature-store backfill.
+"""
+
+import json
+import os
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.api.scoring import parse_timestamp
+from src.features.backfill import backfill, partition_users, read_events, sort_events
+from src.features.memory_store import InMemoryFeatureStore
+from src.features.store import RedisFeatureStore
+
+
+@pytest.fixture
+def transactions() -> pd.DataFrame:
+    """Interleaved, unsorted transactions of five cards (load_dataset columns)."""
+    rng = np.random.default_rng(7)
+    n = 200
+    return pd.DataFrame(
+        {
+            "trans_date_trans_time": (
+                pd.Timestamp("2019-01-01") + pd.to_timedelta(rng.integers(0, 3 * 86400, n), "s")
+            ).astype(str),
+            "cc_num": rng.choice([4001, 4002, 4003, 4004, 4005], n),
+            "amt": rng.uniform(1, 300, n).round(2),
+            "is_fraud": 0,
+        }
+    )
+
+
+def replay(df: pd.DataFrame) -> InMemoryFeatureStore:
+    """Reference: one add_transaction per row, in user / time order."""
+    store = InMemoryFeatureStore()
+    df = df.assign(ts=df["trans_date_trans_time"].map(parse_timestamp))
+    for row in df.sort_values(["cc_num", "ts"], kind="stable").itertuples():
+        store.add_transaction(str(row.cc_num), row.amt, row.ts)
+    return store
+
+
+def assert_same_features(store, expected: InMemoryFeatureStore, df: pd.DataFrame) -> None:
+    now = parse_timestamp(df["trans_date_trans_time"].max())
+    for user_id in df["cc_num"].astype(str).unique():
+        assert store.get_features(user_id, now) == pytest.approx(
+            expected.get_features(user_id, now)
+        )
+
+
+class TestBackfill:
+    """Test suite for reading, ordering and replaying transaction files."""
+
+    def test_read_events_csv_and_parquet(self, transactions, tmp_path):
+        """Test that both formats yield the same columns, timestamps parsed like the API."""
+        transactions.to_csv(tmp_path / "tx.csv", index=False)
+        transactions.to_parquet(tmp_path / "tx.parquet", index=False)
+
+        for name in ("tx.csv", "tx.parquet"):
+            users, timestamps, amounts = read_events(tmp_path / name, chunk_rows=64)
+            assert users.tolist() == transactions["cc_num"].astype(str).tolist()
+            assert timestamps.tolist() == [
+                parse_timestamp(t) for t in transactions["trans_date_trans_time"]
+            ]
+            assert amounts.tolist() == transactions["amt"].tolist()
+
+    def test_sort_and_partition(self):
+        """Test user / time ordering and that no user is split across writers."""
+        users = np.array(["b", "a", "b", "a", "c", "c", "c"], dtype=object)
+        events = sort_events((users, np.array([5, 9, 1, 2, 3, 1, 2]), np.arange(7.0)))
+
+        assert events[0].tolist() == ["a", "a", "b", "b", "c", "c", "c"]
+        assert events[1].tolist() == [2, 9, 1, 5, 1, 2, 3]
+        assert partition_users(events[0], 3) == [(0, 2), (2, 4), (4, 7)]
+        assert partition_users(events[0], 10) == [(0, 2), (2, 4), (4, 7)]
+        assert partition_users(events[0], 1) == [(0, 7)]
+
+    def test_backfill_matches_sequential_replay(self, transactions, tmp_path):
+        """Test that batched replay ends in the same state as one write per row."""
+        transactions.to_parquet(tmp_path / "tx.parquet", index=False)
+        store = InMemoryFeatureStore()
+
+        stats = backfill(tmp_path / "tx.parquet", lambda: store, workers=1, batch_size=16)
+
+        assert stats["rows"] == stats["written"] == len(transactions)
+        assert_same_features(store, replay(transactions), transactions)
+
+    def test_resume_from_checkpoint(self, transactions, tmp_path):
+        """Test that a rerun writes only what the checkpoint has not recorded."""
+        path = tmp_path / "tx.csv"
+        transactions.to_csv(path, index=False)
+        checkpoint = tmp_path / "progress.json"
+        first = InMemoryFeatureStore()
+
+        def interrupt(done, total, elapsed):
+            if done >= 64:
+                raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            backfill(path, lambda: first, 1, 32, checkpoint, report=interrupt)
+        assert json.loads(checkpoint.read_text())["done"] == [64]
+
+        stats = backfill(path, lambda: first, 1, 32, checkpoint)
+        assert stats["written"] == len(transactions) - 64
+        assert_same_features(first, replay(transactions), transactions)
+
+        # Complete: nothing left to write
+        assert backfill(path, lambda: first, 1, 32, checkpoint)["written"] == 0
+
+        with pytest.raises(ValueError):
+            backfill(path, lambda: first, 2, 32, checkpoint)
+
+    def test_writer_processes(self, transactions, tmp_path, redis_client):
+        """Test the multi-process path against Redis."""
+        transactions.to_csv(tmp_path / "tx.csv", index=False)
+        factory = partial(
+            RedisFeatureStore,
+            host=os.getenv("REDIS_HOST", "localhost"),
+            port=int(os.getenv("REDIS_PORT", "6379")),
+            db=15,
+        )
+
+        stats = backfill(tmp_path / "tx.csv", factory, workers=3, batch_size=20)
+
+        assert stats["written"] == len(transactions)
+        progress = json.loads((tmp_path / "tx.csv.backfill.json").read_text())
+        assert len(progress["ranges"]) == 3
+        store = factory()
+        assert_same_features(store, replay(transactions), transactions)
+        store.close()
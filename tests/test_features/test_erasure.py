@@ -0,0 +1,53 @@
+"""
+Tests for bulk GDPR erasure.
+"""
+
+import json
+import time
+
+from src.features.erasure import bulk_erase, read_user_ids
+from src.features.memory_store import InMemoryFeatureStore
+
+
+class TestBulkErase:
+    """Test suite for bulk_erase (in-memory backend, no Redis needed)."""
+
+    def test_erases_and_audits(self, tmp_path):
+        """Test that listed users are erased, others kept, and every user audited."""
+        store = InMemoryFeatureStore()
+        store.add_transactions([(f"u{i}", 10.0, 1000000) for i in range(10)])
+        ids = tmp_path / "ids.txt"
+        ids.write_text("# erasure requests\nu1\n\nu2\nunknown\nu3\n")
+        audit = tmp_path / "audit" / "erasure.jsonl"
+
+        stats = bulk_erase(store, ids, batch_size=2, max_users_per_second=None, audit_path=audit)
+
+        assert stats["users"] == 4
+        assert stats["users_with_data"] == 3
+        assert stats["deleted_keys"] == 12
+        assert store.get_features("u1", 1000000)["trans_count_24h"] == 0.0
+        assert store.get_features("u4", 1000000)["trans_count_24h"] == 1.0
+
+        records = [json.loads(line) for line in audit.read_text().splitlines()]
+        assert [(r["user_id"], r["deleted_keys"]) for r in records] == [
+            ("u1", 4),
+            ("u2", 4),
+            ("unknown", 0),
+            ("u3", 4),
+        ]
+
+    def test_rate_limit(self):
+        """Test that batches are paced to max_users_per_second."""
+        start = time.perf_counter()
+        stats = bulk_erase(
+            InMemoryFeatureStore(), (f"u{i}" for i in range(100)), 10, max_users_per_second=500
+        )
+
+        assert stats["users"] == 100
+        assert time.perf_counter() - start >= 0.19
+
+    def test_read_user_ids(self, tmp_path):
+        """Test that IDs are stripped and comments skipped."""
+        path = tmp_path / "ids.txt"
+        path.write_text(" a \n#b\n\nc\n")
+        assert list(read_user_ids(path)) == ["a", "c"]
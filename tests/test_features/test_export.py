@@ -0,0 +1,86 @@
+"""
+Tests for the Parquet export of the feature store.
+"""
+
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from src.features.export import LatencyGuard, export_to_parquet
+from src.features.store import RedisFeatureStore
+
+
+class TestLatencyGuard:
+    """Test suite for LatencyGuard (no Redis needed)."""
+
+    def test_over_budget_when_probe_slows_down(self):
+        """Test that a slower probe than the baseline trips the budget."""
+        delay = {"seconds": 0.0}
+        guard = LatencyGuard(
+            lambda: time.sleep(delay["seconds"]),
+            budget_ms=5.0,
+            interval=0.001,
+            baseline_samples=5,
+        )
+        guard.start()
+        try:
+            assert not guard.over_budget()
+            delay["seconds"] = 0.02
+            time.sleep(0.2)
+            assert guard.over_budget()
+            assert guard.p99_ms() >= 20.0
+        finally:
+            guard.stop()
+
+
+class TestExportToParquet:
+    """Test suite for export_to_parquet."""
+
+    @pytest.fixture(params=["zset", "buckets"])
+    def store(self, request, redis_client):
+        store = RedisFeatureStore(
+            host=os.getenv("REDIS_HOST", "localhost"),
+            port=int(os.getenv("REDIS_PORT", "6379")),
+            db=15,
+            window_mode=request.param,
+        )
+        redis_client.flushdb()
+        yield store
+        redis_client.flushdb()
+        store.close()
+
+    def test_export_matches_get_features(self, store, redis_client, tmp_path):
+        """Test that every user is exported once with the features the store serves."""
+        now = 1000000
+        users = [f"export_{i}" for i in range(45)]
+        store.add_transactions(
+            [(u, 10.0 + i + k, now - 3600 * k) for i, u in enumerate(users) for k in range(3)]
+        )
+        # A user whose profile key was lost is still found through avg_spend
+        redis_client.delete("user:export_0:profile")
+
+        stats = export_to_parquet(
+            store, tmp_path, as_of=now, scan_count=10, rows_per_file=20, latency_budget_ms=None
+        )
+
+        df = pd.read_parquet(stats["path"])
+        assert stats["users"] == len(df) == len(users)
+        assert stats["files"] == 3
+        assert sorted(df["user_id"]) == sorted(users)
+
+        df = df.set_index("user_id").loc[users]
+        expected = store.get_features_arrays(users, [now] * len(users))
+        for name, values in expected.items():
+            assert df[name].tolist() == pytest.approx(values.tolist())
+        assert (df["window_len"] > 0).all()
+
+    def test_export_with_latency_budget(self, store, tmp_path):
+        """Test the throttled path end to end."""
+        store.add_transactions([(f"budget_{i}", 5.0, 1000000) for i in range(30)])
+
+        stats = export_to_parquet(store, tmp_path, as_of=1000000, latency_budget_ms=50.0)
+
+        assert stats["users"] == 30
+        assert stats["baseline_p99_ms"] > 0
@@ -0,0 +1,93 @@
+"""
+Tests for the keys -> hash key layout migration.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from src.features.layout_migration import migrate_key_layout
+from src.features.store import RedisFeatureStore
+
+
+class TestMigrateKeyLayout:
+    """Test suite for migrate_key_layout (databases 13 and 14)."""
+
+    @pytest.fixture
+    def stores(self, redis_client):
+        connection = {
+            "host": os.getenv("REDIS_HOST", "localhost"),
+            "port": int(os.getenv("REDIS_PORT", "6379")),
+        }
+        old = RedisFeatureStore(db=14, **connection)
+        new = RedisFeatureStore(db=14, key_layout="hash", **connection)
+        reference = RedisFeatureStore(db=13, **connection)
+        old.client.flushdb()
+        reference.client.flushdb()
+        yield old, new, reference
+        old.client.flushdb()
+        reference.client.flushdb()
+
+    @staticmethod
+    def events(n_users=20, n_events=300, seed=2):
+        rng = np.random.default_rng(seed)
+        return [
+            (f"mig:{rng.integers(n_users)}", float(rng.integers(1, 500)), 1000000 + int(t))
+            for t in np.sort(rng.integers(0, 2 * 86400, n_events))
+        ]
+
+    def test_migrated_features_unchanged(self, stores):
+        """Test that every user reads the same features before and after migrating."""
+        old, new, reference = stores
+        events = self.events()
+        users = sorted({user_id for user_id, _, _ in events})
+        old.add_transactions(events[:200])
+        reference.add_transactions(events[:200])
+        before = old.get_features_many(users, [1172800] * len(users))
+
+        stats = migrate_key_layout(old, scan_count=7)
+
+        assert stats["users"] == len(users)
+        assert stats["removed_keys"] == 4 * len(users)
+        assert stats["merged"] == 0
+        assert not list(old.client.scan_iter(match="user:mig:*"))
+        assert new.get_features_many(users, [1172800] * len(users)) == before
+        assert 0 < new.client.ttl("user:{mig:3}:tx_history") <= new.key_ttl
+        assert new.client.ttl("user:{mig:3}:state") > new.key_ttl
+
+        # Writes continue from the migrated state (EMA, rolling sum, profile)
+        new.add_transactions(events[200:])
+        reference.add_transactions(events[200:])
+        for ts in (1172800, 1259200):
+            assert new.get_features_many(users, [ts] * len(users)) == (
+                reference.get_features_many(users, [ts] * len(users))
+            )
+        assert migrate_key_layout(old)["users"] == 0
+
+    def test_merges_users_written_since_the_switch(self, stores):
+        """Test that old state is merged into windows already written in the new layout."""
+        old, new, reference = stores
+        old.add_transactions([("switch", 10.0, 1000000), ("switch", 20.0, 1000100)])
+        new.add_transaction("switch", 30.0, 1000200)
+
+        stats = migrate_key_layout(old)
+
+        assert stats["merged"] == 1
+        features = new.get_features("switch", 1000200)
+        assert features["trans_count_24h"] == 3.0
+        assert features["avg_amt_24h"] == 20.0
+        assert features["trans_count_all_time"] == 3.0
+        assert features["avg_spend_24h"] == 30.0  # EMA of the new layout kept
+
+    def test_dry_run(self, stores):
+        """Test that a dry run counts users and keys without moving anything."""
+        old, new, _ = stores
+        old.add_transactions([(f"dry_{i}", 10.0, 1000000) for i in range(30)])
+
+        stats = migrate_key_layout(old, scan_count=10, dry_run=True)
+
+        assert stats["users"] == 30
+        assert stats["removed_keys"] == 120
+        assert new.get_features("dry_0", 1000000)["trans_count_24h"] == 0.0
+        assert old.get_features("dry_0", 1000000)["trans_count_24h"] == 1.0
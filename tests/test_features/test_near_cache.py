@@ -0,0 +1,180 @@
+"""
+Tests for the hot-user near cache.
+"""
+
+import os
+import time
+
+import pytest
+
+from src.features.near_cache import NearCache
+from src.features.store import RedisFeatureStore
+
+
+class TestNearCache:
+    """Test suite for NearCache (no Redis needed)."""
+
+    def test_hit_after_put(self):
+        """Test that a stored entry is served and counted as a hit."""
+        cache = NearCache()
+        assert cache.get("u1") is None
+
+        cache.put("u1", (3, 60.0), "12.5", cache.reserve("u1"))
+        state = cache.get("u1")
+
+        assert state.window == (3, 60.0)
+        assert state.avg_spend == "12.5"
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+        assert cache.stats()["hit_rate"] == 0.5
+
+    def test_timestamps_outside_window_range_miss(self):
+        """Test that an entry only serves the timestamps its window holds for."""
+        cache = NearCache()
+        cache.put("u1", (1, 5.0), None, cache.reserve("u1"), valid_from=100, valid_until=200)
+
+        assert cache.get("u1", 100) is not None  # Inclusive bounds
+        assert cache.get("u1", 200) is not None
+        assert cache.get("u1", 99) is None
+        assert cache.get("u1", 201) is None
+        assert cache.stats()["out_of_window"] == 2
+        assert cache.stats()["misses"] == 2
+
+    def test_lru_eviction(self):
+        """Test that the least recently used user is evicted at capacity."""
+        cache = NearCache(max_entries=2)
+        for user_id in ("a", "b"):
+            cache.put(user_id, (1, 1.0), None, cache.reserve(user_id))
+        cache.get("a")  # "b" is now least recently used
+        cache.put("c", (1, 1.0), None, cache.reserve("c"))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_entries_expire(self):
+        """Test the per-entry staleness bound."""
+        cache = NearCache(ttl_seconds=0.01)
+        cache.put("u1", (1, 1.0), None, cache.reserve("u1"))
+        time.sleep(0.02)
+
+        assert cache.get("u1") is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_invalidation_during_fetch_is_not_cached(self):
+        """Test that a fetch racing with a write does not cache stale state."""
+        cache = NearCache()
+        ticket = cache.reserve("u1")
+        cache.invalidate("u1")  # Write lands while the fetch is in flight
+
+        state = cache.put("u1", (1, 10.0), "10.0", ticket)
+
+        assert state.avg_spend == "10.0"  # Still usable by the caller
+        assert cache.get("u1") is None
+
+    def test_invalidate_keys(self):
+        """Test that Redis invalidation messages map keys back to users."""
+        cache = NearCache()
+        for user_id in ("u1", "u:2", "u3"):
+            cache.put(user_id, (1, 1.0), None, cache.reserve(user_id))
+
+        cache.invalidate_keys(["user:u1:avg_spend", "user:u:2:tx_history", "other:u3"])
+
+        assert cache.get("u1") is None
+        assert cache.get("u:2") is None
+        assert cache.get("u3") is not None
+        assert cache.stats()["invalidations"] == 2
+
+        cache.put("u4", (1, 1.0), None, cache.reserve("u4"))
+        cache.invalidate_keys(["user:{u4}:state"])  # key_layout="hash"
+        assert cache.get("u4") is None
+
+        cache.invalidate_keys(None)  # FLUSHDB / FLUSHALL
+        assert cache.stats()["entries"] == 0
+
+
+class TestNearCachedFeatureStore:
+    """Test suite for RedisFeatureStore with a near cache."""
+
+    @pytest.fixture
+    def cached_store(self, redis_client):
+        cache = NearCache(max_entries=100, ttl_seconds=60)
+        store = RedisFeatureStore(
+            host=os.getenv("REDIS_HOST", "localhost"),
+            port=int(os.getenv("REDIS_PORT", "6379")),
+            db=15,
+            near_cache=cache,
+        )
+        yield store
+        cache.stop()
+
+    def test_cached_features_match_redis(self, cached_store, feature_store):
+        """Test that cached reads equal Redis reads, re-reading once the window changes."""
+        base_time = 1000000
+        # Latest first: each write only trims members older than its own 24h
+        for offset in (0, -3600, -90000):
+            feature_store.add_transaction("near_user", 100.0 + offset / 1000, base_time + offset)
+
+        # The window at base_time holds -3600 and 0 until -3600 ages out (+82800);
+        # before 0, or while -90000 is within 24h (<= -3600), it differs
+        timestamps = [base_time, base_time + 60, base_time + 82800, base_time + 82801]
+        timestamps += [base_time - 1, base_time - 3600]
+        for ts in timestamps:
+            assert cached_store.get_features("near_user", ts) == feature_store.get_features(
+                "near_user", ts
+            )
+
+        stats = cached_store.near_cache.stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 4
+        assert stats["out_of_window"] == 3
+
+    def test_hash_layout(self, feature_store):
+        """Test cached reads with the hash key layout (EMA and profile in one hash)."""
+        store = RedisFeatureStore(
+            host=os.getenv("REDIS_HOST", "localhost"),
+            port=int(os.getenv("REDIS_PORT", "6379")),
+            db=15,
+            key_layout="hash",
+            near_cache=NearCache(ttl_seconds=60),
+        )
+        store.add_transaction("near_hash", 40.0, timestamp=1000000)
+        store.add_transaction("near_hash", 60.0, timestamp=1000100)
+
+        for ts in (1000100, 1000200, 1000050):
+            features = store.get_features("near_hash", ts)
+            store.near_cache.invalidate("near_hash")
+            assert features == store.get_features("near_hash", ts)
+        assert store.get_features("near_hash", 1000200)["trans_count_24h"] == 2.0
+
+    def test_local_writes_invalidate(self, cached_store):
+        """Test that writes through the store are visible on the next read."""
+        cached_store.add_transaction("near_writer", 50.0, timestamp=1000000)
+        assert cached_store.get_features("near_writer", 1000000)["trans_count_24h"] == 1.0
+
+        cached_store.add_transactions([("near_writer", 70.0, 1000010)])
+        assert cached_store.get_features("near_writer", 1000010)["trans_count_24h"] == 2.0
+
+        cached_store.get_features_and_record("near_writer", 20.0, 1000020)
+        assert cached_store.get_features("near_writer", 1000020)["trans_count_24h"] == 3.0
+
+        cached_store.delete_user_data("near_writer")
+        assert cached_store.get_features("near_writer", 1000020)["trans_count_24h"] == 0.0
+
+    def test_tracking_falls_back_to_ttl(self, redis_client):
+        """Test that start_tracking reports whether the server supports tracking."""
+        cache = NearCache(ttl_seconds=1.0)
+        try:
+            supported = redis_client.execute_command("CLIENT", "TRACKINGINFO") is not None
+        except Exception:
+            supported = False
+
+        enabled = cache.start_tracking(
+            host=os.getenv("REDIS_HOST", "localhost"),
+            port=int(os.getenv("REDIS_PORT", "6379")),
+            db=15,
+        )
+        cache.stop()
+
+        assert enabled == supported
+        assert cache.stats()["tracking"] is False  # Stopped
@@ -0,0 +1,81 @@
+"""
+Tests for read replica selection (ReplicaRouter).
+"""
+
+import time
+
+import pytest
+
+from src.features.replicas import ReplicaRouter
+
+
+class TestReplicaRouter:
+    """Test suite for staleness tracking and replica selection (no Redis)."""
+
+    def test_unknown_replicas_are_stale(self):
+        """Test that replicas that returned no heartbeat are not used."""
+        router = ReplicaRouter(["a", "b"])
+        router.next_heartbeat()
+        router.observe(0, None)
+
+        assert router.staleness_ms(0) == float("inf")
+        assert router.choose() == []
+        assert router.stats()["primary_reads"] == 1
+
+    def test_round_robin_over_fresh_replicas(self):
+        """Test that fresh replicas take turns being first (the second is the hedge)."""
+        router = ReplicaRouter(["a", "b", "c"])
+        seq = router.next_heartbeat()
+        router.observe(0, seq)
+        router.observe(2, str(seq))  # GET replies are strings
+
+        assert [router.choose() for _ in range(3)] == [[0, 2], [2, 0], [0, 2]]
+
+    def test_staleness_grows_until_next_heartbeat(self):
+        """Test that a replica is skipped once its latest heartbeat is too old."""
+        router = ReplicaRouter(["a"], max_staleness_ms=50)
+        router.observe(0, router.next_heartbeat())
+        assert router.choose() == [0]
+
+        time.sleep(0.06)
+        assert router.staleness_ms(0) > 50
+        assert router.choose() == []
+
+        # A newer heartbeat makes it fresh again; an older one is ignored
+        seq = router.next_heartbeat()
+        router.observe(0, seq)
+        router.observe(0, seq - 1)
+        assert router.choose() == [0]
+
+    def test_record_read(self):
+        """Test replica, fallback and hedging counters."""
+        router = ReplicaRouter(["a", "b"], hedge_after_ms=5)
+        router.record_read(0)
+        router.record_read(1, hedged=True, hedge_won=True)
+        router.record_read(None)
+
+        stats = router.stats()
+        assert stats["replicas"]["a"]["reads"] == 1
+        assert stats["replicas"]["b"]["reads"] == 1
+        assert stats["primary_reads"] == 1
+        assert stats["replica_errors"] == 1
+        assert stats["hedged_reads"] == 1
+        assert stats["hedge_wins"] == 1
+
+    def test_heartbeat_keys_are_private(self):
+        """Test that two routers never read each other's heartbeats."""
+        assert ReplicaRouter(["a"]).heartbeat_key != ReplicaRouter(["a"]).heartbeat_key
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"names": []},
+            {"names": ["a"], "max_staleness_ms": 0},
+            {"names": ["a"], "max_staleness_ms": 100, "heartbeat_interval_ms": 100},
+            {"names": ["a"], "hedge_after_ms": 0},
+        ],
+    )
+    def test_invalid_configuration(self, kwargs):
+        """Test that inconsistent settings are rejected."""
+        with pytest.raises(ValueError):
+            ReplicaRouter(**kwargs)
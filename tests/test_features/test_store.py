@@ -4,9 +4,59 @@ Tests for Redis Feature Store
 Tests sliding window logic, EMA computation, and Redis operations.
 """
 
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-class TestRedisFeatureStore:
-    """Test suite for RedisFeatureStore."""
+import numpy as np
+import pytest
+import redis
+from redis.crc import key_slot
+from redis.exceptions import NoScriptError, ResponseError
+
+from src.features.async_store import AsyncRedisFeatureStore
+from src.features.backend import FeatureStoreBackend
+from src.features.memory_store import InMemoryFeatureStore
+from src.features.near_cache import NearCache
+from src.features.sharded_store import HashRing, ShardedFeatureStore, parse_redis_url
+from src.features.store import (
+    USER_KEY_SUFFIXES,
+    FeatureStoreBase,
+    RedisFeatureStore,
+    key_user_id,
+    register_user_key,
+)
+
+
+class TestFeatureStoreBase:
+    """Test suite for the transport-independent helpers."""
+
+    def test_collect_script_replies(self):
+        """Test that NOSCRIPT replies are returned for retry and other errors raised."""
+        results = [None] * 4
+
+        retry = FeatureStoreBase._collect_script_replies(
+            [0, 2, 3], ["10", NoScriptError("NOSCRIPT"), "30"], results
+        )
+
+        assert retry == [2]
+        assert results == ["10", None, None, "30"]
+
+        with pytest.raises(ResponseError):
+            FeatureStoreBase._collect_script_replies([2], [ResponseError("WRONGTYPE")], results)
+
+    def test_lost_scripts(self):
+        """Test that read replies report NOSCRIPT and raise other errors."""
+        assert FeatureStoreBase._lost_scripts([[1, "10"], "5.0", NoScriptError("NOSCRIPT")])
+        assert not FeatureStoreBase._lost_scripts([[1, "10"], None, [None, None]])
+
+        with pytest.raises(ResponseError):
+            FeatureStoreBase._lost_scripts([ResponseError("WRONGTYPE")])
+
+
+class FeatureStoreScenarios:
+    """Backend-independent scenarios, run against every feature store (feature_store fixture)."""
 
     def test_connection(self, feature_store):
         """Test that Redis connection is established."""
@@ -101,13 +151,21 @@ class TestRedisFeatureStore:
 
         # Delete user data
         deleted_count = feature_store.delete_user_data("test_user_5")
-        assert deleted_count == 2  # tx_history + avg_spend
+        assert deleted_count == 4  # tx_history + avg_spend + profile + rolling_sum
 
         # Verify data is gone
         features = feature_store.get_features("test_user_5", current_timestamp=1000000)
         assert features["trans_count_24h"] == 0.0
         assert features["avg_spend_24h"] == 0.0
 
+    def test_delete_users_data(self, feature_store):
+        """Test batch deletion: per-user key counts, other users untouched."""
+        feature_store.add_transactions([("erase_a", 10.0, 1000000), ("keep_b", 20.0, 1000000)])
+
+        assert feature_store.delete_users_data(["erase_a", "never_seen"]) == [4, 0]
+        assert feature_store.get_features("erase_a", 1000000)["trans_count_all_time"] == 0.0
+        assert feature_store.get_features("keep_b", 1000000)["trans_count_24h"] == 1.0
+
     def test_concurrent_transactions(self, feature_store):
         """Test that multiple users can be tracked concurrently."""
         base_time = 1000000
@@ -121,8 +179,1030 @@ class TestRedisFeatureStore:
             features = feature_store.get_features(user_id, current_timestamp=base_time)
             assert features["trans_count_24h"] == 1.0
 
+    def test_get_features_many(self, feature_store):
+        """Test pipelined multi-user feature fetch matches per-user fetch."""
+        base_time = 1000000
+
+        feature_store.add_transaction(user_id="many_a", amount=100.00, timestamp=base_time)
+        feature_store.add_transaction(user_id="many_a", amount=200.00, timestamp=base_time + 60)
+        feature_store.add_transaction(user_id="many_b", amount=50.00, timestamp=base_time)
+
+        user_ids = ["many_a", "many_b", "many_missing"]
+        timestamps = [base_time + 60, base_time, base_time]
+
+        batch = feature_store.get_features_many(user_ids, timestamps)
+
+        assert len(batch) == 3
+        for user_id, ts, features in zip(user_ids, timestamps, batch):
+            assert features == feature_store.get_features(user_id, current_timestamp=ts)
+
+        assert batch[0]["trans_count_24h"] == 2.0
+        assert batch[2]["trans_count_24h"] == 0.0
+
+    def test_get_features_arrays(self, feature_store):
+        """Test columnar multi-user fetch, across pipeline chunks."""
+        base_time = 1000000
+        user_ids = [f"cols_{i}" for i in range(7)]
+        for i, user_id in enumerate(user_ids[:5]):
+            for k in range(i):
+                feature_store.add_transaction(user_id, 10.0 * (k + 1), base_time + k)
+
+        feature_store.read_chunk_size = 3
+        timestamps = [base_time + 10] * len(user_ids)
+        columns = feature_store.get_features_arrays(user_ids, timestamps)
+        rows = feature_store.get_features_many(user_ids, timestamps)
+
+        assert columns["trans_count_24h"].dtype == np.float64
+        np.testing.assert_array_equal(columns["trans_count_24h"], [0, 1, 2, 3, 4, 0, 0])
+        for name, column in columns.items():
+            np.testing.assert_array_equal(column, [row[name] for row in rows])
+
+        assert feature_store.get_features_arrays([], [])["avg_spend_24h"].shape == (0,)
+        with pytest.raises(ValueError):
+            feature_store.get_features_arrays(user_ids, timestamps[:2])
+
+    def test_add_transactions_matches_sequential_writes(self, feature_store):
+        """Test that a batched multi-user write equals one add_transaction per event."""
+        base_time = 1000000
+        events = [
+            ("bulk_a", 100.00, base_time),
+            ("bulk_b", 40.00, base_time + 10),
+            ("bulk_a", 200.00, base_time + 20),
+            ("bulk_a", 50.00, base_time + 30),
+        ]
+
+        feature_store.add_transactions(events)
+        for user_id, amount, timestamp in events:
+            feature_store.add_transaction("seq_" + user_id, amount, timestamp)
+
+        for user_id in ("bulk_a", "bulk_b"):
+            assert feature_store.get_features(
+                user_id, current_timestamp=base_time + 30
+            ) == feature_store.get_features("seq_" + user_id, current_timestamp=base_time + 30)
+
+        assert feature_store.get_features("bulk_a", base_time + 30)["trans_count_24h"] == 3.0
+
+    def test_get_features_and_record(self, feature_store):
+        """Test that the combined call equals get_features followed by add_transaction."""
+        base_time = 1000000
+        history = [(100.00, base_time - 90000), (200.00, base_time - 3600), (50.00, base_time)]
+
+        for amount, timestamp in history:
+            combined = feature_store.get_features_and_record("combined_user", amount, timestamp)
+            expected = feature_store.get_features("separate_user", current_timestamp=timestamp)
+            feature_store.add_transaction("separate_user", amount, timestamp)
+            assert combined == expected
+
+        assert combined["trans_count_24h"] == 1.0  # Excludes itself and the 25h-old one
+        assert feature_store.get_features(
+            "combined_user", current_timestamp=base_time
+        ) == feature_store.get_features("separate_user", current_timestamp=base_time)
+
+    def test_get_features_and_record_new_user(self, feature_store):
+        """Test that a first transaction hydrates empty features."""
+        features = feature_store.get_features_and_record("combined_new", 75.0, 1000000)
+
+        assert features == {
+            "trans_count_24h": 0.0,
+            "avg_spend_24h": 0.0,
+            "avg_amt_24h": 0.0,
+            "trans_count_all_time": 0.0,
+            "user_avg_amt_all_time": 0.0,
+        }
+        assert feature_store.get_features("combined_new", 1000000)["avg_spend_24h"] == 75.0
+
+    def test_all_time_profile(self, feature_store):
+        """Test the running count and mean over transactions outside the 24h window."""
+        base_time = 1000000
+        amounts = [10.0, 20.0, 30.0, 140.0]
+        for day, amount in enumerate(amounts):
+            feature_store.add_transaction("profile_user", amount, base_time + day * 86400)
+
+        now = base_time + 3 * 86400
+        features = feature_store.get_features("profile_user", current_timestamp=now)
+        assert features["trans_count_24h"] == 1.0
+        assert features["trans_count_all_time"] == 4.0
+        assert features["user_avg_amt_all_time"] == pytest.approx(50.0)
+
+        # Hydrated features exclude the transaction being recorded
+        before = feature_store.get_features_and_record("profile_user", 300.0, now + 1)
+        assert before["user_avg_amt_all_time"] == pytest.approx(50.0)
+
+        columns = feature_store.get_features_arrays(["profile_user", "nobody"], [now, now])
+        assert columns["trans_count_all_time"].tolist() == [5.0, 0.0]
+        assert columns["user_avg_amt_all_time"] == pytest.approx([100.0, 0.0])
+
+    def test_get_velocity(self, feature_store):
+        """Test counts and sums of several windows from one call."""
+        feature_store.velocity_windows = {"1h": 3600, "7d": 604800}
+        feature_store.window_retention = 604800
+        now = 2000000
+        for amount, age in ((1.0, 8 * 86400), (10.0, 3 * 86400), (100.0, 1800), (1000.0, 0)):
+            feature_store.add_transaction("velocity_user", amount, now - age)
+
+        velocity = feature_store.get_velocity("velocity_user", current_timestamp=now)
+
+        assert velocity == {
+            "trans_count_1h": 2.0,
+            "amt_sum_1h": 1100.0,
+            "trans_count_7d": 3.0,
+            "amt_sum_7d": 1110.0,
+        }
+        # Kept for 7 days, but the 24h features are unchanged
+        assert feature_store.get_features("velocity_user", now)["trans_count_24h"] == 2.0
+        assert len(feature_store.get_transaction_history("velocity_user", 24 * 7, now)) == 3
+
+    @pytest.mark.parametrize("retention", [86400, 604800])
+    def test_rolling_mean_24h(self, feature_store, retention):
+        """Test avg_amt_24h against the mean of the 24h history, as training computes it."""
+        feature_store.window_retention = retention
+        rng = np.random.default_rng(11)
+        base_time = 1000000
+        events = [
+            (round(float(rng.uniform(1, 500)), 2), base_time + int(t))
+            for t in np.sort(rng.integers(0, 4 * 86400, 150))
+        ]
+        # Out-of-order (inside and before the current window) and duplicate events
+        events.insert(100, (12.5, events[90][1]))
+        events.insert(120, (7.0, events[119][1] - 2 * 86400))
+        events.append(events[-3])
+
+        def expected(ts):
+            amounts = [a for _, a in feature_store.get_transaction_history("mean_user", 24, ts)]
+            return sum(amounts) / len(amounts) if amounts else 0.0
+
+        for i, (amount, timestamp) in enumerate(events):
+            if i % 2:
+                mean = expected(timestamp)
+                before = feature_store.get_features_and_record("mean_user", amount, timestamp)
+                assert before["avg_amt_24h"] == pytest.approx(mean, abs=1e-9)
+            else:
+                feature_store.add_transaction("mean_user", amount, timestamp)
+
+        last = max(timestamp for _, timestamp in events)
+        for ts in (last - 3600, last, last + 3600, last + 86399, last + 86400, last + 86401):
+            features = feature_store.get_features("mean_user", current_timestamp=ts)
+            assert features["avg_amt_24h"] == pytest.approx(expected(ts), abs=1e-9)
+
+        columns = feature_store.get_features_arrays(["mean_user", "nobody"], [last, last])
+        assert columns["avg_amt_24h"] == pytest.approx([expected(last), 0.0])
+
+    def test_concurrent_ema_updates_are_not_lost(self, feature_store):
+        """Test that racing writers for one user all contribute to the EMA."""
+        base_time = 1000000
+        n_writers = 40
+        feature_store.add_transaction("ema_race", 0.0, timestamp=base_time)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(
+                pool.map(
+                    lambda i: feature_store.add_transaction("ema_race", 100.0, base_time + 1 + i),
+                    range(n_writers),
+                )
+            )
+
+        features = feature_store.get_features("ema_race", current_timestamp=base_time + n_writers)
+        expected = 100.0 * (1 - (1 - feature_store.ema_alpha) ** n_writers)
+        assert features["trans_count_24h"] == n_writers + 1
+        assert features["avg_spend_24h"] == pytest.approx(expected)
+
     def test_empty_user(self, feature_store):
         """Test getting features for user with no history."""
         features = feature_store.get_features("nonexistent_user", current_timestamp=1000000)
         assert features["trans_count_24h"] == 0.0
         assert features["avg_spend_24h"] == 0.0
+
+
+class TestRedisFeatureStore(FeatureStoreScenarios):
+    """Test suite for RedisFeatureStore."""
+
+    def test_script_reloaded_after_flush(self, redis_client):
+        """Test that a new store loads the scripts the server no longer has cached."""
+        redis_client.script_flush()
+        store = RedisFeatureStore(
+            host=os.getenv("REDIS_HOST", "localhost"),
+            port=int(os.getenv("REDIS_PORT", "6379")),
+            db=15,
+        )
+        store.add_transaction("flushed_user", 80.0, timestamp=1000000)
+
+        features = store.get_features("flushed_user", current_timestamp=1000000)
+        assert features == {
+            "trans_count_24h": 1.0,
+            "avg_spend_24h": 80.0,
+            "avg_amt_24h": 80.0,
+            "trans_count_all_time": 1.0,
+            "user_avg_amt_all_time": 80.0,
+        }
+
+    def test_rolling_sum_rebuilt_when_missing(self, feature_store, redis_client):
+        """Test that windows written without the rolling sum key are still exact."""
+        for i, amount in enumerate((10.0, 20.0, 30.0)):
+            feature_store.add_transaction("rebuild_user", amount, 1000000 + i * 3600)
+        redis_client.delete("user:rebuild_user:rolling_sum")
+
+        assert feature_store.get_features("rebuild_user", 1007200)["avg_amt_24h"] == 20.0
+
+        feature_store.add_transaction("rebuild_user", 60.0, 1000000 + 86400 + 60)
+        assert redis_client.hget("user:rebuild_user:rolling_sum", "sum") == "110"
+        assert feature_store.get_features("rebuild_user", 1086460)["avg_amt_24h"] == 110.0 / 3
+
+    def test_delete_covers_registered_keys(self, feature_store, redis_client, monkeypatch):
+        """Test that a per-user structure registered later is erased too."""
+        monkeypatch.setattr("src.features.store.USER_KEY_SUFFIXES", list(USER_KEY_SUFFIXES))
+        suffix = register_user_key("devices")
+        redis_client.sadd(f"user:registry_user:{suffix}", "device-1")
+        feature_store.add_transaction("registry_user", 10.0, timestamp=1000000)
+
+        assert feature_store.delete_user_data("registry_user") == 5
+        assert not redis_client.exists("user:registry_user:devices")
+
+    def test_profile_outlives_window_keys(self, feature_store, redis_client):
+        """Test that the all-time profile key gets the longer profile_ttl."""
+        feature_store.add_transaction("ttl_profile", 10.0, timestamp=1000000)
+
+        assert redis_client.ttl("user:ttl_profile:avg_spend") <= feature_store.key_ttl
+        assert redis_client.ttl("user:ttl_profile:profile") > feature_store.key_ttl
+
+
+class TestAsyncRedisFeatureStore(TestRedisFeatureStore):
+    """Runs the RedisFeatureStore scenarios against AsyncRedisFeatureStore."""
+
+    @pytest.fixture
+    def feature_store(self, async_feature_store):
+        """Async store behind a synchronous facade (see conftest)."""
+        return async_feature_store
+
+    def test_script_reloaded_after_flush(self, redis_client):
+        """Test that connect() loads the scripts the server no longer has cached."""
+
+        async def scenario():
+            redis_client.script_flush()
+            store = AsyncRedisFeatureStore(
+                host=os.getenv("REDIS_HOST", "localhost"),
+                port=int(os.getenv("REDIS_PORT", "6379")),
+                db=15,
+            )
+            await store.connect()
+            await store.add_transaction("async_flushed_user", 80.0, timestamp=1000000)
+            features = await store.get_features("async_flushed_user", current_timestamp=1000000)
+            await store.close()
+            return features
+
+        assert asyncio.run(scenario()) == {
+            "trans_count_24h": 1.0,
+            "avg_spend_24h": 80.0,
+            "avg_amt_24h": 80.0,
+            "trans_count_all_time": 1.0,
+            "user_avg_amt_all_time": 80.0,
+        }
+
+    def test_concurrent_ema_updates_are_not_lost(self, redis_client):
+        """Test that racing coroutines for one user all contribute to the EMA."""
+        base_time = 1000000
+        n_writers = 40
+
+        async def scenario():
+            store = AsyncRedisFeatureStore(
+                host=os.getenv("REDIS_HOST", "localhost"),
+                port=int(os.getenv("REDIS_PORT", "6379")),
+                db=15,
+                max_connections=8,
+            )
+            await store.connect()
+            await store.delete_user_data("async_ema_race")
+            await store.add_transaction("async_ema_race", 0.0, timestamp=base_time)
+            await asyncio.gather(
+                *(
+                    store.add_transaction("async_ema_race", 100.0, base_time + 1 + i)
+                    for i in range(n_writers)
+                )
+            )
+            features = await store.get_features("async_ema_race", base_time + n_writers)
+            await store.close()
+            return features, store.ema_alpha
+
+        features, alpha = asyncio.run(scenario())
+
+        assert features["trans_count_24h"] == n_writers + 1
+        assert features["avg_spend_24h"] == pytest.approx(100.0 * (1 - (1 - alpha) ** n_writers))
+
+    def test_concurrent_awaits(self, redis_client):
+        """Test that many coroutines can hydrate and record concurrently."""
+
+        async def scenario():
+            store = AsyncRedisFeatureStore(
+                host=os.getenv("REDIS_HOST", "localhost"),
+                port=int(os.getenv("REDIS_PORT", "6379")),
+                db=15,
+                max_connections=8,
+            )
+            await store.connect()
+            user_ids = [f"async_user_{i}" for i in range(50)]
+            await asyncio.gather(
+                *(store.add_transaction(u, 10.0, timestamp=1000000) for u in user_ids)
+            )
+            features = await asyncio.gather(
+                *(store.get_features(u, current_timestamp=1000000) for u in user_ids)
+            )
+            await store.close()
+            return features
+
+        features = asyncio.run(scenario())
+
+        expected = {
+            "trans_count_24h": 1.0,
+            "avg_spend_24h": 10.0,
+            "avg_amt_24h": 10.0,
+            "trans_count_all_time": 1.0,
+            "user_avg_amt_all_time": 10.0,
+        }
+        assert all(f == expected for f in features)
+
+
+class TestBucketedFeatureStore:
+    """Test suite for window_mode="buckets" (fixed 15-minute buckets)."""
+
+    @pytest.fixture
+    def bucket_store(self, redis_client):
+        return RedisFeatureStore(
+            host=os.getenv("REDIS_HOST", "localhost"),
+            port=int(os.getenv("REDIS_PORT", "6379")),
+            db=15,
+            window_mode="buckets",
+        )
+
+    @staticmethod
+    def expected_count(timestamps, current_timestamp):
+        """Transactions in the 96 buckets ending with current_timestamp's."""
+        last = current_timestamp // 900
+        return sum(1 for ts in timestamps if last - 96 < ts // 900 <= last)
+
+    def test_memory_bounded_per_user(self, bucket_store, redis_client):
+        """Test that the hash never exceeds one field per bucket."""
+        bucket_store.add_transactions(
+            [("burst_user", 1.0, 1000000 + i * 60) for i in range(3000)]  # ~50h
+        )
+
+        assert redis_client.hlen("user:burst_user:tx_buckets") <= 96
+        assert not redis_client.exists("user:burst_user:tx_history")
+
+    def test_counts_whole_buckets(self, bucket_store):
+        """Test the count against the bucket-aligned window at several timestamps."""
+        rng = np.random.default_rng(3)
+        timestamps = sorted(1000000 + int(t) for t in rng.integers(0, 2 * 86400, 200))
+        for ts in timestamps:
+            bucket_store.add_transaction("bucket_user", 10.0, ts)
+
+        end = timestamps[-1]
+        for ts in (end, end + 900, end + 43200, end + 86400):
+            features = bucket_store.get_features("bucket_user", ts)
+            assert features["trans_count_24h"] == self.expected_count(timestamps, ts)
+
+        columns = bucket_store.get_features_arrays(["bucket_user", "nobody"], [end, end])
+        assert columns["trans_count_24h"].tolist() == [self.expected_count(timestamps, end), 0]
+
+    def test_approximates_exact_window(self, bucket_store, feature_store):
+        """Test that counts only differ from the ZSET window by its oldest bucket."""
+        base_time = 1000000
+        events = [("approx_user", 20.0, base_time + i * 1800) for i in range(80)]
+        bucket_store.add_transactions(events)
+        feature_store.add_transactions(events)
+
+        at = base_time + 79 * 1800
+        exact = feature_store.get_features("approx_user", at)
+        approx = bucket_store.get_features("approx_user", at)
+
+        assert exact["trans_count_24h"] - 1 <= approx["trans_count_24h"] <= exact["trans_count_24h"]
+        assert approx["avg_spend_24h"] == exact["avg_spend_24h"]
+        assert approx["avg_amt_24h"] == exact["avg_amt_24h"] == 20.0
+
+    def test_get_features_and_record(self, bucket_store):
+        """Test that the combined call returns the pre-transaction features."""
+        bucket_store.add_transaction("hydrate_bucket", 100.0, timestamp=1000000)
+        before = bucket_store.get_features("hydrate_bucket", 1000100)
+
+        assert bucket_store.get_features_and_record("hydrate_bucket", 50.0, 1000100) == before
+        assert bucket_store.get_features("hydrate_bucket", 1000100)["trans_count_24h"] == 2.0
+
+    def test_late_event_for_reused_slot_is_dropped(self, bucket_store):
+        """Test that an event older than its slot's current bucket is not counted."""
+        bucket_store.add_transaction("late_user", 10.0, timestamp=1000000 + 86400)
+        bucket_store.add_transaction("late_user", 10.0, timestamp=1000000)  # Same slot, 24h older
+        bucket_store.add_transaction("late_user", 10.0, timestamp=1000000 + 86400 - 900)
+
+        features = bucket_store.get_features("late_user", 1000000 + 86400)
+        assert features["trans_count_24h"] == 2.0
+
+    def test_velocity_from_buckets(self, redis_client):
+        """Test that windows sum whole buckets of the hash."""
+        store = RedisFeatureStore(
+            host=os.getenv("REDIS_HOST", "localhost"),
+            port=int(os.getenv("REDIS_PORT", "6379")),
+            db=15,
+            window_mode="buckets",
+            velocity_windows={"30m": 1800, "24h": 86400},
+        )
+        now = 900 * 2000 + 10
+        store.add_transactions(
+            [("velocity_bucket", amount, now - age) for amount, age in ((5.0, 3600), (7.0, 600))]
+        )
+
+        assert store.get_velocity("velocity_bucket", now) == {
+            "trans_count_30m": 1.0,
+            "amt_sum_30m": 7.0,
+            "trans_count_24h": 2.0,
+            "amt_sum_24h": 12.0,
+        }
+
+    def test_delete_and_history(self, bucket_store):
+        """Test that deletion covers the bucket hash and history is unavailable."""
+        bucket_store.add_transaction("gone_user", 10.0, timestamp=1000000)
+
+        with pytest.raises(ValueError):
+            bucket_store.get_transaction_history("gone_user", current_timestamp=1000000)
+        assert bucket_store.delete_user_data("gone_user") == 3
+        assert bucket_store.get_features("gone_user", 1000000)["trans_count_24h"] == 0.0
+
+    def test_invalid_configuration(self):
+        """Test that bad modes are rejected before connecting."""
+        with pytest.raises(ValueError):
+            FeatureStoreBase(window_mode="list")
+        with pytest.raises(ValueError):
+            FeatureStoreBase(window_mode="buckets", bucket_seconds=7)
+        with pytest.raises(ValueError):
+            FeatureStoreBase(window_mode="buckets", near_cache=NearCache())
+        with pytest.raises(ValueError):
+            FeatureStoreBase(window_mode="buckets", velocity_windows={"7d": 604800})
+
+    def test_async_store_matches(self, bucket_store, redis_client):
+        """Test that the async store reads and writes the same buckets."""
+
+        async def scenario():
+            store = AsyncRedisFeatureStore(
+                host=os.getenv("REDIS_HOST", "localhost"),
+                port=int(os.getenv("REDIS_PORT", "6379")),
+                db=15,
+                window_mode="buckets",
+            )
+            await store.connect()
+            try:
+                events = [("async_bucket", 30.0, 1000000 + i) for i in range(5)]
+                await store.add_transactions(events)
+                hydrated = await store.get_features_and_record("async_bucket", 30.0, 1000005)
+                return hydrated, await store.get_features_many(["async_bucket"], [1000005])
+            finally:
+                await store.close()
+
+        hydrated, (features,) = asyncio.run(scenario())
+
+        assert hydrated["trans_count_24h"] == 5.0
+        assert features == bucket_store.get_features("async_bucket", 1000005)
+        assert features["trans_count_24h"] == 6.0
+
+
+class TestHashLayoutFeatureStore(FeatureStoreScenarios):
+    """Runs the feature-store scenarios with key_layout="hash" (window + one state hash)."""
+
+    @pytest.fixture
+    def feature_store(self, redis_client):
+        return RedisFeatureStore(
+            host=os.getenv("REDIS_HOST", "localhost"),
+            port=int(os.getenv("REDIS_PORT", "6379")),
+            db=15,
+            key_layout="hash",
+        )
+
+    def test_delete_user_data(self, feature_store):
+        """Test that erasure removes the window and the state hash."""
+        feature_store.add_transaction("hash_erase", 100.0, timestamp=1000000)
+
+        assert feature_store.delete_user_data("hash_erase") == 2
+        assert feature_store.get_features("hash_erase", 1000000)["trans_count_all_time"] == 0.0
+
+    def test_delete_users_data(self, feature_store):
+        """Test batch deletion: per-user key counts, other users untouched."""
+        feature_store.add_transactions([("erase_a", 10.0, 1000000), ("keep_b", 20.0, 1000000)])
+
+        assert feature_store.delete_users_data(["erase_a", "never_seen"]) == [2, 0]
+        assert feature_store.get_features("keep_b", 1000000)["trans_count_24h"] == 1.0
+
+    def test_two_keys_in_one_slot(self, feature_store, redis_client):
+        """Test that a user is a window and a state hash sharing a cluster slot."""
+        feature_store.add_transaction("slot:user", 10.0, timestamp=1000000)
+
+        keys = sorted(redis_client.scan_iter(match="user:{slot:user}:*"))
+        assert keys == ["user:{slot:user}:state", "user:{slot:user}:tx_history"]
+        assert len({key_slot(key.encode()) for key in keys}) == 1
+        assert set(redis_client.hgetall(keys[0])) == {"ema", "count", "sum", "rsum", "rcur"}
+        assert redis_client.ttl(keys[0]) > feature_store.key_ttl
+        assert 0 < redis_client.ttl(keys[1]) <= feature_store.key_ttl
+
+    def test_window_fields_lapse_with_window(self, feature_store, redis_client):
+        """Test that the EMA and rolling sum expire with the window, the profile does not."""
+        feature_store.add_transaction("lapse_user", 100.0, timestamp=1000000)
+        redis_client.delete("user:{lapse_user}:tx_history")  # key_ttl elapsed
+
+        features = feature_store.get_features("lapse_user", 1000000)
+        assert features["avg_spend_24h"] == 0.0
+        assert features["trans_count_all_time"] == 1.0
+
+        feature_store.add_transaction("lapse_user", 20.0, timestamp=1000060)
+        features = feature_store.get_features("lapse_user", 1000060)
+        assert features["avg_spend_24h"] == 20.0  # EMA restarts, as with avg_spend's TTL
+        assert features["avg_amt_24h"] == 20.0
+        assert features["trans_count_all_time"] == 2.0
+
+    @pytest.mark.parametrize("window_mode", ["zset", "buckets"])
+    def test_matches_keys_layout(self, redis_client, window_mode):
+        """Test that both layouts give identical features for the same events."""
+        connection = {
+            "host": os.getenv("REDIS_HOST", "localhost"),
+            "port": int(os.getenv("REDIS_PORT", "6379")),
+            "window_mode": window_mode,
+        }
+        stores = [
+            RedisFeatureStore(db=13, **connection),
+            RedisFeatureStore(db=14, key_layout="hash", **connection),
+        ]
+        rng = np.random.default_rng(11)
+        events = [
+            ("layout_" + str(rng.integers(3)), float(rng.integers(1, 500)), 1000000 + int(t))
+            for t in np.sort(rng.integers(0, 3 * 86400, 60))
+        ]
+        users = ["layout_0", "layout_1", "layout_2", "nobody"]
+        at = [1000000 + 86400 * day for day in range(4)]
+
+        results = []
+        for store in stores:
+            store.client.flushdb()
+            hydrated = [
+                store.get_features_and_record(*event)
+                if i % 3 == 0
+                else store.add_transaction(*event)
+                for i, event in enumerate(events)
+            ]
+            results.append(
+                (
+                    hydrated,
+                    [store.get_features_many(users, [ts] * len(users)) for ts in at],
+                    [store.get_features("layout_0", ts) for ts in at],
+                    [store.get_velocity("layout_1", ts) for ts in at],
+                )
+            )
+            store.client.flushdb()
+
+        assert results[0] == results[1]
+
+    def test_async_store_matches(self, feature_store):
+        """Test that the async store reads and writes the same state hash."""
+
+        async def scenario():
+            store = AsyncRedisFeatureStore(
+                host=os.getenv("REDIS_HOST", "localhost"),
+                port=int(os.getenv("REDIS_PORT", "6379")),
+                db=15,
+                key_layout="hash",
+            )
+            await store.connect()
+            try:
+                await store.add_transactions([("async_hash", 30.0, 1000000 + i) for i in range(5)])
+                hydrated = await store.get_features_and_record("async_hash", 60.0, 1000005)
+                return hydrated, await store.get_features_arrays(["async_hash"], [1000005])
+            finally:
+                await store.close()
+
+        hydrated, columns = asyncio.run(scenario())
+
+        assert hydrated["trans_count_24h"] == 5.0
+        expected = feature_store.get_features("async_hash", 1000005)
+        assert {name: values[0] for name, values in columns.items()} == expected
+        assert expected["avg_amt_24h"] == 35.0
+
+    def test_invalid_configuration(self):
+        """Test that an unknown key layout is rejected."""
+        with pytest.raises(ValueError):
+            FeatureStoreBase(key_layout="flat")
+
+    def test_key_user_id(self):
+        """Test that user IDs are parsed from keys of either layout."""
+        assert key_user_id("user:u1:tx_history") == "u1"
+        assert key_user_id("user:u:2:avg_spend") == "u:2"
+        assert key_user_id("user:{u:3}:state") == "u:3"
+
+
+class TestReplicaFeatureStore(FeatureStoreScenarios):
+    """
+    Runs the feature-store scenarios with reads routed to a replica: URLs of
+    the test database itself stand in for up-to-date replicas, other
+    databases for replicas the heartbeat never reaches.
+    """
+
+    @pytest.fixture
+    def connection(self, redis_client):
+        return {
+            "host": os.getenv("REDIS_HOST", "localhost"),
+            "port": int(os.getenv("REDIS_PORT", "6379")),
+        }
+
+    @pytest.fixture
+    def feature_store(self, connection):
+        store = RedisFeatureStore(db=15, replicas=[{**connection, "db": 15}], **connection)
+        yield store
+        store.close()
+
+    def test_reads_served_by_replica(self, feature_store, connection):
+        """Test that reads go to a fresh replica and writes to the primary."""
+        host, port = connection["host"], connection["port"]
+        feature_store.add_transaction("replica_user", 40.0, timestamp=1000000)
+        features = feature_store.get_features("replica_user", 1000000)
+        feature_store.get_features_many(["replica_user"], [1000000])
+        feature_store.get_velocity("replica_user", 1000000)
+        feature_store.get_transaction_history("replica_user", current_timestamp=1000000)
+
+        stats = feature_store.replica_router.stats()
+        assert features["trans_count_24h"] == 1.0
+        assert stats["replicas"][f"{host}:{port}/15"]["reads"] == 4
+        assert stats["primary_reads"] == 0
+
+    def test_writes_stay_on_primary(self, connection, redis_client):
+        """Test that writes and hydrate-and-record use the primary, other reads the replica."""
+        replica = redis.Redis(db=11, decode_responses=True, **connection)
+        replica.flushdb()
+        store = RedisFeatureStore(db=15, replicas=[{**connection, "db": 11}], **connection)
+        try:
+            # db 11 never receives the heartbeat; report it as caught up
+            store.replica_router.observe(0, store.replica_router.next_heartbeat())
+            store.add_transaction("split_user", 10.0, timestamp=1000000)
+            hydrated = store.get_features_and_record("split_user", 20.0, 1000001)
+
+            assert hydrated["trans_count_24h"] == 1.0
+            assert store.get_features("split_user", 1000001)["trans_count_24h"] == 0.0
+            assert replica.dbsize() == 0
+            assert redis_client.exists("user:split_user:tx_history")
+        finally:
+            store.close()
+            replica.flushdb()
+
+    def test_stale_replica_falls_back_to_primary(self, connection):
+        """Test that a replica without the latest heartbeats is skipped."""
+        store = RedisFeatureStore(db=15, replicas=[{**connection, "db": 11}], **connection)
+        try:
+            store.add_transaction("stale_user", 10.0, timestamp=1000000)
+
+            assert store.get_features("stale_user", 1000000)["trans_count_24h"] == 1.0
+            stats = store.replica_router.stats()
+            assert stats["replicas"][f"{connection['host']}:{connection['port']}/11"] == {
+                "staleness_ms": float("inf"),
+                "fresh": False,
+                "reads": 0,
+            }
+            assert stats["primary_reads"] == 1
+        finally:
+            store.close()
+
+    def test_lagging_replica_falls_back_to_primary(self, connection):
+        """Test that a replica becomes stale once heartbeats stop reaching it."""
+        store = RedisFeatureStore(
+            db=15,
+            replicas=[{**connection, "db": 15}],
+            replica_max_staleness_ms=100,
+            **connection,
+        )
+        try:
+            assert store.replica_router.choose() == [0]
+
+            # Heartbeats stop arriving (as with a broken replication link)
+            store._heartbeat_stop.set()
+            store._heartbeat_thread.join()
+            time.sleep(0.15)
+
+            assert store.replica_router.choose() == []
+        finally:
+            store.close()
+
+    def test_replica_error_falls_back_to_primary(self, feature_store, monkeypatch):
+        """Test that a failing replica read is retried on the primary."""
+        feature_store.add_transaction("error_user", 10.0, timestamp=1000000)
+
+        def fail(*args, **kwargs):
+            raise redis.exceptions.ConnectionError("replica down")
+
+        monkeypatch.setattr(feature_store.replica_clients[0], "pipeline", fail)
+
+        assert feature_store.get_features("error_user", 1000000)["trans_count_24h"] == 1.0
+        assert feature_store.replica_router.stats()["replica_errors"] == 1
+
+    def test_hedged_read(self, connection, monkeypatch):
+        """Test that a read the first replica is slow to answer is won by the second."""
+        store = RedisFeatureStore(
+            db=15,
+            replicas=[{**connection, "db": 15}, {**connection, "db": 15}],
+            replica_hedge_ms=20,
+            **connection,
+        )
+        execute_reads = store._execute_reads
+        calls = []
+
+        def slow_first_read(queue, transaction=False, client=None):
+            calls.append(client)
+            if len(calls) == 1:
+                time.sleep(0.5)
+            return execute_reads(queue, transaction, client)
+
+        monkeypatch.setattr(store, "_execute_reads", slow_first_read)
+        try:
+            store.add_transaction("hedge_user", 10.0, timestamp=1000000)
+            started = time.perf_counter()
+            features = store.get_features("hedge_user", 1000000)
+
+            assert time.perf_counter() - started < 0.4
+            assert features["trans_count_24h"] == 1.0
+            assert calls[0] is not calls[1]
+            stats = store.replica_router.stats()
+            assert stats["hedged_reads"] == 1
+            assert stats["hedge_wins"] == 1
+        finally:
+            store.close()
+
+    def test_async_store_routes_reads(self, connection):
+        """Test replica reads, hedging and the heartbeat task of the async store."""
+
+        async def scenario():
+            store = AsyncRedisFeatureStore(
+                db=15,
+                replicas=[{**connection, "db": 15}, {**connection, "db": 15}],
+                replica_hedge_ms=20,
+                **connection,
+            )
+            await store.connect()
+            execute_reads = store._execute_reads
+            calls = []
+
+            async def slow_first_read(queue, transaction=False, client=None):
+                calls.append(client)
+                if len(calls) == 1:
+                    await asyncio.sleep(0.5)
+                return await execute_reads(queue, transaction, client)
+
+            store._execute_reads = slow_first_read
+            try:
+                events = [("async_replica", 10.0, 1000000 + i) for i in range(3)]
+                await store.add_transactions(events)
+                features = await store.get_features("async_replica", 1000002)
+                velocity = await store.get_velocity("async_replica", 1000002)
+                return features, velocity, store.replica_router.stats(), store._heartbeat_task
+            finally:
+                await store.close()
+
+        features, velocity, stats, heartbeat = asyncio.run(scenario())
+
+        assert features["trans_count_24h"] == 3.0
+        assert velocity["trans_count_24h"] == 3.0
+        assert stats["hedged_reads"] == 1
+        assert stats["hedge_wins"] == 1
+        assert sum(replica["reads"] for replica in stats["replicas"].values()) == 2
+        assert heartbeat.cancelled()
+
+
+class TestInMemoryFeatureStore(FeatureStoreScenarios):
+    """Runs the feature-store scenarios against InMemoryFeatureStore (no Redis)."""
+
+    @pytest.fixture
+    def feature_store(self, memory_feature_store):
+        return memory_feature_store
+
+    def test_implements_backend_protocol(self, feature_store):
+        """Test that the in-memory store satisfies the backend interface."""
+        assert isinstance(feature_store, FeatureStoreBackend)
+        assert feature_store.blocking_io is False
+
+    def test_state_is_compact_arrays(self, feature_store):
+        """Test that a user's window is held as typed NumPy arrays."""
+        feature_store.add_transaction("compact_user", 10.0, timestamp=1000000)
+        feature_store.add_transaction("compact_user", 20.0, timestamp=1000100)
+
+        state = feature_store._users["compact_user"]
+        assert state.timestamps.dtype == np.int64
+        assert state.amounts.dtype == np.float64
+        assert state.timestamps.tolist() == [1000000, 1000100]
+
+    def test_state_expires_after_ttl(self, feature_store):
+        """Test that the window expires after key_ttl and the profile after profile_ttl."""
+        feature_store.key_ttl = 0
+        feature_store.add_transaction("ttl_user", 10.0, timestamp=1000000)
+
+        features = feature_store.get_features("ttl_user", 1000000)
+        assert features["trans_count_24h"] == 0.0
+        assert features["trans_count_all_time"] == 1.0
+        assert feature_store.delete_user_data("ttl_user") == 1  # Profile only
+
+        feature_store.profile_ttl = 0
+        feature_store.add_transaction("ttl_user", 10.0, timestamp=1000000)
+        assert feature_store.delete_user_data("ttl_user") == 0
+
+    def test_matches_redis(self, feature_store, redis_client):
+        """Test that the same events give identical features and history as Redis."""
+        redis_store = RedisFeatureStore(
+            host=os.getenv("REDIS_HOST", "localhost"),
+            port=int(os.getenv("REDIS_PORT", "6379")),
+            db=15,
+        )
+        rng = np.random.default_rng(7)
+        base_time = 1000000
+        events = [
+            ("parity_" + str(rng.integers(3)), float(rng.integers(1, 500)), base_time + int(t))
+            for t in np.sort(rng.integers(0, 3 * 86400, 60))
+        ]
+        # Out-of-order and duplicate events
+        events += [events[5], ("parity_0", 42.0, base_time)]
+
+        for store in (feature_store, redis_store):
+            for i, (user_id, amount, timestamp) in enumerate(events):
+                if i % 3 == 0:
+                    store.get_features_and_record(user_id, amount, timestamp)
+                else:
+                    store.add_transaction(user_id, amount, timestamp)
+
+        for user_id in ("parity_0", "parity_1", "parity_2"):
+            for ts in (base_time, base_time + 86400, base_time + 3 * 86400):
+                assert feature_store.get_features(user_id, ts) == redis_store.get_features(
+                    user_id, ts
+                )
+            assert sorted(
+                feature_store.get_transaction_history(user_id, 72, base_time + 3 * 86400)
+            ) == sorted(redis_store.get_transaction_history(user_id, 72, base_time + 3 * 86400))
+
+
+class TestHashRing:
+    """Test suite for consistent hashing of users to shards."""
+
+    def test_balanced_and_order_independent(self):
+        """Test that users spread evenly and the mapping ignores node order."""
+        users = [f"user_{i}" for i in range(30000)]
+        ring = HashRing(["a", "b", "c"])
+        counts = {node: 0 for node in "abc"}
+        for user_id in users:
+            counts[ring.node_for(user_id)] += 1
+
+        assert all(8000 < n < 12000 for n in counts.values())
+        reordered = HashRing(["c", "a", "b"])
+        assert all(ring.node_for(u) == reordered.node_for(u) for u in users[:1000])
+
+    def test_adding_a_node_only_moves_keys_to_it(self):
+        """Test that a new node takes about 1/N of the keys, all from existing nodes."""
+        users = [f"user_{i}" for i in range(20000)]
+        before = HashRing(["a", "b", "c"])
+        after = HashRing(["a", "b", "c", "d"])
+
+        moved = [u for u in users if before.node_for(u) != after.node_for(u)]
+
+        assert all(after.node_for(u) == "d" for u in moved)
+        assert 0.2 < len(moved) / len(users) < 0.3
+
+    def test_invalid_nodes(self):
+        """Test that empty or duplicate node lists are rejected."""
+        with pytest.raises(ValueError):
+            HashRing([])
+        with pytest.raises(ValueError):
+            HashRing(["a", "a"])
+
+    def test_parse_redis_url(self):
+        """Test connection settings parsed from shard URLs."""
+        assert parse_redis_url("redis://:secret@redis-a:6380/2") == {
+            "host": "redis-a",
+            "port": 6380,
+            "db": 2,
+            "password": "secret",
+        }
+        assert parse_redis_url("redis://redis-b")["port"] == 6379
+        with pytest.raises(ValueError):
+            parse_redis_url("http://redis-a")
+
+
+class TestShardedFeatureStore(FeatureStoreScenarios):
+    """Test suite for ShardedFeatureStore (databases 12-14 stand in for three nodes)."""
+
+    SHARD_DBS = (12, 13, 14)
+
+    @pytest.fixture
+    def shard_urls(self, redis_client):
+        host = os.getenv("REDIS_HOST", "localhost")
+        port = int(os.getenv("REDIS_PORT", "6379"))
+        yield [f"redis://{host}:{port}/{db}" for db in self.SHARD_DBS]
+        for db in self.SHARD_DBS:
+            redis.Redis(host=host, port=port, db=db).flushdb()
+
+    @pytest.fixture
+    def feature_store(self, shard_urls):
+        store = ShardedFeatureStore.from_urls(shard_urls)
+        yield store
+        store.close()
+
+    def test_implements_backend_protocol(self, feature_store):
+        """Test that the sharded store satisfies the backend interface."""
+        assert isinstance(feature_store, FeatureStoreBackend)
+        assert feature_store.ema_alpha == pytest.approx(0.08)
+
+    def test_users_live_on_one_shard(self, feature_store):
+        """Test that each user's keys are all on the shard the ring assigns."""
+        users = [f"spread_{i}" for i in range(90)]
+        feature_store.add_transactions([(u, 10.0, 1000000) for u in users])
+
+        held = {name: 0 for name in feature_store.shards}
+        for user_id in users:
+            for name, store in feature_store.shards.items():
+                present = store.client.exists(f"user:{user_id}:tx_history")
+                assert present == (name == feature_store.shard_for(user_id))
+                held[name] += present
+
+        assert all(n > 0 for n in held.values())
+
+    def test_batch_reads_match_single_reads(self, feature_store):
+        """Test that split, parallel batch reads come back in input order."""
+        users = [f"batch_{i}" for i in range(40)]
+        feature_store.add_transactions(
+            [(u, float(i + 1), 1000000 + i) for i, u in enumerate(users)]
+        )
+        query = users[::-1] + ["nobody"]
+        timestamps = [1000100] * len(query)
+
+        many = feature_store.get_features_many(query, timestamps)
+        columns = feature_store.get_features_arrays(query, timestamps)
+
+        for i, user_id in enumerate(query):
+            expected = feature_store.get_features(user_id, 1000100)
+            assert many[i] == expected
+            assert {name: values[i] for name, values in columns.items()} == expected
+        assert feature_store.get_features_arrays([], [])["trans_count_24h"].shape == (0,)
+
+    def test_rebalance_after_adding_a_shard(self, shard_urls):
+        """Test that rebalancing moves the new shard's users with their state and TTL."""
+        old = ShardedFeatureStore.from_urls(shard_urls[:2])
+        users = [f"moving_{i}" for i in range(120)]
+        old.add_transactions([(u, 25.0, 1000000 + i) for i, u in enumerate(users)])
+        expected = old.get_features_many(users, [1000200] * len(users))
+
+        new = ShardedFeatureStore.from_urls(shard_urls)
+        moving = [u for u in users if new.shard_for(u) != old.shard_for(u)]
+        assert moving and all(new.shard_for(u) == list(new.shards)[2] for u in moving)
+
+        assert new.rebalance(dry_run=True)["moved_keys"] == 4 * len(moving)
+        assert new.get_features(moving[0], 1000200)["trans_count_24h"] == 0.0
+
+        stats = new.rebalance(scan_count=50)
+
+        assert stats["moved_keys"] == 4 * len(moving)  # Window, EMA, rolling sum, profile
+        assert stats["conflicts"] == 0
+        assert new.get_features_many(users, [1000200] * len(users)) == expected
+        target = new.shards[new.shard_for(moving[0])]
+        assert 0 < target.client.ttl(f"user:{moving[0]}:tx_history") <= target.key_ttl
+        assert new.rebalance()["moved_keys"] == 0
+        old.close()
+        new.close()
+
+    def test_rebalance_keeps_keys_written_on_the_new_shard(self, shard_urls):
+        """Test that a user already written on the new shard keeps that state."""
+        old = ShardedFeatureStore.from_urls(shard_urls[:2])
+        new = ShardedFeatureStore.from_urls(shard_urls)
+        user_id = next(
+            f"conflict_{i}"
+            for i in range(1000)
+            if new.shard_for(f"conflict_{i}") != old.shard_for(f"conflict_{i}")
+        )
+        old.add_transaction(user_id, 10.0, 1000000)
+        new.add_transaction(user_id, 99.0, 1000100)
+
+        stats = new.rebalance()
+
+        assert stats["conflicts"] == 4
+        assert new.get_transaction_history(user_id, 24, 1000100) == [(1000100, 99.0)]
+        assert not old.shards[old.shard_for(user_id)].client.exists(f"user:{user_id}:tx_history")
+        old.close()
+        new.close()
+
+
+class TestBackendProtocol:
+    """Every feature store exposes the backend interface."""
+
+    @pytest.mark.parametrize(
+        "store_cls",
+        [RedisFeatureStore, AsyncRedisFeatureStore, InMemoryFeatureStore, ShardedFeatureStore],
+    )
+    def test_backends_define_interface(self, store_cls):
+        """Test that each backend class defines every interface method."""
+        for name in (
+            "add_transaction",
+            "add_transactions",
+            "get_features_and_record",
+            "get_features",
+            "get_features_many",
+            "get_features_arrays",
+            "get_velocity",
+            "get_transaction_history",
+            "delete_user_data",
+            "delete_users_data",
+            "health_check",
+            "close",
+        ):
+            assert callable(getattr(store_cls, name)), name
@@ -0,0 +1,44 @@
+"""
+Tests for velocity window configuration.
+"""
+
+import pytest
+
+from src.features.windows import (
+    DEFAULT_VELOCITY_WINDOWS,
+    load_velocity_windows,
+    validate_velocity_windows,
+)
+
+
+class TestVelocityWindows:
+    """Test suite for loading and validating velocity windows."""
+
+    def test_repo_config(self):
+        """Test the windows declared in configs/redis_config.yaml."""
+        assert load_velocity_windows("configs/redis_config.yaml") == {
+            "1h": 3600,
+            "6h": 21600,
+            "24h": 86400,
+            "7d": 604800,
+        }
+
+    def test_defaults_without_config(self, tmp_path):
+        """Test the 24h default when the file or key is missing."""
+        assert load_velocity_windows(str(tmp_path / "missing.yaml")) == DEFAULT_VELOCITY_WINDOWS
+
+        config = tmp_path / "redis_config.yaml"
+        config.write_text("sliding_window_hours: 24\n")
+        assert load_velocity_windows(str(config)) == DEFAULT_VELOCITY_WINDOWS
+
+    def test_fractional_hours(self, tmp_path):
+        """Test that windows shorter than an hour can be declared."""
+        config = tmp_path / "redis_config.yaml"
+        config.write_text("velocity_windows:\n  15m: 0.25\n")
+        assert load_velocity_windows(str(config)) == {"15m": 900}
+
+    @pytest.mark.parametrize("windows", [{}, {"1 h": 3600}, {"1h": 0}, {"1h": 0.5}])
+    def test_invalid_windows(self, windows):
+        """Test that unusable names and durations are rejected."""
+        with pytest.raises(ValueError):
+            validate_velocity_windows(windows)
@@ -0,0 +1,142 @@
+"""
+Tests for the Compiled Inference Path.
+
+The compiled path must produce exactly the same model inputs (and therefore
+the same probabilities) as the sklearn Pipeline it was built from.
+"""
+
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import StandardScaler
+
+from src.models.compiled import CompiledFraudPipeline
+from src.models.pipeline import create_fraud_pipeline
+
+
+MODEL_PATH = Path(__file__).parent.parent.parent / "models" / "fraud_model.pkl"
+
+JOBS = ["Engineer, biomedical", "Data scientist", "Teacher"]
+CATEGORIES = ["grocery_pos", "gas_transport", "shopping_net"]
+
+
+def make_rows(n, seed=0, jobs=JOBS, categories=CATEGORIES):
+    """Random raw rows shaped like the API's model input (string timestamps)."""
+    rng = np.random.default_rng(seed)
+    times = pd.Timestamp("2019-01-01") + pd.to_timedelta(
+        rng.integers(0, 2 * 365 * 86400, n), unit="s"
+    )
+    return [
+        {
+            "user_id": f"u{i}",
+            "trans_date_trans_time": times[i].strftime("%Y-%m-%d %H:%M:%S"),
+            "amt": float(rng.uniform(0.5, 5000)),
+            "lat": float(rng.uniform(25, 48)),
+            "long": float(rng.uniform(-124, -67)),
+            "merch_lat": float(rng.uniform(25, 48)),
+            "merch_long": float(rng.uniform(-124, -67)),
+            "job": str(rng.choice(jobs)),
+            "category": str(rng.choice(categories)),
+            "gender": str(rng.choice(["M", "F"])),
+            "dob": f"{rng.integers(1930, 2004)}-{rng.integers(1, 13):02d}-15",
+            "trans_count_24h": int(rng.integers(0, 30)),
+            "amt_to_avg_ratio_24h": float(rng.uniform(0.1, 10)),
+            "amt_relative_to_all_time": float(rng.uniform(0.1, 10)),
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture(scope="module")
+def trained_pipeline():
+    """Small pipeline trained on a subset of jobs/categories."""
+    rows = make_rows(300, seed=42, jobs=JOBS[:2], categories=CATEGORIES[:2])
+    y = np.random.default_rng(42).integers(0, 2, len(rows))
+
+    pipeline = create_fraud_pipeline({"max_depth": 3, "n_estimators": 20})
+    pipeline.fit(pd.DataFrame(rows), y)
+    return pipeline
+
+
+def reference_matrix(pipeline, rows):
+    """Model input matrix produced by the sklearn preprocessing steps."""
+    return np.asarray(pipeline[:-1].transform(pd.DataFrame(rows)), dtype=np.float64)
+
+
+class TestCompiledFraudPipeline:
+    """Equivalence of the compiled path with the sklearn Pipeline."""
+
+    def test_transform_is_bit_identical(self, trained_pipeline):
+        """Test that the batch transform matches the pandas path exactly."""
+        rows = make_rows(500, seed=1)
+        compiled = CompiledFraudPipeline(trained_pipeline)
+
+        assert np.array_equal(compiled.transform(rows), reference_matrix(trained_pipeline, rows))
+
+    def test_transform_one_is_bit_identical(self, trained_pipeline):
+        """Test that the scalar fast path matches the pandas path exactly."""
+        rows = make_rows(200, seed=2)
+        compiled = CompiledFraudPipeline(trained_pipeline)
+        expected = reference_matrix(trained_pipeline, rows)
+
+        for i, row in enumerate(rows):
+            assert np.array_equal(compiled.transform_one(row), expected[i : i + 1])
+
+    def test_predict_proba_is_identical(self, trained_pipeline):
+        """Test that single and batch probabilities equal Pipeline.predict_proba."""
+        rows = make_rows(100, seed=3)
+        compiled = CompiledFraudPipeline(trained_pipeline)
+        expected = trained_pipeline.predict_proba(pd.DataFrame(rows))
+
+        assert np.array_equal(compiled.predict_proba(rows), expected)
+        for i in range(5):
+            assert np.array_equal(compiled.predict_proba([rows[i]]), expected[i : i + 1])
+
+    def test_unseen_category_matches_encoder(self, trained_pipeline):
+        """Test that unseen jobs/categories get the encoder's unknown value."""
+        rows = make_rows(20, seed=4)
+        for row in rows:
+            row["job"] = "Astronaut"
+            row["category"] = "misc_net"
+        compiled = CompiledFraudPipeline(trained_pipeline)
+
+        assert np.array_equal(compiled.transform(rows), reference_matrix(trained_pipeline, rows))
+
+    def test_unknown_gender_raises(self, trained_pipeline):
+        """Test that unmapped gender values are rejected on both paths."""
+        row = make_rows(1, seed=5)[0]
+        row["gender"] = "X"
+        compiled = CompiledFraudPipeline(trained_pipeline)
+
+        with pytest.raises(ValueError):
+            compiled.transform_one(row)
+        with pytest.raises(ValueError):
+            compiled.transform([row, row])
+
+    def test_unsupported_transformer_rejected(self, trained_pipeline):
+        """Test that compilation refuses preprocessing it cannot reproduce."""
+        pipeline = create_fraud_pipeline({"max_depth": 3, "n_estimators": 5})
+        pipeline.set_params(
+            preprocessor=ColumnTransformer([("num", StandardScaler(), ["amt_log"])])
+        )
+        rows = make_rows(50, seed=6)
+        pipeline.fit(pd.DataFrame(rows), np.arange(50) % 2)
+
+        with pytest.raises(ValueError):
+            CompiledFraudPipeline(pipeline)
+
+    @pytest.mark.skipif(not MODEL_PATH.exists(), reason="Trained model not available")
+    def test_shipped_model_is_bit_identical(self):
+        """Test equivalence against the production model artifact."""
+        pipeline = joblib.load(MODEL_PATH)
+        compiled = CompiledFraudPipeline(pipeline)
+        rows = make_rows(1000, seed=7)
+
+        assert np.array_equal(compiled.transform(rows), reference_matrix(pipeline, rows))
+        assert np.array_equal(
+            compiled.predict_proba(rows), pipeline.predict_proba(pd.DataFrame(rows))
+        )
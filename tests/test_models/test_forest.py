@@ -0,0 +1,115 @@
+"""
+Tests for the Flattened Tree-Ensemble Evaluator.
+
+FlatTreeEnsemble must reproduce XGBClassifier.predict_proba bit for bit.
+"""
+
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pytest
+import xgboost as xgb
+from xgboost import XGBClassifier, XGBRegressor
+
+from src.models.forest import FlatTreeEnsemble
+
+
+MODEL_PATH = Path(__file__).parent.parent.parent / "models" / "fraud_model.pkl"
+
+
+def make_data(n, n_features=6, seed=0):
+    """Random features with a learnable, imbalanced target."""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, n_features))
+    y = (X[:, 0] + 0.5 * X[:, 1] * X[:, 2] + rng.normal(scale=0.5, size=n) > 1.2).astype(int)
+    return X, y
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    """Small booster with a non-trivial base score and uneven tree depths."""
+    X, y = make_data(2000)
+    model = XGBClassifier(n_estimators=40, max_depth=5, learning_rate=0.2, random_state=0)
+    model.fit(X, y)
+    return model
+
+
+class TestFlatTreeEnsemble:
+    """Parity of the numpy evaluator with XGBoost."""
+
+    def test_export_structure(self, classifier):
+        """Test that node arrays describe one tree per boosting round."""
+        forest = FlatTreeEnsemble.from_xgboost(classifier)
+
+        assert forest.n_trees == 40
+        assert 1 <= forest.max_depth <= 5
+        n_nodes = len(forest.feature)
+        for array in (forest.threshold, forest.left, forest.right, forest.value):
+            assert len(array) == n_nodes
+        # Leaves point to themselves and carry the values
+        leaves = np.flatnonzero(forest.is_leaf)
+        assert np.array_equal(forest.left[leaves], leaves)
+        assert np.all(forest.value[~forest.is_leaf] == 0)
+
+    @pytest.mark.parametrize("batch_size", [1, 32, 1024])
+    def test_predict_proba_is_bit_identical(self, classifier, batch_size):
+        """Test exact equality with predict_proba at several batch sizes."""
+        forest = FlatTreeEnsemble.from_xgboost(classifier)
+        X, _ = make_data(batch_size, seed=batch_size)
+
+        actual = forest.predict_proba(X)
+        expected = classifier.predict_proba(X)
+
+        assert actual.dtype == expected.dtype
+        assert np.array_equal(actual, expected)
+
+    def test_margin_matches_booster(self, classifier):
+        """Test that raw margins equal the booster's output_margin."""
+        forest = FlatTreeEnsemble.from_xgboost(classifier)
+        X, _ = make_data(500, seed=7)
+
+        expected = classifier.get_booster().predict(xgb.DMatrix(X), output_margin=True)
+        assert np.array_equal(forest.predict_margin(X), expected)
+
+    def test_missing_values_follow_default_direction(self, classifier):
+        """Test that NaN features take each split's learned default branch."""
+        forest = FlatTreeEnsemble.from_xgboost(classifier)
+        X, _ = make_data(500, seed=8)
+        X[np.random.default_rng(8).random(X.shape) < 0.3] = np.nan
+
+        assert np.array_equal(forest.predict_proba(X), classifier.predict_proba(X))
+
+    def test_early_stopping_uses_best_iteration(self):
+        """Test that trees after best_iteration are ignored, as in predict_proba."""
+        X, y = make_data(2000, seed=1)
+        model = XGBClassifier(n_estimators=200, max_depth=4, early_stopping_rounds=5)
+        model.fit(X[:1500], y[:1500], eval_set=[(X[1500:], y[1500:])], verbose=False)
+        assert model.best_iteration < 199
+
+        forest = FlatTreeEnsemble.from_xgboost(model)
+        assert forest.n_trees == model.best_iteration + 1
+        assert np.array_equal(forest.predict_proba(X), model.predict_proba(X))
+
+    def test_wrong_feature_count_raises(self, classifier):
+        """Test that inputs with the wrong number of columns are rejected."""
+        forest = FlatTreeEnsemble.from_xgboost(classifier)
+        with pytest.raises(ValueError):
+            forest.predict_proba(np.zeros((2, 3)))
+
+    def test_unsupported_objective_raises(self):
+        """Test that non-logistic models are refused at export time."""
+        X, y = make_data(200)
+        model = XGBRegressor(n_estimators=5, max_depth=2).fit(X, y.astype(float))
+        with pytest.raises(ValueError):
+            FlatTreeEnsemble.from_xgboost(model)
+
+    @pytest.mark.skipif(not MODEL_PATH.exists(), reason="Trained model not available")
+    def test_shipped_model_is_bit_identical(self):
+        """Test parity on the production model (500 trees, depth 8)."""
+        model = joblib.load(MODEL_PATH).named_steps["model"]
+        forest = FlatTreeEnsemble.from_xgboost(model)
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(2000, forest.n_features)).astype(np.float32)
+
+        assert np.array_equal(forest.predict_proba(X), model.predict_proba(X))
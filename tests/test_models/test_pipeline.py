@@ -4,11 +4,72 @@ Tests for Model Training Pipeline.
 Tests the pipeline construction and feature extraction logic.
 """
 
+import json
+
 import numpy as np
 import pandas as pd
+import pytest
 from sklearn.base import BaseEstimator
 
-from src.models.pipeline import FraudFeatureExtractor, create_fraud_pipeline
+from src.models.pipeline import FraudFeatureExtractor, create_fraud_pipeline, limit_model_threads
+
+
+def reference_transform(X):
+    """The original pandas implementation of FraudFeatureExtractor.transform."""
+    X = X.copy()
+    if "trans_date_trans_time" in X.columns:
+        if X["trans_date_trans_time"].dtype == "object":
+            X["trans_date_trans_time"] = pd.to_datetime(X["trans_date_trans_time"])
+        dt = X["trans_date_trans_time"].dt
+        X["hour_sin"] = np.sin(2 * np.pi * dt.hour / 24)
+        X["hour_cos"] = np.cos(2 * np.pi * dt.hour / 24)
+        X["day_sin"] = np.sin(2 * np.pi * dt.dayofweek / 7)
+        X["day_cos"] = np.cos(2 * np.pi * dt.dayofweek / 7)
+        if "dob" in X.columns:
+            if X["dob"].dtype == "object":
+                X["dob"] = pd.to_datetime(X["dob"])
+            X["age"] = dt.year - X["dob"].dt.year
+
+    if all(c in X.columns for c in ["lat", "long", "merch_lat", "merch_long"]):
+        lat1, lon1, lat2, lon2 = map(
+            np.radians, [X["lat"], X["long"], X["merch_lat"], X["merch_long"]]
+        )
+        a = (
+            np.sin((lat2 - lat1) / 2) ** 2
+            + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        )
+        X["distance_km"] = 2 * np.arcsin(np.sqrt(a)) * 6371
+
+    if "amt" in X.columns:
+        X["amt_log"] = np.log1p(X["amt"])
+    if "gender" in X.columns:
+        X["gender"] = X["gender"].map({"M": 1, "F": 0}).astype(int)
+    return X
+
+
+def raw_transactions(n, seed=0):
+    """Raw rows in the dataset's formats (string timestamps and dob, M/F gender)."""
+    rng = np.random.default_rng(seed)
+    timestamps = np.datetime64("2019-01-01") + rng.integers(0, 500 * 86400, n).astype(
+        "timedelta64[s]"
+    )
+    dobs = np.datetime64("1940-01-01") + rng.integers(0, 25000, 300).astype("timedelta64[D]")
+    return pd.DataFrame(
+        {
+            "trans_date_trans_time": pd.Series(np.datetime_as_string(timestamps)).str.replace(
+                "T", " "
+            ),
+            "dob": np.datetime_as_string(rng.choice(dobs, n)).astype(object),
+            "gender": rng.choice(np.array(["M", "F"], dtype=object), n),
+            "lat": rng.uniform(20, 50, n),
+            "long": rng.uniform(-125, -70, n),
+            "merch_lat": rng.uniform(20, 50, n),
+            "merch_long": rng.uniform(-125, -70, n),
+            "amt": rng.uniform(1, 2000, n),
+            "category": "grocery_pos",
+        },
+        index=np.arange(n) * 2,
+    )
 
 
 class TestFraudFeatureExtractor:
@@ -79,6 +140,54 @@ class TestFraudFeatureExtractor:
 
         assert result["gender"].tolist() == [1, 0, 1]
 
+    def test_matches_reference_implementation(self):
+        """Test that the vectorized transform returns exactly the original pandas output."""
+        data = raw_transactions(5000)
+
+        pd.testing.assert_frame_equal(
+            FraudFeatureExtractor().transform(data), reference_transform(data), check_exact=True
+        )
+
+    def test_matches_reference_with_gaps_and_other_formats(self):
+        """Test parity for missing dates, ISO "T" timestamps, float32 and integer coordinates."""
+        data = raw_transactions(500, seed=1)
+        data.loc[data.index[3], "trans_date_trans_time"] = None
+        data.loc[data.index[5], "dob"] = None
+        for column in ("lat", "long", "merch_lat", "merch_long"):
+            data[column] = data[column].astype(np.float32)
+        iso = raw_transactions(500, seed=2)
+        iso["trans_date_trans_time"] = iso["trans_date_trans_time"].str.replace(" ", "T")
+        iso["lat"] = iso["lat"].round().astype(int)
+
+        for frame in (data, iso):
+            pd.testing.assert_frame_equal(
+                FraudFeatureExtractor().transform(frame),
+                reference_transform(frame),
+                check_exact=True,
+            )
+
+    def test_input_not_modified(self):
+        """Test that columns are added to a new frame, leaving the input untouched."""
+        data = raw_transactions(100)
+        before = data.copy()
+
+        result = FraudFeatureExtractor().transform(data)
+
+        pd.testing.assert_frame_equal(data, before)
+        assert "distance_km" not in data.columns
+        assert result["gender"].dtype == np.int64
+        # Input columns that are not rewritten are shared, not copied
+        assert np.shares_memory(result["amt"].to_numpy(), data["amt"].to_numpy())
+
+    def test_unknown_gender_raises(self):
+        """Test that genders other than M/F are rejected."""
+        extractor = FraudFeatureExtractor()
+
+        with pytest.raises(ValueError):
+            extractor.transform(pd.DataFrame({"gender": ["M", "X"]}))
+        with pytest.raises(ValueError):
+            extractor.transform(pd.DataFrame({"gender": ["F", None]}))
+
 
 class TestPipelineCreation:
     """Test pipeline factory function."""
@@ -138,3 +247,35 @@ class TestPipelineCreation:
         probas = pipeline.predict_proba(data)
         assert probas.shape == (n_samples, 2)
         assert np.all((probas >= 0) & (probas <= 1))
+
+    def test_limit_model_threads(self):
+        """Test that serving processes can cap XGBoost's thread count."""
+        np.random.seed(0)
+        X = pd.DataFrame(
+            {
+                "trans_date_trans_time": pd.date_range("2019-01-01", periods=50, freq="h"),
+                "amt": np.random.uniform(10, 500, 50),
+                "lat": np.random.uniform(30, 45, 50),
+                "long": np.random.uniform(-120, -70, 50),
+                "merch_lat": np.random.uniform(30, 45, 50),
+                "merch_long": np.random.uniform(-120, -70, 50),
+                "job": np.random.choice(["Engineer, biomedical", "Data scientist"], 50),
+                "category": np.random.choice(["grocery_pos", "gas_transport"], 50),
+                "gender": np.random.choice(["M", "F"], 50),
+                "dob": ["1990-01-01"] * 50,
+                "trans_count_24h": np.random.randint(1, 10, 50),
+                "amt_to_avg_ratio_24h": np.random.uniform(0.5, 2.0, 50),
+                "amt_relative_to_all_time": np.random.uniform(0.5, 2.0, 50),
+            }
+        )
+        pipeline = create_fraud_pipeline({"max_depth": 2, "n_estimators": 5})
+        pipeline.fit(X, np.random.randint(0, 2, 50))
+        before = pipeline.predict_proba(X)
+
+        limit_model_threads(pipeline, 1)
+
+        model = pipeline.named_steps["model"]
+        assert model.get_params()["n_jobs"] == 1
+        config = json.loads(model.get_booster().save_config())
+        assert config["learner"]["generic_param"]["nthread"] == "1"
+        np.testing.assert_array_equal(pipeline.predict_proba(X), before)